@@ -0,0 +1,80 @@
+"""Content-based language detection as document size grows.
+
+``split`` is the old LanguageDetector.detect_from_content: split the whole
+text into lines to keep the first 50, then up to a dozen separate
+``re.search`` passes. ``prefix`` is the current one: the first 50 lines,
+bounded to PREFIX_SIZE characters, scanned once by a combined pattern.
+``agree`` checks that both give the same answer.
+"""
+
+import re
+
+from common import best_of, c_source, print_table
+
+from editor.highlighters.detector import LanguageDetector
+
+
+def _split_detect(content: str) -> str:
+    lines = content.split("\n")[:50]
+    text = "\n".join(lines)
+
+    if re.search(r"^\s*(import|from)\s+\w+", text, re.MULTILINE):
+        if re.search(r"^\s*def\s+\w+\s*\(", text, re.MULTILINE):
+            return "python"
+        if re.search(r"^\s*class\s+\w+.*:", text, re.MULTILINE):
+            return "python"
+
+    if re.search(r"^\s*#include\s*[<\"]", text, re.MULTILINE):
+        if re.search(r"\b(class|namespace|template)\b", text):
+            return "cpp"
+        return "c"
+
+    if re.search(r"^\s*(public|private|protected)\s+(class|interface)\s+\w+", text, re.MULTILINE):
+        return "java"
+    if re.search(r"^\s*package\s+[\w.]+;", text, re.MULTILINE):
+        return "java"
+
+    if re.search(r"^\s*<!DOCTYPE\s+html", text, re.MULTILINE | re.IGNORECASE):
+        return "html"
+    if re.search(r"<html[\s>]", text, re.IGNORECASE):
+        return "html"
+
+    text_stripped = text.strip()
+    if text_stripped.startswith("{") or text_stripped.startswith("["):
+        if re.search(r'"\w+"\s*:', text):
+            return "json"
+
+    if re.search(r"^#{1,6}\s", text, re.MULTILINE):
+        return "markdown"
+    if re.search(r"^\s*[-*]\s", text, re.MULTILINE) and re.search(r"\[.+\]\(.+\)", text):
+        return "markdown"
+
+    return "plain"
+
+
+def _documents(lines: int) -> dict[str, str]:
+    body = c_source(lines)
+    return {
+        "c": "#include <stdio.h>\n" + body,
+        "python": "import os\n\ndef main():\n    pass\n" + body,
+        "json": '{\n  "key": 1,\n' + body,
+        "plain": body,
+    }
+
+
+def run(line_counts=(1_000, 100_000, 1_000_000)) -> None:
+    rows = []
+    for count in line_counts:
+        for name, content in _documents(count).items():
+            split = best_of(lambda: _split_detect(content))
+            prefix = best_of(lambda: LanguageDetector.detect_from_content(content))
+            agree = _split_detect(content) == LanguageDetector.detect_from_content(content)
+            rows.append([
+                count, name, f"{split:.2f}", f"{prefix:.2f}", "yes" if agree else "no",
+            ])
+
+    print_table(["lines", "content", "split ms", "prefix ms", "agree"], rows)
+
+
+if __name__ == "__main__":
+    run()
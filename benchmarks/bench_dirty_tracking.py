@@ -0,0 +1,56 @@
+"""Per-keystroke cost of unsaved-changes tracking in MainWindow.
+
+``copy`` is what ``_mark_modified`` used to do on every ``textChanged``:
+materialize the whole document with ``toPlainText`` and compare it with
+the saved text. ``revision`` is the current DocumentModel path, which
+records the edit and answers ``is_modified`` from the revision and the
+document length. Times are for inserting one character through the
+editor, including layout, highlighting and the status update.
+"""
+
+import time
+
+from common import c_source, get_app, print_table
+
+from editor.window import MainWindow
+
+
+def _keystroke_us(app, window, repeat) -> float:
+    cursor = window.text_edit.textCursor()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        cursor.insertText("x")
+    elapsed = time.perf_counter() - start
+    app.processEvents()
+    return elapsed / repeat * 1e6
+
+
+def _measure(app, text: str, copy: bool) -> float:
+    window = MainWindow()
+    window._load_content(text)
+    if copy:
+        saved = window.text_edit.toPlainText()
+        window.text_edit.textChanged.disconnect()
+        window.text_edit.textChanged.connect(
+            lambda: window.text_edit.toPlainText() != saved and window._update_title()
+        )
+    elapsed = _keystroke_us(app, window, repeat=20 if copy else 200)
+    window._document.mark_saved()
+    window.close()
+    return elapsed
+
+
+def run(line_counts=(10_000, 100_000, 400_000)) -> None:
+    app = get_app()
+    rows = []
+    for count in line_counts:
+        text = c_source(count)
+        copy = _measure(app, text, copy=True)
+        revision = _measure(app, text, copy=False)
+        rows.append([count, f"{len(text) / 1e6:.1f}", f"{copy:.0f}", f"{revision:.0f}"])
+
+    print_table(["lines", "MB", "copy us", "revision us"], rows)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,65 @@
+"""setFormat calls per block with and without merged format runs.
+
+Highlights 5,000 dense C or minified-style JS lines. ``per token`` emulates
+the old behaviour: one setFormat per token, PLAIN included. ``merged``
+is the current DocumentHighlighter. It joins adjacent tokens that share a
+format and skips PLAIN. ``calls/line`` counts setFormat calls;
+``rehighlight ms`` is a full rehighlight() with every line already in the
+line cache, so it is mostly format application.
+"""
+
+from array import array
+
+from common import best_of, get_app, print_table
+
+from PyQt6.QtGui import QTextDocument
+from PyQt6.QtWidgets import QPlainTextDocumentLayout
+
+from editor.highlighters.document_highlighter import DocumentHighlighter
+import editor.highlighters.register_tokenizers  # noqa: F401
+
+
+class PerTokenHighlighter(DocumentHighlighter):
+    """Applies one format per token, like highlightBlock used to."""
+
+    def _build_format_table(self):
+        self._run_formats = list(self._style_registry.format_table)
+        self._style_to_run = list(range(len(self._run_formats)))
+
+    def _merge_runs(self, tokens):
+        return array("I", tokens)
+
+
+DENSE = {
+    "c": "a[i]=b[i]+c[i]*d;x->y=(int)z[k++];if(!p){q(r,s);}",
+    "javascript": "var a={b:[1,2,3]};if(a&&b){c(d,e[f])};g=h?i:j;",
+}
+
+
+def _measure(app, cls, lang_id: str, lines: int = 5_000):
+    doc = QTextDocument()
+    doc.setDocumentLayout(QPlainTextDocumentLayout(doc))
+    doc.setPlainText("\n".join([DENSE[lang_id]] * lines))
+    highlighter = cls(doc, lang_id)
+    app.processEvents()
+
+    entry = highlighter._incremental_manager._line_entries[0]
+    calls = len(entry.tokens) // 3
+    elapsed = best_of(highlighter.rehighlight, 3)
+    highlighter.setDocument(None)
+    return calls, elapsed
+
+
+def run() -> None:
+    app = get_app()
+    rows = []
+    for lang_id in DENSE:
+        for label, cls in (("per token", PerTokenHighlighter), ("merged", DocumentHighlighter)):
+            calls, elapsed = _measure(app, cls, lang_id)
+            rows.append([lang_id, label, calls, f"{elapsed:.0f}"])
+
+    print_table(["lang", "mode", "calls/line", "rehighlight ms"], rows)
+
+
+if __name__ == "__main__":
+    run()
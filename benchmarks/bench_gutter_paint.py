@@ -0,0 +1,118 @@
+"""Painting the line number gutter.
+
+``old`` is the previous paint: it walks every block from the top of the
+viewport and lays out each number with ``drawText``, fetching the font
+metrics and a fresh pen per row. ``new`` is CodeEditor's cached
+LineNumberGutter, which starts at the damaged row and draws pre-rendered
+digits. ``full`` repaints the whole gutter; ``scroll`` repaints the one
+row a single-line scroll exposes at the bottom, which is all the gutter
+is asked to paint after ``scroll(0, dy)``. ``width`` is the cost of the
+width check ``updateRequest`` runs on every full-viewport update.
+"""
+
+from PyQt6.QtCore import QRect, Qt
+from PyQt6.QtGui import QColor, QPainter
+
+from common import best_of, c_source, get_app, print_table
+
+from editor.code_editor import CodeEditor
+
+REPAINTS = 200
+
+
+def _old_paint(editor, event):
+    painter = QPainter(editor.line_number_area)
+    painter.fillRect(event.rect(), QColor(Qt.GlobalColor.lightGray).lighter(120))
+
+    block = editor.firstVisibleBlock()
+    block_number = block.blockNumber()
+    top = int(editor.blockBoundingGeometry(block).translated(editor.contentOffset()).top())
+    bottom = top + int(editor.blockBoundingRect(block).height())
+
+    while block.isValid() and top <= event.rect().bottom():
+        if block.isVisible() and bottom >= event.rect().top():
+            painter.setPen(QColor(Qt.GlobalColor.darkGray))
+            painter.drawText(
+                0,
+                top,
+                editor.line_number_area.width() - 3,
+                editor.fontMetrics().height(),
+                Qt.AlignmentFlag.AlignRight,
+                str(block_number + 1),
+            )
+        block = block.next()
+        if not block.isValid():
+            break
+        top = bottom
+        bottom = top + int(editor.blockBoundingRect(block).height())
+        block_number += 1
+
+
+def _old_width(editor):
+    digits = 1
+    max_block = max(1, editor.blockCount())
+    while max_block >= 10:
+        max_block //= 10
+        digits += 1
+    return 3 + editor.fontMetrics().horizontalAdvance("9") * digits + 3
+
+
+def _repaint(area, rect) -> float:
+    def paint():
+        for _ in range(REPAINTS):
+            area.repaint(rect)
+
+    return best_of(paint) * 1000.0 / REPAINTS
+
+
+def _width(func) -> float:
+    def check():
+        for _ in range(REPAINTS):
+            func(0)
+
+    return best_of(check) * 1000.0 / REPAINTS
+
+
+def run(line_counts=(1_000, 100_000)) -> None:
+    app = get_app()
+    rows = []
+    for count in line_counts:
+        editor = CodeEditor()
+        editor.resize(800, 900)
+        editor.show()
+        editor.setPlainText(c_source(count))
+        editor.verticalScrollBar().setValue(editor.verticalScrollBar().maximum() // 2)
+        app.processEvents()
+
+        area = editor.line_number_area
+        full = area.rect()
+        row = editor.fontMetrics().height()
+        scroll = QRect(0, full.height() - row, full.width(), row)
+
+        new_full = _repaint(area, full)
+        new_scroll = _repaint(area, scroll)
+        new_width = _width(editor._update_line_number_area_width)
+
+        editor.line_number_area_paint_event = lambda event: _old_paint(editor, event)
+        old_full = _repaint(area, full)
+        old_scroll = _repaint(area, scroll)
+        old_width = _width(lambda _: editor.setViewportMargins(_old_width(editor), 0, 0, 0))
+        del editor.line_number_area_paint_event
+
+        rows.append([
+            count,
+            f"{old_full:.0f}", f"{new_full:.0f}",
+            f"{old_scroll:.0f}", f"{new_scroll:.0f}",
+            f"{old_width:.1f}", f"{new_width:.1f}",
+        ])
+        editor.close()
+
+    print_table(
+        ["lines", "old full us", "new full us", "old scroll us", "new scroll us",
+         "old width us", "new width us"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,90 @@
+"""Edit-to-repaint latency of DocumentHighlighter as the file grows.
+
+Types one character in the middle of a C file and times how long the
+document takes to process the edit, including the synchronous rehighlight.
+The ``highlight ms`` column is the part spent inside ``highlightBlock``; with
+early exit it stays flat regardless of file size, while the rest of the
+keystroke is Qt's own bookkeeping. The last columns toggle ``/*`` on and off,
+which revisits every block up to the next ``*/`` but reuses cached tokens on
+the way back.
+"""
+
+import time
+
+from common import best_of, c_source, get_app, print_table
+
+from PyQt6.QtGui import QTextCursor, QTextDocument
+from PyQt6.QtWidgets import QPlainTextDocumentLayout
+
+from editor.highlighters.document_highlighter import DocumentHighlighter
+import editor.highlighters.register_tokenizers  # noqa: F401
+
+
+class TimedHighlighter(DocumentHighlighter):
+    """DocumentHighlighter that records time spent and blocks tokenized."""
+
+    def __init__(self, document, lang_id):
+        super().__init__(document, lang_id)
+        self.elapsed = 0.0
+        self.tokenized = 0
+        inner = self._tokenizer.tokenize_line_packed
+
+        def counting_tokenize(line, stack, out):
+            self.tokenized += 1
+            return inner(line, stack, out)
+
+        self._tokenizer.tokenize_line_packed = counting_tokenize
+
+    def highlightBlock(self, text):
+        start = time.perf_counter()
+        super().highlightBlock(text)
+        self.elapsed += time.perf_counter() - start
+
+
+def run(line_counts=(1_000, 10_000, 50_000)) -> None:
+    app = get_app()
+    rows = []
+    for count in line_counts:
+        doc = QTextDocument()
+        doc.setDocumentLayout(QPlainTextDocumentLayout(doc))
+        doc.setPlainText(c_source(count))
+        highlighter = TimedHighlighter(doc, "c")
+        app.processEvents()
+
+        middle = doc.findBlockByNumber(count // 2 + 1)
+
+        def type_char():
+            cursor = QTextCursor(middle)
+            cursor.insertText("x")
+            cursor.deletePreviousChar()
+
+        def toggle_comment():
+            cursor = QTextCursor(middle)
+            cursor.insertText("/*")
+            cursor.deletePreviousChar()
+            cursor.deletePreviousChar()
+
+        toggle_comment()
+        highlighter.elapsed = 0.0
+        keystroke = best_of(type_char, 20)
+        highlight = highlighter.elapsed * 1000.0 / 20
+
+        highlighter.tokenized = 0
+        toggle = best_of(toggle_comment, 3)
+        rows.append([
+            count,
+            f"{keystroke:.3f}",
+            f"{highlight:.3f}",
+            f"{toggle:.1f}",
+            highlighter.tokenized // 3,
+        ])
+        highlighter.setDocument(None)
+
+    print_table(
+        ["lines", "keystroke ms", "highlight ms", "/* toggle ms", "lines tokenized"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    run()
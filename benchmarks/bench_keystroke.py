@@ -0,0 +1,54 @@
+"""Cost of one Delete keypress as the document grows.
+
+``old us`` is the end-of-document check the Delete key used to make,
+``len(toPlainText())``, which copies the whole document out of Qt on
+every press. ``delete us`` is a full Delete keypress through
+CodeEditor.keyPressEvent, undo command included, in the middle of the
+document. ``undo us`` undoes it again. All three are per keypress.
+"""
+
+import time
+
+from PyQt6.QtCore import QEvent, Qt
+from PyQt6.QtGui import QKeyEvent
+
+from common import c_source, get_app, print_table
+
+from editor.code_editor import CodeEditor
+
+PRESSES = 200
+
+
+def _per_press(func) -> float:
+    start = time.perf_counter()
+    for _ in range(PRESSES):
+        func()
+    return (time.perf_counter() - start) * 1e6 / PRESSES
+
+
+def run(line_counts=(1_000, 10_000, 100_000)) -> None:
+    app = get_app()
+    rows = []
+    delete = QKeyEvent(QEvent.Type.KeyPress, Qt.Key.Key_Delete, Qt.KeyboardModifier.NoModifier, "")
+    for count in line_counts:
+        editor = CodeEditor()
+        editor.resize(800, 600)
+        editor.show()
+        editor.setPlainText(c_source(count))
+        app.processEvents()
+        cursor = editor.textCursor()
+        cursor.setPosition(editor.document().characterCount() // 2)
+        editor.setTextCursor(cursor)
+
+        old = _per_press(lambda: editor.textCursor().position() < len(editor.toPlainText()))
+        press = _per_press(lambda: editor.keyPressEvent(delete))
+        undo = _per_press(editor.undo)
+
+        rows.append([count, f"{old:.0f}", f"{press:.0f}", f"{undo:.0f}"])
+        editor.close()
+
+    print_table(["lines", "old us", "delete us", "undo us"], rows)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,65 @@
+"""Jumping around a memory-mapped file in the read-only viewer.
+
+``index ms`` is how long the background thread takes to build the sparse
+line index. ``goto us`` is the mean time for ``LargeFileViewer.goto_line``
+to a random line followed by materializing and highlighting the viewport,
+which should not grow with the file. ``index KiB`` is the size of the
+line index itself.
+"""
+
+import os
+import random
+import tempfile
+import time
+
+from common import c_source, get_app, print_table
+
+from editor.large_file_viewer import LargeFileViewer
+from editor.models.mapped_file import MappedFile
+import editor.highlighters.register_tokenizers  # noqa: F401
+
+
+def _write(path: str, megabytes: int) -> None:
+    chunk = c_source(20_000) + "\n"
+    with open(path, "w", encoding="utf-8") as f:
+        written = 0
+        while written < megabytes * 1_000_000:
+            f.write(chunk)
+            written += len(chunk)
+
+
+def run(sizes=(20, 80, 320), jumps: int = 200) -> None:
+    app = get_app()
+    rng = random.Random(0)
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for megabytes in sizes:
+            path = os.path.join(directory, f"{megabytes}.c")
+            _write(path, megabytes)
+
+            mapped = MappedFile(path)
+            start = time.perf_counter()
+            mapped.build_index()
+            index_ms = (time.perf_counter() - start) * 1000.0
+
+            viewer = LargeFileViewer(mapped, "c")
+            viewer.resize(800, 600)
+            viewer.show()
+            app.processEvents()
+            lines = mapped.line_count
+            start = time.perf_counter()
+            for _ in range(jumps):
+                viewer.goto_line(rng.randrange(1, lines))
+                viewer._visible_lines()
+            goto_us = (time.perf_counter() - start) / jumps * 1e6
+
+            index_kib = mapped._newlines_before.itemsize * len(mapped._newlines_before) / 1024
+            rows.append([megabytes, lines, f"{index_ms:.0f}", f"{goto_us:.0f}", f"{index_kib:.0f}"])
+            viewer.close_file()
+            viewer.close()
+
+    print_table(["MB", "lines", "index ms", "goto us", "index KiB"], rows)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,74 @@
+"""Time to a highlighted viewport when opening a large file.
+
+Compares an unrestricted DocumentHighlighter, which tokenizes the whole file
+before the event loop gets control back, with one driven by
+HighlightScheduler, which colours the visible lines first and highlights the
+rest in short slices. ``first paint ms`` is the time from ``setPlainText``
+until the first visible line is highlighted; ``longest stall ms`` is the
+longest time the UI is blocked, either in ``setPlainText`` itself or in a
+single trip through the event loop while highlighting runs.
+"""
+
+import time
+
+from common import c_source, get_app, print_table
+
+from editor.code_editor import CodeEditor
+from editor.highlighters.document_highlighter import DocumentHighlighter
+from editor.highlighters.scheduler import HighlightScheduler
+import editor.highlighters.register_tokenizers  # noqa: F401
+
+
+def _open(app, text: str, scheduled: bool) -> tuple[float, float, float]:
+    editor = CodeEditor()
+    editor.resize(800, 600)
+    editor.show()
+    app.processEvents()
+
+    highlighter = DocumentHighlighter(editor.document(), "c")
+    scheduler = HighlightScheduler(highlighter, editor) if scheduled else None
+
+    start = time.perf_counter()
+    editor.setPlainText(text)
+    first_paint = None
+    longest = time.perf_counter() - start
+    while True:
+        tick = time.perf_counter()
+        app.processEvents()
+        longest = max(longest, time.perf_counter() - tick)
+        if first_paint is None and editor.firstVisibleBlock().userState() != -1:
+            first_paint = time.perf_counter() - start
+        if scheduler is None or scheduler.is_complete:
+            break
+    total = time.perf_counter() - start
+
+    if scheduler is not None:
+        scheduler.stop()
+    highlighter.setDocument(None)
+    editor.close()
+    return first_paint * 1000.0, longest * 1000.0, total * 1000.0
+
+
+def run(line_counts=(10_000, 50_000, 200_000)) -> None:
+    app = get_app()
+    rows = []
+    for count in line_counts:
+        text = c_source(count)
+        for label, scheduled in (("full", False), ("scheduled", True)):
+            first_paint, longest, total = _open(app, text, scheduled)
+            rows.append([
+                count,
+                label,
+                f"{first_paint:.1f}",
+                f"{longest:.1f}",
+                f"{total:.0f}",
+            ])
+
+    print_table(
+        ["lines", "mode", "first paint ms", "longest stall ms", "total ms"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    run()
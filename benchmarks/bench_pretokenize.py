@@ -0,0 +1,98 @@
+"""Open-to-fully-coloured time with and without worker pre-tokenization.
+
+``tokenize ms`` compares tokenizing the whole file on the calling thread with
+:func:`pretokenizer.pretokenize`, which spreads the chunks over one worker
+process per available CPU and stitches them back together, and with a
+StreamPretokenizer fed the file in FileManager.CHUNK_SIZE pieces, as a
+streamed open does. ``coloured ms`` is the time from the first text going
+into the editor until HighlightScheduler has highlighted every block. With
+pre-tokenization the scheduler only has to apply cached formats once the
+workers are done. The worker pool is warmed up first so process start-up
+isn't counted.
+"""
+
+import time
+
+from PyQt6.QtGui import QTextCursor
+
+from common import c_source, get_app, print_table
+
+from editor.code_editor import CodeEditor
+from editor.file_manager import FileManager
+from editor.highlighters import pretokenizer
+from editor.highlighters.document_highlighter import DocumentHighlighter
+from editor.highlighters.scheduler import HighlightScheduler
+import editor.highlighters.register_tokenizers  # noqa: F401
+
+
+def _pieces(text: str) -> list[str]:
+    size = FileManager.CHUNK_SIZE
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _coloured(app, text: str, mode: str) -> float:
+    editor = CodeEditor()
+    editor.resize(800, 600)
+    editor.show()
+    app.processEvents()
+
+    highlighter = DocumentHighlighter(editor.document(), "c")
+    scheduler = HighlightScheduler(highlighter, editor)
+
+    start = time.perf_counter()
+    if mode == "streamed":
+        scheduler.begin_pretokenize_stream()
+        cursor = QTextCursor(editor.document())
+        for piece in _pieces(text):
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText(piece)
+            scheduler.feed_pretokenize_stream(piece)
+        scheduler.end_pretokenize_stream()
+    else:
+        editor.setPlainText(text)
+        if mode == "workers":
+            scheduler.pretokenize(text)
+    while not scheduler.is_complete:
+        app.processEvents()
+    elapsed = time.perf_counter() - start
+
+    scheduler.stop()
+    highlighter.setDocument(None)
+    editor.close()
+    return elapsed * 1000.0
+
+
+def run(line_counts=(20_000, 100_000)) -> None:
+    app = get_app()
+    pretokenizer.MIN_CPUS = 1
+    pretokenizer.pretokenize("c", "int x;").result()
+
+    rows = []
+    for count in line_counts:
+        text = c_source(count)
+        lines = text.split("\n")
+
+        start = time.perf_counter()
+        pretokenizer.tokenize_lines("c", lines)
+        serial = (time.perf_counter() - start) * 1000.0
+
+        start = time.perf_counter()
+        pretokenizer.pretokenize("c", text).result()
+        pooled = (time.perf_counter() - start) * 1000.0
+
+        start = time.perf_counter()
+        stream = pretokenizer.StreamPretokenizer("c")
+        for piece in _pieces(text):
+            stream.feed(piece)
+        stream.finish().result()
+        streamed = (time.perf_counter() - start) * 1000.0
+
+        for mode, tokenize_ms in (("serial", serial), ("workers", pooled), ("streamed", streamed)):
+            rows.append([count, mode, f"{tokenize_ms:.0f}", f"{_coloured(app, text, mode):.0f}"])
+
+    print(f"available CPUs = {pretokenizer.available_cpus()}")
+    print_table(["lines", "mode", "tokenize ms", "coloured ms"], rows)
+
+
+if __name__ == "__main__":
+    run()
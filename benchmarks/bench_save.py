@@ -0,0 +1,65 @@
+"""UI-thread cost of Ctrl+S on a large document.
+
+All three go through ``MainWindow.save_file``, so each includes
+materializing the text with ``toPlainText`` and the status and
+highlighter updates after the save. ``direct`` patches in the old write:
+``open(path, "w")`` and one ``write``, with no fsync. ``atomic`` is
+FileManager.write_file (temp file, fsync, rename) waited for on the UI
+thread, as below BACKGROUND_SAVE_THRESHOLD. ``background`` hands the
+write to the FileSaver. ``blocked ms`` is how long save_file holds the
+UI thread; ``done ms`` is until the save has been reported back.
+"""
+
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+from common import c_source, get_app, print_table
+
+from editor.window import MainWindow
+
+
+def _direct(path: str, content: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def _save(app, path: str, content: str, background: bool) -> tuple[float, float]:
+    window = MainWindow()
+    window._document.file_path = path
+    window.text_edit.setPlainText(content)
+    window._controller.BACKGROUND_SAVE_THRESHOLD = 0 if background else float("inf")
+    app.processEvents()
+
+    start = time.perf_counter()
+    window.save_file()
+    blocked = (time.perf_counter() - start) * 1000.0
+    while window._saver.is_busy:
+        app.processEvents()
+    done = (time.perf_counter() - start) * 1000.0
+    window.close()
+    return blocked, done
+
+
+def run(line_counts=(100_000, 400_000, 1_600_000)) -> None:
+    app = get_app()
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for count in line_counts:
+            content = c_source(count)
+            path = os.path.join(directory, f"{count}.c")
+            size = f"{len(content) / 1e6:.0f}"
+
+            with patch("editor.file_saver.FileManager.write_file", _direct):
+                blocked, done = _save(app, path, content, background=False)
+            rows.append([size, "direct", f"{blocked:.0f}", f"{done:.0f}"])
+            for label, background in (("atomic", False), ("background", True)):
+                blocked, done = _save(app, path, content, background)
+                rows.append([size, label, f"{blocked:.0f}", f"{done:.0f}"])
+
+    print_table(["MB", "save", "blocked ms", "done ms"], rows)
+
+
+if __name__ == "__main__":
+    run()
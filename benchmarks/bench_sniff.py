@@ -0,0 +1,79 @@
+"""Opening a mixed corpus: full UTF-8 decode vs sniffing first.
+
+``decode`` is the old FileManager.read_file: decode the whole file as
+UTF-8 and call a file binary if that fails. ``sniff`` is
+FileManager.read_text, which classifies the file from its first
+SNIFF_SIZE bytes and then decodes it once in the detected encoding.
+``ok`` says whether the outcome was right: text opened with the right
+encoding and newline style, binary rejected.
+"""
+
+import codecs
+import os
+import random
+import tempfile
+
+from common import best_of, c_source, print_table
+
+from editor.file_format import BinaryFileError
+from editor.file_manager import FileManager
+
+
+def _corpus(lines: int) -> list[tuple[str, bytes, object]]:
+    """``(name, data, expected)``; expected is ``(encoding, newline)`` or None for binary."""
+    source = c_source(lines)
+    latin = source.replace("note", "café")
+    rng = random.Random(0)
+    noise = bytes(rng.randrange(256) for _ in range(1 << 16)) * (len(source) >> 16)
+    return [
+        ("utf-8", source.encode("utf-8"), ("utf-8", "\n")),
+        ("utf-8 crlf", source.replace("\n", "\r\n").encode("utf-8"), ("utf-8", "\r\n")),
+        ("latin-1", latin.encode("latin-1"), ("latin-1", "\n")),
+        ("utf-16 bom", codecs.BOM_UTF16_LE + source.encode("utf-16-le"), ("utf-16-le", "\n")),
+        ("utf-16", source.replace("\n", "\r\n").encode("utf-16-be"), ("utf-16-be", "\r\n")),
+        ("binary", noise, None),
+        ("text then binary", source.encode("utf-8")[: 1 << 17] + noise, None),
+    ]
+
+
+def _decode(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            f.read()
+    except UnicodeDecodeError:
+        return None
+    return ("utf-8", "\n")
+
+
+def _sniff(path: str):
+    try:
+        _, file_format = FileManager.read_text(path)
+    except BinaryFileError:
+        return None
+    return (file_format.encoding, file_format.newline)
+
+
+def run(lines: int = 400_000) -> None:
+    rows = []
+    correct = {"decode": 0, "sniff": 0}
+    corpus = _corpus(lines)
+    with tempfile.TemporaryDirectory() as directory:
+        for name, data, expected in corpus:
+            path = os.path.join(directory, name.replace(" ", "_"))
+            with open(path, "wb") as f:
+                f.write(data)
+            row = [name, f"{len(data) / 1e6:.1f}"]
+            for label, func in (("decode", _decode), ("sniff", _sniff)):
+                ok = func(path) == expected
+                correct[label] += ok
+                row += [f"{best_of(lambda: func(path)):.1f}", "yes" if ok else "no"]
+            rows.append(row)
+
+    print_table(["file", "MB", "decode ms", "ok", "sniff ms", "ok"], rows)
+    print()
+    for label, count in correct.items():
+        print(f"{label}: {count}/{len(corpus)} classified correctly")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,86 @@
+"""Opening a second view of an open, highlighted document.
+
+``copy`` is what a second view would cost without a shared document:
+another CodeEditor with its own copy of the text and its own
+DocumentHighlighter, highlighted to completion. ``split`` is
+DocumentTab.split, whose pane shares the QTextDocument, the highlighter
+and its block states. ``lines`` is how many lines were tokenized for the
+second view.
+"""
+
+import time
+
+from PyQt6.QtCore import Qt
+
+from common import c_source, get_app, print_table
+
+from editor.code_editor import CodeEditor
+from editor.highlighters.document_highlighter import DocumentHighlighter
+from editor.highlighters.scheduler import HighlightScheduler
+from editor.window import MainWindow
+
+
+def _count_lines(highlighter) -> list:
+    calls = []
+    tokenizer = highlighter._tokenizer
+    original = tokenizer.tokenize_line_packed
+
+    def counting(line, stack, out):
+        calls.append(None)
+        return original(line, stack, out)
+
+    tokenizer.tokenize_line_packed = counting
+    return calls
+
+
+def _copy(app, text: str) -> tuple[float, int]:
+    start = time.perf_counter()
+    editor = CodeEditor()
+    editor.resize(800, 300)
+    editor.show()
+    highlighter = DocumentHighlighter(editor.document(), "c")
+    calls = _count_lines(highlighter)
+    scheduler = HighlightScheduler(highlighter, editor)
+    editor.setPlainText(text)
+    scheduler.finish()
+    app.processEvents()
+    elapsed = (time.perf_counter() - start) * 1000.0
+    del highlighter._tokenizer.tokenize_line_packed
+    scheduler.stop()
+    editor.close()
+    return elapsed, len(calls)
+
+
+def _split(app, window) -> tuple[float, int]:
+    calls = _count_lines(window.highlighter)
+    start = time.perf_counter()
+    window._tab.split(Qt.Orientation.Vertical)
+    app.processEvents()
+    elapsed = (time.perf_counter() - start) * 1000.0
+    del window.highlighter._tokenizer.tokenize_line_packed
+    return elapsed, len(calls)
+
+
+def run(line_counts=(10_000, 100_000)) -> None:
+    app = get_app()
+    rows = []
+    for count in line_counts:
+        text = c_source(count)
+        window = MainWindow()
+        window.resize(800, 600)
+        window.show()
+        window._tab.setup_highlighter(lang="c")
+        window._load_content(text)
+        window._highlight_scheduler.finish()
+        app.processEvents()
+
+        copy_ms, copy_lines = _copy(app, text)
+        split_ms, split_lines = _split(app, window)
+        rows.append([count, f"{copy_ms:.0f}", copy_lines, f"{split_ms:.1f}", split_lines])
+        window.close()
+
+    print_table(["lines", "copy ms", "lines", "split ms", "lines"], rows)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,76 @@
+"""State stack pool growth over a long editing session.
+
+One document is reloaded with 300 different Markdown files in turn. Each
+file has fenced code blocks with their own info strings, which push frames
+no other file uses. The process-wide pool (the behaviour before scoped
+pools) keeps every stack it has ever seen. The per-document pool
+DocumentHighlighter now uses evicts stacks that no line references any
+more, keeping at most ``MAX_UNUSED`` unused ones around.
+"""
+
+import time
+
+from common import get_app, print_table
+
+from PyQt6.QtGui import QTextDocument
+from PyQt6.QtWidgets import QPlainTextDocumentLayout
+
+from editor.highlighters.core.incremental_manager import IncrementalManager
+from editor.highlighters.core.stack_pool import StateStackPool
+from editor.highlighters.document_highlighter import DocumentHighlighter
+import editor.highlighters.register_tokenizers  # noqa: F401
+
+
+def _markdown(file_index: int) -> str:
+    parts = [f"# File {file_index}", ""]
+    for block in range(20):
+        parts.append(f"Paragraph {block} with *emphasis* and `code`.")
+        parts.append(f"```lang{file_index}x{block}")
+        parts.append("some code")
+        parts.append("```")
+    return "\n".join(parts)
+
+
+def _session(app, use_global: bool, files: int = 300):
+    doc = QTextDocument()
+    doc.setDocumentLayout(QPlainTextDocumentLayout(doc))
+    highlighter = DocumentHighlighter(doc, "markdown")
+    if use_global:
+        highlighter._stack_pool = StateStackPool()
+        highlighter._incremental_manager = IncrementalManager()
+    pool = highlighter._stack_pool
+    app.processEvents()
+
+    start = time.perf_counter()
+    for i in range(files):
+        doc.setPlainText(_markdown(i))
+    elapsed = time.perf_counter() - start
+
+    stats = pool.stats()
+    highlighter.setDocument(None)
+    return stats, elapsed * 1000.0
+
+
+def run() -> None:
+    app = get_app()
+    rows = []
+    for label, use_global in (("global (before)", True), ("per-document", False)):
+        StateStackPool.reset()
+        stats, elapsed = _session(app, use_global)
+        rows.append([
+            label,
+            stats.size,
+            stats.referenced,
+            stats.evictions,
+            f"{stats.hit_rate:.1%}",
+            f"{elapsed:.0f}",
+        ])
+
+    print_table(
+        ["pool", "stacks kept", "referenced", "evicted", "hit rate", "session ms"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    run()
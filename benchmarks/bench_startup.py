@@ -0,0 +1,68 @@
+"""Editor startup cost with lazy vs eager language loading.
+
+Each run is a fresh interpreter that creates a QApplication and then
+measures ``from editor.window import MainWindow; MainWindow()``, which is
+what ``python src/main.py`` does before the event loop starts. ``eager``
+also loads what startup used to: every tokenizer module and instance, the
+legacy ``*_hl`` highlighters behind HIGHLIGHTER_MAP, and the
+multiprocessing machinery of the pretokenizer. ``KiB`` is memory
+allocated by Python during the measured part (tracemalloc, in a separate
+run so tracing does not inflate the times).
+"""
+
+import subprocess
+import sys
+
+from common import SRC_DIR, print_table
+
+CHILD = r"""
+import sys, time, tracemalloc
+sys.path.insert(0, {src!r})
+eager, trace = {eager}, {trace}
+from PyQt6.QtWidgets import QApplication
+app = QApplication([])
+if trace:
+    tracemalloc.start()
+start = time.perf_counter()
+from editor.window import MainWindow
+window = MainWindow()
+if eager:
+    import concurrent.futures.process, multiprocessing
+    from editor.highlighters.core.registry import HighlightRegistry
+    from editor.highlighters.detector import LanguageDetector
+    from editor.highlighters.register_tokenizers import TOKENIZERS
+    for lang_id, *_ in TOKENIZERS + [("css",)]:
+        HighlightRegistry.instance().get_tokenizer(lang_id)
+    import warnings
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        LanguageDetector.HIGHLIGHTER_MAP.values()
+elapsed = (time.perf_counter() - start) * 1000.0
+allocated = tracemalloc.get_traced_memory()[0] / 1024 if trace else 0
+modules = sum(name.startswith("editor") for name in sys.modules)
+print(elapsed, allocated, modules, len(sys.modules))
+"""
+
+
+def _run(eager: bool, trace: bool) -> list[float]:
+    code = CHILD.format(src=SRC_DIR, eager=eager, trace=trace)
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return [float(value) for value in output.split()]
+
+
+def run(repeat: int = 5) -> None:
+    rows = []
+    for label, eager in (("eager", True), ("lazy", False)):
+        elapsed = min(_run(eager, trace=False)[0] for _ in range(repeat))
+        _, allocated, editor_modules, modules = _run(eager, trace=True)
+        rows.append([
+            label, f"{elapsed:.0f}", f"{allocated:.0f}", int(editor_modules), int(modules),
+        ])
+
+    print_table(["startup", "ms", "KiB", "editor modules", "all modules"], rows)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,69 @@
+"""Opening a large file whole vs streaming it in chunks.
+
+``whole`` is the synchronous path: read the file into one str, hand it to
+DocumentModel and ``setPlainText``. ``streamed`` is the FileLoader path,
+which appends one chunk per trip through the event loop. Each run is a
+fresh interpreter; ``peak MB`` is the growth of the process's peak RSS
+while opening, so it includes the QTextDocument's own copy of the text.
+``longest stall ms`` is the longest time the event loop was blocked.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+from common import SRC_DIR, c_source, print_table
+
+CHILD = r"""
+import os, resource, sys, time
+sys.path.insert(0, {src!r})
+os.environ["QT_QPA_PLATFORM"] = "offscreen"
+from PyQt6.QtWidgets import QApplication
+app = QApplication([])
+from editor.window import MainWindow
+window = MainWindow()
+window._controller.STREAM_THRESHOLD = 0 if {streamed} else float("inf")
+app.processEvents()
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+window._open_path({path!r})
+longest = time.perf_counter() - start
+while window._loader is not None:
+    tick = time.perf_counter()
+    app.processEvents()
+    longest = max(longest, time.perf_counter() - tick)
+total = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+assert window._status_label.text() == "Saved"
+print(total * 1000.0, longest * 1000.0, peak / 1024.0)
+"""
+
+
+def _run(path: str, streamed: bool) -> list[float]:
+    code = CHILD.format(src=SRC_DIR, path=path, streamed=streamed)
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return [float(value) for value in output.split()]
+
+
+def run(line_counts=(100_000, 400_000, 1_600_000)) -> None:
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for count in line_counts:
+            path = os.path.join(directory, f"{count}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(c_source(count))
+            size = os.path.getsize(path) / 1e6
+            for label, streamed in (("whole", False), ("streamed", True)):
+                total, longest, peak = _run(path, streamed)
+                rows.append([
+                    f"{size:.0f}", label, f"{total:.0f}", f"{longest:.0f}", f"{peak:.0f}",
+                ])
+
+    print_table(["file MB", "mode", "total ms", "longest stall ms", "peak MB"], rows)
+
+
+if __name__ == "__main__":
+    run()
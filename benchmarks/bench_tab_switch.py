@@ -0,0 +1,76 @@
+"""Switching between two open documents.
+
+``reload ms`` is what every file switch used to cost with a single
+editor: a new highlighter, ``setPlainText`` of the other file and the
+highlighting of the first viewport. ``switch ms`` is selecting the other
+tab, whose document and highlighting were kept alive. Both include one
+pass of the event loop. ``cache MB`` is the line cache an inactive tab
+holds until it is evicted, and ``evict ms`` is the cost of evicting it.
+"""
+
+import os
+import tempfile
+import time
+
+from common import c_source, get_app, print_table
+
+from editor.window import MainWindow
+
+
+def _settle(app, window) -> None:
+    while not window._highlight_scheduler.is_complete:
+        app.processEvents()
+
+
+def _timed(app, func) -> float:
+    start = time.perf_counter()
+    func()
+    app.processEvents()
+    return (time.perf_counter() - start) * 1000.0
+
+
+def run(line_counts=(1_000, 10_000, 100_000)) -> None:
+    app = get_app()
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for count in line_counts:
+            paths = []
+            for name in ("a.c", "b.c"):
+                path = os.path.join(directory, f"{count}_{name}")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(c_source(count))
+                paths.append(path)
+
+            window = MainWindow()
+            window.resize(800, 600)
+            window.show()
+            for path in paths:
+                window._open_path(path)
+                _settle(app, window)
+            first, second = window._tabs.tabs()
+            content = first.editor.toPlainText()
+
+            def reload():
+                second.setup_highlighter(paths[0], content)
+                window._load_content(content)
+
+            switch = min(
+                _timed(app, lambda: window._tabs.set_current_tab(tab))
+                for tab in (first, second) * 3
+            )
+            cache = first.cache_bytes
+            evict = _timed(app, first.evict_cache)
+            reload_ms = _timed(app, reload)
+
+            rows.append([
+                count, f"{reload_ms:.1f}", f"{switch:.2f}",
+                f"{cache / 1e6:.1f}", f"{evict:.1f}",
+            ])
+            window._document.mark_saved()
+            window.close()
+
+    print_table(["lines", "reload ms", "switch ms", "cache MB", "evict ms"], rows)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,69 @@
+"""Undo steps kept while typing indented code with corrections.
+
+Every line is indented with spaces, typed word by word, and ends with a
+typo that is taken back with a run of Backspace presses. ``keys`` is the
+number of keypresses. ``unmerged`` is how many undo steps the same typing
+leaves with mergeWith switched off, as before, and ``merged`` how many
+it leaves with merging. ``us/key`` is the cost per
+keypress in both cases.
+"""
+
+import time
+
+from PyQt6.QtCore import QEvent, Qt
+from PyQt6.QtGui import QKeyEvent
+
+from common import get_app, print_table
+
+from editor.code_editor import CodeEditor
+from editor.undo_commands import DeleteTextCommand, InsertTextCommand
+
+LINE = "        total = total + value * weight;"
+TYPO = "wieght"
+
+
+def _events(lines: int) -> list[QKeyEvent]:
+    def key(code, text=""):
+        return QKeyEvent(QEvent.Type.KeyPress, code, Qt.KeyboardModifier.NoModifier, text)
+
+    events = []
+    for _ in range(lines):
+        for char in LINE:
+            events.append(key(Qt.Key.Key_Space, " ") if char == " " else key(Qt.Key.Key_A, char))
+        events.append(key(Qt.Key.Key_Space, " "))
+        events.extend(key(Qt.Key.Key_A, char) for char in TYPO)
+        events.extend(key(Qt.Key.Key_Backspace) for _ in range(len(TYPO) + 1))
+        events.append(key(Qt.Key.Key_Return, "\r"))
+    return events
+
+
+def _count(events, merge: bool) -> tuple[int, float]:
+    originals = InsertTextCommand.mergeWith, DeleteTextCommand.mergeWith
+    if not merge:
+        InsertTextCommand.mergeWith = DeleteTextCommand.mergeWith = lambda self, other: False
+    try:
+        editor = CodeEditor()
+        editor.undo_stack.setUndoLimit(0)
+        start = time.perf_counter()
+        for event in events:
+            editor.keyPressEvent(event)
+        elapsed = time.perf_counter() - start
+        return editor.undo_stack.count(), elapsed * 1e6 / len(events)
+    finally:
+        InsertTextCommand.mergeWith, DeleteTextCommand.mergeWith = originals
+
+
+def run(line_counts=(10, 100)) -> None:
+    app = get_app()
+    rows = []
+    for count in line_counts:
+        events = _events(count)
+        unmerged, unmerged_us = _count(events, merge=False)
+        merged, merged_us = _count(events, merge=True)
+        rows.append([count, len(events), unmerged, merged, f"{unmerged_us:.0f}", f"{merged_us:.0f}"])
+
+    print_table(["lines", "keys", "unmerged", "merged", "us/key", "us/key"], rows)
+
+
+if __name__ == "__main__":
+    run()
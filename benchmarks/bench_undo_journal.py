@@ -0,0 +1,74 @@
+"""Restoring undo history from a file's journal as the history grows.
+
+A journal is written with ``steps`` typed lines, then the file is opened
+again. ``journal KB`` is its size, ``record us`` the cost of pushing one
+step with the journal recording it, and ``restore ms`` the cost of
+restoring the history at open time. Only the undo limit's worth of steps
+is read, so restore time stays flat however long the history gets; the
+first open after a long history also compacts the journal, and
+``again ms`` is the next open.
+"""
+
+import os
+import tempfile
+import time
+
+from common import get_app, print_table
+
+from editor.code_editor import CodeEditor
+from editor.models.document import fingerprint
+from editor.undo_commands import InsertTextCommand
+from editor.undo_journal import UndoJournal
+
+
+def _write(file_path: str, steps: int) -> tuple[str, float]:
+    editor = CodeEditor()
+    stack = editor.undo_stack
+    stack.journal = UndoJournal.restore(file_path, fingerprint(""), editor)
+    cursor = editor.textCursor()
+    elapsed = 0.0
+    for i in range(steps):
+        word = f"word{i}\n"
+        position = cursor.position()
+        cursor.insertText(word)
+        command = InsertTextCommand(editor, word, position)
+        start = time.perf_counter()
+        stack.push(command)
+        elapsed += time.perf_counter() - start
+    text = editor.toPlainText()
+    stack.journal.checkpoint(fingerprint(text))
+    stack.journal.close()
+    stack.journal = None
+    return text, elapsed * 1e6 / steps
+
+
+def run(step_counts=(1_000, 10_000, 100_000)) -> None:
+    app = get_app()
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        UndoJournal.DIRECTORY = os.path.join(directory, "undo")
+        for steps in step_counts:
+            file_path = os.path.join(directory, f"{steps}.txt")
+            text, record_us = _write(file_path, steps)
+            size = os.path.getsize(UndoJournal.journal_path(file_path))
+
+            times = []
+            for _ in range(2):
+                editor = CodeEditor()
+                editor.setPlainText(text)
+                app.processEvents()
+                start = time.perf_counter()
+                journal = UndoJournal.restore(file_path, fingerprint(text), editor)
+                times.append((time.perf_counter() - start) * 1000.0)
+                journal.close()
+
+            rows.append([
+                steps, f"{size / 1024:.0f}", f"{record_us:.0f}",
+                f"{times[0]:.2f}", f"{times[1]:.2f}",
+            ])
+
+    print_table(["steps", "journal KB", "record us", "restore ms", "again ms"], rows)
+
+
+if __name__ == "__main__":
+    run()
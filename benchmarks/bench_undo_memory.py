@@ -0,0 +1,61 @@
+"""Undo history memory after repeated select-all pastes.
+
+Each step replaces the whole document with another generated C file of
+``lines`` lines, so every step holds two document-sized payloads.
+``raw MB`` is what the history would hold with every payload kept as a
+str, ``memory MB`` and ``disk MB`` what it holds under a budget of
+``budget MB``. ``push ms`` is the slowest push (a compaction included) and
+``undo ms`` the slowest undo of one step, spilled ones included.
+"""
+
+import time
+
+from common import c_source, get_app, print_table
+
+from editor.code_editor import CodeEditor
+from editor.undo_commands import ReplaceTextCommand
+
+STEPS = 20
+
+
+def _timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000.0
+
+
+def run(line_counts=(10_000, 100_000), budgets_mb=(32, 4)) -> None:
+    app = get_app()
+    rows = []
+    for count, budget in ((c, b) for c in line_counts for b in budgets_mb):
+        editor = CodeEditor()
+        stack = editor.undo_stack
+        stack.memory_budget = budget * 1024 * 1024
+        texts = [c_source(count).replace("note", f"note {i}") for i in range(STEPS + 1)]
+        editor.setPlainText(texts[0])
+        app.processEvents()
+
+        push = 0.0
+        raw = 0
+        for old_text, new_text in zip(texts, texts[1:]):
+            cursor = editor.textCursor()
+            cursor.select(cursor.SelectionType.Document)
+            cursor.insertText(new_text)
+            command = ReplaceTextCommand(editor, 0, len(old_text), old_text, new_text)
+            raw += sum(payload.memory_bytes for payload in command.payloads())
+            push = max(push, _timed(lambda: stack.push(command)))
+        footprint = stack.footprint()
+        undo = max(_timed(editor.undo) for _ in range(STEPS))
+
+        rows.append([
+            count, budget, f"{raw / 1e6:.0f}", f"{footprint.memory / 1e6:.1f}",
+            f"{footprint.disk / 1e6:.1f}", f"{push:.0f}", f"{undo:.0f}",
+        ])
+        stack.clear()
+        editor.close()
+
+    print_table(["lines", "budget MB", "raw MB", "memory MB", "disk MB", "push ms", "undo ms"], rows)
+
+
+if __name__ == "__main__":
+    run()
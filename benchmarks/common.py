@@ -0,0 +1,59 @@
+"""Shared setup for the benchmark scripts.
+
+Run a benchmark from the repository root, e.g.::
+
+    python benchmarks/bench_incremental_highlight.py
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+
+def get_app():
+    """Return the running QApplication, creating one if needed."""
+    from PyQt6.QtWidgets import QApplication
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv)
+    return app
+
+
+def best_of(func, repeat: int = 5) -> float:
+    """Run ``func`` ``repeat`` times and return the fastest wall time in ms."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
+
+
+def c_source(lines: int) -> str:
+    """Generate a C-like source file with the given number of lines."""
+    body = []
+    for i in range(lines):
+        if i % 10 == 0:
+            body.append(f"/* block {i} */ static int f{i}(int a, int b) {{")
+        elif i % 10 == 9:
+            body.append("}")
+        else:
+            body.append(f'    a = b * {i} + 0x{i:x}; printf("%d\\n", a); // note')
+    return "\n".join(body)
+
+
+def print_table(headers: list[str], rows: list[list]) -> None:
+    """Print a simple aligned table."""
+    widths = [max(len(str(x)) for x in col) for col in zip(headers, *rows)]
+    line = "  ".join(str(h).rjust(w) for h, w in zip(headers, widths))
+    print(line)
+    print("-" * len(line))
+    for row in rows:
+        print("  ".join(str(v).rjust(w) for v, w in zip(row, widths)))
@@ -3,18 +3,21 @@ from editor.code_editor import CodeEditor
 from editor.file_manager import FileManager
 from editor.models.document import DocumentModel
 from editor.controllers.file_controller import FileController
-from editor.highlighters import (
-    LanguageDetector,
-    BaseHighlighter,
-    PythonHighlighter,
-    CHighlighter,
-    CppHighlighter,
-    JavaHighlighter,
-    HtmlHighlighter,
-    JsonHighlighter,
-    MarkdownHighlighter,
-    PlainTextHighlighter,
-)
+
+# Highlighter names are forwarded to editor.highlighters on first access so
+# the legacy highlighter modules stay unimported unless something uses them.
+_HIGHLIGHTER_EXPORTS = {
+    "LanguageDetector",
+    "BaseHighlighter",
+    "PythonHighlighter",
+    "CHighlighter",
+    "CppHighlighter",
+    "JavaHighlighter",
+    "HtmlHighlighter",
+    "JsonHighlighter",
+    "MarkdownHighlighter",
+    "PlainTextHighlighter",
+}
 
 __all__ = [
     "MainWindow",
@@ -33,3 +36,11 @@ __all__ = [
     "MarkdownHighlighter",
     "PlainTextHighlighter",
 ]
+
+
+def __getattr__(name: str):
+    if name not in _HIGHLIGHTER_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import editor.highlighters
+
+    return getattr(editor.highlighters, name)
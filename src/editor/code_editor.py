@@ -1,8 +1,17 @@
+import time
+
 from PyQt6.QtWidgets import QPlainTextEdit, QWidget
-from PyQt6.QtCore import Qt, QRect, QSize
-from PyQt6.QtGui import QColor, QPainter, QKeyEvent, QUndoStack
+from PyQt6.QtCore import Qt, QEvent, QPoint, QRect, QSize, pyqtSignal
+from PyQt6.QtGui import QPainter, QKeyEvent, QTextCursor
 
-from editor.undo_commands import InsertTextCommand, DeleteTextCommand, ReplaceTextCommand
+from editor.line_number_gutter import LineNumberGutter
+from editor.undo_commands import (
+    DeleteTextCommand,
+    InsertTextCommand,
+    ReplaceTextCommand,
+    TextEditCommand,
+)
+from editor.undo_stack import UndoStack
 
 
 class LineNumberArea(QWidget):
@@ -18,18 +27,25 @@ class LineNumberArea(QWidget):
 
 
 class CodeEditor(QPlainTextEdit):
+    # Emitted when the editor gains keyboard focus.
+    focused = pyqtSignal()
+
     WHITESPACE_KEYS = {Qt.Key.Key_Space, Qt.Key.Key_Tab, Qt.Key.Key_Return, Qt.Key.Key_Enter}
     MAX_UNDO_STEPS = 100
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.line_number_area = LineNumberArea(self)
+        self._gutter = LineNumberGutter(self.font(), self.line_number_area.devicePixelRatioF())
+        self._line_number_area_width = -1
 
-        self._undo_stack = QUndoStack(self)
+        self._undo_stack = UndoStack(self)
         self._undo_stack.setUndoLimit(self.MAX_UNDO_STEPS)
 
         self._pending_insert_text = ""
         self._pending_insert_start = -1
+        self._pending_insert_end = -1
+        self._pending_insert_time = 0.0
         self._is_applying_undo_redo = False
 
         self.document().setUndoRedoEnabled(False)
@@ -40,9 +56,33 @@ class CodeEditor(QPlainTextEdit):
         self._update_line_number_area_width(0)
 
     @property
-    def undo_stack(self) -> QUndoStack:
+    def undo_stack(self) -> UndoStack:
         return self._undo_stack
 
+    def share_document(self, other: "CodeEditor") -> None:
+        """Show ``other``'s document here too, with one shared undo history.
+
+        Each editor keeps its own cursor, scroll position and line number
+        area. ``other`` must outlive this editor, since it owns the document.
+        """
+        self._flush_pending_insert()
+        self._undo_stack.deleteLater()
+        self._undo_stack = other.undo_stack
+        self.setDocument(other.document())
+        self._update_line_number_area_width(0)
+
+    def hand_over_undo(self, editor: "CodeEditor") -> None:
+        """Let ``editor`` replay the shared undo history recorded through this one."""
+        self._flush_pending_insert()
+        for i in range(self._undo_stack.count()):
+            command = self._undo_stack.command(i)
+            if isinstance(command, TextEditCommand) and command.editor is self:
+                command.editor = editor
+
+    def end_typing(self) -> None:
+        """Push the word being typed as an undo step of its own."""
+        self._flush_pending_insert()
+
     def undo(self):
         if self._pending_insert_text:
             self._flush_pending_insert()
@@ -64,16 +104,15 @@ class CodeEditor(QPlainTextEdit):
         return self._undo_stack.canRedo()
 
     def line_number_area_width(self):
-        digits = 1
-        max_block = max(1, self.blockCount())
-        while max_block >= 10:
-            max_block //= 10
-            digits += 1
-        space = 3 + self.fontMetrics().horizontalAdvance("9") * digits + 3
-        return space
+        return self._line_number_area_width
 
     def _update_line_number_area_width(self, _):
-        self.setViewportMargins(self.line_number_area_width(), 0, 0, 0)
+        self._gutter.set_font(self.font(), self.line_number_area.devicePixelRatioF())
+        width = self._gutter.width(len(str(max(1, self.blockCount()))))
+        if width == self._line_number_area_width:
+            return
+        self._line_number_area_width = width
+        self.setViewportMargins(width, 0, 0, 0)
 
     def _update_line_number_area(self, rect, dy):
         if dy:
@@ -83,6 +122,13 @@ class CodeEditor(QPlainTextEdit):
         if rect.contains(self.viewport().rect()):
             self._update_line_number_area_width(0)
 
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() in (QEvent.Type.FontChange, QEvent.Type.DevicePixelRatioChange):
+            self._line_number_area_width = -1
+            self._update_line_number_area_width(0)
+            self.line_number_area.update()
+
     def resizeEvent(self, event):
         super().resizeEvent(event)
         cr = self.contentsRect()
@@ -91,26 +137,27 @@ class CodeEditor(QPlainTextEdit):
         )
 
     def line_number_area_paint_event(self, event):
+        rect = event.rect()
+        gutter = self._gutter
         painter = QPainter(self.line_number_area)
-        painter.fillRect(event.rect(), QColor(Qt.GlobalColor.lightGray).lighter(120))
+        gutter.fill(painter, rect)
 
-        block = self.firstVisibleBlock()
+        # Start at the first damaged row rather than the top of the viewport,
+        # so a scroll that exposes one row only walks and paints that row.
+        block = self.cursorForPosition(QPoint(0, rect.top())).block()
+        if not block.isValid():
+            block = self.firstVisibleBlock()
         block_number = block.blockNumber()
-        top = int(self.blockBoundingGeometry(block).translated(self.contentOffset()).top())
+        offset = self.contentOffset()
+        top = int(self.blockBoundingGeometry(block).translated(offset).top())
         bottom = top + int(self.blockBoundingRect(block).height())
+        right = self.line_number_area.width() - gutter.PADDING
+        rect_top = rect.top()
+        rect_bottom = rect.bottom()
 
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
-                number = str(block_number + 1)
-                painter.setPen(QColor(Qt.GlobalColor.darkGray))
-                painter.drawText(
-                    0,
-                    top,
-                    self.line_number_area.width() - 3,
-                    self.fontMetrics().height(),
-                    Qt.AlignmentFlag.AlignRight,
-                    number,
-                )
+        while block.isValid() and top <= rect_bottom:
+            if block.isVisible() and bottom >= rect_top:
+                gutter.draw_number(painter, right, top, block_number + 1)
             block = block.next()
             if not block.isValid():
                 break
@@ -121,7 +168,12 @@ class CodeEditor(QPlainTextEdit):
     def _flush_pending_insert(self):
         """Push any pending insert as a command."""
         if self._pending_insert_text and self._pending_insert_start >= 0:
-            cmd = InsertTextCommand(self, self._pending_insert_text, self._pending_insert_start)
+            cmd = InsertTextCommand(
+                self,
+                self._pending_insert_text,
+                self._pending_insert_start,
+                typed_at=self._pending_insert_time,
+            )
             self._undo_stack.push(cmd)
             self._pending_insert_text = ""
             self._pending_insert_start = -1
@@ -163,7 +215,7 @@ class CodeEditor(QPlainTextEdit):
                 cursor.setPosition(pos - 1, cursor.MoveMode.KeepAnchor)
                 deleted = cursor.selectedText()
                 super().keyPressEvent(event)
-                cmd = DeleteTextCommand(self, pos - 1, pos, deleted)
+                cmd = DeleteTextCommand(self, pos - 1, pos, deleted, typed_at=time.monotonic())
                 self._undo_stack.push(cmd)
             else:
                 super().keyPressEvent(event)
@@ -178,12 +230,15 @@ class CodeEditor(QPlainTextEdit):
                 super().keyPressEvent(event)
                 cmd = DeleteTextCommand(self, start, end, deleted)
                 self._undo_stack.push(cmd)
-            elif cursor.position() < len(self.toPlainText()):
+            elif not cursor.atEnd():
                 pos = cursor.position()
-                cursor.setPosition(pos + 1, cursor.MoveMode.KeepAnchor)
+                cursor.movePosition(
+                    QTextCursor.MoveOperation.NextCharacter, QTextCursor.MoveMode.KeepAnchor
+                )
+                end = cursor.position()
                 deleted = cursor.selectedText()
                 super().keyPressEvent(event)
-                cmd = DeleteTextCommand(self, pos, pos + 1, deleted)
+                cmd = DeleteTextCommand(self, pos, end, deleted, typed_at=time.monotonic())
                 self._undo_stack.push(cmd)
             else:
                 super().keyPressEvent(event)
@@ -212,7 +267,7 @@ class CodeEditor(QPlainTextEdit):
                     cursor.insertBlock()
                 else:
                     super().keyPressEvent(event)
-                cmd = InsertTextCommand(self, new_text, pos)
+                cmd = InsertTextCommand(self, new_text, pos, typed_at=time.monotonic())
                 self._undo_stack.push(cmd)
             return
 
@@ -228,15 +283,28 @@ class CodeEditor(QPlainTextEdit):
                 self._undo_stack.push(cmd)
             else:
                 pos = cursor.position()
+                now = time.monotonic()
+                if self._pending_insert_text and (
+                    pos != self._pending_insert_end
+                    or now - self._pending_insert_time > InsertTextCommand.MERGE_WINDOW
+                ):
+                    # Typing after a pause or elsewhere starts a new step.
+                    self._flush_pending_insert()
                 if self._pending_insert_start < 0:
                     self._pending_insert_start = pos
                 super().keyPressEvent(event)
                 self._pending_insert_text += event.text()
+                self._pending_insert_end = self.textCursor().position()
+                self._pending_insert_time = now
             return
 
         self._flush_pending_insert()
         super().keyPressEvent(event)
 
+    def focusInEvent(self, event):
+        super().focusInEvent(event)
+        self.focused.emit()
+
     def focusOutEvent(self, event):
         self._flush_pending_insert()
         super().focusOutEvent(event)
@@ -1,16 +1,34 @@
 from typing import Tuple, Optional
 
+from PyQt6.QtGui import QTextDocument
+
+from editor.file_format import BinaryFileError
+from editor.file_loader import FileLoader
 from editor.file_manager import FileManager
+from editor.file_saver import SaveRequest
 from editor.models.document import DocumentModel
+from editor.models.mapped_file import MappedFile
+from editor.highlighters.core.language_index import LanguageIndex
 from editor.highlighters.detector import LanguageDetector
 
 
 class FileController:
     """Controller for file operations, bridging view and model."""
 
+    # Files at least this large are streamed into the editor in chunks.
+    STREAM_THRESHOLD = 8 * 1024 * 1024
+    # Files at least this large open read-only in a LargeFileViewer.
+    LARGE_FILE_THRESHOLD = 512 * 1024 * 1024
+    # Documents with at least this many characters are saved without
+    # waiting for the write to finish.
+    BACKGROUND_SAVE_THRESHOLD = 1024 * 1024
+
     def __init__(self, document: DocumentModel):
         self.document = document
         self.file_manager = FileManager()
+        self._languages = LanguageIndex.instance()
+        # (revision, language) of the last detect_from_content call.
+        self._detected: Tuple[int, str] = (-1, "")
 
     def open_file(self, file_path: str) -> Tuple[bool, str, str]:
         """
@@ -20,18 +38,90 @@ class FileController:
             Tuple of (success, content, error_message)
         """
         try:
-            content = self.file_manager.read_file(file_path)
+            content, file_format = self.file_manager.read_text(file_path)
             self.document.file_path = file_path
+            self.document.file_format = file_format
             self.document.set_content(content, mark_as_saved=True)
             return True, content, ""
-        except FileNotFoundError:
-            return False, "", f"File not found: {file_path}"
-        except PermissionError:
-            return False, "", f"Permission denied: {file_path}"
-        except UnicodeDecodeError:
-            return False, "", f"Could not open file: {file_path}\n\nThis appears to be a binary file. Only text files are supported."
         except Exception as e:
-            return False, "", f"Could not open file: {e}"
+            return False, "", self.open_error_message(file_path, e)
+
+    def should_stream(self, file_path: str) -> bool:
+        """Whether ``file_path`` is large enough to open with ``stream_file``."""
+        return self._file_size(file_path) >= self.STREAM_THRESHOLD
+
+    def is_large_file(self, file_path: str) -> bool:
+        """Whether ``file_path`` is too large to edit and should be mapped instead."""
+        return self._file_size(file_path) >= self.LARGE_FILE_THRESHOLD
+
+    def _file_size(self, file_path: str) -> int:
+        try:
+            return self.file_manager.file_size(file_path)
+        except OSError:
+            return -1
+
+    def open_mapped(self, file_path: str) -> Tuple[Optional[MappedFile], str]:
+        """
+        Map ``file_path`` read-only for viewing.
+
+        The document model is reset to an empty, unmodified document for
+        the path, since the file is never loaded into the editor.
+
+        Returns:
+            Tuple of (mapped file or None, error_message)
+        """
+        try:
+            file_format = self.file_manager.detect_format(file_path)
+            mapped = MappedFile(file_path, file_format)
+        except Exception as e:
+            return None, self.open_error_message(file_path, e)
+        self.document.reset()
+        self.document.file_path = file_path
+        self.document.file_format = file_format
+        return mapped, ""
+
+    def stream_file(
+        self, file_path: str, document: QTextDocument
+    ) -> Tuple[Optional[FileLoader], str]:
+        """
+        Prepare a FileLoader that appends ``file_path`` to ``document``.
+
+        The caller starts the loader and calls ``finish_stream`` once it
+        has finished.
+
+        Returns:
+            Tuple of (loader or None, error_message)
+        """
+        try:
+            total = self.file_manager.file_size(file_path)
+            file_format = self.file_manager.detect_format(file_path)
+            chunks = self.file_manager.read_chunks(file_path, file_format=file_format)
+            self.document.file_format = file_format
+
+            def reopen(error: UnicodeDecodeError):
+                fallback = self.file_manager.fallback_format(file_path, file_format, error)
+                self.document.file_format = fallback
+                return self.file_manager.read_chunks(file_path, file_format=fallback)
+
+            return FileLoader(document, chunks, total, reopen=reopen), ""
+        except Exception as e:
+            return None, self.open_error_message(file_path, e)
+
+    def finish_stream(self, file_path: str, loader: FileLoader) -> None:
+        """Record a completely streamed file as the saved document."""
+        self.document.file_path = file_path
+        self.document.mark_saved(loader.digest)
+
+    @staticmethod
+    def open_error_message(file_path: str, error: Exception) -> str:
+        """Describe why ``file_path`` could not be opened."""
+        if isinstance(error, FileNotFoundError):
+            return f"File not found: {file_path}"
+        if isinstance(error, PermissionError):
+            return f"Permission denied: {file_path}"
+        if isinstance(error, (BinaryFileError, UnicodeDecodeError)):
+            return f"Could not open file: {file_path}\n\nThis appears to be a binary file. Only text files are supported."
+        return f"Could not open file: {error}"
 
     def save_file(self, file_path: str, content: str) -> Tuple[bool, str]:
         """
@@ -40,23 +130,82 @@ class FileController:
         Returns:
             Tuple of (success, error_message)
         """
-        final_path = LanguageDetector.suggest_extension(file_path, content)
+        final_path = self._final_path(file_path, content)
 
         try:
-            self.file_manager.write_file(final_path, content)
+            self.file_manager.write_file(final_path, content, self.document.file_format)
             self.document.file_path = final_path
             self.document.set_content(content, mark_as_saved=True)
             return True, ""
-        except PermissionError:
-            return False, f"Permission denied: {final_path}"
         except Exception as e:
-            return False, f"Could not save file: {e}"
+            return False, self.save_error_message(final_path, e)
+
+    def prepare_save(self, file_path: str, content: str) -> SaveRequest:
+        """Snapshot ``content`` for a FileSaver, choosing the final path."""
+        final_path = self._final_path(file_path, content)
+        return SaveRequest(
+            final_path, content, self.document.revision, self.document.file_format
+        )
+
+    def finish_save(
+        self, request: SaveRequest, state: Optional[Tuple[int, bytes]], error: Optional[Exception]
+    ) -> Tuple[bool, str]:
+        """
+        Update the document model once a FileSaver has written ``request``.
+
+        Returns:
+            Tuple of (success, error_message)
+        """
+        if error is not None:
+            return False, self.save_error_message(request.file_path, error)
+        self.document.file_path = request.file_path
+        self.document.mark_saved_at(request.revision, *state)
+        return True, ""
+
+    @staticmethod
+    def save_error_message(file_path: str, error: Exception) -> str:
+        """Describe why ``file_path`` could not be saved."""
+        if isinstance(error, PermissionError):
+            return f"Permission denied: {file_path}"
+        if isinstance(error, UnicodeEncodeError):
+            return (
+                f"Could not save file: {file_path}\n\nThe text contains characters "
+                f"that cannot be encoded as {error.encoding}."
+            )
+        return f"Could not save file: {error}"
 
     def get_save_filter(self, content: str) -> str:
         """Get the suggested save filter based on current file and content."""
-        return LanguageDetector.get_save_filter(
-            self.document.file_path or "", content
-        )
+        lang = LanguageDetector.detect_from_extension(self.document.file_path or "")
+        if not lang:
+            lang = self._content_language(content)
+        return self._languages.save_filter(lang)
+
+    def get_open_filters(self) -> str:
+        """File dialog filters for opening, one per known language."""
+        return self._languages.open_filters()
+
+    def get_save_filters(self) -> str:
+        """File dialog filters for saving; ``get_save_filter`` is one of them."""
+        return self._languages.save_filters()
+
+    def _final_path(self, file_path: str, content: str) -> str:
+        """``file_path``, with an extension for the content if it has none."""
+        if LanguageDetector.detect_from_extension(file_path):
+            return file_path
+        lang = self._content_language(content)
+        return file_path + self._languages.save_extension(lang)
+
+    def _content_language(self, content: str) -> str:
+        """Detect the language of ``content``, the document's current text.
+
+        The result is reused until the document changes, so saving
+        repeatedly does not scan the text again.
+        """
+        revision = self.document.revision
+        if self._detected[0] != revision:
+            self._detected = (revision, LanguageDetector.detect_from_content(content))
+        return self._detected[1]
 
     def get_suggested_path(self) -> str:
         """Get the suggested path for save dialog."""
@@ -0,0 +1,360 @@
+"""Open documents, one per tab, each with its own highlighting state."""
+
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtWidgets import QSplitter, QStackedWidget, QTabWidget, QWidget
+
+from editor.code_editor import CodeEditor
+from editor.controllers.file_controller import FileController
+from editor.file_saver import FileSaver
+from editor.highlighters.detector import LanguageDetector
+from editor.highlighters.scheduler import HighlightScheduler
+from editor.models.document import DocumentModel
+from editor.undo_journal import UndoJournal
+
+
+def _path_key(file_path: str) -> str:
+    return os.path.normcase(os.path.abspath(file_path))
+
+
+class DocumentTab(QObject):
+    """An open document and everything that is kept alive with it.
+
+    Each tab has its own CodeEditor (and so its own QTextDocument), model,
+    controller, saver and DocumentHighlighter. The formats Qt has already
+    applied and the highlighter's line cache survive while another tab is
+    shown, so switching back costs no tokenization. Tokenizers themselves
+    are shared between tabs through the HighlightRegistry.
+
+    ``editor`` can be split into several panes (``panes``), all showing
+    the same QTextDocument through the same highlighter and undo history.
+    Each pane has its own line number gutter, cursor and scroll position.
+    ``editor`` is always the first pane and owns the document; closing it
+    hands the document over to the next pane, which becomes ``editor``.
+
+    ``stack`` is the tab's page: the panes, or a LargeFileViewer on top of
+    them while a huge file is shown read-only.
+    """
+
+    # The document's text changed, whichever pane is ``editor``.
+    text_changed = pyqtSignal()
+
+    def __init__(self, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.editor = CodeEditor()
+        self.document = DocumentModel()
+        self.document.content_source = self.editor.toPlainText
+        self.controller = FileController(self.document)
+        self.saver = FileSaver(self)
+        self.panes = QSplitter(Qt.Orientation.Horizontal)
+        self.panes.setChildrenCollapsible(False)
+        self.panes.addWidget(self.editor)
+        self.stack = QStackedWidget()
+        self.stack.addWidget(self.panes)
+        self._panes = [self.editor]
+        self.active_pane = self.editor
+        editor = self.editor
+        self.editor.focused.connect(lambda: self._activate(editor))
+        self.editor.textChanged.connect(self.text_changed)
+        self.highlighter = None
+        self.scheduler = None
+        self.loading = False
+        self.loader = None
+        self.viewer = None
+
+    @property
+    def title(self) -> str:
+        if not self.document.file_path:
+            return "Untitled"
+        return os.path.basename(self.document.file_path)
+
+    @property
+    def is_pristine(self) -> bool:
+        """True for an empty, unnamed, untouched tab a file can be opened in."""
+        return (
+            not self.document.file_path
+            and not self.document.is_modified
+            and self.loader is None
+            and self.viewer is None
+            and self.editor.document().isEmpty()
+        )
+
+    @property
+    def cache_bytes(self) -> int:
+        """Approximate memory held by the highlighter's line cache."""
+        if self.highlighter is None:
+            return 0
+        return self.highlighter.cache_bytes
+
+    def evict_cache(self) -> None:
+        if self.highlighter is not None:
+            self.highlighter.evict_cache()
+
+    def setup_highlighter(self, file_path: str = "", content: str = "", lang: str = "") -> None:
+        """Replace the highlighter with one for the detected language."""
+        if self.scheduler:
+            self.scheduler.stop()
+            self.scheduler.deleteLater()
+            self.scheduler = None
+        if self.highlighter:
+            self.highlighter.setDocument(None)
+        self.highlighter = LanguageDetector.get_highlighter(
+            self.editor.document(), file_path, content, lang
+        )
+        self.scheduler = HighlightScheduler(self.highlighter, self.editor)
+        for pane in self._panes[1:]:
+            self.scheduler.add_editor(pane)
+
+    def pane_count(self) -> int:
+        return len(self._panes)
+
+    def split(self, orientation: Qt.Orientation) -> CodeEditor:
+        """Open a pane beside (horizontal) or below (vertical) the active one.
+
+        The new pane starts at the active pane's cursor and becomes active.
+        """
+        active = self.active_pane
+        pane = CodeEditor()
+        pane.share_document(active)
+        parent = active.parentWidget()
+        index = parent.indexOf(active)
+        if parent.count() > 1 and parent.orientation() != orientation:
+            splitter = QSplitter(orientation)
+            splitter.setChildrenCollapsible(False)
+            parent.replaceWidget(index, splitter)
+            splitter.addWidget(active)
+            parent, index = splitter, 0
+        parent.setOrientation(orientation)
+        parent.insertWidget(index + 1, pane)
+        parent.setSizes([1] * parent.count())
+
+        pane.setTextCursor(active.textCursor())
+        pane.verticalScrollBar().setValue(active.verticalScrollBar().value())
+        pane.focused.connect(lambda: self._activate(pane))
+        self._panes.append(pane)
+        if self.scheduler is not None:
+            self.scheduler.add_editor(pane)
+        self.active_pane = pane
+        pane.setFocus()
+        return pane
+
+    def close_pane(self, pane: Optional[CodeEditor] = None) -> bool:
+        """Close ``pane``, the active one by default; False if there is only one.
+
+        Closing ``editor`` first promotes the next pane to ``editor``.
+        """
+        if len(self._panes) == 1:
+            return False
+        pane = pane or self.active_pane
+        if pane is self.editor:
+            self._promote(self._panes[1])
+        self._panes.remove(pane)
+        if self.scheduler is not None:
+            self.scheduler.remove_editor(pane)
+        pane.hand_over_undo(self.editor)
+
+        parent = pane.parentWidget()
+        pane.setParent(None)
+        pane.deleteLater()
+        if parent is not self.panes and parent.count() == 1:
+            outer = parent.parentWidget()
+            outer.replaceWidget(outer.indexOf(parent), parent.widget(0))
+            parent.deleteLater()
+
+        if self.active_pane is pane:
+            self.active_pane = self.editor
+            self.editor.setFocus()
+        return True
+
+    def _promote(self, pane: CodeEditor) -> None:
+        """Make ``pane`` the editor that owns the document and undo history."""
+        old = self.editor
+        old.hand_over_undo(pane)
+        document = old.document()
+        document.setParent(pane)
+        # The layout measures text on the viewport of the editor that made it.
+        document.documentLayout().setPaintDevice(pane.viewport())
+        old.undo_stack.setParent(pane)
+        old.textChanged.disconnect(self.text_changed)
+        pane.textChanged.connect(self.text_changed)
+        self.document.content_source = pane.toPlainText
+        if self.scheduler is not None:
+            self.scheduler.set_editor(pane)
+        self._panes.remove(pane)
+        self._panes.insert(0, pane)
+        self.editor = pane
+
+    def _activate(self, pane: CodeEditor) -> None:
+        self.active_pane = pane
+
+    def update_language(self, file_path: str) -> None:
+        """Highlight as the language ``file_path``'s name implies, if it names one.
+
+        The highlighter is kept; only a different language makes it drop its
+        line states and highlight the document again.
+        """
+        lang = LanguageDetector.detect_from_extension(file_path)
+        if lang and self.highlighter is not None:
+            self.highlighter.set_language(lang)
+
+    def open_journal(self) -> None:
+        """Restore the opened file's undo history and keep recording it."""
+        stack = self.editor.undo_stack
+        self.close_journal()
+        stack.journal = UndoJournal.restore(
+            self.document.file_path, self.document.saved_fingerprint, self.editor
+        )
+
+    def record_save(self) -> None:
+        """Checkpoint the undo journal after a save, starting one for a new path.
+
+        Nothing is recorded if the document changed while it was being
+        saved, since the journal's steps would not lead to the saved text.
+        """
+        if self.document.is_modified:
+            return
+        self.editor.end_typing()
+        stack = self.editor.undo_stack
+        fingerprint = self.document.saved_fingerprint
+        journal = stack.journal
+        if journal is not None and journal.file_path == self.document.file_path:
+            journal.checkpoint(fingerprint)
+            return
+        self.close_journal()
+        stack.journal = UndoJournal.start(self.document.file_path, stack, fingerprint)
+
+    def close_journal(self) -> None:
+        stack = self.editor.undo_stack
+        if stack.journal is not None:
+            stack.journal.close()
+            stack.journal = None
+
+    def close(self) -> None:
+        """Stop all background work and release the tab's widgets."""
+        self.saver.wait()
+        self.close_journal()
+        if self.loader is not None:
+            self.loader.cancel()
+            self.loader = None
+        if self.viewer is not None:
+            self.viewer.close_file()
+            self.viewer = None
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        if self.highlighter is not None:
+            self.highlighter.setDocument(None)
+        self.stack.deleteLater()
+        self.deleteLater()
+
+
+class DocumentTabs(QTabWidget):
+    """The tab bar of open documents.
+
+    Tabs are also kept in most-recently-used order. Only the current tab's
+    line cache is needed for editing, so whenever the current tab changes,
+    the caches of the least recently used other tabs are evicted until the
+    inactive tabs together hold at most ``CACHE_BUDGET`` bytes. Eviction
+    keeps the applied formats and the line states, so an evicted tab still
+    shows up highlighted at once; only re-tokenizing an edited line can no
+    longer be skipped.
+    """
+
+    # Emitted with the DocumentTab that became current.
+    current_tab_changed = pyqtSignal(object)
+    # Emitted with the DocumentTab whose close button was clicked.
+    close_requested = pyqtSignal(object)
+
+    CACHE_BUDGET = 64 * 1024 * 1024
+
+    def __init__(self, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.setTabsClosable(True)
+        self.setMovable(True)
+        self.setDocumentMode(True)
+        # Least recently used first.
+        self._recent: list[DocumentTab] = []
+        self.currentChanged.connect(self._on_current_changed)
+        self.tabCloseRequested.connect(self._on_close_requested)
+
+    def add_tab(self, tab: DocumentTab) -> None:
+        """Add ``tab`` after the current tab and make it current."""
+        self._recent.insert(0, tab)
+        index = self.insertTab(self.currentIndex() + 1, tab.stack, tab.title)
+        self.setCurrentIndex(index)
+
+    def remove_tab(self, tab: DocumentTab) -> None:
+        self._recent.remove(tab)
+        self.removeTab(self.indexOf(tab.stack))
+        tab.close()
+
+    def tabs(self) -> list[DocumentTab]:
+        """Open tabs in tab bar order."""
+        return [self.tab_at(i) for i in range(self.count())]
+
+    def tab_at(self, index: int) -> Optional[DocumentTab]:
+        page = self.widget(index)
+        for tab in self._recent:
+            if tab.stack is page:
+                return tab
+        return None
+
+    def current_tab(self) -> Optional[DocumentTab]:
+        return self.tab_at(self.currentIndex())
+
+    def set_current_tab(self, tab: DocumentTab) -> None:
+        self.setCurrentWidget(tab.stack)
+
+    def find(self, file_path: str) -> Optional[DocumentTab]:
+        """The tab showing ``file_path``, if it is open."""
+        key = _path_key(file_path)
+        for tab in self._recent:
+            if tab.document.file_path and _path_key(tab.document.file_path) == key:
+                return tab
+        return None
+
+    def update_tab(self, tab: DocumentTab) -> None:
+        """Refresh the tab's label after its file or modified state changed."""
+        index = self.indexOf(tab.stack)
+        title = f"* {tab.title}" if tab.document.is_modified else tab.title
+        if self.tabText(index) != title:
+            self.setTabText(index, title)
+            self.setTabToolTip(index, tab.document.file_path or "")
+
+    def evict_caches(self, budget: Optional[int] = None) -> int:
+        """Evict inactive tabs' line caches, oldest first, down to ``budget`` bytes.
+
+        Returns the number of tabs whose cache was evicted.
+        """
+        if budget is None:
+            budget = self.CACHE_BUDGET
+        current = self.current_tab()
+        inactive = [tab for tab in self._recent if tab is not current]
+        total = sum(tab.cache_bytes for tab in inactive)
+        evicted = 0
+        for tab in inactive:
+            if total <= budget:
+                break
+            size = tab.cache_bytes
+            if size:
+                tab.evict_cache()
+                total -= size
+                evicted += 1
+        return evicted
+
+    def _on_current_changed(self, index: int) -> None:
+        tab = self.tab_at(index)
+        if tab is None:
+            return
+        self._recent.remove(tab)
+        self._recent.append(tab)
+        self.evict_caches()
+        self.current_tab_changed.emit(tab)
+
+    def _on_close_requested(self, index: int) -> None:
+        tab = self.tab_at(index)
+        if tab is not None:
+            self.close_requested.emit(tab)
@@ -0,0 +1,114 @@
+"""Encoding and line-ending detection from a prefix of a file's bytes."""
+
+import codecs
+import os
+from typing import NamedTuple, Optional
+
+# Bytes looked at to classify a file.
+SNIFF_SIZE = 64 * 1024
+
+# Byte order marks, longest first: the UTF-32 LE mark starts with the
+# UTF-16 LE one.
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+# Control bytes that do not occur in text, apart from NUL which is
+# checked separately.
+_CONTROL = bytes(c for c in range(1, 32) if chr(c) not in "\t\n\f\r\b\x1b\x0b")
+# Share of control bytes above which a file is taken to be binary.
+MAX_CONTROL_RATIO = 0.1
+
+
+class BinaryFileError(ValueError):
+    """Raised when a file looks like binary data rather than text."""
+
+
+class FileFormat(NamedTuple):
+    """How a text file is encoded on disk."""
+
+    encoding: str = "utf-8"
+    # Whether the file starts with a byte order mark.
+    bom: bool = False
+    newline: str = os.linesep
+
+
+DEFAULT_FORMAT = FileFormat()
+
+
+def _utf16_without_bom(data: bytes) -> Optional[str]:
+    """Guess UTF-16 from where the NULs are: ASCII text has a NUL in every
+    other byte."""
+    if len(data) < 4:
+        return None
+    even = data[0::2].count(0)
+    odd = data[1::2].count(0)
+    half = len(data) // 2
+    if odd > half * 0.4 and even < half * 0.05:
+        return "utf-16-le"
+    if even > half * 0.4 and odd < half * 0.05:
+        return "utf-16-be"
+    return None
+
+
+def _newline(text: str, default: str) -> str:
+    crlf = text.count("\r\n")
+    lf = text.count("\n") - crlf
+    cr = text.count("\r") - crlf
+    if not (crlf or lf or cr):
+        return default
+    return max((lf, "\n"), (crlf, "\r\n"), (cr, "\r"))[1]
+
+
+def sniff(data: bytes, complete: bool = False, default: FileFormat = DEFAULT_FORMAT) -> FileFormat:
+    """Classify a file from its first bytes.
+
+    Args:
+        data: The start of the file, normally SNIFF_SIZE bytes.
+        complete: True if ``data`` is the whole file, so a multi-byte
+            sequence cut off at the end is an error rather than truncation.
+        default: The format to assume for what cannot be detected, such as
+            the newline of a file with a single line.
+
+    Raises:
+        BinaryFileError: If the data looks binary.
+    """
+    bom = False
+    for mark, encoding in _BOMS:
+        if data.startswith(mark):
+            bom = True
+            data = data[len(mark):]
+            break
+    else:
+        encoding = None
+        if 0 in data:
+            encoding = _utf16_without_bom(data)
+            if encoding is None:
+                raise BinaryFileError("file contains NUL bytes")
+        elif data:
+            control = len(data) - len(data.translate(None, _CONTROL))
+            if control > len(data) * MAX_CONTROL_RATIO:
+                raise BinaryFileError("file contains control characters")
+
+    if encoding is None:
+        try:
+            text = codecs.getincrementaldecoder("utf-8")().decode(data, final=complete)
+            encoding = "utf-8"
+        except UnicodeDecodeError:
+            encoding = "latin-1"
+            text = data.decode(encoding)
+    else:
+        text = codecs.getincrementaldecoder(encoding)("replace").decode(data)
+
+    return FileFormat(encoding, bom, _newline(text, default.newline))
+
+
+def sniff_file(file_path: str, default: FileFormat = DEFAULT_FORMAT) -> FileFormat:
+    """Read the start of ``file_path`` and ``sniff`` it."""
+    with open(file_path, "rb") as f:
+        data = f.read(SNIFF_SIZE + 1)
+    return sniff(data[:SNIFF_SIZE], complete=len(data) <= SNIFF_SIZE, default=default)
@@ -0,0 +1,132 @@
+"""Streaming file loading for large documents."""
+
+from typing import Callable, Iterator, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtGui import QTextCursor, QTextDocument
+
+from editor.models.document import ContentDigest
+
+
+class FileLoader(QObject):
+    """Appends a file to a QTextDocument a chunk at a time.
+
+    One chunk is inserted per trip through the event loop, so the editor
+    stays responsive and shows the start of the file while the rest is
+    still being read. Python only ever holds one chunk: the text lives in
+    the document, and the digest the DocumentModel needs to track unsaved
+    changes is computed as the chunks go by.
+    """
+
+    # Bytes read so far and the size of the file.
+    progress = pyqtSignal(int, int)
+    # Text of each chunk, once it is in the document.
+    chunk_loaded = pyqtSignal(str)
+    # Everything loaded so far was discarded; loading starts over.
+    restarted = pyqtSignal()
+    finished = pyqtSignal()
+    # Carries the exception that stopped the load.
+    failed = pyqtSignal(object)
+
+    def __init__(
+        self,
+        document: QTextDocument,
+        chunks: Iterator[Tuple[str, int]],
+        total_bytes: int,
+        parent: Optional[QObject] = None,
+        reopen: Optional[Callable[[UnicodeDecodeError], Iterator[Tuple[str, int]]]] = None,
+    ) -> None:
+        """Prepare to stream ``chunks`` onto the end of ``document``.
+
+        Args:
+            document: The document to append to; normally empty.
+            chunks: ``(text, bytes_read)`` pairs, as from FileManager.read_chunks.
+            total_bytes: Size of the file, for progress reporting.
+            reopen: Called once if ``chunks`` fails to decode; returns the
+                chunks to restart the load from, or raises to fail it.
+        """
+        super().__init__(parent)
+        self._document = document
+        self._chunks = chunks
+        self._total_bytes = total_bytes
+        self._digest = ContentDigest()
+        self._done = False
+        self._reopen = reopen
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._load_chunk)
+
+    @property
+    def is_running(self) -> bool:
+        return not self._done
+
+    @property
+    def digest(self) -> bytes:
+        """ContentDigest of everything loaded so far."""
+        return self._digest.digest()
+
+    def start(self) -> None:
+        """Start loading from the event loop."""
+        self._timer.start()
+
+    def finish(self) -> None:
+        """Synchronously load everything that is still pending."""
+        self._timer.stop()
+        while not self._done:
+            self._load_chunk(reschedule=False)
+
+    def cancel(self) -> None:
+        """Stop loading, keeping what was inserted so far."""
+        self._timer.stop()
+        if not self._done:
+            self._done = True
+            self._chunks.close()
+
+    def _load_chunk(self, reschedule: bool = True) -> None:
+        try:
+            text, bytes_read = next(self._chunks)
+        except StopIteration:
+            self._done = True
+            self.finished.emit()
+            return
+        except UnicodeDecodeError as e:
+            if self._reopen is None:
+                self._fail(e)
+            else:
+                self._restart(e)
+                if reschedule and not self._done:
+                    self._timer.start()
+            return
+        except (OSError, ValueError) as e:
+            self._fail(e)
+            return
+
+        cursor = QTextCursor(self._document)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+        self._digest.update(text, plain=True)
+        self.chunk_loaded.emit(text)
+        self.progress.emit(bytes_read, self._total_bytes)
+
+        if reschedule:
+            self._timer.start()
+
+    def _fail(self, error: Exception) -> None:
+        self._done = True
+        self.failed.emit(error)
+
+    def _restart(self, error: UnicodeDecodeError) -> None:
+        """Discard what was loaded and start again from ``reopen``'s chunks."""
+        reopen, self._reopen = self._reopen, None
+        try:
+            self._chunks = reopen(error)
+        except (OSError, ValueError) as e:
+            self._fail(e)
+            return
+        cursor = QTextCursor(self._document)
+        cursor.select(QTextCursor.SelectionType.Document)
+        cursor.removeSelectedText()
+        self._digest = ContentDigest()
+        self.restarted.emit()
@@ -1,10 +1,189 @@
+import codecs
+import errno
+import io
+import os
+import secrets
+import stat
+import tempfile
+from typing import Iterator, Optional, Tuple
+
+from editor.file_format import DEFAULT_FORMAT, BinaryFileError, FileFormat, sniff_file
+
+
 class FileManager:
+    CHUNK_SIZE = 1 << 18
+    # Characters encoded per write, bounding the encoded copy held at once.
+    WRITE_CHUNK_SIZE = 1 << 20
+
     @staticmethod
     def read_file(file_path: str) -> str:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return f.read()
+        return FileManager.read_text(file_path)[0]
+
+    @staticmethod
+    def read_text(file_path: str) -> Tuple[str, FileFormat]:
+        """Read a text file in whatever encoding it was sniffed to have.
+
+        Returns the text, with ``\n`` line endings and without a byte order
+        mark, and the format to write it back with.
+
+        Raises:
+            BinaryFileError: If the file looks binary.
+        """
+        file_format = sniff_file(file_path)
+        try:
+            with open(file_path, "r", encoding=file_format.encoding) as f:
+                text = f.read()
+        except UnicodeDecodeError as e:
+            file_format = FileManager.fallback_format(file_path, file_format, e)
+            with open(file_path, "r", encoding=file_format.encoding) as f:
+                text = f.read()
+        if file_format.bom:
+            text = text[1:]
+        return text, file_format
+
+    @staticmethod
+    def fallback_format(
+        file_path: str, file_format: FileFormat, error: UnicodeDecodeError
+    ) -> FileFormat:
+        """Return the format to re-read ``file_path`` with after ``error``.
+
+        Invalid UTF-8 past the sniffed prefix means Latin-1, unless the
+        file turns out to be binary after all.
+
+        Raises:
+            BinaryFileError: If the file contains NUL bytes.
+            UnicodeDecodeError: ``error``, if the file was not read as UTF-8.
+        """
+        if file_format.encoding != "utf-8":
+            raise error
+        with open(file_path, "rb") as f:
+            while data := f.read(FileManager.CHUNK_SIZE):
+                if 0 in data:
+                    raise BinaryFileError("file contains NUL bytes")
+        return file_format._replace(encoding="latin-1")
+
+    @staticmethod
+    def detect_format(file_path: str) -> FileFormat:
+        """Sniff the encoding and newline style of ``file_path``."""
+        return sniff_file(file_path)
 
     @staticmethod
-    def write_file(file_path: str, content: str) -> None:
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(content)
+    def read_chunks(
+        file_path: str, chunk_size: int = CHUNK_SIZE, file_format: FileFormat = DEFAULT_FORMAT
+    ) -> Iterator[Tuple[str, int]]:
+        """Read a text file incrementally in the encoding of ``file_format``.
+
+        Yields ``(text, bytes_read)`` pairs. Newlines are translated the same
+        way ``read_file`` translates them, even when a ``\\r\\n`` pair or a
+        multi-byte character is split between two chunks.
+        """
+        decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(file_format.encoding)(), translate=True
+        )
+        strip_bom = file_format.bom
+        with open(file_path, "rb") as f:
+            bytes_read = 0
+            while True:
+                data = f.read(chunk_size)
+                bytes_read += len(data)
+                text = decoder.decode(data, final=not data)
+                if strip_bom and text:
+                    strip_bom = False
+                    if text.startswith("\ufeff"):
+                        text = text[1:]
+                if text:
+                    yield text, bytes_read
+                if not data:
+                    return
+
+    @staticmethod
+    def file_size(file_path: str) -> int:
+        return os.path.getsize(file_path)
+
+    @staticmethod
+    def write_file(
+        file_path: str, content: str, file_format: FileFormat = DEFAULT_FORMAT
+    ) -> None:
+        """Replace ``file_path`` with ``content`` atomically.
+
+        ``content`` uses ``\n`` line endings; it is written with the
+        encoding, byte order mark and newline style of ``file_format``.
+
+        The text is written to a temporary file next to the target, synced
+        to disk and renamed over the target, and the rename is synced too,
+        so a crash mid-save leaves either the old file or the new one, never
+        a truncated one. The target's permissions are kept, a new file gets
+        the usual ``0o666`` less the umask, and a symlink is written through.
+        """
+        target = os.path.realpath(file_path)
+        mode: Optional[int] = None
+        try:
+            mode = stat.S_IMODE(os.stat(target).st_mode)
+        except FileNotFoundError:
+            pass
+        else:
+            if os.path.isdir(target):
+                raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), file_path)
+            if not os.access(target, os.W_OK):
+                raise PermissionError(errno.EACCES, os.strerror(errno.EACCES), file_path)
+
+        directory, name = os.path.split(target)
+        fd, temp_path = _create_temp(directory, name, mode)
+        try:
+            with open(fd, "w", encoding=file_format.encoding, newline=file_format.newline) as f:
+                if file_format.bom:
+                    f.write("\ufeff")
+                step = FileManager.WRITE_CHUNK_SIZE
+                for start in range(0, len(content), step):
+                    f.write(content[start:start + step])
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, target)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+        _sync_directory(directory)
+
+
+def _create_temp(directory: str, name: str, mode: Optional[int]) -> Tuple[int, str]:
+    """Create an empty temporary file for ``name`` in ``directory``.
+
+    With ``mode`` None the file is created ``0o666`` and the kernel applies
+    the umask, as for any new file. Otherwise it is created owner-only and
+    then given exactly ``mode``, which the umask must not narrow.
+
+    Returns the open file descriptor and the file's path.
+    """
+    for _ in range(tempfile.TMP_MAX):
+        temp_path = os.path.join(directory, f".{name}.{secrets.token_hex(4)}.tmp")
+        try:
+            fd = os.open(
+                temp_path,
+                os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0),
+                0o666 if mode is None else 0o600,
+            )
+        except FileExistsError:
+            continue
+        if mode is not None:
+            try:
+                os.chmod(temp_path, mode)
+            except BaseException:
+                os.close(fd)
+                os.unlink(temp_path)
+                raise
+        return fd, temp_path
+    raise FileExistsError(errno.EEXIST, "No usable temporary file name found", directory)
+
+
+def _sync_directory(directory: str) -> None:
+    """Flush ``directory``'s entries to disk, making a rename durable."""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
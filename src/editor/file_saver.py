@@ -0,0 +1,103 @@
+"""Background saving with coalesced requests."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from editor.file_format import DEFAULT_FORMAT, FileFormat
+from editor.file_manager import FileManager
+from editor.models.document import fingerprint
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class SaveRequest(NamedTuple):
+    """A snapshot of the document to write."""
+
+    file_path: str
+    content: str
+    # DocumentModel revision the content was taken at.
+    revision: int
+    file_format: FileFormat = DEFAULT_FORMAT
+
+
+def _write(request: SaveRequest) -> Tuple[int, bytes]:
+    FileManager.write_file(request.file_path, request.content, request.file_format)
+    return fingerprint(request.content)
+
+
+class FileSaver(QObject):
+    """Writes files on a worker thread, one save at a time.
+
+    ``save`` returns at once; encoding, writing, syncing and fingerprinting
+    the content all happen on the worker. While a write is in flight, a
+    new request replaces any request already waiting, so a burst of Ctrl+S
+    presses costs at most one more write, of the newest content.
+    """
+
+    # The request, its fingerprint (None on failure) and the error (None on success).
+    finished = pyqtSignal(object, object, object)
+
+    # Carries a finished write back to the GUI thread.
+    _written = pyqtSignal(object, object)
+
+    def __init__(self, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._executor: ThreadPoolExecutor | None = None
+        self._in_flight: SaveRequest | None = None
+        self._future: Future | None = None
+        self._queued: SaveRequest | None = None
+        self._written.connect(self._on_written)
+
+    @property
+    def is_busy(self) -> bool:
+        """True while a write is in flight."""
+        return self._in_flight is not None
+
+    def has_pending(self, revision: int) -> bool:
+        """True if a write of the content at ``revision`` is in flight or waiting."""
+        return any(
+            request is not None and request.revision == revision
+            for request in (self._in_flight, self._queued)
+        )
+
+    def save(self, request: SaveRequest) -> None:
+        """Write ``request`` once any write in flight has finished."""
+        if self._in_flight is not None:
+            self._queued = request
+            return
+        self._submit(request)
+
+    def wait(self) -> None:
+        """Block until every pending save has finished and been reported."""
+        while self._future is not None:
+            request, future = self._in_flight, self._future
+            future.exception()
+            self._on_written(request, future)
+
+    def _submit(self, request: SaveRequest) -> None:
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="save")
+        self._in_flight = request
+        future = self._executor.submit(_write, request)
+        self._future = future
+        future.add_done_callback(lambda f: self._written.emit(request, f))
+
+    def _on_written(self, request: SaveRequest, future: Future) -> None:
+        # wait() may already have reported this write.
+        if future is not self._future:
+            return
+        self._in_flight = None
+        self._future = None
+        error = future.exception()
+        state = None if error is not None else future.result()
+
+        queued, self._queued = self._queued, None
+        if queued is not None:
+            self._submit(queued)
+        self.finished.emit(request, state, error)
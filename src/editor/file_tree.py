@@ -2,7 +2,7 @@
 FileTreeWidget - A tree view for browsing files and folders.
 
 This widget displays a file system tree with:
-- File/folder icons
+- File/folder icons, by language for known file types
 - Hidden file visibility
 - Double-click to open files or expand folders
 - Context menu for New File, New Folder, Delete, Rename
@@ -27,7 +27,41 @@ from PyQt6.QtCore import (
     QFileSystemWatcher,
     QEventLoop,
 )
-from PyQt6.QtGui import QFileSystemModel, QAction
+from PyQt6.QtGui import QFileSystemModel, QAction, QIcon
+
+from editor.highlighters.core.language_index import LanguageIndex
+
+
+class LanguageFileSystemModel(QFileSystemModel):
+    """A QFileSystemModel that gives files the icon of their language.
+
+    The language comes from the LanguageIndex, by file name; files of no
+    known language, and languages with no icon in the theme, keep the
+    platform's icon.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._languages = LanguageIndex.instance()
+        self._icons: dict[str, QIcon | None] = {}
+
+    def language_icon(self, file_name: str) -> QIcon | None:
+        """The theme icon for ``file_name``'s language, if there is one."""
+        lang_id = self._languages.for_path(file_name)
+        if lang_id is None:
+            return None
+        if lang_id not in self._icons:
+            language = self._languages.get(lang_id)
+            icon = QIcon.fromTheme(language.icon) if language.icon else QIcon()
+            self._icons[lang_id] = None if icon.isNull() else icon
+        return self._icons[lang_id]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DecorationRole and index.column() == 0 and not self.isDir(index):
+            icon = self.language_icon(self.fileName(index))
+            if icon is not None:
+                return icon
+        return super().data(index, role)
 
 
 class FileTreeWidget(QTreeView):
@@ -56,7 +90,7 @@ class FileTreeWidget(QTreeView):
     
     def _setup_model(self):
         """Initialize the QFileSystemModel."""
-        self._model = QFileSystemModel()
+        self._model = LanguageFileSystemModel()
         self._model.setFilter(QDir.Filter.Hidden | QDir.Filter.AllEntries | QDir.Filter.NoDotAndDotDot)
         self.setModel(self._model)
     
@@ -1,23 +1,31 @@
-from editor.highlighters.base import BaseHighlighter
-from editor.highlighters.python_hl import PythonHighlighter
-from editor.highlighters.c_hl import CHighlighter
-from editor.highlighters.cpp_hl import CppHighlighter
-from editor.highlighters.java_hl import JavaHighlighter
-from editor.highlighters.html_hl import HtmlHighlighter
-from editor.highlighters.json_hl import JsonHighlighter
-from editor.highlighters.markdown_hl import MarkdownHighlighter
-from editor.highlighters.plain_hl import PlainTextHighlighter
-from editor.highlighters.detector import LanguageDetector
+"""Syntax highlighting.
 
-__all__ = [
-    "BaseHighlighter",
-    "PythonHighlighter",
-    "CHighlighter",
-    "CppHighlighter",
-    "JavaHighlighter",
-    "HtmlHighlighter",
-    "JsonHighlighter",
-    "MarkdownHighlighter",
-    "PlainTextHighlighter",
-    "LanguageDetector",
-]
+The legacy per-language highlighters are imported on first access; the
+editor itself only needs LanguageDetector and DocumentHighlighter.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "BaseHighlighter": "base",
+    "PythonHighlighter": "python_hl",
+    "CHighlighter": "c_hl",
+    "CppHighlighter": "cpp_hl",
+    "JavaHighlighter": "java_hl",
+    "HtmlHighlighter": "html_hl",
+    "JsonHighlighter": "json_hl",
+    "MarkdownHighlighter": "markdown_hl",
+    "PlainTextHighlighter": "plain_hl",
+    "LanguageDetector": "detector",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
@@ -2,6 +2,15 @@
 
 from .base_tokenizer import BaseTokenizer
 from .incremental_manager import IncrementalManager
-from .style_registry import StyleId, StyleRegistry
+from .language_index import Language, LanguageIndex
+from .style_registry import StyleRegistry
+from .types import StyleId
 
-__all__ = ["BaseTokenizer", "IncrementalManager", "StyleId", "StyleRegistry"]
+__all__ = [
+    "BaseTokenizer",
+    "IncrementalManager",
+    "Language",
+    "LanguageIndex",
+    "StyleId",
+    "StyleRegistry",
+]
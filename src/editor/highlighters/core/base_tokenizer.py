@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 
 from editor.highlighters.core.types import (
+    PackedTokens,
     Token,
     StackFrame,
     StateStack,
@@ -33,6 +34,24 @@ class BaseTokenizer(ABC):
         """
         pass
 
+    def tokenize_line_packed(
+        self, line: str, state_stack: StateStack, out: PackedTokens
+    ) -> StateStack:
+        """Append the line's tokens to ``out`` as packed triples.
+
+        Args:
+            line: The line of text to tokenize.
+            state_stack: The current state stack from previous lines.
+            out: ``array("I")`` receiving ``start, length, style_id`` triples.
+
+        Returns:
+            The final state stack.
+        """
+        result = self.tokenize_line(line, state_stack)
+        for token in result.tokens:
+            out.extend(token)
+        return result.final_stack
+
     @abstractmethod
     def get_lang_id(self) -> str:
         """Return the language identifier (e.g., 'python', 'html')."""
@@ -1,27 +1,119 @@
 """Manages per-line state caching for incremental highlighting."""
 
+import sys
+from array import array
+from typing import NamedTuple
+
+from editor.highlighters.core.stack_pool import StateStackPool
+from editor.highlighters.core.types import PackedTokens
+
+
+class _LineEntry(NamedTuple):
+    """Cached tokenization of one line for a given starting state."""
+
+    initial_state_id: int
+    text_hash: int
+    final_state_id: int
+    tokens: PackedTokens
+
+
+# Bytes an entry takes besides its tokens: the tuple and an empty array.
+_ENTRY_OVERHEAD = sys.getsizeof(_LineEntry(0, 0, 0, array("I"))) + sys.getsizeof(array("I"))
+
+
+def _entry_bytes(entry: _LineEntry) -> int:
+    return _ENTRY_OVERHEAD + 4 * len(entry.tokens)
+
 
 class IncrementalManager:
-    """Manages per-line state caching and determines when to stop propagating rehighlighting."""
+    """Manages per-line state caching and determines when to stop propagating rehighlighting.
 
-    def __init__(self) -> None:
+    Besides the final state and text hash of every line, the manager keeps
+    the tokens produced for the line together with the state it started in.
+    Tokenizers are pure functions of ``(text, initial state)``, so a line whose
+    text and starting state match a cached entry can reuse the cached tokens
+    and final state without being tokenized again. Each line keeps its current
+    entry plus the one it replaced, so toggling a construct that changes the
+    state of everything below it (opening and closing ``/*``) only pays for
+    tokenization once.
+
+    When given a ``pool``, the manager holds a pool reference for every state
+    id it stores (line states and cached entries), so the pool can evict
+    stacks that no line uses any more.
+
+    :attr:`cached_bytes` keeps a running estimate of the memory the cached
+    tokens take, so a caller juggling several documents can decide whose
+    cache to :meth:`drop_tokens` without walking any of them.
+    """
+
+    def __init__(self, pool: StateStackPool | None = None) -> None:
         """Initialize empty state."""
+        self._pool = pool
         self._line_states: list[int] = []
         self._line_hashes: list[int] = []
+        self._line_entries: list[_LineEntry | None] = []
+        self._line_spares: list[_LineEntry | None] = []
+        self._cached_bytes = 0
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines currently tracked."""
+        return len(self._line_states)
+
+    @property
+    def cached_bytes(self) -> int:
+        """Approximate memory held by cached tokenizations, in bytes."""
+        return self._cached_bytes
 
     def set_line_count(self, count: int) -> None:
         """Resize internal arrays, fill new entries with -1."""
         current_count = len(self._line_states)
         if count > current_count:
-            self._line_states.extend([-1] * (count - current_count))
-            self._line_hashes.extend([-1] * (count - current_count))
+            extra = count - current_count
+            self._line_states.extend([-1] * extra)
+            self._line_hashes.extend([-1] * extra)
+            self._line_entries.extend([None] * extra)
+            self._line_spares.extend([None] * extra)
         elif count < current_count:
-            self._line_states = self._line_states[:count]
-            self._line_hashes = self._line_hashes[:count]
+            self._release_lines(count, current_count)
+            del self._line_states[count:]
+            del self._line_hashes[count:]
+            del self._line_entries[count:]
+            del self._line_spares[count:]
+
+    def splice(self, index: int, delta: int) -> None:
+        """Insert (delta > 0) or remove (delta < 0) lines after ``index``.
+
+        Keeps cached entries aligned with their lines when an edit adds or
+        removes lines in the middle of the document.
+        """
+        at = max(0, index + 1)
+        if delta > 0:
+            self._line_states[at:at] = [-1] * delta
+            self._line_hashes[at:at] = [-1] * delta
+            self._line_entries[at:at] = [None] * delta
+            self._line_spares[at:at] = [None] * delta
+        elif delta < 0:
+            end = at - delta
+            self._release_lines(at, end)
+            del self._line_states[at:end]
+            del self._line_hashes[at:end]
+            del self._line_entries[at:end]
+            del self._line_spares[at:end]
 
-    def update_line(self, index: int, text: str, final_state_id: int) -> bool:
+    def update_line(
+        self,
+        index: int,
+        text: str,
+        final_state_id: int,
+        initial_state_id: int | None = None,
+        tokens: PackedTokens | None = None,
+    ) -> bool:
         """Update cache for line at index.
 
+        If ``initial_state_id`` and ``tokens`` are given, the tokenization is
+        cached so :meth:`lookup` can reuse it later.
+
         Returns True if state changed (requiring propagation to next lines).
         Returns False if state unchanged (early exit signal).
         """
@@ -32,11 +124,59 @@ class IncrementalManager:
         old_state = self._line_states[index]
         old_hash = self._line_hashes[index]
 
-        self._line_states[index] = final_state_id
+        self._set_state(index, final_state_id)
         self._line_hashes[index] = text_hash
 
+        if initial_state_id is not None and tokens is not None:
+            entry = _LineEntry(initial_state_id, text_hash, final_state_id, tokens)
+            self._hold_entry(entry)
+            current = self._line_entries[index]
+            if current is not None and (
+                current.initial_state_id != initial_state_id
+                or current.text_hash != text_hash
+            ):
+                self._drop_entry(self._line_spares[index])
+                self._line_spares[index] = current
+            else:
+                self._drop_entry(current)
+            self._line_entries[index] = entry
+
         return old_state != final_state_id or old_hash != text_hash
 
+    def lookup(
+        self, index: int, text: str, initial_state_id: int
+    ) -> tuple[PackedTokens, int] | None:
+        """Return cached ``(tokens, final_state_id)`` for a line, or None.
+
+        A hit requires both the text and the starting state to match what the
+        line was last tokenized with. On a hit the line's final state is
+        recorded as if :meth:`update_line` had been called.
+        """
+        if index < 0 or index >= len(self._line_states):
+            return None
+
+        text_hash = hash(text)
+        entry = self._line_entries[index]
+        if (
+            entry is None
+            or entry.initial_state_id != initial_state_id
+            or entry.text_hash != text_hash
+        ):
+            spare = self._line_spares[index]
+            if (
+                spare is None
+                or spare.initial_state_id != initial_state_id
+                or spare.text_hash != text_hash
+            ):
+                return None
+            self._line_spares[index] = entry
+            self._line_entries[index] = spare
+            entry = spare
+
+        self._set_state(index, entry.final_state_id)
+        self._line_hashes[index] = text_hash
+        return entry.tokens, entry.final_state_id
+
     def get_initial_state_id(self, index: int) -> int:
         """Return final state of previous line (or -1 for line 0).
 
@@ -51,12 +191,66 @@ class IncrementalManager:
     def invalidate_from(self, index: int) -> None:
         """Mark all lines from index onwards as needing re-tokenization.
 
-        Sets state IDs to -1 from index onwards.
+        Sets state IDs to -1 from index onwards and drops cached tokens.
         """
-        for i in range(index, len(self._line_states)):
+        self._release_lines(max(0, index), len(self._line_states))
+        for i in range(max(0, index), len(self._line_states)):
             self._line_states[i] = -1
+            self._line_entries[i] = None
+            self._line_spares[i] = None
+
+    def drop_tokens(self) -> None:
+        """Forget every cached tokenization but keep the line states.
+
+        Used when cached tokens can no longer be applied as they are (the
+        format table changed), while the states they led to are still valid.
+        """
+        for i in range(len(self._line_states)):
+            self._drop_entry(self._line_entries[i])
+            self._drop_entry(self._line_spares[i])
+            self._line_entries[i] = None
+            self._line_spares[i] = None
 
     def clear(self) -> None:
         """Reset all state."""
+        self._release_lines(0, len(self._line_states))
         self._line_states.clear()
         self._line_hashes.clear()
+        self._line_entries.clear()
+        self._line_spares.clear()
+        self._cached_bytes = 0
+
+    def _set_state(self, index: int, state_id: int) -> None:
+        pool = self._pool
+        if pool is not None:
+            old_state = self._line_states[index]
+            if old_state == state_id:
+                return
+            pool.acquire(state_id)
+            pool.release(old_state)
+        self._line_states[index] = state_id
+
+    def _hold_entry(self, entry: _LineEntry) -> None:
+        self._cached_bytes += _entry_bytes(entry)
+        pool = self._pool
+        if pool is not None:
+            pool.acquire(entry.initial_state_id)
+            pool.acquire(entry.final_state_id)
+
+    def _drop_entry(self, entry: _LineEntry | None) -> None:
+        if entry is None:
+            return
+        self._cached_bytes -= _entry_bytes(entry)
+        pool = self._pool
+        if pool is not None:
+            pool.release(entry.initial_state_id)
+            pool.release(entry.final_state_id)
+
+    def _release_lines(self, start: int, end: int) -> None:
+        """Release the pool references held by lines ``start``..``end - 1``."""
+        pool = self._pool
+        for i in range(start, end):
+            if pool is not None:
+                pool.release(self._line_states[i])
+            self._drop_entry(self._line_entries[i])
+            self._drop_entry(self._line_spares[i])
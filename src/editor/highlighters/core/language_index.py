@@ -0,0 +1,205 @@
+"""The one table of languages the editor knows about.
+
+LanguageDetector, the save dialog's filters, the file tree's icons and the
+HighlightRegistry all look languages up here, so a language registered
+once (for instance by a grammar file) is recognized everywhere.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Iterable, NamedTuple
+
+
+class Language(NamedTuple):
+    lang_id: str
+    # Shown in file dialog filters.
+    name: str
+    # Lowercase, with the leading dot. The first one is used when saving.
+    extensions: tuple[str, ...] = ()
+    # Whole file names, for files without a telling extension.
+    filenames: tuple[str, ...] = ()
+    # Program names that may follow ``#!`` on the first line.
+    interpreters: tuple[str, ...] = ()
+    # Sets of LanguageDetector features; the content is in this language
+    # if every feature of any one set is present.
+    signatures: tuple[tuple[str, ...], ...] = ()
+    # Icon theme name for the file tree.
+    icon: str = ""
+
+
+# Content signatures are tried in this order.
+BUILTIN_LANGUAGES = (
+    Language(
+        "python", "Python", (".py", ".pyw"),
+        filenames=("SConstruct", "SConscript"),
+        interpreters=("python", "python2", "python3"),
+        signatures=(("py_import", "py_def"), ("py_import", "py_class")),
+        icon="text-x-python",
+    ),
+    Language(
+        "cpp", "C++ Source", (".cpp", ".hpp", ".cc", ".cxx", ".hxx"),
+        signatures=(("c_include", "cpp_keyword"),),
+        icon="text-x-c++src",
+    ),
+    Language(
+        "c", "C Source", (".c", ".h"),
+        signatures=(("c_include",),),
+        icon="text-x-csrc",
+    ),
+    Language(
+        "java", "Java", (".java",),
+        signatures=(("java_decl",), ("java_package",)),
+        icon="text-x-java",
+    ),
+    Language(
+        "html", "HTML", (".html", ".htm", ".xml"),
+        signatures=(("html_doctype",), ("html_tag",)),
+        icon="text-html",
+    ),
+    Language(
+        "json", "JSON", (".json",),
+        signatures=(("json_open", "json_key"),),
+        icon="application-json",
+    ),
+    Language(
+        "markdown", "Markdown", (".md", ".markdown"),
+        signatures=(("md_heading",), ("md_bullet", "md_link")),
+        icon="text-markdown",
+    ),
+    Language(
+        "javascript", "JavaScript", (".js", ".jsx"),
+        interpreters=("node", "nodejs"),
+        icon="application-javascript",
+    ),
+    Language("plain", "Text", (".txt",), icon="text-plain"),
+)
+
+
+class LanguageIndex:
+    """Languages by id, extension, file name and interpreter.
+
+    Every lookup is a dict hit: a path's extensions are tried from the
+    longest (``.tar.gz``) to the shortest (``.gz``), one lookup each.
+    """
+
+    _instance: LanguageIndex | None = None
+
+    def __init__(self, languages=BUILTIN_LANGUAGES) -> None:
+        self._languages: dict[str, Language] = {}
+        self._extensions: dict[str, str] = {}
+        self._filenames: dict[str, str] = {}
+        self._interpreters: dict[str, str] = {}
+        self._signatures: list[tuple[frozenset[str], str]] = []
+        for language in languages:
+            self.add(language)
+
+    @classmethod
+    def instance(cls) -> LanguageIndex:
+        if cls._instance is None:
+            cls._instance = LanguageIndex()
+        return cls._instance
+
+    def add(self, language: Language) -> None:
+        """Add ``language``, or merge it into the language with its id."""
+        old = self._languages.get(language.lang_id)
+        if old is not None:
+            language = Language(
+                language.lang_id,
+                old.name,
+                old.extensions + tuple(e for e in language.extensions if e not in old.extensions),
+                old.filenames + language.filenames,
+                old.interpreters + language.interpreters,
+                old.signatures + language.signatures,
+                old.icon or language.icon,
+            )
+        self._languages[language.lang_id] = language
+        for ext in language.extensions:
+            self._extensions[ext.lower()] = language.lang_id
+        for name in language.filenames:
+            self._filenames[name.lower()] = language.lang_id
+        for name in language.interpreters:
+            self._interpreters[name] = language.lang_id
+        self._signatures = [
+            (frozenset(signature), lang.lang_id)
+            for lang in self._languages.values()
+            for signature in lang.signatures
+        ]
+
+    def register(self, lang_id: str, extensions: Iterable[str] = ()) -> None:
+        """Map ``extensions`` to ``lang_id``, adding the language if it is new."""
+        self.add(Language(lang_id, lang_id.upper(), tuple(extensions)))
+
+    def get(self, lang_id: str) -> Language | None:
+        return self._languages.get(lang_id)
+
+    def languages(self) -> list[Language]:
+        return list(self._languages.values())
+
+    def for_extension(self, ext: str) -> str | None:
+        return self._extensions.get(ext.lower())
+
+    def for_path(self, file_path: str) -> str | None:
+        """The language of ``file_path`` by its name alone."""
+        name = os.path.basename(file_path).lower()
+        lang = self._filenames.get(name)
+        if lang is not None:
+            return lang
+        dot = name.find(".")
+        while dot >= 0:
+            lang = self._extensions.get(name[dot:])
+            if lang is not None:
+                return lang
+            dot = name.find(".", dot + 1)
+        return None
+
+    def for_shebang(self, line: str) -> str | None:
+        """The language of a script whose first line is ``line``."""
+        if not line.startswith("#!"):
+            return None
+        words = line[2:].split()
+        if words and os.path.basename(words[0]) == "env":
+            words = [word for word in words[1:] if "=" not in word and not word.startswith("-")]
+        if not words:
+            return None
+        program = os.path.basename(words[0])
+        lang = self._interpreters.get(program)
+        if lang is None:
+            lang = self._interpreters.get(program.rstrip("0123456789."))
+        return lang
+
+    def for_features(self, features) -> str | None:
+        """The first language with a signature contained in ``features``."""
+        for signature, lang in self._signatures:
+            if signature <= features:
+                return lang
+        return None
+
+    def save_extension(self, lang_id: str) -> str:
+        language = self._languages.get(lang_id)
+        if language is None or not language.extensions:
+            return ".txt"
+        return language.extensions[0]
+
+    def save_filter(self, lang_id: str) -> str:
+        language = self._languages.get(lang_id)
+        if language is None or not language.extensions:
+            return "All Files (*)"
+        return f"{language.name} (*{language.extensions[0]})"
+
+    def open_filters(self) -> str:
+        """File dialog filters: all files, then each language's extensions."""
+        filters = ["All Files (*)"]
+        for language in self._languages.values():
+            if language.extensions:
+                patterns = " ".join(f"*{ext}" for ext in language.extensions)
+                filters.append(f"{language.name} ({patterns})")
+        return ";;".join(filters)
+
+    def save_filters(self) -> str:
+        """File dialog filters: all files, then each ``save_filter``."""
+        filters = ["All Files (*)"]
+        for language in self._languages.values():
+            if language.extensions:
+                filters.append(self.save_filter(language.lang_id))
+        return ";;".join(filters)
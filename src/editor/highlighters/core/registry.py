@@ -1,63 +1,92 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import threading
+from typing import TYPE_CHECKING, Callable, Iterable
+
+from .language_index import LanguageIndex
 
 if TYPE_CHECKING:
     from ..tokenizers.base_tokenizer import BaseTokenizer
 
+TokenizerFactory = Callable[[], "BaseTokenizer"]
+
 
 class HighlightRegistry:
+    """Tokenizers by language id.
+
+    Which files a language applies to is kept in a LanguageIndex; the
+    extensions given when registering a tokenizer are added to it.
+
+    Lookups are thread-safe: pre-tokenization looks up embedded languages
+    off the GUI thread, and a lazy tokenizer is only ever built once.
+    """
+
     _instance: HighlightRegistry | None = None
 
-    def __init__(self) -> None:
+    def __init__(self, index: LanguageIndex | None = None) -> None:
         self._tokenizers: dict[str, BaseTokenizer] = {}
-        self._extension_map: dict[str, str] = {}
+        self._factories: dict[str, TokenizerFactory] = {}
+        self._index = index if index is not None else LanguageIndex()
         self._default_tokenizer: BaseTokenizer | None = None
-        self._init_extension_map()
-
-    def _init_extension_map(self) -> None:
-        extensions = {
-            ".py": "python",
-            ".pyw": "python",
-            ".c": "c",
-            ".h": "c",
-            ".cpp": "cpp",
-            ".hpp": "cpp",
-            ".cc": "cpp",
-            ".cxx": "cpp",
-            ".hxx": "cpp",
-            ".java": "java",
-            ".html": "html",
-            ".htm": "html",
-            ".xml": "html",
-            ".json": "json",
-            ".md": "markdown",
-            ".markdown": "markdown",
-            ".js": "javascript",
-        }
-        self._extension_map.update(extensions)
+        # Reentrant: a factory may look up the languages it embeds.
+        self._lock = threading.RLock()
 
     @classmethod
     def instance(cls) -> HighlightRegistry:
         if cls._instance is None:
-            cls._instance = HighlightRegistry()
+            cls._instance = HighlightRegistry(LanguageIndex.instance())
         return cls._instance
 
+    @property
+    def index(self) -> LanguageIndex:
+        return self._index
+
     def register(
         self,
         lang_id: str,
         tokenizer: BaseTokenizer,
-        extensions: list[str],
+        extensions: Iterable[str] = (),
     ) -> None:
-        self._tokenizers[lang_id] = tokenizer
-        for ext in extensions:
-            self._extension_map[ext] = lang_id
+        with self._lock:
+            self._factories.pop(lang_id, None)
+            self._tokenizers[lang_id] = tokenizer
+        self._index.register(lang_id, extensions)
+
+    def register_lazy(
+        self,
+        lang_id: str,
+        factory: TokenizerFactory,
+        extensions: Iterable[str] = (),
+    ) -> None:
+        """Register a tokenizer that ``factory`` creates on first lookup.
+
+        Extensions map to ``lang_id`` right away, so detection works without
+        importing the tokenizer's module.
+        """
+        with self._lock:
+            self._tokenizers.pop(lang_id, None)
+            self._factories[lang_id] = factory
+        self._index.register(lang_id, extensions)
 
     def get_tokenizer(self, lang_id: str) -> BaseTokenizer | None:
-        return self._tokenizers.get(lang_id)
+        tokenizer = self._tokenizers.get(lang_id)
+        if tokenizer is None:
+            with self._lock:
+                tokenizer = self._tokenizers.get(lang_id)
+                factory = self._factories.get(lang_id)
+                if tokenizer is None and factory is not None:
+                    # Stored before the factory goes, so a lookup always
+                    # finds one or the other.
+                    tokenizer = self._tokenizers[lang_id] = factory()
+                    del self._factories[lang_id]
+        return tokenizer
+
+    def is_loaded(self, lang_id: str) -> bool:
+        """Return True if the tokenizer for ``lang_id`` has been created."""
+        return lang_id in self._tokenizers
 
     def get_lang_for_extension(self, ext: str) -> str | None:
-        return self._extension_map.get(ext)
+        return self._index.for_extension(ext)
 
     def get_default_tokenizer(self) -> BaseTokenizer:
         if self._default_tokenizer is None:
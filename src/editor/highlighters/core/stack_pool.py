@@ -1,25 +1,92 @@
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import NamedTuple
+
 from .types import StateStack
 
 
+class PoolStats(NamedTuple):
+    size: int
+    referenced: int
+    unused: int
+    hits: int
+    misses: int
+    evictions: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
 class StateStackPool:
+    """Interns state stacks so blocks can store them as integer ids.
+
+    ``StateStackPool()`` is the process-wide pool and never evicts.
+    ``StateStackPool(scope)`` returns a pool shared by everyone using the same
+    scope key (a language id, for example), and :meth:`private` returns one
+    that nobody else sees, for a single document. Scoped and private pools
+    are bounded: owners :meth:`acquire` and :meth:`release` the ids they
+    hold, and once more than ``max_unused`` stacks are no longer referenced
+    the oldest of them are evicted. Ids are never reused, so a stale id can
+    only miss, never resolve to the wrong stack.
+    """
+
     _instance: "StateStackPool | None" = None
+    _scoped: dict[Hashable, "StateStackPool"] = {}
+
+    MAX_UNUSED = 256
 
-    def __new__(cls) -> "StateStackPool":
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._stack_to_id: dict[StateStack, int] = {}
-            cls._instance._id_to_stack: dict[int, StateStack] = {}
-            cls._instance._next_id: int = 0
-        return cls._instance
+    def __new__(cls, scope: Hashable | None = None) -> "StateStackPool":
+        if scope is None:
+            if cls._instance is None:
+                cls._instance = cls._create(max_unused=None)
+            return cls._instance
+        pool = cls._scoped.get(scope)
+        if pool is None:
+            pool = cls._scoped[scope] = cls._create(cls.MAX_UNUSED)
+        return pool
+
+    @classmethod
+    def _create(cls, max_unused: int | None) -> "StateStackPool":
+        pool = super().__new__(cls)
+        pool._stack_to_id: dict[StateStack, int] = {}
+        pool._id_to_stack: dict[int, StateStack] = {}
+        pool._next_id: int = 0
+        pool._refcounts: dict[int, int] = {}
+        pool._unused: OrderedDict[int, None] = OrderedDict()
+        pool._max_unused = max_unused
+        pool._hits = 0
+        pool._misses = 0
+        pool._evictions = 0
+        return pool
+
+    @classmethod
+    def private(cls, max_unused: int | None = None) -> "StateStackPool":
+        """Return a new bounded pool that is not shared with anyone."""
+        return cls._create(cls.MAX_UNUSED if max_unused is None else max_unused)
+
+    @classmethod
+    def release_scope(cls, scope: Hashable) -> None:
+        """Forget the pool registered for ``scope``."""
+        cls._scoped.pop(scope, None)
 
     def intern(self, stack: StateStack) -> int:
-        if stack in self._stack_to_id:
-            return self._stack_to_id[stack]
+        state_id = self._stack_to_id.get(stack)
+        if state_id is not None:
+            self._hits += 1
+            if state_id in self._unused:
+                self._unused.move_to_end(state_id)
+            return state_id
 
+        self._misses += 1
         state_id = self._next_id
         self._next_id += 1
         self._stack_to_id[stack] = state_id
         self._id_to_stack[state_id] = stack
+        if self._max_unused is not None:
+            self._unused[state_id] = None
+            self._trim()
         return state_id
 
     def get(self, state_id: int) -> StateStack:
@@ -27,6 +94,49 @@ class StateStackPool:
             return ()
         return self._id_to_stack.get(state_id, ())
 
+    def acquire(self, state_id: int) -> None:
+        """Record one more live reference to ``state_id``."""
+        if state_id < 0:
+            return
+        count = self._refcounts.get(state_id, 0)
+        if count == 0:
+            self._unused.pop(state_id, None)
+        self._refcounts[state_id] = count + 1
+
+    def release(self, state_id: int) -> None:
+        """Drop a reference taken with :meth:`acquire`."""
+        if state_id < 0:
+            return
+        count = self._refcounts.get(state_id, 0) - 1
+        if count > 0:
+            self._refcounts[state_id] = count
+            return
+        self._refcounts.pop(state_id, None)
+        if self._max_unused is not None and state_id in self._id_to_stack:
+            self._unused[state_id] = None
+            self._trim()
+
+    def stats(self) -> PoolStats:
+        """Return the pool's size, reference and hit-rate counters."""
+        return PoolStats(
+            size=len(self._id_to_stack),
+            referenced=len(self._refcounts),
+            unused=len(self._unused),
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+        )
+
+    def _trim(self) -> None:
+        # Always keep the newest unused stack: one that was just interned
+        # must survive until its caller acquires it.
+        while len(self._unused) > max(self._max_unused, 1):
+            state_id, _ = self._unused.popitem(last=False)
+            stack = self._id_to_stack.pop(state_id)
+            del self._stack_to_id[stack]
+            self._evictions += 1
+
     @classmethod
     def reset(cls) -> None:
         cls._instance = None
+        cls._scoped = {}
@@ -1,40 +1,76 @@
 """Style registry for managing QTextCharFormat objects."""
 
-from enum import IntEnum
-from typing import Dict
+from typing import NamedTuple
 
+from PyQt6.QtCore import QObject, pyqtSignal
 from PyQt6.QtGui import QColor, QFont, QTextCharFormat
 
-
-class StyleId(IntEnum):
-    """Enumeration of syntax highlighting styles."""
-
-    KEYWORD = 0
-    STRING = 1
-    COMMENT = 2
-    NUMBER = 3
-    OPERATOR = 4
-    TAG = 5
-    ATTR_NAME = 6
-    ATTR_VALUE = 7
-    PUNCTUATION = 8
-    IDENTIFIER = 9
-    EMBEDDED = 10
-    PLAIN = 11
-
-
-class StyleRegistry:
+from .types import StyleId
+
+
+class StyleSpec(NamedTuple):
+    """How one style is drawn in a theme."""
+
+    color: str
+    bold: bool = False
+    italic: bool = False
+
+
+DARK_THEME: dict[StyleId, StyleSpec] = {
+    StyleId.PLAIN: StyleSpec("#D4D4D4"),
+    StyleId.KEYWORD: StyleSpec("#569CD6", bold=True),
+    StyleId.STRING: StyleSpec("#CE9178"),
+    StyleId.COMMENT: StyleSpec("#6A9955", italic=True),
+    StyleId.NUMBER: StyleSpec("#B5CEA8"),
+    StyleId.OPERATOR: StyleSpec("#D4D4D4"),
+    StyleId.TAG: StyleSpec("#569CD6", bold=True),
+    StyleId.ATTR_NAME: StyleSpec("#9CDCFE"),
+    StyleId.ATTR_VALUE: StyleSpec("#CE9178"),
+    StyleId.PUNCTUATION: StyleSpec("#D4D4D4"),
+    StyleId.IDENTIFIER: StyleSpec("#DCDCAA"),
+    StyleId.EMBEDDED: StyleSpec("#C586C0"),
+}
+
+LIGHT_THEME: dict[StyleId, StyleSpec] = {
+    StyleId.PLAIN: StyleSpec("#000000"),
+    StyleId.KEYWORD: StyleSpec("#0000FF", bold=True),
+    StyleId.STRING: StyleSpec("#A31515"),
+    StyleId.COMMENT: StyleSpec("#008000", italic=True),
+    StyleId.NUMBER: StyleSpec("#098658"),
+    StyleId.OPERATOR: StyleSpec("#000000"),
+    StyleId.TAG: StyleSpec("#800000", bold=True),
+    StyleId.ATTR_NAME: StyleSpec("#E50000"),
+    StyleId.ATTR_VALUE: StyleSpec("#0451A5"),
+    StyleId.PUNCTUATION: StyleSpec("#000000"),
+    StyleId.IDENTIFIER: StyleSpec("#795E26"),
+    StyleId.EMBEDDED: StyleSpec("#AF00DB"),
+}
+
+THEMES: dict[str, dict[StyleId, StyleSpec]] = {
+    "dark": DARK_THEME,
+    "light": LIGHT_THEME,
+}
+
+
+class StyleRegistry(QObject):
     """Singleton registry for syntax highlighting formats.
 
-    Maps StyleId to QTextCharFormat with sensible dark-theme colors.
+    Formats live in a tuple indexed directly by the integer ``StyleId`` the
+    tokenizers emit, so highlighters never construct enums per token.
+    Switching themes rebuilds the table once and emits ``theme_changed``.
     """
 
+    # Emitted after set_theme() has rebuilt the format table.
+    theme_changed = pyqtSignal()
+
     _instance: "StyleRegistry | None" = None
 
     def __init__(self) -> None:
-        """Initialize the registry with pre-created formats."""
-        self._formats: Dict[StyleId, QTextCharFormat] = {}
-        self._create_formats()
+        """Initialize the registry with the dark theme."""
+        super().__init__()
+        self._theme_name = "dark"
+        self._table: tuple[QTextCharFormat, ...] = ()
+        self._create_formats(DARK_THEME)
 
     @classmethod
     def instance(cls) -> "StyleRegistry":
@@ -43,70 +79,42 @@ class StyleRegistry:
             cls._instance = cls()
         return cls._instance
 
-    def _create_formats(self) -> None:
-        """Create all QTextCharFormat objects with dark theme colors."""
-        # KEYWORD: #569CD6 (blue), bold
-        keyword_fmt = QTextCharFormat()
-        keyword_fmt.setForeground(QColor("#569CD6"))
-        keyword_fmt.setFontWeight(QFont.Weight.Bold)
-        self._formats[StyleId.KEYWORD] = keyword_fmt
-
-        # STRING: #CE9178 (orange)
-        string_fmt = QTextCharFormat()
-        string_fmt.setForeground(QColor("#CE9178"))
-        self._formats[StyleId.STRING] = string_fmt
-
-        # COMMENT: #6A9955 (green), italic
-        comment_fmt = QTextCharFormat()
-        comment_fmt.setForeground(QColor("#6A9955"))
-        comment_fmt.setFontItalic(True)
-        self._formats[StyleId.COMMENT] = comment_fmt
-
-        # NUMBER: #B5CEA8 (light green)
-        number_fmt = QTextCharFormat()
-        number_fmt.setForeground(QColor("#B5CEA8"))
-        self._formats[StyleId.NUMBER] = number_fmt
-
-        # OPERATOR: #D4D4D4 (white)
-        operator_fmt = QTextCharFormat()
-        operator_fmt.setForeground(QColor("#D4D4D4"))
-        self._formats[StyleId.OPERATOR] = operator_fmt
-
-        # TAG: #569CD6 (blue), bold
-        tag_fmt = QTextCharFormat()
-        tag_fmt.setForeground(QColor("#569CD6"))
-        tag_fmt.setFontWeight(QFont.Weight.Bold)
-        self._formats[StyleId.TAG] = tag_fmt
-
-        # ATTR_NAME: #9CDCFE (light blue)
-        attr_name_fmt = QTextCharFormat()
-        attr_name_fmt.setForeground(QColor("#9CDCFE"))
-        self._formats[StyleId.ATTR_NAME] = attr_name_fmt
-
-        # ATTR_VALUE: #CE9178 (orange)
-        attr_value_fmt = QTextCharFormat()
-        attr_value_fmt.setForeground(QColor("#CE9178"))
-        self._formats[StyleId.ATTR_VALUE] = attr_value_fmt
-
-        # PUNCTUATION: #D4D4D4 (white)
-        punctuation_fmt = QTextCharFormat()
-        punctuation_fmt.setForeground(QColor("#D4D4D4"))
-        self._formats[StyleId.PUNCTUATION] = punctuation_fmt
-
-        # IDENTIFIER: #DCDCAA (yellow)
-        identifier_fmt = QTextCharFormat()
-        identifier_fmt.setForeground(QColor("#DCDCAA"))
-        self._formats[StyleId.IDENTIFIER] = identifier_fmt
-
-        # EMBEDDED: #C586C0 (purple)
-        embedded_fmt = QTextCharFormat()
-        embedded_fmt.setForeground(QColor("#C586C0"))
-        self._formats[StyleId.EMBEDDED] = embedded_fmt
-
-        # PLAIN: #D4D4D4 (white)
-        plain_fmt = QTextCharFormat()
-        plain_fmt.setForeground(QColor("#D4D4D4"))
-        self._formats[StyleId.PLAIN] = plain_fmt
+    @property
+    def theme_name(self) -> str:
+        """Name of the active theme."""
+        return self._theme_name
+
+    @property
+    def format_table(self) -> tuple[QTextCharFormat, ...]:
+        """Formats indexed by integer style id."""
+        return self._table
+
+    def set_theme(self, name: str) -> None:
+        """Switch to one of the themes in ``THEMES``.
+
+        Raises:
+            KeyError: If no theme with that name exists.
+        """
+        theme = THEMES[name]
+        if name == self._theme_name:
+            return
+        self._theme_name = name
+        self._create_formats(theme)
+        self.theme_changed.emit()
+
+    def _create_formats(self, theme: dict[StyleId, StyleSpec]) -> None:
+        """Build the format table for ``theme``."""
+        table = []
+        for style_id in StyleId:
+            spec = theme[style_id]
+            fmt = QTextCharFormat()
+            fmt.setForeground(QColor(spec.color))
+            if spec.bold:
+                fmt.setFontWeight(QFont.Weight.Bold)
+            if spec.italic:
+                fmt.setFontItalic(True)
+            table.append(fmt)
+        self._table = tuple(table)
 
     def get_format(self, style_id: StyleId) -> QTextCharFormat:
         """Get the QTextCharFormat for a given style.
@@ -117,4 +125,4 @@ class StyleRegistry:
         Returns:
             The corresponding QTextCharFormat.
         """
-        return self._formats[style_id]
+        return self._table[style_id]
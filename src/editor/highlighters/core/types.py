@@ -1,5 +1,6 @@
+from array import array
 from enum import IntEnum
-from typing import NamedTuple
+from typing import Iterable, NamedTuple
 
 
 class Token(NamedTuple):
@@ -35,3 +36,26 @@ StateStack = tuple[StackFrame, ...]
 class TokenizeResult(NamedTuple):
     tokens: list[Token]
     final_stack: StateStack
+
+
+# Tokens packed as consecutive ``start, length, style_id`` triples in an
+# ``array("I")``: one object per line instead of one per token.
+PackedTokens = array
+
+
+def pack_tokens(tokens: Iterable[Token]) -> PackedTokens:
+    """Pack a token list into an ``array("I")`` of triples."""
+    return array("I", [value for token in tokens for value in token])
+
+
+def unpack_tokens(packed: PackedTokens) -> list[Token]:
+    """Expand packed triples back into Token objects."""
+    return [
+        Token(packed[i], packed[i + 1], packed[i + 2])
+        for i in range(0, len(packed), 3)
+    ]
+
+
+class PackedResult(NamedTuple):
+    tokens: PackedTokens
+    final_stack: StateStack
@@ -1,23 +1,87 @@
+import codecs
+import importlib
 import re
 import warnings
 
-from editor.highlighters.python_hl import PythonHighlighter
-from editor.highlighters.c_hl import CHighlighter
-from editor.highlighters.cpp_hl import CppHighlighter
-from editor.highlighters.java_hl import JavaHighlighter
-from editor.highlighters.html_hl import HtmlHighlighter
-from editor.highlighters.json_hl import JsonHighlighter
-from editor.highlighters.markdown_hl import MarkdownHighlighter
-from editor.highlighters.plain_hl import PlainTextHighlighter
+from editor.file_format import BinaryFileError, sniff
+from editor.highlighters.core.language_index import LanguageIndex
+
+# detect_from_content looks at no more than this many lines...
+MAX_LINES = 50
+# ...and no more than this many characters (bytes, for detect_from_file).
+PREFIX_SIZE = 8 * 1024
+
+# What detect_from_content looks for, scanned for in a single pass:
+# features that start a line...
+_LINE_FEATURES = (
+    ("py_import", r"\s*(?:import|from)\s+\w+"),
+    ("py_def", r"\s*def\s+\w+\s*\("),
+    ("py_class", r"\s*class\s+\w+.*:"),
+    ("c_include", r'\s*#include\s*[<"]'),
+    ("java_decl", r"\s*(?:public|private|protected)\s+(?:class|interface)\s+\w+"),
+    ("java_package", r"\s*package\s+[\w.]+;"),
+    ("html_doctype", r"(?i:\s*<!DOCTYPE\s+html)"),
+    ("md_heading", r"#{1,6}\s"),
+    ("md_bullet", r"\s*[-*]\s"),
+)
+# ...and features anywhere, each starting with one of these characters.
+_INLINE_START = "cnt<\"["
+_INLINE_FEATURES = (
+    ("cpp_keyword", r"\b(?:class|namespace|template)\b"),
+    ("html_tag", r"(?i:<html[\s>])"),
+    ("json_key", r'"\w+"\s*:'),
+    ("md_link", r"\[.+\]\(.+\)"),
+)
+
+
+def _lookaheads(features) -> str:
+    return "|".join(f"(?=(?P<{name}>{pattern}))" for name, pattern in features)
+
+
+# Every feature is a lookahead and a match consumes one character, so
+# overlapping features are all seen, but only the first feature listed is
+# reported for a position. That can only hide cpp_keyword behind
+# py_class, which implies it.
+_FEATURE_RE = re.compile(
+    f"(?:^(?:{_lookaheads(_LINE_FEATURES)})"
+    f"|(?=[{re.escape(_INLINE_START)}])(?:{_lookaheads(_INLINE_FEATURES)}))(?s:.)",
+    re.MULTILINE,
+)
+
+
+_index: LanguageIndex | None = None
+
+
+def _languages() -> LanguageIndex:
+    global _index
+    if _index is None:
+        # Registering the tokenizers adds the languages of the grammar files.
+        import editor.highlighters.register_tokenizers  # noqa: F401
+
+        _index = LanguageIndex.instance()
+    return _index
 
 
 class _DeprecatedHighlighterMap(dict):
-    """Wrapper that emits deprecation warning when HIGHLIGHTER_MAP is accessed."""
+    """Wrapper that emits deprecation warning when HIGHLIGHTER_MAP is accessed.
+
+    Values start out as ``(module, class name)`` pairs and are imported the
+    first time they are looked up, so the legacy highlighters cost nothing
+    unless something still uses them.
+    """
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._warned = False
 
+    def _load(self, key):
+        value = super().__getitem__(key)
+        if isinstance(value, tuple):
+            module, name = value
+            value = getattr(importlib.import_module(f"editor.highlighters.{module}"), name)
+            super().__setitem__(key, value)
+        return value
+
     def _warn(self):
         if not self._warned:
             warnings.warn(
@@ -30,114 +94,96 @@ class _DeprecatedHighlighterMap(dict):
 
     def __getitem__(self, key):
         self._warn()
-        return super().__getitem__(key)
+        return self._load(key)
 
     def get(self, key, default=None):
         self._warn()
-        return super().get(key, default)
+        if key not in self:
+            return default
+        return self._load(key)
 
+    def values(self):
+        self._warn()
+        return [self._load(key) for key in self]
+
+    def items(self):
+        self._warn()
+        return [(key, self._load(key)) for key in self]
 
-class LanguageDetector:
-    EXTENSION_MAP = {
-        ".py": "python",
-        ".pyw": "python",
-        ".c": "c",
-        ".h": "c",
-        ".cpp": "cpp",
-        ".hpp": "cpp",
-        ".cc": "cpp",
-        ".cxx": "cpp",
-        ".hxx": "cpp",
-        ".java": "java",
-        ".html": "html",
-        ".htm": "html",
-        ".xml": "html",
-        ".json": "json",
-        ".md": "markdown",
-        ".markdown": "markdown",
-        ".txt": "plain",
-    }
-
-    LANGUAGE_TO_EXTENSION = {
-        "python": ".py",
-        "c": ".c",
-        "cpp": ".cpp",
-        "java": ".java",
-        "html": ".html",
-        "json": ".json",
-        "markdown": ".md",
-        "plain": ".txt",
-    }
-
-    LANGUAGE_TO_FILTER = {
-        "python": "Python (*.py)",
-        "c": "C Source (*.c)",
-        "cpp": "C++ Source (*.cpp)",
-        "java": "Java (*.java)",
-        "html": "HTML (*.html)",
-        "json": "JSON (*.json)",
-        "markdown": "Markdown (*.md)",
-        "plain": "Text (*.txt)",
-    }
 
+class LanguageDetector:
     HIGHLIGHTER_MAP = _DeprecatedHighlighterMap({
-        "python": PythonHighlighter,
-        "c": CHighlighter,
-        "cpp": CppHighlighter,
-        "java": JavaHighlighter,
-        "html": HtmlHighlighter,
-        "json": JsonHighlighter,
-        "markdown": MarkdownHighlighter,
-        "plain": PlainTextHighlighter,
+        "python": ("python_hl", "PythonHighlighter"),
+        "c": ("c_hl", "CHighlighter"),
+        "cpp": ("cpp_hl", "CppHighlighter"),
+        "java": ("java_hl", "JavaHighlighter"),
+        "html": ("html_hl", "HtmlHighlighter"),
+        "json": ("json_hl", "JsonHighlighter"),
+        "markdown": ("markdown_hl", "MarkdownHighlighter"),
+        "plain": ("plain_hl", "PlainTextHighlighter"),
     })
 
     @classmethod
     def detect_from_extension(cls, file_path: str) -> str:
         if not file_path:
             return ""
-        file_path = file_path.lower()
-        for ext, lang in cls.EXTENSION_MAP.items():
-            if file_path.endswith(ext):
-                return lang
-        return ""
+        return _languages().for_path(file_path) or ""
 
     @classmethod
     def detect_from_content(cls, content: str) -> str:
-        lines = content.split("\n")[:50]
-        text = "\n".join(lines)
-
-        if re.search(r"^\s*(import|from)\s+\w+", text, re.MULTILINE):
-            if re.search(r"^\s*def\s+\w+\s*\(", text, re.MULTILINE):
-                return "python"
-            if re.search(r"^\s*class\s+\w+.*:", text, re.MULTILINE):
-                return "python"
-
-        if re.search(r"^\s*#include\s*[<\"]", text, re.MULTILINE):
-            if re.search(r"\b(class|namespace|template)\b", text):
-                return "cpp"
-            return "c"
-
-        if re.search(r"^\s*(public|private|protected)\s+(class|interface)\s+\w+", text, re.MULTILINE):
-            return "java"
-        if re.search(r"^\s*package\s+[\w.]+;", text, re.MULTILINE):
-            return "java"
-
-        if re.search(r"^\s*<!DOCTYPE\s+html", text, re.MULTILINE | re.IGNORECASE):
-            return "html"
-        if re.search(r"<html[\s>]", text, re.IGNORECASE):
-            return "html"
-
-        text_stripped = text.strip()
-        if text_stripped.startswith("{") or text_stripped.startswith("["):
-            if re.search(r'"\w+"\s*:', text):
-                return "json"
-
-        if re.search(r"^#{1,6}\s", text, re.MULTILINE):
-            return "markdown"
-        if re.search(r"^\s*[-*]\s", text, re.MULTILINE) and re.search(r"\[.+\]\(.+\)", text):
-            return "markdown"
-
-        return "plain"
+        """Guess the language of ``content`` from its first lines.
+
+        Only the first MAX_LINES lines, and at most PREFIX_SIZE characters
+        of them, are looked at, so the cost does not grow with the document.
+        """
+        return cls._classify(cls._prefix(content))
+
+    @classmethod
+    def detect_from_file(cls, file_path: str) -> str:
+        """Guess the language of the file at ``file_path``.
+
+        The extension decides if it is known; otherwise only the first
+        PREFIX_SIZE bytes of the file are read and classified.
+        """
+        lang = cls.detect_from_extension(file_path)
+        if lang:
+            return lang
+        try:
+            with open(file_path, "rb") as f:
+                data = f.read(PREFIX_SIZE)
+            file_format = sniff(data)
+        except (OSError, BinaryFileError):
+            return "plain"
+        text = codecs.getincrementaldecoder(file_format.encoding)("replace").decode(data)
+        if file_format.bom:
+            text = text[1:]
+        return cls.detect_from_content(text.replace("\r\n", "\n"))
+
+    @staticmethod
+    def _prefix(content: str) -> str:
+        end = -1
+        for _ in range(MAX_LINES):
+            end = content.find("\n", end + 1, PREFIX_SIZE)
+            if end < 0:
+                return content[:PREFIX_SIZE]
+        return content[:end]
+
+    @staticmethod
+    def _classify(text: str) -> str:
+        languages = _languages()
+        if text.startswith("#!"):
+            lang = languages.for_shebang(text.partition("\n")[0])
+            if lang is not None:
+                return lang
+
+        found = set()
+        for match in _FEATURE_RE.finditer(text):
+            found.add(match.lastgroup)
+        if "py_class" in found:
+            found.add("cpp_keyword")
+        if text.lstrip()[:1] in ("{", "["):
+            found.add("json_open")
+        return languages.for_features(found) or "plain"
 
     @classmethod
     def detect(cls, file_path: str = "", content: str = "") -> str:
@@ -147,7 +193,7 @@ class LanguageDetector:
         return cls.detect_from_content(content)
 
     @classmethod
-    def get_highlighter(cls, document, file_path: str = "", content: str = ""):
+    def get_highlighter(cls, document, file_path: str = "", content: str = "", lang: str = ""):
         """Get a highlighter for the given document.
 
         Uses the new DocumentHighlighter with tokenizer architecture.
@@ -156,6 +202,7 @@ class LanguageDetector:
             document: The QTextDocument to highlight.
             file_path: Optional file path for language detection.
             content: Optional content for language detection.
+            lang: The language, if already known; skips detection.
 
         Returns:
             A DocumentHighlighter instance configured for the detected language.
@@ -163,18 +210,15 @@ class LanguageDetector:
         from editor.highlighters.document_highlighter import DocumentHighlighter
         import editor.highlighters.register_tokenizers  # noqa: F401
 
-        lang = cls.detect(file_path, content)
+        lang = lang or cls.detect(file_path, content)
         return DocumentHighlighter(document, lang)
 
     @classmethod
     def suggest_extension(cls, file_path: str, content: str) -> str:
         if cls.detect_from_extension(file_path):
             return file_path
-        lang = cls.detect_from_content(content)
-        ext = cls.LANGUAGE_TO_EXTENSION.get(lang, ".txt")
-        return file_path + ext
+        return file_path + _languages().save_extension(cls.detect_from_content(content))
 
     @classmethod
     def get_save_filter(cls, file_path: str = "", content: str = "") -> str:
-        lang = cls.detect(file_path, content)
-        return cls.LANGUAGE_TO_FILTER.get(lang, "All Files (*)")
+        return _languages().save_filter(cls.detect(file_path, content))
@@ -1,17 +1,36 @@
 """Document highlighter that integrates tokenizers with PyQt6's QSyntaxHighlighter."""
 
+from array import array
+
+from PyQt6.QtCore import QTimer, pyqtSignal
 from PyQt6.QtGui import QSyntaxHighlighter, QTextDocument
 
 from editor.highlighters.core.incremental_manager import IncrementalManager
 from editor.highlighters.core.registry import HighlightRegistry
 from editor.highlighters.core.stack_pool import StateStackPool
-from editor.highlighters.core.style_registry import StyleId, StyleRegistry
-from editor.highlighters.core.types import StackFrame, StateStack
+from editor.highlighters.core.style_registry import StyleRegistry
+from editor.highlighters.core.types import (
+    PackedResult,
+    PackedTokens,
+    StackFrame,
+    StateStack,
+    StyleId,
+)
 from editor.highlighters.tokenizers.base_tokenizer import BaseTokenizer
 
 
 class DocumentHighlighter(QSyntaxHighlighter):
-    """Bridge between the tokenizer architecture and PyQt6."""
+    """Bridge between the tokenizer architecture and PyQt6.
+
+    By default every block Qt asks for is highlighted. Once a window is set
+    with :meth:`set_window` (see ``HighlightScheduler``), blocks outside it
+    are deferred: they keep their previous state so Qt's rehighlight loop
+    stops there, and the first deferred block is remembered so the rest can
+    be highlighted later in small slices.
+    """
+
+    # Emitted when the whole document needs highlighting again.
+    invalidated = pyqtSignal()
 
     def __init__(self, document: QTextDocument, lang_id: str = "plain") -> None:
         """Initialize the document highlighter.
@@ -23,10 +42,94 @@ class DocumentHighlighter(QSyntaxHighlighter):
         super().__init__(document)
         self._registry = HighlightRegistry.instance()
         self._style_registry = StyleRegistry.instance()
-        self._stack_pool = StateStackPool()
-        self._incremental_manager = IncrementalManager()
+        self._build_format_table()
+        self._style_registry.theme_changed.connect(self._on_theme_changed)
+        self._theme_timer = QTimer(self)
+        self._theme_timer.setSingleShot(True)
+        self._theme_timer.setInterval(0)
+        self._theme_timer.timeout.connect(self._rehighlight_for_theme)
+        self._stack_pool = StateStackPool.private()
+        self._incremental_manager = IncrementalManager(self._stack_pool)
         self._lang_id = lang_id
         self._tokenizer = self._get_tokenizer(lang_id)
+        self._window: tuple[int, int] | None = None
+        self._extra_window: tuple[int, int] | None = None
+        self._view_windows: tuple[tuple[int, int], ...] = ()
+        self._deferred_from: int | None = None
+        self._last_highlighted = -1
+
+    def _build_format_table(self) -> None:
+        """Map token style ids to distinct formats for :meth:`_merge_runs`.
+
+        ``_run_formats`` holds each distinct QTextCharFormat once, and
+        ``_style_to_run`` maps a token style id to its index there, or -1 for
+        styles drawn in the default format (PLAIN), which are skipped.
+        """
+        run_formats = []
+        style_to_run = []
+        for value, fmt in enumerate(self._style_registry.format_table):
+            if value == StyleId.PLAIN:
+                style_to_run.append(-1)
+                continue
+            for index, existing in enumerate(run_formats):
+                if existing == fmt:
+                    break
+            else:
+                index = len(run_formats)
+                run_formats.append(fmt)
+            style_to_run.append(index)
+        self._run_formats = run_formats
+        self._style_to_run = style_to_run
+
+    def _on_theme_changed(self) -> None:
+        """Pick up the new theme's formats and schedule one rehighlight.
+
+        Cached runs index into ``_run_formats``, so they stay valid as long
+        as the new theme groups styles into formats the same way; otherwise
+        the cached tokens are dropped (line states are kept).
+        """
+        old_style_to_run = self._style_to_run
+        self._build_format_table()
+        if self._style_to_run != old_style_to_run:
+            self._incremental_manager.drop_tokens()
+        self._theme_timer.start()
+
+    def _rehighlight_for_theme(self) -> None:
+        if self.document() is None:
+            return
+        self.rehighlight()
+        self.invalidated.emit()
+
+    def _merge_runs(self, tokens: PackedTokens) -> PackedTokens:
+        """Turn packed tokens into packed ``start, length, format`` runs.
+
+        Adjacent tokens that end up with the same format are merged into one
+        run and default-format tokens are dropped, so highlightBlock makes as
+        few setFormat calls as possible. Runs are what the line cache stores.
+        """
+        style_to_run = self._style_to_run
+        style_count = len(style_to_run)
+        runs = array("I")
+        run_start = run_end = 0
+        run_format = -1
+        for i in range(0, len(tokens), 3):
+            style = tokens[i + 2]
+            length = tokens[i + 1]
+            if style >= style_count or not length:
+                continue
+            fmt = style_to_run[style]
+            if fmt < 0:
+                continue
+            start = tokens[i]
+            if fmt == run_format and start == run_end:
+                run_end = start + length
+                continue
+            if run_format >= 0:
+                runs.extend((run_start, run_end - run_start, run_format))
+            run_start, run_end, run_format = start, start + length, fmt
+        if run_format >= 0:
+            runs.extend((run_start, run_end - run_start, run_format))
+        return runs
 
     def _get_tokenizer(self, lang_id: str) -> BaseTokenizer:
         """Get tokenizer for the given language, falling back to plain."""
@@ -47,40 +150,179 @@ class DocumentHighlighter(QSyntaxHighlighter):
         self._tokenizer = self._get_tokenizer(lang_id)
         self._incremental_manager.clear()
         self.rehighlight()
+        self.invalidated.emit()
+
+    @property
+    def stack_pool(self) -> StateStackPool:
+        """The state stack pool scoped to this document."""
+        return self._stack_pool
+
+    @property
+    def lang_id(self) -> str:
+        """The language identifier currently used for highlighting."""
+        return self._lang_id
+
+    @property
+    def cache_bytes(self) -> int:
+        """Approximate memory held by the line cache's format runs."""
+        return self._incremental_manager.cached_bytes
+
+    def evict_cache(self) -> None:
+        """Drop the cached format runs to free memory.
+
+        The formats already applied to the document and the line states are
+        kept, so nothing has to be highlighted again; lines are simply
+        tokenized anew the next time they change.
+        """
+        self._incremental_manager.drop_tokens()
+
+    def preload(self, lines: list[str], results: list[PackedResult]) -> bool:
+        """Seed the line cache with tokens computed off the GUI thread.
+
+        Highlighting then only applies formats for lines whose text and
+        starting state still match. Results for lines edited in the meantime
+        are simply never hit.
+
+        Args:
+            lines: The document's lines at the time they were tokenized.
+            results: One PackedResult per line, tokenized in order.
+
+        Returns:
+            False if the document no longer has the same number of lines.
+        """
+        doc = self.document()
+        if doc is None or doc.blockCount() != len(lines):
+            return False
+        manager = self._incremental_manager
+        manager.set_line_count(len(lines))
+        intern = self._stack_pool.intern
+        initial_state_id = -1
+        for index, (text, result) in enumerate(zip(lines, results)):
+            final_state_id = intern(result.final_stack)
+            manager.update_line(
+                index,
+                text,
+                final_state_id,
+                initial_state_id,
+                self._merge_runs(result.tokens),
+            )
+            initial_state_id = final_state_id
+        return True
+
+    def set_window(
+        self,
+        first: int | None,
+        last: int | None = None,
+        extra: tuple[int, int] | None = None,
+        views: tuple[tuple[int, int], ...] = (),
+    ) -> None:
+        """Restrict highlighting to blocks ``first``..``last`` (inclusive).
+
+        ``extra`` is a second allowed range, used for the block range of a
+        background slice, and ``views`` are the ranges shown by other views
+        of the document (split panes). Passing ``None`` for ``first``
+        removes the restriction.
+        """
+        if first is None:
+            self._window = None
+            self._extra_window = None
+            self._view_windows = ()
+            return
+        self._window = (first, last if last is not None else first)
+        self._extra_window = extra
+        self._view_windows = views
+
+    def take_deferred(self) -> int | None:
+        """Return and clear the first block number that was deferred."""
+        deferred = self._deferred_from
+        self._deferred_from = None
+        return deferred
+
+    @property
+    def last_highlighted(self) -> int:
+        """Block number of the last block that was actually highlighted."""
+        return self._last_highlighted
+
+    def _is_allowed(self, block_number: int) -> bool:
+        """Return True if the block lies inside the current window(s)."""
+        window = self._window
+        if window is None:
+            return True
+        if window[0] <= block_number <= window[1]:
+            return True
+        extra = self._extra_window
+        if extra is not None and extra[0] <= block_number <= extra[1]:
+            return True
+        for first, last in self._view_windows:
+            if first <= block_number <= last:
+                return True
+        return False
 
     def highlightBlock(self, text: str) -> None:
         """Qt override: Highlight a single block of text.
 
+        Lines whose text and starting state match the incremental cache reuse
+        their cached format runs instead of being tokenized again. Qt stops walking
+        forward once a block's final state equals the one it had before, so an
+        edit that doesn't change a line's final state only costs one block.
+
         Args:
             text: The text content of the block to highlight.
         """
         prev_state_id = self.previousBlockState()
-        state_stack = self._stack_pool.get(prev_state_id)
+        block_number = self._sync_line_count()
 
-        if not state_stack:
-            state_stack = self._get_default_stack()
+        if not self._is_allowed(block_number):
+            if self._deferred_from is None or block_number < self._deferred_from:
+                self._deferred_from = block_number
+            self.setCurrentBlockState(self.currentBlockState())
+            return
+        self._last_highlighted = block_number
+
+        cached = self._incremental_manager.lookup(block_number, text, prev_state_id)
+        if cached is not None:
+            runs, final_state_id = cached
+        else:
+            state_stack = self._stack_pool.get(prev_state_id)
+
+            if not state_stack:
+                state_stack = self._get_default_stack()
 
-        tokenizer = self._get_active_tokenizer(state_stack)
-        result = tokenizer.tokenize_line(text, state_stack)
+            tokenizer = self._get_active_tokenizer(state_stack)
+            tokens = array("I")
+            final_stack = tokenizer.tokenize_line_packed(text, state_stack, tokens)
+            final_state_id = self._stack_pool.intern(final_stack)
+            runs = self._merge_runs(tokens)
+            self._incremental_manager.update_line(
+                block_number, text, final_state_id, prev_state_id, runs
+            )
 
-        for token in result.tokens:
-            try:
-                style_id = StyleId(token.style_id)
-                fmt = self._style_registry.get_format(style_id)
-                self.setFormat(token.start, token.length, fmt)
-            except ValueError:
-                pass
+        formats = self._run_formats
+        set_format = self.setFormat
+        for i in range(0, len(runs), 3):
+            set_format(runs[i], runs[i + 1], formats[runs[i + 2]])
 
-        final_state_id = self._stack_pool.intern(result.final_stack)
         self.setCurrentBlockState(final_state_id)
 
+    def _sync_line_count(self) -> int:
+        """Align the incremental cache with the document and return the block number.
+
+        Qt starts rehighlighting at the block where an edit began, so when the
+        block count differs from the cache the added or removed lines sit right
+        after the current block.
+        """
         block = self.currentBlock()
-        if block.isValid():
-            block_number = block.blockNumber()
-            doc = self.document()
-            if doc:
-                self._incremental_manager.set_line_count(doc.blockCount())
-            self._incremental_manager.update_line(block_number, text, final_state_id)
+        if not block.isValid():
+            return -1
+        block_number = block.blockNumber()
+        doc = self.document()
+        if doc is not None:
+            manager = self._incremental_manager
+            delta = doc.blockCount() - manager.line_count
+            if delta and block_number < manager.line_count:
+                manager.splice(block_number, delta)
+            manager.set_line_count(doc.blockCount())
+        return block_number
 
     def _get_default_stack(self) -> StateStack:
         """Get the default state stack for the current language."""
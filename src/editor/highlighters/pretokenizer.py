@@ -0,0 +1,245 @@
+"""Tokenize whole files in worker processes.
+
+Tokenizers are pure functions of ``(line, StateStack)`` with no Qt
+dependency, so a large file can be split into chunks that are tokenized in
+parallel. Every chunk after the first is tokenized speculatively from the
+language's default state. :func:`stitch_chunks` then re-tokenizes the start
+of any chunk whose real starting state differs, until its states converge
+with the speculative run. This is usually after a line or two, and at the
+latest at the end of the chunk.
+
+Files that are streamed into the editor are fed to a
+:class:`StreamPretokenizer` chunk by chunk, so workers start on the top of
+the file while the rest is still being read.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+from array import array
+from typing import TYPE_CHECKING
+
+from editor.highlighters.core.registry import HighlightRegistry
+from editor.highlighters.core.types import PackedResult, StackFrame, StateStack
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+# Files shorter than this are cheap enough to highlight on the GUI thread.
+MIN_LINES = 20_000
+
+# With fewer cores the workers only compete with the GUI thread.
+MIN_CPUS = 2
+
+# Smallest chunk sent to a worker, to keep pickling overhead in check.
+MIN_CHUNK_LINES = 2_000
+
+# Lines per chunk sent to a worker while a file is still streaming in and
+# its length is unknown.
+STREAM_CHUNK_LINES = 5_000
+
+_executor: ProcessPoolExecutor | None = None
+_stitcher: ThreadPoolExecutor | None = None
+
+
+def default_stack(lang_id: str) -> StateStack:
+    """Return the state stack a document in ``lang_id`` starts in."""
+    return (StackFrame(lang_id=lang_id, sub_state=0, end_condition=None),)
+
+
+def available_cpus() -> int:
+    """Return how many CPUs this process is allowed to run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # Not available on macOS and Windows.
+        return os.cpu_count() or 1
+
+
+def should_pretokenize(line_count: int) -> bool:
+    """Return True if a file this long is worth tokenizing in workers."""
+    return line_count >= MIN_LINES and available_cpus() >= MIN_CPUS
+
+
+def tokenize_lines(
+    lang_id: str, lines: list[str], initial_stack: StateStack = ()
+) -> list[PackedResult]:
+    """Tokenize ``lines`` in order, the same way DocumentHighlighter does.
+
+    Args:
+        lang_id: The document's language identifier.
+        lines: The lines to tokenize.
+        initial_stack: State the first line starts in; empty means the default.
+
+    Returns:
+        One PackedResult per line.
+    """
+    import editor.highlighters.register_tokenizers  # noqa: F401
+
+    registry = HighlightRegistry.instance()
+    tokenizer = registry.get_tokenizer(lang_id) or registry.get_default_tokenizer()
+    results = []
+    stack = initial_stack
+    for line in lines:
+        if not stack:
+            stack = default_stack(lang_id)
+        active = tokenizer
+        top_lang = stack[-1].lang_id
+        if top_lang != lang_id:
+            active = registry.get_tokenizer(top_lang) or tokenizer
+        tokens = array("I")
+        stack = active.tokenize_line_packed(line, stack, tokens)
+        results.append(PackedResult(tokens, stack))
+    return results
+
+
+def stitch_chunks(
+    lang_id: str,
+    chunks: list[list[str]],
+    results: list[list[PackedResult]],
+) -> list[PackedResult]:
+    """Join speculatively tokenized chunks into one correct result list.
+
+    ``results[0]`` must have been tokenized from the default state. Every
+    other chunk is assumed to have been tokenized from the default state too,
+    and is fixed up from the real final state of the chunk before it.
+    """
+    default = default_stack(lang_id)
+    stitched = list(results[0]) if results else []
+    for lines, chunk in zip(chunks[1:], results[1:]):
+        stack = stitched[-1].final_stack if stitched else ()
+        speculative = ()
+        for index, line in enumerate(lines):
+            if (stack or default) == (speculative or default):
+                stitched.extend(chunk[index:])
+                break
+            result = tokenize_lines(lang_id, [line], stack)[0]
+            stitched.append(result)
+            stack = result.final_stack
+            speculative = chunk[index].final_stack
+    return stitched
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # Imported here: multiprocessing and concurrent.futures are only
+        # needed once a file is large enough to pretokenize.
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Spawned rather than forked workers: the GUI process has Qt state
+        # that must not be duplicated into the children.
+        _executor = ProcessPoolExecutor(
+            max_workers=available_cpus(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        atexit.register(shutdown)
+    return _executor
+
+
+def _get_stitcher() -> ThreadPoolExecutor:
+    global _stitcher
+    if _stitcher is None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        _stitcher = ThreadPoolExecutor(max_workers=1)
+    return _stitcher
+
+
+def shutdown() -> None:
+    """Stop the worker processes, if they were started."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _collect(
+    lang_id: str, chunks: list[list[str]], futures: list[Future]
+) -> tuple[list[str], list[PackedResult]]:
+    results = stitch_chunks(lang_id, chunks, [f.result() for f in futures])
+    return [line for chunk in chunks for line in chunk], results
+
+
+def pretokenize(lang_id: str, text: str) -> Future:
+    """Tokenize ``text`` in worker processes.
+
+    The text is split into lines on a background thread, not the caller's.
+
+    Returns:
+        A Future resolving to ``(lines, results)``, with one PackedResult
+        per line. It completes on a background thread, so callers in the
+        GUI must hop back to the main thread (e.g. via a queued signal)
+        before touching Qt objects.
+    """
+    def run() -> tuple[list[str], list[PackedResult]]:
+        lines = text.split("\n")
+        workers = available_cpus()
+        chunk_size = max(MIN_CHUNK_LINES, -(-len(lines) // (workers * 2)))
+        chunks = [lines[i:i + chunk_size] for i in range(0, len(lines), chunk_size)]
+        executor = _get_executor()
+        futures = [executor.submit(tokenize_lines, lang_id, chunk) for chunk in chunks]
+        return _collect(lang_id, chunks, futures)
+
+    return _get_stitcher().submit(run)
+
+
+class StreamPretokenizer:
+    """Tokenizes a file in worker processes while it is still being read.
+
+    Text is fed in as it arrives. Once the file is known to be long enough
+    to be worth it, every ``STREAM_CHUNK_LINES`` complete lines go to a
+    worker; :meth:`finish` sends the rest and stitches the results.
+    """
+
+    def __init__(self, lang_id: str) -> None:
+        self._lang_id = lang_id
+        self._partial = ""
+        self._pending: list[str] = []
+        self._line_count = 0
+        self._chunks: list[list[str]] = []
+        self._futures: list[Future] = []
+
+    def feed(self, text: str) -> None:
+        """Add the next piece of the file."""
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        self._pending.extend(lines)
+        self._line_count += len(lines)
+        if self._line_count >= MIN_LINES and len(self._pending) >= STREAM_CHUNK_LINES:
+            self._submit()
+
+    def _submit(self) -> None:
+        executor = _get_executor()
+        pending = self._pending
+        self._pending = []
+        for i in range(0, len(pending), STREAM_CHUNK_LINES):
+            chunk = pending[i:i + STREAM_CHUNK_LINES]
+            self._chunks.append(chunk)
+            self._futures.append(executor.submit(tokenize_lines, self._lang_id, chunk))
+
+    def finish(self) -> Future | None:
+        """Tokenize what is left once the whole file has been fed.
+
+        Returns:
+            A Future like :func:`pretokenize`'s, or None if the file turned
+            out too short to be worth tokenizing in workers.
+        """
+        self._pending.append(self._partial)
+        self._partial = ""
+        self._line_count += 1
+        if not should_pretokenize(self._line_count):
+            self.cancel()
+            return None
+        self._submit()
+        return _get_stitcher().submit(_collect, self._lang_id, self._chunks, self._futures)
+
+    def cancel(self) -> None:
+        """Drop queued work; the fed text is no longer wanted."""
+        for future in self._futures:
+            future.cancel()
+        self._pending = []
+        self._chunks = []
+        self._futures = []
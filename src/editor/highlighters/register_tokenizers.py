@@ -1,32 +1,81 @@
-"""Registration module for all tokenizers."""
-
-from editor.highlighters.core.registry import HighlightRegistry
-from editor.highlighters.tokenizers import (
-    PlainTokenizer,
-    JsonTokenizer,
-    HtmlTokenizer,
-    MarkdownTokenizer,
-    PythonTokenizer,
-    CTokenizer,
-    CppTokenizer,
-    JavaTokenizer,
-    JavaScriptTokenizer,
-)
+"""Registration module for all tokenizers.
+
+Tokenizers are registered as lazy factories: a tokenizer's module is
+imported, and the tokenizer created, the first time its language is
+looked up, so starting the editor only loads the languages it opens.
+"""
+
+import importlib
+import json
+import os
+
+from editor.highlighters.core.registry import HighlightRegistry, TokenizerFactory
+
+GRAMMAR_DIR = os.path.join(os.path.dirname(__file__), "grammars")
+
+# lang_id, module in editor.highlighters.tokenizers, class. Which files
+# each language applies to is in the LanguageIndex.
+TOKENIZERS: list[tuple[str, str, str]] = [
+    ("plain", "plain_tokenizer", "PlainTokenizer"),
+    ("python", "python_tokenizer", "PythonRegexTokenizer"),
+    ("c", "c_tokenizer", "CRegexTokenizer"),
+    ("cpp", "cpp_tokenizer", "CppRegexTokenizer"),
+    ("java", "java_tokenizer", "JavaRegexTokenizer"),
+    ("html", "html_tokenizer", "HtmlTokenizer"),
+    ("json", "json_tokenizer", "JsonTokenizer"),
+    ("markdown", "markdown_tokenizer", "MarkdownTokenizer"),
+    ("javascript", "javascript_tokenizer", "JavaScriptRegexTokenizer"),
+]
+
+
+def tokenizer_factory(module: str, name: str) -> TokenizerFactory:
+    """Return a factory that imports ``module`` and instantiates ``name``."""
+
+    def create():
+        tokenizer_module = importlib.import_module(f"editor.highlighters.tokenizers.{module}")
+        return getattr(tokenizer_module, name)()
+
+    return create
+
+
+def grammar_factory(path: str) -> TokenizerFactory:
+    """Return a factory that loads the grammar at ``path`` into a tokenizer."""
+
+    def create():
+        from editor.highlighters.tokenizers.grammar import load_grammar
+        from editor.highlighters.tokenizers.grammar_tokenizer import GrammarTokenizer
+
+        return GrammarTokenizer(load_grammar(path))
+
+    return create
+
+
+def register_grammars(directory: str = GRAMMAR_DIR) -> None:
+    """Register a GrammarTokenizer for every ``*.json`` grammar in ``directory``.
+
+    Each grammar file is parsed here, but only its language id and
+    extensions are kept; the grammar is built and its patterns compiled
+    when its language is first used. Grammar files are small, so the
+    parse costs far less than the compile it puts off.
+    """
+    registry = HighlightRegistry.instance()
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json"):
+            path = os.path.join(directory, name)
+            with open(path, encoding="utf-8") as f:
+                header = json.load(f)
+            registry.register_lazy(
+                header["lang_id"], grammar_factory(path), header.get("extensions", [])
+            )
 
 
 def register_all_tokenizers():
     """Register all tokenizers with the HighlightRegistry."""
     registry = HighlightRegistry.instance()
 
-    registry.register("plain", PlainTokenizer(), [".txt"])
-    registry.register("python", PythonTokenizer(), [".py", ".pyw"])
-    registry.register("c", CTokenizer(), [".c", ".h"])
-    registry.register("cpp", CppTokenizer(), [".cpp", ".hpp", ".cc", ".cxx", ".hxx"])
-    registry.register("java", JavaTokenizer(), [".java"])
-    registry.register("html", HtmlTokenizer(), [".html", ".htm", ".xml"])
-    registry.register("json", JsonTokenizer(), [".json"])
-    registry.register("markdown", MarkdownTokenizer(), [".md", ".markdown"])
-    registry.register("javascript", JavaScriptTokenizer(), [".js", ".jsx"])
+    for lang_id, module, name in TOKENIZERS:
+        registry.register_lazy(lang_id, tokenizer_factory(module, name))
+    register_grammars()
 
 
 # Auto-register on import
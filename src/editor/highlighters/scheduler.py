@@ -0,0 +1,323 @@
+"""Viewport-first, time-sliced highlighting for large documents."""
+
+import time
+
+from PyQt6.QtCore import QObject, QPoint, QTimer, pyqtSignal
+
+from editor.highlighters import pretokenizer
+
+
+class HighlightScheduler(QObject):
+    """Drives a DocumentHighlighter so big documents don't block the UI.
+
+    The blocks visible in the editor are highlighted first. The rest of the
+    document is then highlighted from the top in slices of roughly
+    ``SLICE_MS`` milliseconds, returning to the event loop between slices.
+    Scrolling replaces the pending viewport job, and an edit moves the
+    background frontier back to the first block it affected, so stale work
+    is dropped rather than queued.
+
+    Further editors showing the same document (split panes) are added
+    with :meth:`add_editor`; their visible blocks count as viewport too.
+    """
+
+    # Carries a finished pre-tokenization back to the GUI thread.
+    _pretokenized = pyqtSignal(object)
+
+    SLICE_MS = 8
+    CHUNK_BLOCKS = 32
+    VIEWPORT_MARGIN = 10
+
+    def __init__(self, highlighter, editor) -> None:
+        """Start scheduling highlighting of ``highlighter`` for ``editor``.
+
+        Args:
+            highlighter: The DocumentHighlighter attached to the editor's document.
+            editor: The CodeEditor whose viewport should be coloured first.
+        """
+        super().__init__(editor)
+        self._highlighter = highlighter
+        self._editor = editor
+        self._document = highlighter.document()
+        self._block_count = self._document.blockCount()
+        self._frontier = 0
+        self._complete = False
+        self._dirty_until = -1
+        self._viewport = (0, -1)
+        self._views: tuple[tuple[int, int], ...] = ()
+        self._viewport_dirty = True
+        self._viewport_stale = False
+        # Update request handler of each added editor, by editor.
+        self._view_editors: dict = {}
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._run_slice)
+
+        self._pretokenize_future = None
+        self._pretokenize_stream = None
+        self._pretokenized.connect(self._on_pretokenized)
+
+        editor.updateRequest.connect(self._on_update_request)
+        self._document.contentsChange.connect(self._on_contents_change)
+        highlighter.invalidated.connect(self._on_invalidated)
+
+        self._update_viewport()
+        self._timer.start()
+
+    def add_editor(self, editor) -> None:
+        """Also highlight what ``editor``, another view of the document, shows first."""
+        def handler(rect, dy):
+            self._on_update_request(rect, dy, editor)
+
+        self._view_editors[editor] = handler
+        editor.updateRequest.connect(handler)
+        self._viewport_stale = True
+        self._timer.start()
+
+    def remove_editor(self, editor) -> None:
+        handler = self._view_editors.pop(editor, None)
+        if handler is None:
+            return
+        editor.updateRequest.disconnect(handler)
+        self._viewport_stale = True
+        self._timer.start()
+
+    def set_editor(self, editor) -> None:
+        """Make ``editor``, already added with :meth:`add_editor`, the main view."""
+        handler = self._view_editors.pop(editor, None)
+        if handler is not None:
+            editor.updateRequest.disconnect(handler)
+        self._editor.updateRequest.disconnect(self._on_update_request)
+        self._editor = editor
+        self.setParent(editor)
+        editor.updateRequest.connect(self._on_update_request)
+        self._viewport_stale = True
+        self._timer.start()
+
+    @property
+    def is_complete(self) -> bool:
+        """True once every block has been highlighted with its real state."""
+        return self._frontier >= self._document.blockCount()
+
+    def restart(self) -> None:
+        """Highlight the whole document again, viewport first."""
+        self._frontier = 0
+        self._complete = False
+        self._dirty_until = -1
+        self._block_count = self._document.blockCount()
+        self._viewport_dirty = True
+        self._timer.start()
+
+    def pretokenize(self, text: str) -> bool:
+        """Tokenize ``text`` in worker processes and hand the tokens over.
+
+        Only worth it for large files on machines with several cores;
+        otherwise nothing happens.
+
+        Returns:
+            True if pre-tokenization was started.
+        """
+        if not pretokenizer.should_pretokenize(text.count("\n") + 1):
+            return False
+        self._watch(pretokenizer.pretokenize(self._highlighter.lang_id, text))
+        return True
+
+    def begin_pretokenize_stream(self) -> bool:
+        """Start tokenizing a file in workers while it streams in.
+
+        Feed the file with :meth:`feed_pretokenize_stream` and call
+        :meth:`end_pretokenize_stream` once all of it is in the document.
+        Starting again drops what was fed before.
+
+        Returns:
+            True if there are enough cores for it to be worth it.
+        """
+        self._cancel_pretokenize()
+        if pretokenizer.available_cpus() < pretokenizer.MIN_CPUS:
+            return False
+        self._pretokenize_stream = pretokenizer.StreamPretokenizer(self._highlighter.lang_id)
+        return True
+
+    def feed_pretokenize_stream(self, text: str) -> None:
+        if self._pretokenize_stream is not None:
+            self._pretokenize_stream.feed(text)
+
+    def end_pretokenize_stream(self) -> bool:
+        """Tokenize the rest of the streamed file and hand the tokens over.
+
+        Returns:
+            True if the file was long enough to be pre-tokenized.
+        """
+        stream, self._pretokenize_stream = self._pretokenize_stream, None
+        if stream is None:
+            return False
+        future = stream.finish()
+        if future is None:
+            return False
+        self._watch(future)
+        return True
+
+    def _watch(self, future) -> None:
+        self._pretokenize_future = future
+        future.add_done_callback(self._pretokenized.emit)
+
+    def _cancel_pretokenize(self) -> None:
+        self._pretokenize_future = None
+        if self._pretokenize_stream is not None:
+            self._pretokenize_stream.cancel()
+            self._pretokenize_stream = None
+
+    def _on_invalidated(self) -> None:
+        # Tokens still being computed are for the old language.
+        self._cancel_pretokenize()
+        self.restart()
+
+    def _on_pretokenized(self, future) -> None:
+        if future is not self._pretokenize_future:
+            return
+        self._pretokenize_future = None
+        if future.exception() is not None:
+            return
+        if self._highlighter.preload(*future.result()):
+            self.restart()
+
+    def stop(self) -> None:
+        """Stop scheduling and let the highlighter run unrestricted again."""
+        self._timer.stop()
+        self._cancel_pretokenize()
+        self._editor.updateRequest.disconnect(self._on_update_request)
+        for editor, handler in self._view_editors.items():
+            editor.updateRequest.disconnect(handler)
+        self._view_editors.clear()
+        self._document.contentsChange.disconnect(self._on_contents_change)
+        self._highlighter.invalidated.disconnect(self._on_invalidated)
+        self._highlighter.set_window(None)
+
+    def finish(self) -> None:
+        """Synchronously highlight everything that is still pending."""
+        self._timer.stop()
+        while not self.is_complete:
+            self._run_slice(reschedule=False)
+
+    def _visible_range(self, editor) -> tuple[int, int]:
+        """Return the first and last block numbers shown in ``editor``."""
+        first = editor.firstVisibleBlock().blockNumber()
+        bottom = max(0, editor.viewport().height() - 1)
+        last = editor.cursorForPosition(QPoint(0, bottom)).blockNumber()
+        return max(0, first), max(first, last) + self.VIEWPORT_MARGIN
+
+    def _update_viewport(self) -> None:
+        self._viewport_stale = False
+        viewport = self._visible_range(self._editor)
+        views = tuple(self._visible_range(editor) for editor in self._view_editors)
+        if viewport == self._viewport and views == self._views:
+            return
+        self._viewport = viewport
+        self._views = views
+        self._highlighter.set_window(*viewport, views=views)
+        self._viewport_dirty = True
+        self._timer.start()
+
+    def _on_update_request(self, rect, dy: int, editor=None) -> None:
+        # Scrolling has to move the window right away. Full repaints also
+        # happen for every block Qt relayouts, so those only mark the
+        # window for a recheck on the next slice.
+        if dy:
+            self._update_viewport()
+        elif rect.contains((editor or self._editor).viewport().rect()):
+            self._viewport_stale = True
+            self._timer.start()
+
+    def _on_contents_change(self, position: int, removed: int, added: int) -> None:
+        """Move the frontier back to cover what the edit made stale."""
+        document = self._document
+        count = document.blockCount()
+        first_block = document.findBlock(position).blockNumber()
+        last_block = document.findBlock(position + added).blockNumber()
+
+        delta = count - self._block_count
+        self._block_count = count
+        if delta:
+            if first_block < self._frontier:
+                self._frontier = max(first_block + 1, self._frontier + delta)
+            if first_block < self._dirty_until:
+                self._dirty_until = max(last_block, self._dirty_until + delta)
+            self._viewport = (0, -1)
+            self._update_viewport()
+
+        deferred = self._highlighter.take_deferred()
+        if deferred is not None:
+            self._frontier = min(self._frontier, deferred)
+            self._dirty_until = max(self._dirty_until, last_block)
+
+        if self._frontier < count:
+            self._timer.start()
+
+    def _run_slice(self, reschedule: bool = True) -> None:
+        deadline = time.perf_counter() + self.SLICE_MS / 1000.0
+
+        # Blocks deferred outside of an edit come from a full rehighlight
+        # that Qt ran on its own, so nothing past them can be trusted.
+        deferred = self._highlighter.take_deferred()
+        if deferred is not None:
+            self._frontier = min(self._frontier, deferred)
+            self._dirty_until = self._document.blockCount() - 1
+
+        if self._viewport_stale:
+            self._update_viewport()
+        if self._viewport_dirty:
+            self._viewport_dirty = False
+            self._highlight_viewport()
+
+        self._highlight_until(deadline)
+
+        if reschedule and not self.is_complete:
+            self._timer.start()
+
+    def _highlight_viewport(self) -> None:
+        """Highlight visible blocks past the frontier using a guessed start state.
+
+        The background pass fixes them up with the real state once it gets
+        there.
+        """
+        for first, last in (self._viewport, *self._views):
+            start = max(first, self._frontier)
+            if start > last:
+                continue
+            block = self._document.findBlockByNumber(start)
+            if block.isValid():
+                self._highlighter.rehighlightBlock(block)
+                self._highlighter.take_deferred()
+
+    def _highlight_until(self, deadline: float) -> None:
+        highlighter = self._highlighter
+        document = self._document
+        count = document.blockCount()
+
+        while self._frontier < count:
+            start = self._frontier
+            end = start + self.CHUNK_BLOCKS - 1
+            highlighter.set_window(*self._viewport, extra=(start, end), views=self._views)
+            highlighter.rehighlightBlock(document.findBlockByNumber(start))
+            deferred = highlighter.take_deferred()
+            last = max(start, highlighter.last_highlighted)
+
+            if deferred is None and (
+                last >= count - 1
+                or (self._complete and last >= self._dirty_until)
+            ):
+                # Qt stopped because the state stopped changing and every
+                # block after this one is already correct.
+                self._frontier = count
+            else:
+                self._frontier = last + 1
+
+            if time.perf_counter() >= deadline:
+                break
+
+        highlighter.set_window(*self._viewport, views=self._views)
+        if self._frontier >= count:
+            self._complete = True
+            self._dirty_until = -1
@@ -1,21 +1,42 @@
-from editor.highlighters.tokenizers.plain_tokenizer import PlainTokenizer
-from editor.highlighters.tokenizers.json_tokenizer import JsonTokenizer
-from editor.highlighters.tokenizers.html_tokenizer import HtmlTokenizer
-from editor.highlighters.tokenizers.python_tokenizer import PythonTokenizer
-from editor.highlighters.tokenizers.markdown_tokenizer import MarkdownTokenizer
-from editor.highlighters.tokenizers.c_tokenizer import CTokenizer
-from editor.highlighters.tokenizers.cpp_tokenizer import CppTokenizer
-from editor.highlighters.tokenizers.java_tokenizer import JavaTokenizer
-from editor.highlighters.tokenizers.javascript_tokenizer import JavaScriptTokenizer
+"""Language tokenizers.
 
-__all__ = [
-    "PlainTokenizer",
-    "JsonTokenizer",
-    "HtmlTokenizer",
-    "PythonTokenizer",
-    "MarkdownTokenizer",
-    "CTokenizer",
-    "CppTokenizer",
-    "JavaTokenizer",
-    "JavaScriptTokenizer",
-]
+Names are imported from their modules on first access, so importing one
+tokenizer does not load every language.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "PlainTokenizer": "plain_tokenizer",
+    "JsonTokenizer": "json_tokenizer",
+    "HtmlTokenizer": "html_tokenizer",
+    "PythonTokenizer": "python_tokenizer",
+    "PythonRegexTokenizer": "python_tokenizer",
+    "MarkdownTokenizer": "markdown_tokenizer",
+    "CTokenizer": "c_tokenizer",
+    "CRegexTokenizer": "c_tokenizer",
+    "CppTokenizer": "cpp_tokenizer",
+    "CppRegexTokenizer": "cpp_tokenizer",
+    "JavaTokenizer": "java_tokenizer",
+    "JavaRegexTokenizer": "java_tokenizer",
+    "JavaScriptTokenizer": "javascript_tokenizer",
+    "JavaScriptRegexTokenizer": "javascript_tokenizer",
+    "Embed": "grammar",
+    "Grammar": "grammar",
+    "GrammarTokenizer": "grammar_tokenizer",
+    "Rule": "grammar",
+    "StringRule": "grammar",
+    "grammar_from_dict": "grammar",
+    "load_grammar": "grammar",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
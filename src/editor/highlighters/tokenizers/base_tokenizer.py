@@ -1,6 +1,12 @@
 from abc import ABC, abstractmethod
+from array import array
 
-from editor.highlighters.core.types import StateStack, TokenizeResult
+from editor.highlighters.core.types import (
+    PackedTokens,
+    StateStack,
+    TokenizeResult,
+    unpack_tokens,
+)
 
 
 class BaseTokenizer(ABC):
@@ -11,3 +17,31 @@ class BaseTokenizer(ABC):
     @abstractmethod
     def tokenize_line(self, line: str, state_stack: StateStack) -> TokenizeResult:
         pass
+
+    def tokenize_line_packed(
+        self, line: str, state_stack: StateStack, out: PackedTokens
+    ) -> StateStack:
+        """Append the line's tokens to ``out`` as packed triples.
+
+        Returns the final state stack. Tokenizers that build packed tokens
+        directly derive from PackedTokenizer instead.
+        """
+        result = self.tokenize_line(line, state_stack)
+        for token in result.tokens:
+            out.extend(token)
+        return result.final_stack
+
+
+class PackedTokenizer(BaseTokenizer):
+    """Tokenizer that writes packed triples without creating Token objects."""
+
+    @abstractmethod
+    def tokenize_line_packed(
+        self, line: str, state_stack: StateStack, out: PackedTokens
+    ) -> StateStack:
+        pass
+
+    def tokenize_line(self, line: str, state_stack: StateStack) -> TokenizeResult:
+        out = array("I")
+        final_stack = self.tokenize_line_packed(line, state_stack, out)
+        return TokenizeResult(tokens=unpack_tokens(out), final_stack=final_stack)
@@ -1,7 +1,15 @@
-from editor.highlighters.core.types import (
-    Token, StateStack, TokenizeResult, StyleId, StackFrame
+from array import array
+
+from editor.highlighters.core.types import StateStack, StyleId, StackFrame
+from editor.highlighters.tokenizers.base_tokenizer import PackedTokenizer
+from editor.highlighters.tokenizers.scanner import (
+    alternation,
+    first_char_styles,
+    master_regex,
+    quoted,
+    scan,
+    word_styles,
 )
-from editor.highlighters.tokenizers.base_tokenizer import BaseTokenizer
 
 STATE_DEFAULT = 0
 STATE_BLOCK_COMMENT = 1
@@ -24,15 +32,16 @@ OPERATORS: set[str] = {
 PUNCTUATION: set[str] = {"(", ")", "[", "]", "{", "}", ",", ";"}
 
 
-class CTokenizer(BaseTokenizer):
+class CTokenizer(PackedTokenizer):
     def get_lang_id(self) -> str:
         return "c"
 
     def _get_keywords(self) -> set[str]:
         return KEYWORDS
 
-    def tokenize_line(self, line: str, state_stack: StateStack) -> TokenizeResult:
-        tokens: list[Token] = []
+    def tokenize_line_packed(
+        self, line: str, state_stack: StateStack, out: array
+    ) -> StateStack:
         i = 0
         n = len(line)
 
@@ -47,14 +56,14 @@ class CTokenizer(BaseTokenizer):
             while i < n:
                 if line[i:i+2] == "*/":
                     i += 2
-                    tokens.append(Token(start=start, length=i - start, style_id=StyleId.COMMENT))
+                    out.extend((start, i - start, StyleId.COMMENT))
                     state_stack = state_stack[:-1]
                     current_sub_state = STATE_DEFAULT
                     break
                 i += 1
             else:
-                tokens.append(Token(start=start, length=n - start, style_id=StyleId.COMMENT))
-                return TokenizeResult(tokens=tokens, final_stack=state_stack)
+                out.extend((start, n - start, StyleId.COMMENT))
+                return state_stack
 
         keywords = self._get_keywords()
 
@@ -66,7 +75,7 @@ class CTokenizer(BaseTokenizer):
                 continue
 
             if ch == '/' and i + 1 < n and line[i + 1] == '/':
-                tokens.append(Token(start=i, length=n - i, style_id=StyleId.COMMENT))
+                out.extend((i, n - i, StyleId.COMMENT))
                 break
 
             if ch == '/' and i + 1 < n and line[i + 1] == '*':
@@ -75,11 +84,11 @@ class CTokenizer(BaseTokenizer):
                 while i < n:
                     if line[i:i+2] == "*/":
                         i += 2
-                        tokens.append(Token(start=start, length=i - start, style_id=StyleId.COMMENT))
+                        out.extend((start, i - start, StyleId.COMMENT))
                         break
                     i += 1
                 else:
-                    tokens.append(Token(start=start, length=n - start, style_id=StyleId.COMMENT))
+                    out.extend((start, n - start, StyleId.COMMENT))
                     new_frame = StackFrame(lang_id=self.get_lang_id(), sub_state=STATE_BLOCK_COMMENT, end_condition=None)
                     state_stack = state_stack + (new_frame,)
                 continue
@@ -91,7 +100,7 @@ class CTokenizer(BaseTokenizer):
                     i += 1
                 while i < n and (line[i].isalnum() or line[i] == '_'):
                     i += 1
-                tokens.append(Token(start=start, length=i - start, style_id=StyleId.KEYWORD))
+                out.extend((start, i - start, StyleId.KEYWORD))
                 continue
 
             if ch == '"':
@@ -105,7 +114,7 @@ class CTokenizer(BaseTokenizer):
                         break
                     else:
                         i += 1
-                tokens.append(Token(start=start, length=i - start, style_id=StyleId.STRING))
+                out.extend((start, i - start, StyleId.STRING))
                 continue
 
             if ch == "'":
@@ -119,7 +128,7 @@ class CTokenizer(BaseTokenizer):
                         break
                     else:
                         i += 1
-                tokens.append(Token(start=start, length=i - start, style_id=StyleId.STRING))
+                out.extend((start, i - start, StyleId.STRING))
                 continue
 
             if ch.isdigit() or (ch == '.' and i + 1 < n and line[i + 1].isdigit()):
@@ -149,7 +158,7 @@ class CTokenizer(BaseTokenizer):
                     i += 1
                     if i < n and line[i] in 'lLuU':
                         i += 1
-                tokens.append(Token(start=start, length=i - start, style_id=StyleId.NUMBER))
+                out.extend((start, i - start, StyleId.NUMBER))
                 continue
 
             if ch.isalpha() or ch == '_':
@@ -158,29 +167,82 @@ class CTokenizer(BaseTokenizer):
                     i += 1
                 word = line[start:i]
                 if word in keywords:
-                    tokens.append(Token(start=start, length=i - start, style_id=StyleId.KEYWORD))
+                    out.extend((start, i - start, StyleId.KEYWORD))
                 else:
-                    tokens.append(Token(start=start, length=i - start, style_id=StyleId.IDENTIFIER))
+                    out.extend((start, i - start, StyleId.IDENTIFIER))
                 continue
 
-            if i + 2 <= n and line[i:i+3] in OPERATORS:
-                tokens.append(Token(start=i, length=3, style_id=StyleId.OPERATOR))
+            if i + 3 <= n and line[i:i+3] in OPERATORS:
+                out.extend((i, 3, StyleId.OPERATOR))
                 i += 3
                 continue
             if i + 1 < n and line[i:i+2] in OPERATORS:
-                tokens.append(Token(start=i, length=2, style_id=StyleId.OPERATOR))
+                out.extend((i, 2, StyleId.OPERATOR))
                 i += 2
                 continue
             if ch in OPERATORS:
-                tokens.append(Token(start=i, length=1, style_id=StyleId.OPERATOR))
+                out.extend((i, 1, StyleId.OPERATOR))
                 i += 1
                 continue
 
             if ch in PUNCTUATION:
-                tokens.append(Token(start=i, length=1, style_id=StyleId.PUNCTUATION))
+                out.extend((i, 1, StyleId.PUNCTUATION))
                 i += 1
                 continue
 
             i += 1
 
-        return TokenizeResult(tokens=tokens, final_stack=state_stack)
+        return state_stack
+
+
+_TOKEN_RE = master_regex(
+    r"//.*",
+    r"/\*.*?\*/",
+    r"/\*.*",
+    r"#[ \t]*\w*",
+    quoted('"'),
+    quoted("'"),
+    r"(?:0[xX][0-9a-fA-F]*|0(?=\d)[0-7]*|(?=\.?\d)\d*(?:\.\d*)?(?:[eE][+-]?\d*)?)"
+    r"(?:[fFlLuU][lLuU]?)?",
+    r"[A-Za-z_]\w*",
+    alternation(OPERATORS),
+    alternation(PUNCTUATION),
+)
+
+_FIRST_CHAR_STYLES = first_char_styles({"/": StyleId.COMMENT, "#": StyleId.KEYWORD})
+
+
+class CRegexTokenizer(CTokenizer):
+    """CTokenizer driven by one compiled master regex.
+
+    Produces the same tokens and states as CTokenizer, which still handles
+    lines containing non-ASCII characters.
+    """
+
+    def __init__(self) -> None:
+        self._word_styles = word_styles(self._get_keywords(), OPERATORS, PUNCTUATION)
+
+    def tokenize_line_packed(
+        self, line: str, state_stack: StateStack, out: array
+    ) -> StateStack:
+        if not line.isascii():
+            return super().tokenize_line_packed(line, state_stack, out)
+
+        pos = 0
+        if state_stack:
+            top_frame = state_stack[-1]
+            if top_frame.lang_id == self.get_lang_id() and top_frame.sub_state == STATE_BLOCK_COMMENT:
+                end = line.find("*/")
+                if end < 0:
+                    out.extend((0, len(line), StyleId.COMMENT))
+                    return state_stack
+                pos = end + 2
+                out.extend((0, pos, StyleId.COMMENT))
+                state_stack = state_stack[:-1]
+
+        last = scan(_TOKEN_RE.findall, line, pos, self._word_styles, _FIRST_CHAR_STYLES, out)
+        if last is not None and last.startswith("/*") and (len(last) < 4 or not last.endswith("*/")):
+            new_frame = StackFrame(lang_id=self.get_lang_id(), sub_state=STATE_BLOCK_COMMENT, end_condition=None)
+            state_stack = state_stack + (new_frame,)
+
+        return state_stack
@@ -1,4 +1,8 @@
-from editor.highlighters.tokenizers.c_tokenizer import CTokenizer, KEYWORDS as C_KEYWORDS
+from editor.highlighters.tokenizers.c_tokenizer import (
+    CRegexTokenizer,
+    CTokenizer,
+    KEYWORDS as C_KEYWORDS,
+)
 
 CPP_KEYWORDS: set[str] = C_KEYWORDS | {
     "class", "namespace", "template", "public", "private", "protected",
@@ -17,3 +21,11 @@ class CppTokenizer(CTokenizer):
 
     def _get_keywords(self) -> set[str]:
         return CPP_KEYWORDS
+
+
+class CppRegexTokenizer(CRegexTokenizer):
+    def get_lang_id(self) -> str:
+        return "cpp"
+
+    def _get_keywords(self) -> set[str]:
+        return CPP_KEYWORDS
@@ -0,0 +1,131 @@
+"""Declarative grammar descriptions for GrammarTokenizer.
+
+A grammar is plain data: the words a language styles by their whole text,
+the delimiters of its comments and strings, a few prefixed rules, and the
+literals that switch into an embedded language. :func:`load_grammar`
+reads one from a JSON file whose keys are the field names below; styles
+are given by their ``StyleId`` name in lower case (``"keyword"``).
+"""
+
+import json
+import os
+from typing import NamedTuple
+
+from editor.highlighters.core.types import StyleId
+
+# C's "preprocessing number": digits with any letters, dots and signed
+# exponents after them, so suffixes and hex digits stay in one token.
+DEFAULT_NUMBER = r"\.?\d(?:[eEpP][+-]|[\w.])*"
+
+
+class StringRule(NamedTuple):
+    """A quoted string; unterminated ones end at the end of the line."""
+
+    delimiter: str
+    escape: str | None = "\\"
+    multiline: bool = False
+
+
+class Rule(NamedTuple):
+    """Text starting with ``start`` and continuing with ``pattern``."""
+
+    start: str
+    pattern: str = ""
+    style: StyleId = StyleId.KEYWORD
+
+
+class Embed(NamedTuple):
+    """Text after ``start`` up to ``end`` belongs to another language."""
+
+    start: str
+    lang_id: str
+    end: str
+    style: StyleId = StyleId.TAG
+
+
+class Grammar(NamedTuple):
+    """Everything GrammarTokenizer needs to tokenize one language.
+
+    ``identifier_start`` and ``identifier_part`` are regex character
+    classes; ``number`` is a regex that matches wherever a digit, or a dot
+    followed by a digit, starts a token.
+    """
+
+    lang_id: str
+    extensions: tuple[str, ...] = ()
+    keywords: tuple[str, ...] = ()
+    operators: tuple[str, ...] = ()
+    punctuation: tuple[str, ...] = ()
+    line_comments: tuple[str, ...] = ()
+    block_comments: tuple[tuple[str, str], ...] = ()
+    strings: tuple[StringRule, ...] = ()
+    rules: tuple[Rule, ...] = ()
+    embedded: tuple[Embed, ...] = ()
+    identifier_start: str = r"[^\W\d]"
+    identifier_part: str = r"\w"
+    number: str = DEFAULT_NUMBER
+
+
+def _style(name: str) -> StyleId:
+    try:
+        return StyleId[name.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown style: {name!r}") from None
+
+
+def grammar_from_dict(data: dict) -> Grammar:
+    """Build a Grammar from the JSON form described in the module docstring.
+
+    Raises:
+        ValueError: If a key or style name is not recognised, a delimiter
+            is empty or starts with whitespace, or the grammar embeds its
+            own language.
+    """
+    unknown = set(data) - set(Grammar._fields)
+    if unknown:
+        raise ValueError(f"Unknown grammar keys: {', '.join(sorted(unknown))}")
+
+    fields = dict(data)
+    for name in ("extensions", "keywords", "operators", "punctuation", "line_comments"):
+        if name in fields:
+            fields[name] = tuple(fields[name])
+    fields["block_comments"] = tuple(
+        (start, end) for start, end in data.get("block_comments", ())
+    )
+    fields["strings"] = tuple(StringRule(**spec) for spec in data.get("strings", ()))
+    fields["rules"] = tuple(
+        Rule(spec["start"], spec.get("pattern", ""), _style(spec.get("style", "keyword")))
+        for spec in data.get("rules", ())
+    )
+    fields["embedded"] = tuple(
+        Embed(spec["start"], spec["lang_id"], spec["end"], _style(spec.get("style", "tag")))
+        for spec in data.get("embedded", ())
+    )
+    grammar = Grammar(**fields)
+
+    delimiters = (
+        list(grammar.line_comments)
+        + [start for start, _ in grammar.block_comments]
+        + [end for _, end in grammar.block_comments]
+        + [spec.delimiter for spec in grammar.strings]
+        + [rule.start for rule in grammar.rules]
+        + [embed.start for embed in grammar.embedded]
+        + [embed.end for embed in grammar.embedded]
+    )
+    for delimiter in delimiters:
+        if not delimiter or delimiter[0].isspace():
+            raise ValueError(f"Invalid delimiter in {grammar.lang_id!r}: {delimiter!r}")
+    if any(embed.lang_id == grammar.lang_id for embed in grammar.embedded):
+        raise ValueError(f"{grammar.lang_id!r} cannot embed itself")
+    return grammar
+
+
+def load_grammar(path: str | os.PathLike) -> Grammar:
+    """Read a grammar from a JSON file.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If it is not a valid grammar.
+    """
+    with open(path, encoding="utf-8") as f:
+        return grammar_from_dict(json.load(f))
@@ -0,0 +1,309 @@
+"""Tokenizers generated from declarative grammars.
+
+GrammarTokenizer compiles a :class:`Grammar` on first use into the same
+kind of tiling master regex the hand-written compiled tokenizers use (see
+:mod:`scanner`), so a language described by data needs no code of its own.
+
+Tokens are tried in this order, and within each kind in grammar order:
+line comments, block comments, strings, embedded-language starts, rules,
+numbers, identifiers, then operators and punctuation.
+
+A block comment or multi-line string left open pushes a frame of the
+grammar's language whose ``sub_state`` numbers the construct. An embedded
+start pushes ``(lang_id, 0, end)`` and hands the rest of the line to that
+language's registered tokenizer. When the grammar's language is itself
+embedded (the frame that started it carries an ``end_condition``), the
+scan stops at that marker and the rest of the line goes back to the
+enclosing language's tokenizer, which closes the embedding.
+"""
+
+import re
+from array import array
+from typing import NamedTuple
+
+from editor.highlighters.core.registry import HighlightRegistry
+from editor.highlighters.core.types import StackFrame, StateStack, StyleId
+from editor.highlighters.tokenizers.base_tokenizer import PackedTokenizer
+from editor.highlighters.tokenizers.grammar import Embed, Grammar
+from editor.highlighters.tokenizers.scanner import SKIP, alternation, master_regex, word_styles
+
+# First-character style of tokens that may be a comment, string, rule or
+# embedded start, or a number starting with ".": resolved per token.
+_CHECK = -2
+
+
+class _Construct(NamedTuple):
+    """A grammar construct recognised by the text it starts with."""
+
+    literal: str
+    style: int
+    # sub_state left open when ``closed`` does not match the token, or 0.
+    state: int = 0
+    closed: re.Pattern | None = None
+    # Set for rules, which may fail after their literal.
+    rule: re.Pattern | None = None
+    embed: Embed | None = None
+
+
+def _string_body(delimiter: str, escape: str | None) -> str:
+    d = re.escape(delimiter)
+    if escape is None:
+        return rf"(?:(?!{d}).)*" if len(delimiter) > 1 else rf"[^{d}]*"
+    e = re.escape(escape)
+    if len(delimiter) == 1:
+        return rf"(?:[^{d}{e}]|{e}.)*"
+    return rf"(?:{e}.|(?!{d})[^{e}])*"
+
+
+class _FirstCharStyles(dict):
+    """First-character styles, filled in as characters are first seen."""
+
+    def __init__(self, checked, identifier_start: str) -> None:
+        super().__init__()
+        self._checked = checked
+        self._is_identifier = re.compile(identifier_start).fullmatch
+
+    def __missing__(self, char: str) -> int:
+        if char in self._checked or char == ".":
+            style = _CHECK
+        else:
+            style = self.plain(char)
+        self[char] = style
+        return style
+
+    def plain(self, char: str) -> int:
+        """Style of a token starting with ``char`` that is no construct."""
+        if char.isdecimal():
+            return int(StyleId.NUMBER)
+        if self._is_identifier(char):
+            return int(StyleId.IDENTIFIER)
+        return SKIP
+
+
+class GrammarTokenizer(PackedTokenizer):
+    """Tokenizer for any language described by a :class:`Grammar`."""
+
+    def __init__(self, grammar: Grammar) -> None:
+        self.grammar = grammar
+        self._lang_id = grammar.lang_id
+        self._findall = None
+
+    def get_lang_id(self) -> str:
+        return self._lang_id
+
+    def _compile(self) -> None:
+        """Build the master regex and lookup tables from the grammar."""
+        g = self.grammar
+        constructs: list[_Construct] = []
+        alternatives: list[str] = []
+        continuations: dict[int, tuple[re.Pattern, int]] = {}
+        comment = int(StyleId.COMMENT)
+        string = int(StyleId.STRING)
+
+        for start in g.line_comments:
+            alternatives.append(rf"{re.escape(start)}.*")
+            constructs.append(_Construct(start, comment))
+
+        for start, end in g.block_comments:
+            s, e = re.escape(start), re.escape(end)
+            state = len(continuations) + 1
+            alternatives.append(rf"{s}(?:.*?{e}|.*)")
+            constructs.append(_Construct(start, comment, state, re.compile(rf"{s}.*?{e}", re.S)))
+            continuations[state] = (re.compile(rf".*?{e}", re.S), comment)
+
+        for spec in g.strings:
+            d = re.escape(spec.delimiter)
+            body = _string_body(spec.delimiter, spec.escape)
+            tail = rf"(?:{d}|{re.escape(spec.escape)})?" if spec.escape else rf"(?:{d})?"
+            alternatives.append(rf"{d}{body}{tail}")
+            if spec.multiline:
+                state = len(continuations) + 1
+                closed = re.compile(rf"{d}{body}{d}", re.S)
+                continuations[state] = (re.compile(rf"{body}{d}", re.S), string)
+            else:
+                state, closed = 0, None
+            constructs.append(_Construct(spec.delimiter, string, state, closed))
+
+        for embed in g.embedded:
+            alternatives.append(re.escape(embed.start))
+            constructs.append(_Construct(embed.start, int(embed.style), embed=embed))
+
+        for rule in g.rules:
+            pattern = rf"{re.escape(rule.start)}(?:{rule.pattern})"
+            alternatives.append(pattern)
+            constructs.append(
+                _Construct(rule.start, int(rule.style), rule=re.compile(pattern, re.S))
+            )
+
+        alternatives.append(rf"(?=\.?\d)(?:{g.number}|\.?\d)")
+        identifier = re.compile(rf"{g.identifier_start}{g.identifier_part}*")
+        alternatives.append(identifier.pattern)
+        symbols = [word for word in g.keywords if not identifier.fullmatch(word)]
+        symbols += g.operators + g.punctuation
+        if symbols:
+            alternatives.append(alternation(symbols))
+
+        by_char: dict[str, tuple[_Construct, ...]] = {}
+        for construct in constructs:
+            by_char[construct.literal[0]] = by_char.get(construct.literal[0], ()) + (construct,)
+
+        # Words a construct can also produce are settled in _resolve, after
+        # the constructs, so the table never overrides one.
+        words = word_styles(g.keywords, g.operators, g.punctuation)
+        self._shadowed = {
+            word: words.pop(word)
+            for word in list(words)
+            if any(word.startswith(construct.literal) for construct in constructs)
+        }
+        self._words = words
+        self._first = _FirstCharStyles(by_char, g.identifier_start)
+        self._constructs = by_char
+        self._continuations = continuations
+        self._end_styles = {
+            (embed.lang_id, embed.end): int(embed.style) for embed in g.embedded
+        }
+        self._findall = master_regex(*alternatives).findall
+
+    def _resolve(self, token: str, line: str, pos: int, endpos: int) -> _Construct | None:
+        """Return the construct the master regex matched for ``token``, if any."""
+        for construct in self._constructs.get(token[0], ()):
+            if construct.rule is None:
+                if token.startswith(construct.literal):
+                    return construct
+            elif construct.rule.match(line, pos, endpos):
+                return construct
+        return None
+
+    def _plain_style(self, token: str) -> int:
+        """Style of a token that is no construct."""
+        style = self._shadowed.get(token)
+        if style is not None:
+            return style
+        if token[0] == ".":
+            return int(StyleId.NUMBER) if len(token) > 1 else SKIP
+        return self._first.plain(token[0])
+
+    def _embedding_root(self, stack: StateStack) -> int:
+        """Index of the frame that embedded this language, or -1."""
+        i = len(stack) - 1
+        while i >= 0 and stack[i].lang_id == self._lang_id:
+            if stack[i].end_condition is not None:
+                return i
+            i -= 1
+        return -1
+
+    @staticmethod
+    def _find_marker(line: str, marker: str, pos: int) -> int:
+        # End markers such as "</style>" are matched case-insensitively, as
+        # HtmlTokenizer does; lower() keeps positions only for ASCII text.
+        if line.isascii():
+            return line.lower().find(marker.lower(), pos)
+        return line.find(marker, pos)
+
+    @staticmethod
+    def _hand_over(tokenizer, line: str, pos: int, stack: StateStack, out: array) -> StateStack:
+        """Tokenize ``line[pos:]`` with another language's tokenizer."""
+        tokens = array("I")
+        stack = tokenizer.tokenize_line_packed(line[pos:], stack, tokens)
+        for i in range(0, len(tokens), 3):
+            tokens[i] += pos
+        out.extend(tokens)
+        return stack
+
+    def tokenize_line_packed(
+        self, line: str, state_stack: StateStack, out: array
+    ) -> StateStack:
+        if self._findall is None:
+            self._compile()
+
+        pos = 0
+        n = len(line)
+        while True:
+            top = state_stack[-1] if state_stack else None
+            if top is not None and top.lang_id != self._lang_id and top.end_condition is not None:
+                # Inside a language this grammar embedded that has no
+                # tokenizer of its own, or handed back its end marker.
+                end = self._find_marker(line, top.end_condition, pos)
+                if end < 0:
+                    if n > pos:
+                        out.extend((pos, n - pos, StyleId.EMBEDDED))
+                    return state_stack
+                if end > pos:
+                    out.extend((pos, end - pos, StyleId.EMBEDDED))
+                pos = end + len(top.end_condition)
+                style = self._end_styles.get((top.lang_id, top.end_condition), int(StyleId.TAG))
+                out.extend((end, pos - end, style))
+                state_stack = state_stack[:-1]
+                continue
+
+            endpos = n
+            parent = None
+            root = self._embedding_root(state_stack) if state_stack else -1
+            if root > 0:
+                parent = HighlightRegistry.instance().get_tokenizer(state_stack[root - 1].lang_id)
+                if parent is not None and parent is not self:
+                    marker = self._find_marker(line, state_stack[root].end_condition, pos)
+                    if marker >= 0:
+                        endpos = marker
+                    else:
+                        parent = None
+
+            if (
+                top is not None
+                and top.lang_id == self._lang_id
+                and top.end_condition is None
+                and top.sub_state
+            ):
+                rest, style = self._continuations[top.sub_state]
+                match = rest.match(line, pos, endpos)
+                if match is None:
+                    if endpos > pos:
+                        out.extend((pos, endpos - pos, style))
+                    if parent is not None:
+                        return self._hand_over(parent, line, endpos, state_stack[:root + 1], out)
+                    return state_stack
+                out.extend((pos, match.end() - pos, style))
+                pos = match.end()
+                state_stack = state_stack[:-1]
+
+            embed = None
+            words = self._words
+            get = words.get
+            first = self._first
+            extend = out.extend
+            token = None
+            for token in self._findall(line, pos, endpos):
+                length = len(token)
+                style = get(token)
+                if style is None:
+                    style = first[token[0]]
+                    if style == _CHECK:
+                        construct = self._resolve(token, line, pos, endpos)
+                        if construct is None:
+                            style = self._plain_style(token)
+                        else:
+                            style = construct.style
+                            embed = construct.embed
+                if style >= 0:
+                    extend((pos, length, style))
+                pos += length
+                if embed is not None:
+                    break
+
+            if embed is not None:
+                state_stack = state_stack + (StackFrame(embed.lang_id, 0, embed.end),)
+                child = HighlightRegistry.instance().get_tokenizer(embed.lang_id)
+                if child is not None and child is not self:
+                    return self._hand_over(child, line, pos, state_stack, out)
+                continue
+
+            if parent is not None:
+                return self._hand_over(parent, line, endpos, state_stack[:root + 1], out)
+
+            if token is not None and first[token[0]] == _CHECK:
+                construct = self._resolve(token, line, pos - len(token), endpos)
+                if construct is not None and construct.state:
+                    if not construct.closed.fullmatch(token):
+                        new_frame = StackFrame(self._lang_id, construct.state, None)
+                        state_stack = state_stack + (new_frame,)
+            return state_stack
@@ -1,7 +1,15 @@
-from editor.highlighters.core.types import (
-    Token, StateStack, TokenizeResult, StyleId, StackFrame
+from array import array
+
+from editor.highlighters.core.types import StateStack, StyleId, StackFrame
+from editor.highlighters.tokenizers.base_tokenizer import PackedTokenizer
+from editor.highlighters.tokenizers.scanner import (
+    alternation,
+    first_char_styles,
+    master_regex,
+    quoted,
+    scan,
+    word_styles,
 )
-from editor.highlighters.tokenizers.base_tokenizer import BaseTokenizer
 
 STATE_DEFAULT = 0
 STATE_BLOCK_COMMENT = 1
@@ -27,12 +35,13 @@ OPERATORS: set[str] = {
 PUNCTUATION: set[str] = {"(", ")", "[", "]", "{", "}", ",", ";"}
 
 
-class JavaTokenizer(BaseTokenizer):
+class JavaTokenizer(PackedTokenizer):
     def get_lang_id(self) -> str:
         return "java"
 
-    def tokenize_line(self, line: str, state_stack: StateStack) -> TokenizeResult:
-        tokens: list[Token] = []
+    def tokenize_line_packed(
+        self, line: str, state_stack: StateStack, out: array
+    ) -> StateStack:
         i = 0
         n = len(line)
 
@@ -47,14 +56,14 @@ class JavaTokenizer(BaseTokenizer):
             while i < n:
                 if line[i:i+2] == "*/":
                     i += 2
-                    tokens.append(Token(start=start, length=i - start, style_id=StyleId.COMMENT))
+                    out.extend((start, i - start, StyleId.COMMENT))
                     state_stack = state_stack[:-1]
                     current_sub_state = STATE_DEFAULT
                     break
                 i += 1
             else:
-                tokens.append(Token(start=start, length=n - start, style_id=StyleId.COMMENT))
-                return TokenizeResult(tokens=tokens, final_stack=state_stack)
+                out.extend((start, n - start, StyleId.COMMENT))
+                return state_stack
 
         while i < n:
             ch = line[i]
@@ -64,7 +73,7 @@ class JavaTokenizer(BaseTokenizer):
                 continue
 
             if ch == '/' and i + 1 < n and line[i + 1] == '/':
-                tokens.append(Token(start=i, length=n - i, style_id=StyleId.COMMENT))
+                out.extend((i, n - i, StyleId.COMMENT))
                 break
 
             if ch == '/' and i + 1 < n and line[i + 1] in ('*',):
@@ -73,11 +82,11 @@ class JavaTokenizer(BaseTokenizer):
                 while i < n:
                     if line[i:i+2] == "*/":
                         i += 2
-                        tokens.append(Token(start=start, length=i - start, style_id=StyleId.COMMENT))
+                        out.extend((start, i - start, StyleId.COMMENT))
                         break
                     i += 1
                 else:
-                    tokens.append(Token(start=start, length=n - start, style_id=StyleId.COMMENT))
+                    out.extend((start, n - start, StyleId.COMMENT))
                     new_frame = StackFrame(lang_id="java", sub_state=STATE_BLOCK_COMMENT, end_condition=None)
                     state_stack = state_stack + (new_frame,)
                 continue
@@ -87,7 +96,7 @@ class JavaTokenizer(BaseTokenizer):
                 i += 1
                 while i < n and (line[i].isalnum() or line[i] == '_'):
                     i += 1
-                tokens.append(Token(start=start, length=i - start, style_id=StyleId.IDENTIFIER))
+                out.extend((start, i - start, StyleId.IDENTIFIER))
                 continue
 
             if ch == '"':
@@ -101,7 +110,7 @@ class JavaTokenizer(BaseTokenizer):
                         break
                     else:
                         i += 1
-                tokens.append(Token(start=start, length=i - start, style_id=StyleId.STRING))
+                out.extend((start, i - start, StyleId.STRING))
                 continue
 
             if ch == "'":
@@ -115,7 +124,7 @@ class JavaTokenizer(BaseTokenizer):
                         break
                     else:
                         i += 1
-                tokens.append(Token(start=start, length=i - start, style_id=StyleId.STRING))
+                out.extend((start, i - start, StyleId.STRING))
                 continue
 
             if ch.isdigit() or (ch == '.' and i + 1 < n and line[i + 1].isdigit()):
@@ -143,7 +152,7 @@ class JavaTokenizer(BaseTokenizer):
                             i += 1
                 if i < n and line[i] in 'fFdDlL':
                     i += 1
-                tokens.append(Token(start=start, length=i - start, style_id=StyleId.NUMBER))
+                out.extend((start, i - start, StyleId.NUMBER))
                 continue
 
             if ch.isalpha() or ch == '_':
@@ -152,33 +161,84 @@ class JavaTokenizer(BaseTokenizer):
                     i += 1
                 word = line[start:i]
                 if word in KEYWORDS:
-                    tokens.append(Token(start=start, length=i - start, style_id=StyleId.KEYWORD))
+                    out.extend((start, i - start, StyleId.KEYWORD))
                 else:
-                    tokens.append(Token(start=start, length=i - start, style_id=StyleId.IDENTIFIER))
+                    out.extend((start, i - start, StyleId.IDENTIFIER))
                 continue
 
-            if i + 3 <= n and line[i:i+4] in OPERATORS:
-                tokens.append(Token(start=i, length=4, style_id=StyleId.OPERATOR))
+            if i + 4 <= n and line[i:i+4] in OPERATORS:
+                out.extend((i, 4, StyleId.OPERATOR))
                 i += 4
                 continue
-            if i + 2 <= n and line[i:i+3] in OPERATORS:
-                tokens.append(Token(start=i, length=3, style_id=StyleId.OPERATOR))
+            if i + 3 <= n and line[i:i+3] in OPERATORS:
+                out.extend((i, 3, StyleId.OPERATOR))
                 i += 3
                 continue
             if i + 1 < n and line[i:i+2] in OPERATORS:
-                tokens.append(Token(start=i, length=2, style_id=StyleId.OPERATOR))
+                out.extend((i, 2, StyleId.OPERATOR))
                 i += 2
                 continue
             if ch in OPERATORS:
-                tokens.append(Token(start=i, length=1, style_id=StyleId.OPERATOR))
+                out.extend((i, 1, StyleId.OPERATOR))
                 i += 1
                 continue
 
             if ch in PUNCTUATION:
-                tokens.append(Token(start=i, length=1, style_id=StyleId.PUNCTUATION))
+                out.extend((i, 1, StyleId.PUNCTUATION))
                 i += 1
                 continue
 
             i += 1
 
-        return TokenizeResult(tokens=tokens, final_stack=state_stack)
+        return state_stack
+
+
+_TOKEN_RE = master_regex(
+    r"//.*",
+    r"/\*.*?\*/",
+    r"/\*.*",
+    r"@\w*",
+    quoted('"'),
+    quoted("'"),
+    r"(?:0[xX][\da-fA-F_]*|0[bB][01_]*|(?=\.?\d)[\d_]*(?:\.[\d_]*)?(?:[eE][+-]?[\d_]*)?)"
+    r"[fFdDlL]?",
+    r"[A-Za-z_]\w*",
+    alternation(OPERATORS),
+    alternation(PUNCTUATION),
+)
+
+_WORD_STYLES = word_styles(KEYWORDS, OPERATORS, PUNCTUATION)
+_FIRST_CHAR_STYLES = first_char_styles({"/": StyleId.COMMENT, "@": StyleId.IDENTIFIER})
+
+
+class JavaRegexTokenizer(JavaTokenizer):
+    """JavaTokenizer driven by one compiled master regex.
+
+    Produces the same tokens and states as JavaTokenizer, which still handles
+    lines containing non-ASCII characters.
+    """
+
+    def tokenize_line_packed(
+        self, line: str, state_stack: StateStack, out: array
+    ) -> StateStack:
+        if not line.isascii():
+            return super().tokenize_line_packed(line, state_stack, out)
+
+        pos = 0
+        if state_stack:
+            top_frame = state_stack[-1]
+            if top_frame.lang_id == "java" and top_frame.sub_state == STATE_BLOCK_COMMENT:
+                end = line.find("*/")
+                if end < 0:
+                    out.extend((0, len(line), StyleId.COMMENT))
+                    return state_stack
+                pos = end + 2
+                out.extend((0, pos, StyleId.COMMENT))
+                state_stack = state_stack[:-1]
+
+        last = scan(_TOKEN_RE.findall, line, pos, _WORD_STYLES, _FIRST_CHAR_STYLES, out)
+        if last is not None and last.startswith("/*") and (len(last) < 4 or not last.endswith("*/")):
+            new_frame = StackFrame(lang_id="java", sub_state=STATE_BLOCK_COMMENT, end_condition=None)
+            state_stack = state_stack + (new_frame,)
+
+        return state_stack
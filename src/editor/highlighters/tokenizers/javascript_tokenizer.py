@@ -1,7 +1,15 @@
-from editor.highlighters.core.types import (
-    Token, StateStack, TokenizeResult, StyleId, StackFrame
+import re
+from array import array
+
+from editor.highlighters.core.types import StateStack, StyleId, StackFrame
+from editor.highlighters.tokenizers.base_tokenizer import PackedTokenizer
+from editor.highlighters.tokenizers.scanner import (
+    alternation,
+    first_char_styles,
+    master_regex,
+    quoted,
+    word_styles,
 )
-from editor.highlighters.tokenizers.base_tokenizer import BaseTokenizer
 
 STATE_DEFAULT = 0
 STATE_BLOCK_COMMENT = 1
@@ -31,12 +39,14 @@ OPERATORS: set[str] = {
 PUNCTUATION: set[str] = {"(", ")", "[", "]", "{", "}", ",", ".", ";"}
 
 
-class JavaScriptTokenizer(BaseTokenizer):
+class JavaScriptTokenizer(PackedTokenizer):
     def get_lang_id(self) -> str:
         return "javascript"
 
-    def tokenize_line(self, line: str, state_stack: StateStack) -> TokenizeResult:
-        tokens: list[Token] = []
+    def tokenize_line_packed(
+        self, line: str, state_stack: StateStack, out: array
+    ) -> StateStack:
+        base = len(out)
         i = 0
         n = len(line)
 
@@ -47,15 +57,14 @@ class JavaScriptTokenizer(BaseTokenizer):
                 current_sub_state = top_frame.sub_state
 
         if current_sub_state == STATE_BLOCK_COMMENT:
-            i = self._continue_block_comment(line, i, tokens, state_stack)
+            i, state_stack = self._continue_block_comment(line, i, out, state_stack)
             if i >= n:
-                return TokenizeResult(tokens=tokens, final_stack=state_stack)
-            state_stack = state_stack[:-1]
+                return state_stack
 
         if current_sub_state == STATE_TEMPLATE_STRING:
-            i, state_stack = self._continue_template_string(line, i, tokens, state_stack)
+            i, state_stack = self._continue_template_string(line, i, out, state_stack)
             if i >= n:
-                return TokenizeResult(tokens=tokens, final_stack=state_stack)
+                return state_stack
 
         while i < n:
             ch = line[i]
@@ -65,7 +74,7 @@ class JavaScriptTokenizer(BaseTokenizer):
                 continue
 
             if line[i:i+2] == '//':
-                tokens.append(Token(start=i, length=n - i, style_id=StyleId.COMMENT))
+                out.extend((i, n - i, StyleId.COMMENT))
                 break
 
             if line[i:i+2] == '/*':
@@ -74,11 +83,11 @@ class JavaScriptTokenizer(BaseTokenizer):
                 while i < n:
                     if line[i:i+2] == '*/':
                         i += 2
-                        tokens.append(Token(start=start, length=i - start, style_id=StyleId.COMMENT))
+                        out.extend((start, i - start, StyleId.COMMENT))
                         break
                     i += 1
                 else:
-                    tokens.append(Token(start=start, length=n - start, style_id=StyleId.COMMENT))
+                    out.extend((start, n - start, StyleId.COMMENT))
                     new_frame = StackFrame(lang_id="javascript", sub_state=STATE_BLOCK_COMMENT, end_condition=None)
                     state_stack = state_stack + (new_frame,)
                 continue
@@ -92,11 +101,11 @@ class JavaScriptTokenizer(BaseTokenizer):
                         continue
                     if line[i] == '`':
                         i += 1
-                        tokens.append(Token(start=start, length=i - start, style_id=StyleId.STRING))
+                        out.extend((start, i - start, StyleId.STRING))
                         break
                     i += 1
                 else:
-                    tokens.append(Token(start=start, length=n - start, style_id=StyleId.STRING))
+                    out.extend((start, n - start, StyleId.STRING))
                     new_frame = StackFrame(lang_id="javascript", sub_state=STATE_TEMPLATE_STRING, end_condition=None)
                     state_stack = state_stack + (new_frame,)
                 continue
@@ -113,14 +122,14 @@ class JavaScriptTokenizer(BaseTokenizer):
                         break
                     else:
                         i += 1
-                tokens.append(Token(start=start, length=i - start, style_id=StyleId.STRING))
+                out.extend((start, i - start, StyleId.STRING))
                 continue
 
-            if ch == '/' and self._can_start_regex(tokens):
+            if ch == '/' and self._can_start_regex(out, base):
                 result = self._try_parse_regex(line, i)
                 if result is not None:
                     length = result
-                    tokens.append(Token(start=i, length=length, style_id=StyleId.STRING))
+                    out.extend((i, length, StyleId.STRING))
                     i += length
                     continue
 
@@ -153,7 +162,7 @@ class JavaScriptTokenizer(BaseTokenizer):
                             i += 1
                 if i < n and line[i] == 'n':
                     i += 1
-                tokens.append(Token(start=start, length=i - start, style_id=StyleId.NUMBER))
+                out.extend((start, i - start, StyleId.NUMBER))
                 continue
 
             if ch.isalpha() or ch == '_' or ch == '$':
@@ -162,51 +171,54 @@ class JavaScriptTokenizer(BaseTokenizer):
                     i += 1
                 word = line[start:i]
                 if word in KEYWORDS:
-                    tokens.append(Token(start=start, length=i - start, style_id=StyleId.KEYWORD))
+                    out.extend((start, i - start, StyleId.KEYWORD))
                 else:
-                    tokens.append(Token(start=start, length=i - start, style_id=StyleId.IDENTIFIER))
+                    out.extend((start, i - start, StyleId.IDENTIFIER))
                 continue
 
-            if i + 3 <= n and line[i:i+4] in OPERATORS:
-                tokens.append(Token(start=i, length=4, style_id=StyleId.OPERATOR))
+            if i + 4 <= n and line[i:i+4] in OPERATORS:
+                out.extend((i, 4, StyleId.OPERATOR))
                 i += 4
                 continue
-            if i + 2 <= n and line[i:i+3] in OPERATORS:
-                tokens.append(Token(start=i, length=3, style_id=StyleId.OPERATOR))
+            if i + 3 <= n and line[i:i+3] in OPERATORS:
+                out.extend((i, 3, StyleId.OPERATOR))
                 i += 3
                 continue
             if i + 1 < n and line[i:i+2] in OPERATORS:
-                tokens.append(Token(start=i, length=2, style_id=StyleId.OPERATOR))
+                out.extend((i, 2, StyleId.OPERATOR))
                 i += 2
                 continue
             if ch in OPERATORS:
-                tokens.append(Token(start=i, length=1, style_id=StyleId.OPERATOR))
+                out.extend((i, 1, StyleId.OPERATOR))
                 i += 1
                 continue
 
             if ch in PUNCTUATION:
-                tokens.append(Token(start=i, length=1, style_id=StyleId.PUNCTUATION))
+                out.extend((i, 1, StyleId.PUNCTUATION))
                 i += 1
                 continue
 
             i += 1
 
-        return TokenizeResult(tokens=tokens, final_stack=state_stack)
+        return state_stack
 
-    def _continue_block_comment(self, line: str, i: int, tokens: list[Token], state_stack: StateStack) -> int:
+    def _continue_block_comment(
+        self, line: str, i: int, out: array, state_stack: StateStack
+    ) -> tuple[int, StateStack]:
         n = len(line)
         start = i
         while i < n:
             if line[i:i+2] == '*/':
                 i += 2
-                tokens.append(Token(start=start, length=i - start, style_id=StyleId.COMMENT))
-                return i
+                out.extend((start, i - start, StyleId.COMMENT))
+                state_stack = state_stack[:-1]
+                return i, state_stack
             i += 1
-        tokens.append(Token(start=start, length=n - start, style_id=StyleId.COMMENT))
-        return n
+        out.extend((start, n - start, StyleId.COMMENT))
+        return n, state_stack
 
     def _continue_template_string(
-        self, line: str, i: int, tokens: list[Token], state_stack: StateStack
+        self, line: str, i: int, out: array, state_stack: StateStack
     ) -> tuple[int, StateStack]:
         n = len(line)
         start = i
@@ -216,18 +228,17 @@ class JavaScriptTokenizer(BaseTokenizer):
                 continue
             if line[i] == '`':
                 i += 1
-                tokens.append(Token(start=start, length=i - start, style_id=StyleId.STRING))
+                out.extend((start, i - start, StyleId.STRING))
                 state_stack = state_stack[:-1]
                 return i, state_stack
             i += 1
-        tokens.append(Token(start=start, length=n - start, style_id=StyleId.STRING))
+        out.extend((start, n - start, StyleId.STRING))
         return n, state_stack
 
-    def _can_start_regex(self, tokens: list[Token]) -> bool:
-        if not tokens:
+    def _can_start_regex(self, out: array, base: int) -> bool:
+        if len(out) == base:
             return True
-        last_token = tokens[-1]
-        if last_token.style_id in (StyleId.OPERATOR, StyleId.PUNCTUATION, StyleId.KEYWORD):
+        if out[-1] in (StyleId.OPERATOR, StyleId.PUNCTUATION, StyleId.KEYWORD):
             return True
         return False
 
@@ -257,3 +268,114 @@ class JavaScriptTokenizer(BaseTokenizer):
                 return None
             j += 1
         return None
+
+
+_TEMPLATE_REST = r"(?:\\.|[^`\\])*`"
+
+_TOKEN_RE = master_regex(
+    r"//.*",
+    r"/\*.*?\*/",
+    r"/\*.*",
+    "`" + _TEMPLATE_REST,
+    r"`.*",
+    quoted('"'),
+    quoted("'"),
+    r"/(?![/*])(?:[^\\/\[\r\n]|\\.|\[(?:[^\\\]\r\n]|\\.)*\])*/[A-Za-z]*",
+    r"(?:0[xX][\da-fA-F_]*|0[bB][01_]*|0[oO][0-7_]*"
+    r"|(?=\.?\d)[\d_]*(?:\.[\d_]*)?(?:[eE][+-]?[\d_]*)?)n?",
+    r"[A-Za-z_$][\w$]*",
+    alternation(OPERATORS),
+    alternation(PUNCTUATION),
+)
+_TEMPLATE_RE = re.compile("`" + _TEMPLATE_REST, re.S)
+_TEMPLATE_REST_RE = re.compile(_TEMPLATE_REST, re.S)
+
+# Tokens starting with "/" that aren't operators are comments or regex
+# literals, told apart in the scan loop.
+_SLASH = -2
+
+_WORD_STYLES = word_styles(KEYWORDS, OPERATORS, PUNCTUATION)
+_FIRST_CHAR_STYLES = first_char_styles({"/": _SLASH, "`": StyleId.STRING}, "_$")
+_REGEX_PRECEDERS = (int(StyleId.OPERATOR), int(StyleId.PUNCTUATION), int(StyleId.KEYWORD))
+
+
+class JavaScriptRegexTokenizer(JavaScriptTokenizer):
+    """JavaScriptTokenizer driven by one compiled master regex.
+
+    Produces the same tokens and states as JavaScriptTokenizer, which still
+    handles lines containing non-ASCII characters. The master regex always
+    tries regex literals; one that follows a token a regex literal can't
+    follow is split back into a division operator and scanning resumes
+    after it.
+    """
+
+    def tokenize_line_packed(
+        self, line: str, state_stack: StateStack, out: array
+    ) -> StateStack:
+        if not line.isascii():
+            return super().tokenize_line_packed(line, state_stack, out)
+
+        pos = 0
+        regex_allowed = True
+        if state_stack:
+            top_frame = state_stack[-1]
+            if top_frame.lang_id == "javascript":
+                if top_frame.sub_state == STATE_BLOCK_COMMENT:
+                    end = line.find("*/")
+                    if end < 0:
+                        out.extend((0, len(line), StyleId.COMMENT))
+                        return state_stack
+                    pos = end + 2
+                    out.extend((0, pos, StyleId.COMMENT))
+                    state_stack = state_stack[:-1]
+                    regex_allowed = False
+                elif top_frame.sub_state == STATE_TEMPLATE_STRING:
+                    rest = _TEMPLATE_REST_RE.match(line)
+                    if rest is None:
+                        out.extend((0, len(line), StyleId.STRING))
+                        return state_stack
+                    pos = rest.end()
+                    out.extend((0, pos, StyleId.STRING))
+                    state_stack = state_stack[:-1]
+                    regex_allowed = False
+
+        extend = out.extend
+        get = _WORD_STYLES.get
+        first = _FIRST_CHAR_STYLES
+        findall = _TOKEN_RE.findall
+        while True:
+            token = None
+            for token in findall(line, pos):
+                length = len(token)
+                style = get(token)
+                if style is None:
+                    style = first[token[0]]
+                    if style == _SLASH:
+                        if token[1] in "/*":
+                            style = StyleId.COMMENT
+                        elif regex_allowed:
+                            style = StyleId.STRING
+                        else:
+                            length = 2 if line.startswith("/=", pos) else 1
+                            extend((pos, length, StyleId.OPERATOR))
+                            pos += length
+                            regex_allowed = True
+                            break
+                if style >= 0:
+                    extend((pos, length, style))
+                    regex_allowed = style in _REGEX_PRECEDERS
+                pos += length
+            else:
+                break
+
+        if token is not None:
+            if token.startswith("/*") and (len(token) < 4 or not token.endswith("*/")):
+                sub_state = STATE_BLOCK_COMMENT
+            elif token[0] == "`" and not _TEMPLATE_RE.fullmatch(token):
+                sub_state = STATE_TEMPLATE_STRING
+            else:
+                return state_stack
+            new_frame = StackFrame(lang_id="javascript", sub_state=sub_state, end_condition=None)
+            state_stack = state_stack + (new_frame,)
+
+        return state_stack
@@ -1,13 +1,16 @@
-from editor.highlighters.core.types import Token, StateStack, TokenizeResult, StyleId
-from editor.highlighters.tokenizers.base_tokenizer import BaseTokenizer
+from array import array
 
+from editor.highlighters.core.types import StateStack, StyleId
+from editor.highlighters.tokenizers.base_tokenizer import PackedTokenizer
 
-class JsonTokenizer(BaseTokenizer):
+
+class JsonTokenizer(PackedTokenizer):
     def get_lang_id(self) -> str:
         return "json"
 
-    def tokenize_line(self, line: str, state_stack: StateStack) -> TokenizeResult:
-        tokens: list[Token] = []
+    def tokenize_line_packed(
+        self, line: str, state_stack: StateStack, out: array
+    ) -> StateStack:
         i = 0
         n = len(line)
         expecting_value = False
@@ -42,11 +45,11 @@ class JsonTokenizer(BaseTokenizer):
                 else:
                     style = StyleId.STRING
 
-                tokens.append(Token(start=start, length=len(string_content), style_id=style))
+                out.extend((start, len(string_content), style))
                 continue
 
             if ch in '{}[]:,':
-                tokens.append(Token(start=i, length=1, style_id=StyleId.PUNCTUATION))
+                out.extend((i, 1, StyleId.PUNCTUATION))
                 if ch == ':':
                     expecting_value = True
                 elif ch in ',{}[]':
@@ -70,28 +73,28 @@ class JsonTokenizer(BaseTokenizer):
                         i += 1
                     while i < n and line[i].isdigit():
                         i += 1
-                tokens.append(Token(start=start, length=i - start, style_id=StyleId.NUMBER))
+                out.extend((start, i - start, StyleId.NUMBER))
                 expecting_value = False
                 continue
 
             if line[i:i+4] == 'true':
-                tokens.append(Token(start=i, length=4, style_id=StyleId.KEYWORD))
+                out.extend((i, 4, StyleId.KEYWORD))
                 i += 4
                 expecting_value = False
                 continue
 
             if line[i:i+5] == 'false':
-                tokens.append(Token(start=i, length=5, style_id=StyleId.KEYWORD))
+                out.extend((i, 5, StyleId.KEYWORD))
                 i += 5
                 expecting_value = False
                 continue
 
             if line[i:i+4] == 'null':
-                tokens.append(Token(start=i, length=4, style_id=StyleId.KEYWORD))
+                out.extend((i, 4, StyleId.KEYWORD))
                 i += 4
                 expecting_value = False
                 continue
 
             i += 1
 
-        return TokenizeResult(tokens=tokens, final_stack=state_stack)
+        return state_stack
@@ -1,7 +1,17 @@
-from editor.highlighters.core.types import (
-    Token, StateStack, TokenizeResult, StyleId, StackFrame
+import re
+from array import array
+
+from editor.highlighters.core.types import StateStack, StyleId, StackFrame
+from editor.highlighters.tokenizers.base_tokenizer import PackedTokenizer
+from editor.highlighters.tokenizers.scanner import (
+    alternation,
+    first_char_styles,
+    master_regex,
+    quoted,
+    scan,
+    triple_quoted,
+    word_styles,
 )
-from editor.highlighters.tokenizers.base_tokenizer import BaseTokenizer
 
 STATE_DEFAULT = 0
 STATE_TRIPLE_SINGLE = 1
@@ -27,12 +37,13 @@ OPERATORS: set[str] = {
 PUNCTUATION: set[str] = {"(", ")", "[", "]", "{", "}", ":", ",", ".", ";"}
 
 
-class PythonTokenizer(BaseTokenizer):
+class PythonTokenizer(PackedTokenizer):
     def get_lang_id(self) -> str:
         return "python"
 
-    def tokenize_line(self, line: str, state_stack: StateStack) -> TokenizeResult:
-        tokens: list[Token] = []
+    def tokenize_line_packed(
+        self, line: str, state_stack: StateStack, out: array
+    ) -> StateStack:
         i = 0
         n = len(line)
 
@@ -51,14 +62,14 @@ class PythonTokenizer(BaseTokenizer):
                     continue
                 if line[i:i+3] == delimiter:
                     i += 3
-                    tokens.append(Token(start=start, length=i - start, style_id=StyleId.STRING))
+                    out.extend((start, i - start, StyleId.STRING))
                     state_stack = state_stack[:-1]
                     current_sub_state = STATE_DEFAULT
                     break
                 i += 1
             else:
-                tokens.append(Token(start=start, length=n - start, style_id=StyleId.STRING))
-                return TokenizeResult(tokens=tokens, final_stack=state_stack)
+                out.extend((start, n - start, StyleId.STRING))
+                return state_stack
 
         while i < n:
             ch = line[i]
@@ -68,7 +79,7 @@ class PythonTokenizer(BaseTokenizer):
                 continue
 
             if ch == '#':
-                tokens.append(Token(start=i, length=n - i, style_id=StyleId.COMMENT))
+                out.extend((i, n - i, StyleId.COMMENT))
                 break
 
             if ch == '@':
@@ -76,7 +87,7 @@ class PythonTokenizer(BaseTokenizer):
                 i += 1
                 while i < n and (line[i].isalnum() or line[i] == '_' or line[i] == '.'):
                     i += 1
-                tokens.append(Token(start=start, length=i - start, style_id=StyleId.IDENTIFIER))
+                out.extend((start, i - start, StyleId.IDENTIFIER))
                 continue
 
             if ch in ('"', "'"):
@@ -91,11 +102,11 @@ class PythonTokenizer(BaseTokenizer):
                             continue
                         if line[i:i+3] == delimiter:
                             i += 3
-                            tokens.append(Token(start=start, length=i - start, style_id=StyleId.STRING))
+                            out.extend((start, i - start, StyleId.STRING))
                             break
                         i += 1
                     else:
-                        tokens.append(Token(start=start, length=n - start, style_id=StyleId.STRING))
+                        out.extend((start, n - start, StyleId.STRING))
                         new_frame = StackFrame(lang_id="python", sub_state=sub_state, end_condition=None)
                         state_stack = state_stack + (new_frame,)
                     continue
@@ -110,7 +121,7 @@ class PythonTokenizer(BaseTokenizer):
                             break
                         else:
                             i += 1
-                    tokens.append(Token(start=start, length=i - start, style_id=StyleId.STRING))
+                    out.extend((start, i - start, StyleId.STRING))
                     continue
 
             if ch.isdigit() or (ch == '.' and i + 1 < n and line[i + 1].isdigit()):
@@ -142,7 +153,7 @@ class PythonTokenizer(BaseTokenizer):
                             i += 1
                     if i < n and line[i] in 'jJ':
                         i += 1
-                tokens.append(Token(start=start, length=i - start, style_id=StyleId.NUMBER))
+                out.extend((start, i - start, StyleId.NUMBER))
                 continue
 
             if ch.isalpha() or ch == '_':
@@ -151,29 +162,96 @@ class PythonTokenizer(BaseTokenizer):
                     i += 1
                 word = line[start:i]
                 if word in KEYWORDS:
-                    tokens.append(Token(start=start, length=i - start, style_id=StyleId.KEYWORD))
+                    out.extend((start, i - start, StyleId.KEYWORD))
                 else:
-                    tokens.append(Token(start=start, length=i - start, style_id=StyleId.IDENTIFIER))
+                    out.extend((start, i - start, StyleId.IDENTIFIER))
                 continue
 
-            if i + 2 <= n and line[i:i+3] in OPERATORS:
-                tokens.append(Token(start=i, length=3, style_id=StyleId.OPERATOR))
+            if i + 3 <= n and line[i:i+3] in OPERATORS:
+                out.extend((i, 3, StyleId.OPERATOR))
                 i += 3
                 continue
             if i + 1 < n and line[i:i+2] in OPERATORS:
-                tokens.append(Token(start=i, length=2, style_id=StyleId.OPERATOR))
+                out.extend((i, 2, StyleId.OPERATOR))
                 i += 2
                 continue
             if ch in OPERATORS:
-                tokens.append(Token(start=i, length=1, style_id=StyleId.OPERATOR))
+                out.extend((i, 1, StyleId.OPERATOR))
                 i += 1
                 continue
 
             if ch in PUNCTUATION:
-                tokens.append(Token(start=i, length=1, style_id=StyleId.PUNCTUATION))
+                out.extend((i, 1, StyleId.PUNCTUATION))
                 i += 1
                 continue
 
             i += 1
 
-        return TokenizeResult(tokens=tokens, final_stack=state_stack)
+        return state_stack
+
+
+_TRIPLE_DOUBLE = '"' * 3
+_TRIPLE_SINGLE = "'" * 3
+_CLOSED_TRIPLE = (
+    _TRIPLE_DOUBLE + triple_quoted('"') + "|" + _TRIPLE_SINGLE + triple_quoted("'")
+)
+
+_TOKEN_RE = master_regex(
+    r"#.*",
+    r"@[\w.]*",
+    _CLOSED_TRIPLE,
+    _TRIPLE_DOUBLE + ".*",
+    _TRIPLE_SINGLE + ".*",
+    quoted('"'),
+    quoted("'"),
+    r"0[xX][\da-fA-F_]*|0[bB][01_]*|0[oO][0-7_]*"
+    r"|(?=\.?\d)[\d_]*(?:\.[\d_]*)?(?:[eE][+-]?[\d_]*)?[jJ]?",
+    r"[A-Za-z_]\w*",
+    alternation(OPERATORS),
+    alternation(PUNCTUATION),
+)
+_CLOSED_TRIPLE_RE = re.compile(_CLOSED_TRIPLE, re.S)
+_TRIPLE_REST_RE = {
+    STATE_TRIPLE_DOUBLE: re.compile(triple_quoted('"'), re.S),
+    STATE_TRIPLE_SINGLE: re.compile(triple_quoted("'"), re.S),
+}
+
+# "@" always starts a decorator, never the matrix multiplication operator.
+_WORD_STYLES = word_styles(KEYWORDS, OPERATORS, PUNCTUATION)
+_WORD_STYLES["@"] = int(StyleId.IDENTIFIER)
+_FIRST_CHAR_STYLES = first_char_styles({"#": StyleId.COMMENT, "@": StyleId.IDENTIFIER})
+
+
+class PythonRegexTokenizer(PythonTokenizer):
+    """PythonTokenizer driven by one compiled master regex.
+
+    Produces the same tokens and states as PythonTokenizer, which still
+    handles lines containing non-ASCII characters.
+    """
+
+    def tokenize_line_packed(
+        self, line: str, state_stack: StateStack, out: array
+    ) -> StateStack:
+        if not line.isascii():
+            return super().tokenize_line_packed(line, state_stack, out)
+
+        pos = 0
+        if state_stack:
+            top_frame = state_stack[-1]
+            if top_frame.lang_id == "python" and top_frame.sub_state in _TRIPLE_REST_RE:
+                rest = _TRIPLE_REST_RE[top_frame.sub_state].match(line)
+                if rest is None:
+                    out.extend((0, len(line), StyleId.STRING))
+                    return state_stack
+                pos = rest.end()
+                out.extend((0, pos, StyleId.STRING))
+                state_stack = state_stack[:-1]
+
+        last = scan(_TOKEN_RE.findall, line, pos, _WORD_STYLES, _FIRST_CHAR_STYLES, out)
+        if last is not None and last[:3] in (_TRIPLE_DOUBLE, _TRIPLE_SINGLE):
+            if not _CLOSED_TRIPLE_RE.fullmatch(last):
+                sub_state = STATE_TRIPLE_DOUBLE if last[0] == '"' else STATE_TRIPLE_SINGLE
+                new_frame = StackFrame(lang_id="python", sub_state=sub_state, end_condition=None)
+                state_stack = state_stack + (new_frame,)
+
+        return state_stack
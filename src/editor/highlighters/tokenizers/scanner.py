@@ -0,0 +1,102 @@
+"""Master-regex scanning shared by the compiled tokenizers.
+
+A compiled tokenizer describes its tokens as one alternation, in the same
+priority order its character-by-character tokenizer tests them, and wraps it
+with :func:`master_regex`. The result tiles a line completely: runs of
+whitespace and characters nothing else matches come back as tokens too, so
+``findall`` alone yields every token's text and the positions follow from
+the lengths. :func:`scan` then styles each token from a table of whole words
+(keywords, operators, punctuation) or, failing that, its first character.
+
+The fragments only need to agree with the character-by-character
+tokenizers on ASCII text; lines with other characters go to those instead.
+"""
+
+import re
+import string
+
+from editor.highlighters.core.types import PackedTokens, StyleId
+
+# First-character style of tokens that produce no output (whitespace and
+# unrecognised characters).
+SKIP = -1
+
+
+def alternation(words) -> str:
+    """Return a regex matching any of ``words``, longest first."""
+    return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+def quoted(quote: str) -> str:
+    """A string that may end unterminated, or on a lone trailing backslash."""
+    q = re.escape(quote)
+    return rf"{q}(?:[^{q}\\]|\\.)*[{q}\\]?"
+
+
+def triple_quoted(quote: str) -> str:
+    """Body of a triple-quoted string up to and including its closing quotes."""
+    delimiter = re.escape(quote * 3)
+    return rf"(?:\\.|(?!{delimiter})[^\\])*{delimiter}"
+
+
+def master_regex(*alternatives: str) -> re.Pattern:
+    """Join token patterns (without capturing groups) into a tiling regex."""
+    return re.compile("|".join(("[ \t\r\n]+",) + alternatives + (".",)), re.S)
+
+
+def word_styles(keywords, operators, punctuation) -> dict[str, int]:
+    """Styles of tokens recognised by their whole text (as plain ints).
+
+    Short runs of spaces or tabs are included so the most common unstyled
+    tokens are settled by a single lookup.
+    """
+    styles = dict.fromkeys(
+        [" " * n for n in range(1, 17)] + ["\t" * n for n in range(1, 5)], SKIP
+    )
+    styles.update(dict.fromkeys(punctuation, int(StyleId.PUNCTUATION)))
+    styles.update(dict.fromkeys(operators, int(StyleId.OPERATOR)))
+    styles.update(dict.fromkeys(keywords, int(StyleId.KEYWORD)))
+    return styles
+
+
+def first_char_styles(
+    overrides: dict[str, int], identifier_chars: str = "_"
+) -> dict[str, int]:
+    """Styles of the remaining tokens by first character, for ASCII lines.
+
+    Letters and ``identifier_chars`` start identifiers, digits and ``.``
+    numbers, quotes strings; ``overrides`` adds or replaces entries.
+    """
+    styles = dict.fromkeys(map(chr, range(128)), SKIP)
+    styles.update(dict.fromkeys(string.ascii_letters + identifier_chars, int(StyleId.IDENTIFIER)))
+    styles.update(dict.fromkeys(string.digits + ".", int(StyleId.NUMBER)))
+    styles.update(dict.fromkeys("\"'", int(StyleId.STRING)))
+    styles.update((char, int(style)) for char, style in overrides.items())
+    return styles
+
+
+def scan(
+    findall,
+    line: str,
+    pos: int,
+    words: dict[str, int],
+    first: dict[str, int],
+    out: PackedTokens,
+) -> str | None:
+    """Append the tokens ``findall`` finds in ``line`` from ``pos`` to ``out``.
+
+    Returns the text of the last token (styled or not), or None if there
+    were none, so callers can check whether it left a construct open.
+    """
+    extend = out.extend
+    get = words.get
+    token = None
+    for token in findall(line, pos):
+        length = len(token)
+        style = get(token)
+        if style is None:
+            style = first[token[0]]
+        if style >= 0:
+            extend((pos, length, style))
+        pos += length
+    return token
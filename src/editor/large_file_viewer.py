@@ -0,0 +1,163 @@
+"""Read-only viewer for files too large to load into the editor."""
+
+from PyQt6.QtCore import QPointF, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter, QTextLayout, QTextOption
+from PyQt6.QtWidgets import QAbstractScrollArea
+
+from editor.highlighters import pretokenizer
+from editor.highlighters.core.style_registry import StyleRegistry
+from editor.highlighters.core.types import StyleId
+from editor.models.mapped_file import MappedFile
+
+
+class LargeFileViewer(QAbstractScrollArea):
+    """Shows a MappedFile, materializing only the lines on screen.
+
+    The vertical scroll bar counts lines, so scrolling and ``goto_line``
+    look up one line offset in the file's sparse index no matter how big
+    the file is. Visible lines are highlighted with the language's
+    tokenizer starting from its default state; nothing above the viewport
+    is tokenized.
+    """
+
+    # Bytes indexed so far and the size of the file.
+    index_progress = pyqtSignal(int, int)
+
+    INDEX_POLL_MS = 100
+
+    def __init__(self, mapped_file: MappedFile, lang_id: str = "plain", parent=None) -> None:
+        super().__init__(parent)
+        self._file = mapped_file
+        self._lang_id = lang_id
+        self._style_registry = StyleRegistry.instance()
+        self._style_registry.theme_changed.connect(self._invalidate)
+        # Materialized, highlighted lines for the current viewport.
+        self._cached_range = (-1, 0)
+        self._cached_lines: list[tuple[str, list]] = []
+        self._max_width = 0
+
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(self.INDEX_POLL_MS)
+        self._poll_timer.timeout.connect(self._poll_index)
+
+        self._text_option = QTextOption()
+        self._text_option.setWrapMode(QTextOption.WrapMode.NoWrap)
+
+        self.verticalScrollBar().valueChanged.connect(self.viewport().update)
+        self.horizontalScrollBar().valueChanged.connect(self.viewport().update)
+
+        mapped_file.start_indexing()
+        self._update_scroll_range()
+        if not mapped_file.is_indexed:
+            self._poll_timer.start()
+
+    @property
+    def mapped_file(self) -> MappedFile:
+        return self._file
+
+    @property
+    def first_visible_line(self) -> int:
+        return self.verticalScrollBar().value()
+
+    def goto_line(self, line: int) -> None:
+        """Scroll so that ``line`` (1-based) is the first visible line."""
+        self.verticalScrollBar().setValue(max(0, line - 1))
+
+    def close_file(self) -> None:
+        """Stop indexing and release the file."""
+        self._poll_timer.stop()
+        self._style_registry.theme_changed.disconnect(self._invalidate)
+        self._file.close()
+
+    def _line_height(self) -> int:
+        return self.fontMetrics().lineSpacing()
+
+    def _visible_line_count(self) -> int:
+        return max(1, self.viewport().height() // self._line_height())
+
+    def _gutter_width(self) -> int:
+        digits = len(str(self._file.estimated_line_count()))
+        return 3 + self.fontMetrics().horizontalAdvance("9") * digits + 3
+
+    def _update_scroll_range(self) -> None:
+        lines = self._file.estimated_line_count()
+        bar = self.verticalScrollBar()
+        bar.setRange(0, max(0, lines - self._visible_line_count()))
+        bar.setPageStep(self._visible_line_count())
+        bar.setSingleStep(1)
+
+    def _poll_index(self) -> None:
+        self._update_scroll_range()
+        self.index_progress.emit(self._file.indexed_bytes, self._file.size)
+        if self._file.is_indexed:
+            self._poll_timer.stop()
+        if len(self._cached_lines) < self._visible_line_count():
+            self._invalidate()
+
+    def _invalidate(self) -> None:
+        self._cached_range = (-1, 0)
+        self.viewport().update()
+
+    def _visible_lines(self) -> list[tuple[str, list]]:
+        """Return ``(text, format ranges)`` for each visible line."""
+        first = self.first_visible_line
+        count = self._visible_line_count() + 1
+        if (first, count) != self._cached_range:
+            texts = self._file.lines(first, count)
+            results = pretokenizer.tokenize_lines(self._lang_id, texts)
+            table = self._style_registry.format_table
+            metrics = self.fontMetrics()
+            lines = []
+            for text, result in zip(texts, results):
+                tokens = result.tokens
+                formats = []
+                for i in range(0, len(tokens), 3):
+                    style = tokens[i + 2]
+                    if style == StyleId.PLAIN or style >= len(table) or not tokens[i + 1]:
+                        continue
+                    fmt = QTextLayout.FormatRange()
+                    fmt.start, fmt.length, fmt.format = tokens[i], tokens[i + 1], table[style]
+                    formats.append(fmt)
+                lines.append((text, formats))
+                self._max_width = max(self._max_width, metrics.horizontalAdvance(text))
+            self._cached_range = (first, count)
+            self._cached_lines = lines
+            bar = self.horizontalScrollBar()
+            width = self.viewport().width() - self._gutter_width()
+            bar.setRange(0, max(0, self._max_width - width))
+            bar.setPageStep(width)
+        return self._cached_lines
+
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        self._update_scroll_range()
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self.viewport())
+        rect = event.rect()
+        painter.fillRect(rect, self.palette().base())
+
+        gutter = self._gutter_width()
+        painter.fillRect(0, rect.top(), gutter, rect.height(), QColor(Qt.GlobalColor.lightGray).lighter(120))
+
+        line_height = self._line_height()
+        width = self.viewport().width()
+        height = self.viewport().height()
+        left = gutter + 4 - self.horizontalScrollBar().value()
+        first = self.first_visible_line
+        y = 0
+        for number, (text, formats) in enumerate(self._visible_lines(), first + 1):
+            painter.setPen(QColor(Qt.GlobalColor.darkGray))
+            painter.drawText(
+                0, y, gutter - 3, line_height, Qt.AlignmentFlag.AlignRight, str(number)
+            )
+            layout = QTextLayout(text, self.font())
+            layout.setTextOption(self._text_option)
+            layout.setFormats(formats)
+            layout.beginLayout()
+            layout.createLine()
+            layout.endLayout()
+            painter.setClipRect(gutter, 0, width - gutter, height)
+            layout.draw(painter, QPointF(left, y))
+            painter.setClipping(False)
+            y += line_height
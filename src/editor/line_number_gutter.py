@@ -0,0 +1,70 @@
+"""Line number painting for the editor's gutter."""
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor, QFont, QFontMetrics, QPainter, QPixmap
+
+
+class LineNumberGutter:
+    """Paints right-aligned line numbers from pre-rendered digit pixmaps.
+
+    The font metrics, colours and the ten digit glyphs are computed once
+    per font and device pixel ratio, so painting a number is one
+    ``drawPixmap`` per digit with no text layout and no pen changes.
+    """
+
+    PADDING = 3
+    BACKGROUND = QColor(Qt.GlobalColor.lightGray).lighter(120)
+    FOREGROUND = QColor(Qt.GlobalColor.darkGray)
+
+    def __init__(self, font: QFont, device_pixel_ratio: float = 1.0) -> None:
+        self._font = QFont()
+        self._device_pixel_ratio = 0.0
+        self._digits: list[QPixmap] = []
+        self._advances: list[int] = []
+        self.line_height = 0
+        self.digit_width = 0
+        self.set_font(font, device_pixel_ratio)
+
+    def set_font(self, font: QFont, device_pixel_ratio: float = 1.0) -> None:
+        """Re-render the digits if ``font`` or the pixel ratio changed."""
+        if font == self._font and device_pixel_ratio == self._device_pixel_ratio:
+            return
+        self._font = QFont(font)
+        self._device_pixel_ratio = device_pixel_ratio
+        metrics = QFontMetrics(font)
+        self.line_height = metrics.height()
+        self.digit_width = metrics.horizontalAdvance("9")
+        self._advances = [metrics.horizontalAdvance(str(d)) for d in range(10)]
+        self._digits = [self._render_digit(str(d), metrics) for d in range(10)]
+
+    def _render_digit(self, digit: str, metrics: QFontMetrics) -> QPixmap:
+        ratio = self._device_pixel_ratio
+        width = max(1, metrics.horizontalAdvance(digit))
+        pixmap = QPixmap(round(width * ratio), round(self.line_height * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        painter.setFont(self._font)
+        painter.setPen(self.FOREGROUND)
+        painter.drawText(0, metrics.ascent(), digit)
+        painter.end()
+        return pixmap
+
+    def width(self, digits: int) -> int:
+        """Return the gutter width needed for numbers of ``digits`` digits."""
+        return self.PADDING + self.digit_width * digits + self.PADDING
+
+    def fill(self, painter: QPainter, rect) -> None:
+        painter.fillRect(rect, self.BACKGROUND)
+
+    def draw_number(self, painter: QPainter, right: int, top: int, number: int) -> None:
+        """Draw ``number`` so that its last digit ends at ``right``."""
+        digits = self._digits
+        advances = self._advances
+        x = right
+        while True:
+            number, digit = divmod(number, 10)
+            x -= advances[digit]
+            painter.drawPixmap(x, top, digits[digit])
+            if not number:
+                break
@@ -1,13 +1,79 @@
-from typing import Optional
+import hashlib
+from typing import Callable, Optional, Tuple
+
+from editor.file_format import DEFAULT_FORMAT, FileFormat
+from editor.utf16 import utf16_len
+
+# Characters QTextDocument.toPlainText returns differently from how they
+# were inserted.
+_PLAIN_TEXT = str.maketrans({"\xa0": " ", "\u2028": "\n", "\u2029": "\n"})
+
+
+class ContentDigest:
+    """Incremental fingerprint of document text.
+
+    Text is encoded a slice at a time, so fingerprinting a large document,
+    or a file streamed in chunks, never holds a second full copy of it.
+    Feeding the same text in any split gives the same digest.
+    """
+
+    SLICE = 1 << 16
+
+    def __init__(self) -> None:
+        self._hash = hashlib.blake2b(digest_size=16)
+
+    def update(self, text: str, plain: bool = False) -> None:
+        """Add ``text``; ``plain`` normalizes it the way toPlainText would."""
+        if plain and not text.isascii():
+            text = text.translate(_PLAIN_TEXT)
+        for start in range(0, len(text), self.SLICE):
+            self._hash.update(text[start:start + self.SLICE].encode("utf-8", "surrogatepass"))
+
+    def digest(self) -> bytes:
+        return self._hash.digest()
+
+
+def content_digest(text: str) -> bytes:
+    """Return the ContentDigest of ``text``."""
+    digest = ContentDigest()
+    digest.update(text)
+    return digest.digest()
+
+
+def fingerprint(text: str) -> Tuple[int, bytes]:
+    """Return the length and digest DocumentModel compares ``text`` by.
+
+    Safe to call off the GUI thread, e.g. while a save is being written.
+    """
+    return utf16_len(text), content_digest(text)
 
 
 class DocumentModel:
-    """Model representing the current document state."""
+    """Model representing the current document state.
+
+    Modification is tracked by revision rather than by keeping a copy of
+    the text: every edit bumps the revision, and the document is
+    unmodified while the revision equals the saved one. Otherwise the
+    document can only be unmodified if its length equals the saved length,
+    and only then is the current content materialized and digested, at
+    most once per revision.
+
+    Lengths are in UTF-16 code units so that ``note_edit`` can be fed the
+    editor's own O(1) character count.
+    """
 
     def __init__(self):
         self._file_path: Optional[str] = None
-        self._original_content: str = ""
-        self._current_content: str = ""
+        self._file_format = DEFAULT_FORMAT
+        self._content_source: Optional[Callable[[], str]] = None
+        self._current_content: Optional[str] = ""
+        self._current_length = 0
+        self._revision = 0
+        self._saved_revision = 0
+        self._saved_length = 0
+        self._saved_digest = content_digest("")
+        self._digest_revision = -1
+        self._current_digest = b""
 
     @property
     def file_path(self) -> Optional[str]:
@@ -18,33 +84,107 @@ class DocumentModel:
         self._file_path = value
 
     @property
-    def original_content(self) -> str:
-        return self._original_content
+    def file_format(self) -> FileFormat:
+        """Encoding and newline style the file is written back with."""
+        return self._file_format
+
+    @file_format.setter
+    def file_format(self, value: FileFormat) -> None:
+        self._file_format = value
+
+    @property
+    def content_source(self) -> Optional[Callable[[], str]]:
+        """Callable returning the live text after ``note_edit`` calls."""
+        return self._content_source
+
+    @content_source.setter
+    def content_source(self, source: Optional[Callable[[], str]]) -> None:
+        self._content_source = source
+
+    @property
+    def revision(self) -> int:
+        return self._revision
 
     @property
     def current_content(self) -> str:
-        return self._current_content
+        """The current text, materialized from the content source if needed."""
+        if self._current_content is not None:
+            return self._current_content
+        if self._content_source is None:
+            return ""
+        return self._content_source()
 
     @current_content.setter
     def current_content(self, value: str) -> None:
-        self._current_content = value
+        self.set_content(value)
+
+    @property
+    def saved_fingerprint(self) -> Tuple[int, bytes]:
+        """The ``fingerprint`` of the text last marked as saved."""
+        return self._saved_length, self._saved_digest
 
     @property
     def is_modified(self) -> bool:
-        return self._current_content != self._original_content
+        if self._revision == self._saved_revision:
+            return False
+        if self._current_length != self._saved_length:
+            return True
+        return self._digest() != self._saved_digest
+
+    def _digest(self) -> bytes:
+        if self._digest_revision != self._revision:
+            self._current_digest = content_digest(self.current_content)
+            self._digest_revision = self._revision
+        return self._current_digest
+
+    def note_edit(self, length: int) -> None:
+        """Record an edit that left the live text ``length`` code units long.
+
+        The text itself is not copied; it is read from the content source
+        only if ``is_modified`` cannot be answered from the length alone.
+        """
+        self._revision += 1
+        self._current_length = length
+        self._current_content = None
 
     def set_content(self, content: str, mark_as_saved: bool = False) -> None:
         """Set document content. If mark_as_saved, also updates original content."""
+        self._revision += 1
+        self._current_length = utf16_len(content)
         self._current_content = content
         if mark_as_saved:
-            self._original_content = content
+            self.mark_saved()
+
+    def mark_saved(self, digest: Optional[bytes] = None) -> None:
+        """Mark current content as saved (original = current).
+
+        Args:
+            digest: ContentDigest of the current text, if the caller already
+                has it; otherwise the text is materialized and digested.
+        """
+        if digest is not None:
+            self._current_digest = digest
+            self._digest_revision = self._revision
+        self._saved_revision = self._revision
+        self._saved_length = self._current_length
+        self._saved_digest = self._digest()
+
+    def mark_saved_at(self, revision: int, length: int, digest: bytes) -> None:
+        """Record that the text of an earlier ``revision`` was saved.
+
+        Used when a save finishes after the user kept typing: the document
+        is unmodified again only if it returns to that text.
 
-    def mark_saved(self) -> None:
-        """Mark current content as saved (original = current)."""
-        self._original_content = self._current_content
+        Args:
+            revision: The revision the saved text was taken at.
+            length, digest: The saved text's ``fingerprint``.
+        """
+        self._saved_revision = revision
+        self._saved_length = length
+        self._saved_digest = digest
 
     def reset(self) -> None:
         """Reset the document to initial state."""
         self._file_path = None
-        self._original_content = ""
-        self._current_content = ""
+        self._file_format = DEFAULT_FORMAT
+        self.set_content("", mark_as_saved=True)
@@ -0,0 +1,156 @@
+import mmap
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Optional
+
+from editor.file_format import DEFAULT_FORMAT, FileFormat
+
+class MappedFile:
+    """A read-only, memory-mapped file with a sparse line index.
+
+    Nothing is read up front. A background thread counts the newlines in
+    each ``BLOCK_SIZE`` bytes of the file, so the index holds one integer
+    per block rather than one per line. Finding where a line starts is a
+    binary search over the blocks plus one scan of a single block, which
+    costs the same however large the file is.
+
+    Lines are decoded in the encoding of ``file_format``, and newlines are
+    looked for as that encoding writes them. A line longer than
+    ``MAX_LINE_BYTES`` is cut off, and where the next one starts comes from
+    the index, so one huge line is never scanned to its end.
+    """
+
+    BLOCK_SIZE = 1 << 15
+    # Lines are cut off after this many bytes when materialized.
+    MAX_LINE_BYTES = 1 << 14
+
+    def __init__(self, file_path: str, file_format: FileFormat = DEFAULT_FORMAT) -> None:
+        self._encoding = file_format.encoding
+        self._newline = "\n".encode(self._encoding)
+        self._carriage_return = "\r".encode(self._encoding)
+        # Where line 0 starts, past the byte order mark.
+        self._start = len("\ufeff".encode(self._encoding)) if file_format.bom else 0
+        self._file = open(file_path, "rb")
+        self._size = os.fstat(self._file.fileno()).st_size
+        self._map = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._size else b""
+        )
+        # _newlines_before[i] is the number of newlines before block i; a
+        # partial last block only counts towards _newline_count.
+        self._newlines_before = array("Q", [0])
+        self._newline_count = 0
+        self._indexed_bytes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def indexed_bytes(self) -> int:
+        """How much of the file the line index covers so far."""
+        return self._indexed_bytes
+
+    @property
+    def is_indexed(self) -> bool:
+        return self._indexed_bytes >= self._size
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines in the indexed part of the file."""
+        return self._newline_count + 1
+
+    def estimated_line_count(self) -> int:
+        """Number of lines, extrapolated from the index while it is built."""
+        if self.is_indexed or not self._indexed_bytes:
+            return self.line_count
+        return max(self.line_count, self.line_count * self._size // self._indexed_bytes)
+
+    def start_indexing(self) -> None:
+        """Build the line index on a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.build_index, daemon=True)
+            self._thread.start()
+
+    def build_index(self) -> None:
+        """Index the rest of the file on the calling thread."""
+        data = self._map
+        newlines_before = self._newlines_before
+        block = self.BLOCK_SIZE
+        start = self._indexed_bytes
+        total = self._newline_count
+        while start < self._size and not self._stop.is_set():
+            end = min(start + block, self._size)
+            total += data[start:end].count(self._newline)
+            if end - start == block:
+                newlines_before.append(total)
+            self._newline_count = total
+            self._indexed_bytes = end
+            start = end
+
+    def line_offset(self, line: int) -> Optional[int]:
+        """Return the byte offset where ``line`` (0-based) starts.
+
+        Returns None if the line is past the end of the indexed part.
+        """
+        if line <= 0:
+            return self._start
+        if line > self._newline_count:
+            return None
+        newlines_before = self._newlines_before
+        # The block holding the line-th newline.
+        block = bisect_left(newlines_before, line) - 1
+        start = block * self.BLOCK_SIZE
+        skip = line - newlines_before[block]
+        data = self._map[start:start + self.BLOCK_SIZE]
+        parts = data.split(self._newline, skip)
+        return start + len(data) - len(parts[-1])
+
+    def lines(self, first: int, count: int) -> list[str]:
+        """Materialize up to ``count`` lines starting at line ``first``."""
+        offset = self.line_offset(first)
+        result = []
+        if offset is None:
+            return result
+        data = self._map
+        limit = self._indexed_bytes
+        newline = self._newline
+        width = len(newline)
+        # Cut on a code unit boundary.
+        max_bytes = self.MAX_LINE_BYTES - self.MAX_LINE_BYTES % width
+        line = first
+        while len(result) < count:
+            end = data.find(newline, offset, min(limit, offset + max_bytes + width))
+            if end >= 0:
+                next_offset = end + width
+            else:
+                # A long line, or the last one indexed so far.
+                next_offset = self.line_offset(line + 1)
+                if next_offset is not None:
+                    end = next_offset - width
+                elif self.is_indexed:
+                    end = limit
+                else:
+                    break
+            raw = data[offset:min(end, offset + max_bytes)]
+            if raw.endswith(self._carriage_return):
+                raw = raw[:-len(self._carriage_return)]
+            result.append(raw.decode(self._encoding, "replace"))
+            if next_offset is None:
+                break
+            offset = next_offset
+            line += 1
+        return result
+
+    def close(self) -> None:
+        """Stop indexing and release the mapping."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
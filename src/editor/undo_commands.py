@@ -1,9 +1,149 @@
+import os
+import sys
+import tempfile
+import weakref
+import zlib
+
 from PyQt6.QtGui import QUndoCommand, QTextCursor
 
+from editor.utf16 import utf16_len
+
+
+def _description(verb: str, text: "str | UndoText") -> str:
+    if isinstance(text, UndoText):
+        # Restored from a journal: not read until it is needed.
+        return f"{verb} Text"
+    return f"{verb} '{text[:20]}...'" if len(text) > 20 else f"{verb} '{text}'"
+
+
+def _payload(text: "str | UndoText") -> "UndoText":
+    return text if isinstance(text, UndoText) else UndoText(text)
+
+
+def _has_line_break(text: str) -> bool:
+    # selectedText() returns block separators as U+2029.
+    return "\u2029" in text or "\n" in text
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class UndoText:
+    """Text an undo command puts back, held in memory, compressed or on disk.
+
+    It starts out as the str itself. When the undo history grows past its
+    memory budget (see ``UndoStack``), old payloads are :meth:`compress`-ed
+    and, if that is not enough, :meth:`spill`-ed to a temporary file that
+    is removed once the payload is gone. Payloads restored from an undo
+    journal are :meth:`stored` in the journal file and only read from it
+    when needed. :attr:`text` reads the text back in every case, and
+    :attr:`length` (in UTF-16 code units) is always at hand.
+
+    Commands accept an UndoText wherever they take text.
+    """
+
+    __slots__ = (
+        "_text", "_data", "_path", "_offset", "_size", "_compressed", "length", "__weakref__"
+    )
+
+    # Encoded text at least this long is compressed by :meth:`to_bytes`.
+    COMPRESS_MIN = 4096
+
+    def __init__(self, text: str) -> None:
+        self._text: str | None = text
+        self._data: bytes | None = None
+        self._path: str | None = None
+        self._offset = 0
+        self._size = 0
+        self._compressed = True
+        self.length = utf16_len(text)
+
+    @classmethod
+    def stored(cls, path: str, offset: int, size: int, length: int, compressed: bool) -> "UndoText":
+        """Text kept as ``size`` bytes at ``offset`` in the file ``path``.
+
+        The bytes are zlib data if ``compressed``, UTF-8 otherwise; ``length``
+        is the text's length in UTF-16 code units.
+        """
+        payload = cls("")
+        payload._text = None
+        payload._path = path
+        payload._offset = offset
+        payload._size = size
+        payload._compressed = compressed
+        payload.length = length
+        return payload
+
+    @property
+    def text(self) -> str:
+        if self._text is not None:
+            return self._text
+        data, compressed = self.to_bytes()
+        if compressed:
+            data = zlib.decompress(data)
+        return data.decode("utf-8", "surrogatepass")
+
+    def to_bytes(self) -> tuple[bytes, bool]:
+        """Return the payload encoded for disk, and whether it is compressed."""
+        if self._data is not None:
+            return self._data, True
+        if self._path is not None:
+            with open(self._path, "rb") as f:
+                f.seek(self._offset)
+                return f.read(self._size), self._compressed
+        data = self._text.encode("utf-8", "surrogatepass")
+        if len(data) >= self.COMPRESS_MIN:
+            return zlib.compress(data, 1), True
+        return data, False
+
+    @property
+    def memory_bytes(self) -> int:
+        """Approximate memory the payload holds."""
+        if self._text is not None:
+            return sys.getsizeof(self._text)
+        if self._data is not None:
+            return len(self._data)
+        return 0
+
+    @property
+    def disk_bytes(self) -> int:
+        return self._size if self._path is not None else 0
+
+    def compress(self) -> int:
+        """Compress the text in memory; returns the number of bytes freed."""
+        if self._text is None:
+            return 0
+        before = sys.getsizeof(self._text)
+        data = zlib.compress(self._text.encode("utf-8", "surrogatepass"), 1)
+        if len(data) >= before:
+            return 0
+        self._data = data
+        self._text = None
+        return before - len(data)
 
-def _utf16_len(text: str) -> int:
-    """Return the UTF-16 code unit length of a string (for Qt cursor positions)."""
-    return len(text.encode('utf-16-le')) // 2
+    def spill(self) -> int:
+        """Move the payload to a temporary file; returns the bytes freed."""
+        if self._path is not None:
+            return 0
+        before = self.memory_bytes
+        self.compress()
+        data = self._data
+        if data is None:
+            data = zlib.compress(self._text.encode("utf-8", "surrogatepass"), 1)
+        fd, path = tempfile.mkstemp(prefix="undo-", suffix=".z")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        weakref.finalize(self, _remove_file, path)
+        self._path = path
+        self._size = len(data)
+        self._compressed = True
+        self._text = None
+        self._data = None
+        return before
 
 
 class TextEditCommand(QUndoCommand):
@@ -14,12 +154,43 @@ class TextEditCommand(QUndoCommand):
     to the document before the command is pushed. The first call to redo()
     (which happens automatically on push) is skipped. Subsequent redo() calls
     after undo() will apply the change.
+
+    Commands created with ``typed_at`` (the ``time.monotonic()`` of the
+    keypress that made them) come from typing and report an :meth:`id`,
+    so QUndoStack merges a run of them into one step through
+    :meth:`mergeWith`, as long as each follows the previous one within
+    ``MERGE_WINDOW`` seconds. Other commands never merge.
     """
 
+    MERGE_WINDOW = 1.0
+
     def __init__(self, editor, description: str = "Text Edit"):
         super().__init__(description)
         self._editor = editor
         self._first_redo = True
+        # Set by UndoJournal when the command is recorded.
+        self.journal_serial = -1
+
+    @property
+    def editor(self):
+        """The editor whose cursor follows the command when it is replayed."""
+        return self._editor
+
+    @editor.setter
+    def editor(self, editor) -> None:
+        self._editor = editor
+
+    def payloads(self) -> tuple[UndoText, ...]:
+        """The text this command holds on to, for the undo memory budget."""
+        return ()
+
+    def delta(self) -> tuple[int, int] | None:
+        """``(start, end)`` of the change, as the undo journal records it.
+
+        Together with :meth:`payloads` this is all the journal stores.
+        None means the command cannot be journaled.
+        """
+        return None
 
     def _set_cursor_position(self, position: int):
         cursor = self._editor.textCursor()
@@ -28,12 +199,48 @@ class TextEditCommand(QUndoCommand):
 
 
 class InsertTextCommand(TextEditCommand):
-    """Command for inserting text (text already inserted before push)."""
+    """Command for inserting text (text already inserted before push).
+
+    Words are typed into a single command already (see CodeEditor). A
+    typed run of spaces and tabs merges with whatever is typed right after
+    it, as long as each piece continues where the previous one ended: the
+    word after a space, or the code after indentation, undoes together
+    with it, so typing prose takes one step per word. Every newline is a
+    step of its own.
+    """
+
+    ID = 1
 
-    def __init__(self, editor, text: str, position: int):
-        super().__init__(editor, f"Insert '{text[:20]}...' " if len(text) > 20 else f"Insert '{text}'")
-        self._text = text
+    def __init__(self, editor, text: str, position: int, typed_at: float | None = None):
+        super().__init__(editor, _description("Insert", text))
+        self._text = _payload(text)
         self._position = position
+        self._typed_at = typed_at
+
+    def payloads(self) -> tuple[UndoText, ...]:
+        return (self._text,)
+
+    def delta(self) -> tuple[int, int]:
+        return self._position, self._position
+
+    def id(self) -> int:
+        return -1 if self._typed_at is None else self.ID
+
+    def mergeWith(self, other: QUndoCommand) -> bool:
+        if not isinstance(other, InsertTextCommand) or other._typed_at is None:
+            return False
+        if other._typed_at - self._typed_at > self.MERGE_WINDOW:
+            return False
+        if other._position != self._position + self._text.length:
+            return False
+        text = self._text.text
+        added = other._text.text
+        if not text.isspace() or "\n" in text + added:
+            return False
+        self._text = UndoText(text + added)
+        self._typed_at = other._typed_at
+        self.setText(_description("Insert", text + added))
+        return True
 
     def redo(self):
         if self._first_redo:
@@ -41,25 +248,64 @@ class InsertTextCommand(TextEditCommand):
             return
         cursor = self._editor.textCursor()
         cursor.setPosition(self._position)
-        cursor.insertText(self._text)
+        cursor.insertText(self._text.text)
         self._editor.setTextCursor(cursor)
 
     def undo(self):
         cursor = self._editor.textCursor()
         cursor.setPosition(self._position)
-        cursor.setPosition(self._position + _utf16_len(self._text), QTextCursor.MoveMode.KeepAnchor)
+        cursor.setPosition(self._position + self._text.length, QTextCursor.MoveMode.KeepAnchor)
         cursor.removeSelectedText()
         self._editor.setTextCursor(cursor)
 
 
 class DeleteTextCommand(TextEditCommand):
-    """Command for deleting text (text already deleted before push)."""
+    """Command for deleting text (text already deleted before push).
+
+    Typed deletes merge into a run of Backspace presses (each ending where
+    the previous one started) or of Delete presses (all at the same
+    start). Deleting a line break always starts a new step.
+    """
+
+    ID = 2
 
-    def __init__(self, editor, start: int, end: int, deleted_text: str):
-        super().__init__(editor, f"Delete '{deleted_text[:20]}...'" if len(deleted_text) > 20 else f"Delete '{deleted_text}'")
+    def __init__(self, editor, start: int, end: int, deleted_text: str, typed_at: float | None = None):
+        super().__init__(editor, _description("Delete", deleted_text))
         self._start = start
         self._end = end
-        self._deleted_text = deleted_text
+        self._deleted_text = _payload(deleted_text)
+        self._typed_at = typed_at
+
+    def payloads(self) -> tuple[UndoText, ...]:
+        return (self._deleted_text,)
+
+    def delta(self) -> tuple[int, int]:
+        return self._start, self._end
+
+    def id(self) -> int:
+        return -1 if self._typed_at is None else self.ID
+
+    def mergeWith(self, other: QUndoCommand) -> bool:
+        if not isinstance(other, DeleteTextCommand) or other._typed_at is None:
+            return False
+        if other._typed_at - self._typed_at > self.MERGE_WINDOW:
+            return False
+        text = self._deleted_text.text
+        removed = other._deleted_text.text
+        if _has_line_break(text) or _has_line_break(removed):
+            return False
+        if other._end == self._start:
+            text = removed + text
+            self._start = other._start
+        elif other._start == self._start:
+            text = text + removed
+            self._end += other._end - other._start
+        else:
+            return False
+        self._deleted_text = UndoText(text)
+        self._typed_at = other._typed_at
+        self.setText(_description("Delete", text))
+        return True
 
     def redo(self):
         if self._first_redo:
@@ -67,14 +313,14 @@ class DeleteTextCommand(TextEditCommand):
             return
         cursor = self._editor.textCursor()
         cursor.setPosition(self._start)
-        cursor.setPosition(self._start + _utf16_len(self._deleted_text), QTextCursor.MoveMode.KeepAnchor)
+        cursor.setPosition(self._start + self._deleted_text.length, QTextCursor.MoveMode.KeepAnchor)
         cursor.removeSelectedText()
         self._editor.setTextCursor(cursor)
 
     def undo(self):
         cursor = self._editor.textCursor()
         cursor.setPosition(self._start)
-        cursor.insertText(self._deleted_text)
+        cursor.insertText(self._deleted_text.text)
         self._editor.setTextCursor(cursor)
 
 
@@ -84,8 +330,14 @@ class ReplaceTextCommand(TextEditCommand):
     def __init__(self, editor, start: int, end: int, old_text: str, new_text: str):
         super().__init__(editor, "Replace Text")
         self._start = start
-        self._old_text = old_text
-        self._new_text = new_text
+        self._old_text = _payload(old_text)
+        self._new_text = _payload(new_text)
+
+    def payloads(self) -> tuple[UndoText, ...]:
+        return (self._old_text, self._new_text)
+
+    def delta(self) -> tuple[int, int]:
+        return self._start, self._start + self._old_text.length
 
     def redo(self):
         if self._first_redo:
@@ -93,13 +345,13 @@ class ReplaceTextCommand(TextEditCommand):
             return
         cursor = self._editor.textCursor()
         cursor.setPosition(self._start)
-        cursor.setPosition(self._start + _utf16_len(self._old_text), QTextCursor.MoveMode.KeepAnchor)
-        cursor.insertText(self._new_text)
+        cursor.setPosition(self._start + self._old_text.length, QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText(self._new_text.text)
         self._editor.setTextCursor(cursor)
 
     def undo(self):
         cursor = self._editor.textCursor()
         cursor.setPosition(self._start)
-        cursor.setPosition(self._start + _utf16_len(self._new_text), QTextCursor.MoveMode.KeepAnchor)
-        cursor.insertText(self._old_text)
+        cursor.setPosition(self._start + self._new_text.length, QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText(self._old_text.text)
         self._editor.setTextCursor(cursor)
@@ -0,0 +1,364 @@
+"""Append-only on-disk undo history, one journal per file."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import struct
+import time
+from typing import Optional
+
+from PyQt6.QtCore import QStandardPaths
+
+from editor.undo_commands import (
+    DeleteTextCommand,
+    InsertTextCommand,
+    ReplaceTextCommand,
+    TextEditCommand,
+    UndoText,
+)
+
+# Record kinds.
+_PUSH = 1
+_AMEND = 2
+_UNDO = 3
+_REDO = 4
+_CHECKPOINT = 5
+# A step that could not be recorded; no step before it can be restored.
+_BARRIER = 6
+
+# Every record ends with the length of its body and its kind, so the
+# journal can be read backwards from the end.
+_FOOTER = struct.Struct("<IB")
+# PUSH and AMEND bodies: serial, command kind, start, end, payload count,
+# then one _TEXT header per payload, then the payload bytes.
+_COMMAND = struct.Struct("<QBQQB")
+# Compressed flag, byte size and UTF-16 length of one payload.
+_TEXT = struct.Struct("<BQQ")
+# CHECKPOINT bodies: next serial, text length, then the 16-byte digest.
+_CHECKPOINT_HEAD = struct.Struct("<QQ")
+
+_COMMAND_KINDS = (InsertTextCommand, DeleteTextCommand, ReplaceTextCommand)
+
+
+def _build(kind: int, editor, start: int, end: int, payloads: list[UndoText]) -> TextEditCommand:
+    command_class = _COMMAND_KINDS[kind]
+    if command_class is InsertTextCommand:
+        return InsertTextCommand(editor, payloads[0], start)
+    if command_class is DeleteTextCommand:
+        return DeleteTextCommand(editor, start, end, payloads[0])
+    return ReplaceTextCommand(editor, start, end, payloads[0], payloads[1])
+
+
+class UndoJournal:
+    """Records one file's undo history so it survives closing the file.
+
+    The journal is appended to as the history changes: a PUSH record for
+    every new step, an AMEND record with the whole merged step when a
+    command is merged into the previous one, UNDO and REDO markers, and a
+    CHECKPOINT with the length and digest of the text whenever the file is
+    saved. Payloads are written as UTF-8, compressed once they are large.
+    A run of merges is written as one AMEND when the next record comes, and
+    the file is only flushed at checkpoints, since nothing recorded after
+    the last one is ever restored. A step that cannot be journaled is
+    recorded as a BARRIER, past which restoring stops.
+
+    Opening the file again (:meth:`restore`) reads the journal backwards
+    from its last checkpoint, only until the undo stack's limit of steps is
+    found, so open time does not grow with the length of the history; the
+    restored steps' text is not read until they are undone. The redo steps
+    of the last session are not restored. Journals are keyed by the file's
+    path and only restored if the file still has the checkpoint's digest.
+
+    Whatever was recorded after the last checkpoint (edits that were never
+    saved) is cut off when the journal is closed or restored, and when the
+    part of the journal before the restored steps grows past
+    ``COMPACT_BYTES`` it is dropped by rewriting just the restored tail.
+
+    Journals hold the text of past edits, so they are only readable by
+    their owner. A journal does not know which file it is for, so the
+    journals of files that were deleted or renamed are found by age:
+    whenever a journal is restored, the others not written to for
+    ``MAX_AGE_DAYS`` are removed.
+    """
+
+    # Overrides where journals are kept (used by the tests).
+    DIRECTORY: Optional[str] = None
+    COMPACT_BYTES = 1 << 20
+    MAX_AGE_DAYS = 30
+
+    def __init__(self, file_path: str, next_serial: int = 0, checkpoint_end: int = 0) -> None:
+        self._file_path = file_path
+        self._journal_path = self.journal_path(file_path)
+        self._next_serial = next_serial
+        self._checkpoint_end = checkpoint_end
+        self._pending_checkpoint: Optional[tuple[int, bytes]] = None
+        # The step merges went into, until its AMEND is written.
+        self._pending_amend: Optional[TextEditCommand] = None
+        self._file = None
+
+    @classmethod
+    def directory(cls) -> str:
+        if cls.DIRECTORY is not None:
+            return cls.DIRECTORY
+        cache = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericCacheLocation)
+        return os.path.join(cache, "fart", "undo")
+
+    @classmethod
+    def journal_path(cls, file_path: str) -> str:
+        key = os.path.normcase(os.path.abspath(file_path)).encode("utf-8", "surrogatepass")
+        name = hashlib.blake2b(key, digest_size=16).hexdigest()
+        return os.path.join(cls.directory(), f"{name}.undo")
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    @classmethod
+    def restore(cls, file_path: str, fingerprint: tuple[int, bytes], editor) -> "UndoJournal":
+        """Push ``file_path``'s recorded history onto ``editor``'s undo stack.
+
+        ``fingerprint`` is the length and digest of the text just opened.
+        The history is only restored if it matches the journal's last
+        checkpoint; otherwise the journal is discarded. Returns the journal
+        to keep recording into.
+        """
+        journal_path = cls.journal_path(file_path)
+        cls.prune(keep=journal_path)
+        stack = editor.undo_stack
+        tail = None
+        try:
+            with open(journal_path, "r+b") as f:
+                tail = _read_tail(f, stack.undoLimit() or None)
+                if tail is not None and tail.fingerprint == fingerprint:
+                    f.truncate(tail.end)
+                else:
+                    tail = None
+            if tail is None:
+                os.remove(journal_path)
+        except OSError:
+            pass
+
+        if tail is None:
+            journal = cls(file_path)
+            journal._pending_checkpoint = fingerprint
+            return journal
+
+        shift = 0
+        if tail.start > cls.COMPACT_BYTES:
+            _compact(journal_path, tail)
+            shift = tail.start
+        journal = cls(file_path, tail.next_serial, tail.end - shift)
+        for serial, kind, start, end, payloads in tail.steps:
+            command = _build(kind, editor, start, end, [
+                UndoText.stored(journal_path, offset - shift, size, length, compressed)
+                for offset, size, length, compressed in payloads
+            ])
+            command.journal_serial = serial
+            stack.push(command)
+        return journal
+
+    @classmethod
+    def prune(cls, keep: Optional[str] = None) -> None:
+        """Remove journals, other than ``keep``, unused for ``MAX_AGE_DAYS``."""
+        cutoff = time.time() - cls.MAX_AGE_DAYS * 86400
+        try:
+            entries = list(os.scandir(cls.directory()))
+        except OSError:
+            return
+        for entry in entries:
+            if not entry.name.endswith(".undo") or entry.path == keep:
+                continue
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    @classmethod
+    def start(cls, file_path: str, stack, fingerprint: tuple[int, bytes]) -> "UndoJournal":
+        """Start a new journal for ``file_path`` with ``stack``'s applied steps.
+
+        Used when a document is first saved under ``file_path``. Any older
+        journal for that path is replaced.
+        """
+        journal = cls(file_path)
+        try:
+            journal._file = _open_private(journal._journal_path, os.O_TRUNC)
+        except OSError:
+            journal._file = None
+            return journal
+        for index in range(stack.index()):
+            journal.record_push(stack.command(index))
+        journal.checkpoint(fingerprint)
+        return journal
+
+    def record_push(self, command, merged: bool = False) -> None:
+        """Record a new step, or the step ``command`` was merged into."""
+        if type(command) not in _COMMAND_KINDS or command.delta() is None:
+            if not merged:
+                self._write(_BARRIER, b"")
+            return
+        if merged and command.journal_serial >= 0:
+            self._pending_amend = command
+            return
+        command.journal_serial = self._next_serial
+        self._next_serial += 1
+        self._write(_PUSH, _command_body(command))
+
+    def record_undo(self) -> None:
+        self._write(_UNDO, b"")
+
+    def record_redo(self) -> None:
+        self._write(_REDO, b"")
+
+    def checkpoint(self, fingerprint: tuple[int, bytes]) -> None:
+        """Record that the text with ``fingerprint`` was saved here."""
+        length, digest = fingerprint
+        self._pending_checkpoint = None
+        self._write(_CHECKPOINT, _CHECKPOINT_HEAD.pack(self._next_serial, length) + digest)
+        if self._file is not None:
+            self._file.flush()
+            self._checkpoint_end = self._file.tell()
+
+    def close(self) -> None:
+        """Stop recording, cutting off whatever was not saved."""
+        self._pending_amend = None
+        if self._file is None:
+            return
+        self._file.flush()
+        self._file.truncate(self._checkpoint_end)
+        self._file.close()
+        self._file = None
+
+    def _write(self, kind: int, body: bytes) -> None:
+        if self._pending_amend is not None:
+            command, self._pending_amend = self._pending_amend, None
+            self._write(_AMEND, _command_body(command))
+        if self._file is None and not self._open():
+            return
+        self._file.write(body + _FOOTER.pack(len(body), kind))
+
+    def _open(self) -> bool:
+        pending = self._pending_checkpoint
+        self._pending_checkpoint = None
+        try:
+            self._file = _open_private(self._journal_path, os.O_APPEND)
+        except OSError:
+            return False
+        if pending is not None:
+            self.checkpoint(pending)
+        return True
+
+
+def _command_body(command: TextEditCommand) -> bytes:
+    """Serialize ``command`` as a PUSH or AMEND body."""
+    start, end = command.delta()
+    encoded = [payload.to_bytes() for payload in command.payloads()]
+    parts = [_COMMAND.pack(
+        command.journal_serial, _COMMAND_KINDS.index(type(command)), start, end, len(encoded)
+    )]
+    for payload, (data, compressed) in zip(command.payloads(), encoded):
+        parts.append(_TEXT.pack(compressed, len(data), payload.length))
+    parts.extend(data for data, _ in encoded)
+    return b"".join(parts)
+
+
+def _open_private(path: str, flags: int):
+    """Open ``path`` for binary writing, creating it and its directory owner-only.
+
+    ``flags`` is ``os.O_TRUNC`` or ``os.O_APPEND``.
+    """
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | flags, 0o600)
+    return open(fd, "ab" if flags & os.O_APPEND else "wb")
+
+
+class _Tail:
+    """What :func:`_read_tail` found before the journal's last checkpoint."""
+
+    def __init__(self, fingerprint, next_serial, end):
+        self.fingerprint = fingerprint
+        self.next_serial = next_serial
+        # Offset just past the checkpoint.
+        self.end = end
+        # Offset of the oldest record needed for the restored steps.
+        self.start = end
+        # Oldest first: (serial, kind, start, end, payloads), where each
+        # payload is (offset, size, UTF-16 length, compressed).
+        self.steps = []
+
+
+def _read_tail(f, limit: Optional[int]) -> Optional[_Tail]:
+    """Read the steps applied at the last checkpoint, newest first, up to ``limit``."""
+    position = f.seek(0, os.SEEK_END)
+    tail = None
+    while position > 0:
+        start, kind = _record_before(f, position)
+        if kind == _CHECKPOINT:
+            f.seek(start)
+            body = f.read(position - _FOOTER.size - start)
+            next_serial, length = _CHECKPOINT_HEAD.unpack_from(body)
+            tail = _Tail((length, body[_CHECKPOINT_HEAD.size:]), next_serial, position)
+            position = start
+            break
+        position = start
+    if tail is None:
+        return None
+
+    steps = []
+    # Undos seen (walking backwards) that have not been matched with the
+    # step they took back yet; a redo cancels one of them.
+    undone = 0
+    seen = set()
+    while position > 0 and (limit is None or len(steps) < limit):
+        start, kind = _record_before(f, position)
+        position = start
+        if kind == _UNDO:
+            undone += 1
+        elif kind == _REDO:
+            undone -= 1
+        elif kind == _BARRIER:
+            if undone > 0:
+                undone -= 1
+                continue
+            break
+        elif kind in (_PUSH, _AMEND):
+            f.seek(start)
+            head = f.read(_COMMAND.size)
+            serial, command_kind, begin, end, count = _COMMAND.unpack(head)
+            if serial in seen:
+                # An older version of a step already accounted for.
+                continue
+            seen.add(serial)
+            if undone > 0:
+                undone -= 1
+                continue
+            texts = [_TEXT.unpack(f.read(_TEXT.size)) for _ in range(count)]
+            offset = start + _COMMAND.size + count * _TEXT.size
+            payloads = []
+            for compressed, size, length in texts:
+                payloads.append((offset, size, length, bool(compressed)))
+                offset += size
+            steps.append((serial, command_kind, begin, end, payloads))
+            tail.start = start
+    steps.reverse()
+    tail.steps = steps
+    return tail
+
+
+def _record_before(f, position: int) -> tuple[int, int]:
+    """Return the start and kind of the record ending at ``position``."""
+    f.seek(position - _FOOTER.size)
+    size, kind = _FOOTER.unpack(f.read(_FOOTER.size))
+    return position - _FOOTER.size - size, kind
+
+
+def _compact(journal_path: str, tail: _Tail) -> None:
+    """Rewrite the journal as just the records from ``tail.start`` on."""
+    temp_path = journal_path + ".tmp"
+    with open(journal_path, "rb") as src, _open_private(temp_path, os.O_TRUNC) as dst:
+        src.seek(tail.start)
+        shutil.copyfileobj(src, dst)
+    os.replace(temp_path, journal_path)
@@ -0,0 +1,116 @@
+"""Undo history bounded by the memory its text payloads hold."""
+
+from __future__ import annotations
+
+from typing import NamedTuple, Optional
+
+from PyQt6.QtCore import QObject
+from PyQt6.QtGui import QUndoCommand, QUndoStack
+
+from editor.undo_commands import UndoText
+from editor.undo_journal import UndoJournal
+
+
+class UndoFootprint(NamedTuple):
+    # Bytes of undo text held in memory, raw or compressed.
+    memory: int
+    # Bytes of undo text left on disk: spilled, or restored from a journal.
+    disk: int
+
+
+class UndoStack(QUndoStack):
+    """A QUndoStack that keeps the text its commands hold under a budget.
+
+    The step limit still applies, but a single select-all paste can make
+    one step as large as the document, twice over. Whenever the text held
+    in memory may exceed ``memory_budget`` bytes, payloads are compressed,
+    oldest first, and if that is not enough they are spilled to temporary
+    files, again oldest first. Payloads smaller than ``MIN_PAYLOAD`` are
+    left alone. Undoing a compacted step reads its text back transparently.
+
+    Between checks the stack only adds up the size of what is pushed, an
+    upper bound since Qt drops old and redone steps on its own, so pushing
+    a keystroke stays O(1).
+
+    When ``journal`` is set (see ``UndoJournal``), every push, merge, undo
+    and redo is also recorded there. Clearing the stack closes the journal.
+    """
+
+    MEMORY_BUDGET = 32 * 1024 * 1024
+    MIN_PAYLOAD = 64 * 1024
+
+    def __init__(self, parent: Optional[QObject] = None, memory_budget: Optional[int] = None) -> None:
+        super().__init__(parent)
+        self._memory_budget = self.MEMORY_BUDGET if memory_budget is None else memory_budget
+        self._bound = 0
+        self.journal: Optional[UndoJournal] = None
+
+    @property
+    def memory_budget(self) -> int:
+        return self._memory_budget
+
+    @memory_budget.setter
+    def memory_budget(self, budget: int) -> None:
+        self._memory_budget = budget
+        self._bound = self.footprint().memory
+        self._compact()
+
+    def push(self, command: QUndoCommand) -> None:
+        super().push(command)
+        if self.journal is not None:
+            top = self.command(self.index() - 1)
+            self.journal.record_push(top, merged=top is not command)
+        self._bound += sum(payload.memory_bytes for payload in _payloads(command))
+        if self._bound > self._memory_budget:
+            self._bound = self.footprint().memory
+            self._compact()
+
+    def undo(self) -> None:
+        if self.journal is not None and self.canUndo():
+            self.journal.record_undo()
+        super().undo()
+
+    def redo(self) -> None:
+        if self.journal is not None and self.canRedo():
+            self.journal.record_redo()
+        super().redo()
+
+    def clear(self) -> None:
+        super().clear()
+        self._bound = 0
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def footprint(self) -> UndoFootprint:
+        """Return the bytes of undo text held in memory and on disk."""
+        memory = disk = 0
+        for payload in self._payloads():
+            memory += payload.memory_bytes
+            disk += payload.disk_bytes
+        return UndoFootprint(memory=memory, disk=disk)
+
+    def _payloads(self) -> list[UndoText]:
+        """Payloads of every step, undone ones included, oldest first."""
+        return [
+            payload
+            for index in range(self.count())
+            for payload in _payloads(self.command(index))
+        ]
+
+    def _compact(self) -> None:
+        if self._bound <= self._memory_budget:
+            return
+        candidates = [
+            payload for payload in self._payloads() if payload.memory_bytes >= self.MIN_PAYLOAD
+        ]
+        for shrink in (UndoText.compress, UndoText.spill):
+            for payload in candidates:
+                if self._bound <= self._memory_budget:
+                    return
+                self._bound -= shrink(payload)
+
+
+def _payloads(command: QUndoCommand) -> tuple[UndoText, ...]:
+    payloads = getattr(command, "payloads", None)
+    return payloads() if payloads is not None else ()
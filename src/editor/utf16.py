@@ -0,0 +1,17 @@
+"""Lengths in UTF-16 code units, the unit Qt counts text positions in."""
+
+import re
+
+# Characters outside the BMP, which take two UTF-16 code units each.
+_ASTRAL = re.compile("[\U00010000-\U0010ffff]")
+
+
+def utf16_len(text: str) -> int:
+    """Return the UTF-16 code unit length of ``text``.
+
+    Counts the characters that need a surrogate pair instead of encoding
+    the text, so no copy is made; ASCII text is not scanned at all.
+    """
+    if text.isascii():
+        return len(text)
+    return len(text) + sum(1 for _ in _ASTRAL.finditer(text))
@@ -15,34 +15,58 @@ from PyQt6.QtWidgets import (
     QPushButton,
     QSplitter,
     QInputDialog,
+    QProgressBar,
+    QToolTip,
 )
-from PyQt6.QtGui import QAction, QCloseEvent, QShortcut, QKeySequence
-from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QAction, QCloseEvent, QShortcut, QKeySequence, QTextCursor
+from PyQt6.QtCore import QEvent, Qt
 
 from editor.sidebar import SidebarWidget
 
 from editor.highlighters.detector import LanguageDetector
-from editor.code_editor import CodeEditor
-from editor.models.document import DocumentModel
-from editor.controllers.file_controller import FileController
+from editor.document_tabs import DocumentTab, DocumentTabs
+from editor.large_file_viewer import LargeFileViewer
+
+
+class _CurrentTab:
+    """An attribute of the current DocumentTab, read and set through the window."""
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __get__(self, window, owner=None):
+        if window is None:
+            return self
+        return getattr(window._tab, self._name)
+
+    def __set__(self, window, value):
+        setattr(window._tab, self._name, value)
 
 
 class MainWindow(QMainWindow):
+    text_edit = _CurrentTab("editor")
+    highlighter = _CurrentTab("highlighter")
+    _document = _CurrentTab("document")
+    _controller = _CurrentTab("controller")
+    _saver = _CurrentTab("saver")
+    _highlight_scheduler = _CurrentTab("scheduler")
+    _loading = _CurrentTab("loading")
+    _loader = _CurrentTab("loader")
+    _viewer = _CurrentTab("viewer")
+    _editor_stack = _CurrentTab("stack")
+    _active_pane = _CurrentTab("active_pane")
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Text Editor 9000")
         self.resize(800, 600)
 
-        self._document = DocumentModel()
-        self._controller = FileController(self._document)
-        self.highlighter = None
-
+        self._tab = None
         self._setup_central_widget()
-        self._setup_highlighter()
-        self._setup_menu()
         self._setup_status_label()
+        self._add_tab()
+        self._setup_menu()
 
-        self.text_edit.textChanged.connect(self._mark_modified)
         self.sidebar.file_opened.connect(self._on_file_opened_from_tree)
         self.sidebar.open_folder_requested.connect(self.open_folder)
 
@@ -61,24 +85,18 @@ class MainWindow(QMainWindow):
     @_is_modified.setter
     def _is_modified(self, value):
         if value:
-            self._document._current_content = self.text_edit.toPlainText()
+            self._document.set_content(self.text_edit.toPlainText())
         else:
             self._document.mark_saved()
 
-    @property
-    def _original_content(self):
-        return self._document.original_content
-
-    @_original_content.setter
-    def _original_content(self, value):
-        self._document._original_content = value
-
     def _setup_central_widget(self):
         splitter = QSplitter(Qt.Orientation.Horizontal)
         self.sidebar = SidebarWidget()
         splitter.addWidget(self.sidebar)
-        self.text_edit = CodeEditor()
-        splitter.addWidget(self.text_edit)
+        self._tabs = DocumentTabs()
+        self._tabs.current_tab_changed.connect(self._on_current_tab_changed)
+        self._tabs.close_requested.connect(self.close_tab)
+        splitter.addWidget(self._tabs)
         splitter.setSizes([250, 550])
         self.setCentralWidget(splitter)
         
@@ -99,12 +117,50 @@ class MainWindow(QMainWindow):
             self.toggle_sidebar_button.setChecked(True)
         self.sidebar.focus_search()
 
-    def _setup_highlighter(self, file_path: str = "", content: str = ""):
-        if self.highlighter:
-            self.highlighter.setDocument(None)
-        self.highlighter = LanguageDetector.get_highlighter(
-            self.text_edit.document(), file_path, content
+    def _add_tab(self) -> DocumentTab:
+        """Open a new, empty tab and make it current."""
+        tab = DocumentTab(self)
+        tab.text_changed.connect(lambda: self._mark_modified(tab))
+        tab.saver.finished.connect(
+            lambda request, state, error: self._on_save_finished(tab, request, state, error)
         )
+        tab.setup_highlighter()
+        self._tabs.add_tab(tab)
+        return tab
+
+    def _on_current_tab_changed(self, tab: DocumentTab):
+        self._tab = tab
+        indexing = tab.viewer is not None and not tab.viewer.mapped_file.is_indexed
+        self._load_progress_action.setVisible(tab.loader is not None or indexing)
+        self._update_status(tab)
+        (tab.viewer or tab.active_pane).setFocus()
+
+    def close_tab(self, tab: DocumentTab | None = None):
+        """Close ``tab`` (the current one by default), asking to save changes.
+
+        Closing the last tab leaves a new, empty one.
+        """
+        tab = tab or self._tab
+        if not self._confirm_close(tab):
+            return
+        if self._tabs.count() == 1:
+            self._add_tab()
+        self._tabs.remove_tab(tab)
+
+    def _confirm_close(self, tab: DocumentTab) -> bool:
+        """Stop ``tab``'s background work and offer to save it; False to keep it open."""
+        tab.saver.wait()
+        self._cancel_loading(tab)
+        self._close_viewer(tab)
+        if not tab.document.is_modified:
+            return True
+        self._tabs.set_current_tab(tab)
+        result = self._prompt_save_changes()
+        if result == "save":
+            self.save_file()
+            tab.saver.wait()
+            return not tab.document.is_modified
+        return result != "cancel"
 
     def _setup_menu(self):
         menu_bar = self.menuBar()
@@ -137,6 +193,23 @@ class MainWindow(QMainWindow):
 
         file_menu.addSeparator()
 
+        close_tab_action = QAction("&Close Tab", self)
+        close_tab_action.setShortcut("Ctrl+W")
+        close_tab_action.triggered.connect(lambda: self.close_tab())
+        file_menu.addAction(close_tab_action)
+
+        next_tab_action = QAction("Next Tab", self)
+        next_tab_action.setShortcut("Ctrl+Tab")
+        next_tab_action.triggered.connect(lambda: self._cycle_tab(1))
+        file_menu.addAction(next_tab_action)
+
+        previous_tab_action = QAction("Previous Tab", self)
+        previous_tab_action.setShortcut("Ctrl+Shift+Tab")
+        previous_tab_action.triggered.connect(lambda: self._cycle_tab(-1))
+        file_menu.addAction(previous_tab_action)
+
+        file_menu.addSeparator()
+
         exit_action = QAction("E&xit", self)
         exit_action.setShortcut("Ctrl+Q")
         exit_action.triggered.connect(self.close)
@@ -146,38 +219,60 @@ class MainWindow(QMainWindow):
 
         undo_action = QAction("&Undo", self)
         undo_action.setShortcut("Ctrl+Z")
-        undo_action.triggered.connect(self.text_edit.undo)
+        undo_action.triggered.connect(lambda: self._active_pane.undo())
         edit_menu.addAction(undo_action)
 
         redo_action = QAction("&Redo", self)
         redo_action.setShortcut("Ctrl+Y")
-        redo_action.triggered.connect(self.text_edit.redo)
+        redo_action.triggered.connect(lambda: self._active_pane.redo())
         edit_menu.addAction(redo_action)
 
         edit_menu.addSeparator()
 
         cut_action = QAction("Cu&t", self)
         cut_action.setShortcut("Ctrl+X")
-        cut_action.triggered.connect(self.text_edit.cut)
+        cut_action.triggered.connect(lambda: self._active_pane.cut())
         edit_menu.addAction(cut_action)
 
         copy_action = QAction("&Copy", self)
         copy_action.setShortcut("Ctrl+C")
-        copy_action.triggered.connect(self.text_edit.copy)
+        copy_action.triggered.connect(lambda: self._active_pane.copy())
         edit_menu.addAction(copy_action)
 
         paste_action = QAction("&Paste", self)
         paste_action.setShortcut("Ctrl+V")
-        paste_action.triggered.connect(self.text_edit.paste)
+        paste_action.triggered.connect(lambda: self._active_pane.paste())
         edit_menu.addAction(paste_action)
 
         edit_menu.addSeparator()
 
         select_all_action = QAction("Select &All", self)
         select_all_action.setShortcut("Ctrl+A")
-        select_all_action.triggered.connect(self.text_edit.selectAll)
+        select_all_action.triggered.connect(lambda: self._active_pane.selectAll())
         edit_menu.addAction(select_all_action)
 
+        goto_line_action = QAction("&Go to Line...", self)
+        goto_line_action.setShortcut("Ctrl+G")
+        goto_line_action.triggered.connect(self._goto_line)
+        edit_menu.addAction(goto_line_action)
+
+        view_menu = menu_bar.addMenu("&View")
+
+        split_right_action = QAction("Split &Right", self)
+        split_right_action.setShortcut("Ctrl+\\")
+        split_right_action.triggered.connect(lambda: self._split(Qt.Orientation.Horizontal))
+        view_menu.addAction(split_right_action)
+
+        split_down_action = QAction("Split &Down", self)
+        split_down_action.setShortcut("Ctrl+Shift+\\")
+        split_down_action.triggered.connect(lambda: self._split(Qt.Orientation.Vertical))
+        view_menu.addAction(split_down_action)
+
+        close_pane_action = QAction("&Close Pane", self)
+        close_pane_action.setShortcut("Ctrl+Shift+W")
+        close_pane_action.triggered.connect(lambda: self._tab.close_pane())
+        view_menu.addAction(close_pane_action)
+
         help_menu = menu_bar.addMenu("&Help")
 
         shortcuts_action = QAction("&Keyboard Shortcuts", self)
@@ -206,8 +301,15 @@ class MainWindow(QMainWindow):
         self._status_label = QLabel("New")
         self._status_label.setStyleSheet("color: #1E90FF; font-weight: bold;")
         self._status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self._status_label.installEventFilter(self)
         toolbar.addWidget(self._status_label)
 
+        self._load_progress = QProgressBar()
+        self._load_progress.setFixedWidth(120)
+        self._load_progress.setRange(0, 100)
+        self._load_progress_action = toolbar.addWidget(self._load_progress)
+        self._load_progress_action.setVisible(False)
+
         right_spacer = QWidget()
         right_spacer.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
         toolbar.addWidget(right_spacer)
@@ -216,13 +318,205 @@ class MainWindow(QMainWindow):
         right_balance.setFixedWidth(28)
         toolbar.addWidget(right_balance)
 
-    def _mark_modified(self):
-        current_content = self.text_edit.toPlainText()
-        self._document.current_content = current_content
+    def _split(self, orientation: Qt.Orientation):
+        """Show the current document in another pane, unless it is still loading."""
+        if self._loader is not None or self._viewer is not None:
+            return
+        self._tab.split(orientation)
+
+    def _cycle_tab(self, step: int):
+        self._tabs.setCurrentIndex((self._tabs.currentIndex() + step) % self._tabs.count())
+
+    def _mark_modified(self, tab: DocumentTab):
+        tab.document.note_edit(tab.editor.document().characterCount() - 1)
+        if not tab.loading:
+            self._update_status(tab)
+
+    def _load_content(self, content: str):
+        """Show freshly opened ``content`` and mark it as the saved text."""
+        self._loading = True
+        try:
+            self.text_edit.setPlainText(content)
+        finally:
+            self._loading = False
+        self._document.mark_saved()
+
+    def _open_path(self, file_path: str) -> bool:
+        """Show ``file_path`` in a tab, switching to it if it is already open.
+
+        The file is opened in the current tab if that tab is empty and
+        untouched, otherwise in a new tab.
+        """
+        tab = self._tabs.find(file_path)
+        if tab is not None:
+            self._tabs.set_current_tab(tab)
+            return True
+        previous = self._tab
+        if not previous.is_pristine:
+            self._add_tab()
+        if self._load_path(file_path):
+            return True
+        if self._tab is not previous:
+            self._tabs.remove_tab(self._tab)
+            self._tabs.set_current_tab(previous)
+        return False
+
+    def _load_path(self, file_path: str) -> bool:
+        """Open ``file_path`` in the current tab, streaming it in if it is large.
+
+        Files too large to edit at all are shown in a read-only
+        LargeFileViewer instead.
+        """
+        self._close_viewer()
+        if self._controller.is_large_file(file_path):
+            return self._open_large_file(file_path)
+        if self._controller.should_stream(file_path):
+            return self._stream_file(file_path)
+
+        success, content, error_msg = self._controller.open_file(file_path)
+        if not success:
+            QMessageBox.critical(self, "Error", error_msg)
+            return False
+        self._tab.setup_highlighter(file_path, content)
+        self._load_content(content)
+        self._tab.open_journal()
+        self._highlight_scheduler.pretokenize(content)
         self._update_status()
+        return True
 
-    def _update_status(self):
-        if self._document.is_modified:
+    def _stream_file(self, file_path: str) -> bool:
+        loader, error_msg = self._controller.stream_file(file_path, self.text_edit.document())
+        if loader is None:
+            QMessageBox.critical(self, "Error", error_msg)
+            return False
+
+        tab = self._tab
+        tab.setup_highlighter(lang=LanguageDetector.detect_from_file(file_path))
+        tab.loading = True
+        tab.editor.clear()
+        tab.editor.setReadOnly(True)
+        tab.loader = loader
+        loader.setParent(tab)
+        loader.progress.connect(
+            lambda read, total: tab is self._tab and self._on_load_progress(read, total)
+        )
+        if tab.scheduler.begin_pretokenize_stream():
+            loader.chunk_loaded.connect(tab.scheduler.feed_pretokenize_stream)
+            loader.restarted.connect(tab.scheduler.begin_pretokenize_stream)
+        loader.finished.connect(lambda: self._on_load_finished(tab, file_path))
+        loader.failed.connect(lambda error: self._on_load_failed(tab, file_path, error))
+
+        self._status_label.setText("Loading")
+        self._status_label.setStyleSheet("color: #696969; font-weight: bold;")
+        self._load_progress.setValue(0)
+        self._load_progress_action.setVisible(True)
+        loader.start()
+        return True
+
+    def _open_large_file(self, file_path: str) -> bool:
+        mapped, error_msg = self._controller.open_mapped(file_path)
+        if mapped is None:
+            QMessageBox.critical(self, "Error", error_msg)
+            return False
+
+        tab = self._tab
+        self.text_edit.clear()
+        self._document.mark_saved()
+        tab.setup_highlighter()
+        self._viewer = LargeFileViewer(mapped, LanguageDetector.detect_from_file(file_path))
+        self._viewer.index_progress.connect(
+            lambda read, total: tab is self._tab and self._on_index_progress(read, total)
+        )
+        self._editor_stack.addWidget(self._viewer)
+        self._editor_stack.setCurrentWidget(self._viewer)
+        if not mapped.is_indexed:
+            self._load_progress.setValue(0)
+            self._load_progress_action.setVisible(True)
+        self._update_status()
+        return True
+
+    def _on_index_progress(self, bytes_read: int, total_bytes: int):
+        self._on_load_progress(bytes_read, total_bytes)
+        if bytes_read >= total_bytes:
+            self._load_progress_action.setVisible(False)
+
+    def _close_viewer(self, tab: DocumentTab | None = None):
+        """Leave large-file mode, releasing the mapped file."""
+        tab = tab or self._tab
+        if tab.viewer is None:
+            return
+        tab.viewer.close_file()
+        tab.stack.removeWidget(tab.viewer)
+        tab.viewer.deleteLater()
+        tab.viewer = None
+        tab.stack.setCurrentWidget(tab.panes)
+        if tab is self._tab:
+            self._load_progress_action.setVisible(False)
+        tab.document.reset()
+        self._update_status(tab)
+
+    def _goto_line(self):
+        if self._viewer is not None:
+            line_count = self._viewer.mapped_file.estimated_line_count()
+        else:
+            line_count = self._active_pane.blockCount()
+        line, ok = QInputDialog.getInt(self, "Go to Line", "Line:", 1, 1, line_count)
+        if not ok:
+            return
+        if self._viewer is not None:
+            self._viewer.goto_line(line)
+        else:
+            pane = self._active_pane
+            block = pane.document().findBlockByNumber(line - 1)
+            pane.setTextCursor(QTextCursor(block))
+            pane.centerCursor()
+
+    def _on_load_progress(self, bytes_read: int, total_bytes: int):
+        self._load_progress.setValue(bytes_read * 100 // max(1, total_bytes))
+
+    def _end_loading(self, tab: DocumentTab):
+        tab.loading = False
+        tab.loader = None
+        tab.editor.setReadOnly(False)
+        tab.editor.moveCursor(QTextCursor.MoveOperation.Start)
+        if tab is self._tab:
+            self._load_progress_action.setVisible(False)
+
+    def _on_load_finished(self, tab: DocumentTab, file_path: str):
+        tab.controller.finish_stream(file_path, tab.loader)
+        tab.scheduler.end_pretokenize_stream()
+        self._end_loading(tab)
+        tab.open_journal()
+        self._update_status(tab)
+
+    def _on_load_failed(self, tab: DocumentTab, file_path: str, error: Exception):
+        self._cancel_loading(tab)
+        QMessageBox.critical(self, "Error", tab.controller.open_error_message(file_path, error))
+
+    def _cancel_loading(self, tab: DocumentTab | None = None):
+        """Abandon a file that is still streaming in, leaving an empty document."""
+        tab = tab or self._tab
+        if tab.loader is None:
+            return
+        tab.loader.cancel()
+        self._end_loading(tab)
+        tab.editor.clear()
+        tab.document.reset()
+        tab.setup_highlighter()
+        self._update_status(tab)
+
+    def _update_status(self, tab: DocumentTab | None = None):
+        tab = tab or self._tab
+        self._tabs.update_tab(tab)
+        if tab is not self._tab:
+            return
+        if self._viewer is not None:
+            self._status_label.setText("Read-only")
+            self._status_label.setStyleSheet("color: #696969; font-weight: bold;")
+        elif self._saver.is_busy:
+            self._status_label.setText("Saving")
+            self._status_label.setStyleSheet("color: #696969; font-weight: bold;")
+        elif self._document.is_modified:
             self._status_label.setText("Unsaved")
             self._status_label.setStyleSheet("color: #8B0000; font-weight: bold;")
         elif not self._document.file_path:
@@ -233,6 +527,21 @@ class MainWindow(QMainWindow):
             self._status_label.setStyleSheet("color: #228B22; font-weight: bold;")
         self._update_title()
 
+    def _undo_summary(self) -> str:
+        footprint = self.text_edit.undo_stack.footprint()
+        summary = f"Undo history: {footprint.memory / 1e6:.1f} MB in memory"
+        if footprint.disk:
+            summary += f", {footprint.disk / 1e6:.1f} MB on disk"
+        return summary
+
+    def eventFilter(self, obj, event):
+        # The undo footprint is only added up when the tooltip is shown,
+        # not on every keystroke.
+        if obj is self._status_label and event.type() == QEvent.Type.ToolTip:
+            QToolTip.showText(event.globalPos(), self._undo_summary(), obj)
+            return True
+        return super().eventFilter(obj, event)
+
     def _update_title(self):
         base_title = "Text Editor 9000"
         if self._document.file_path:
@@ -260,28 +569,16 @@ class MainWindow(QMainWindow):
             return "cancel"
 
     def closeEvent(self, event: QCloseEvent):
-        if self._document.is_modified:
-            result = self._prompt_save_changes()
-            if result == "save":
-                self.save_file()
-                if self._document.is_modified:
-                    event.ignore()
-                    return
-            elif result == "cancel":
+        for tab in self._tabs.tabs():
+            if not self._confirm_close(tab):
                 event.ignore()
                 return
+        for tab in self._tabs.tabs():
+            tab.close_journal()
         event.accept()
 
     def new_file(self):
-        if self._document.is_modified:
-            result = self._prompt_save_changes()
-            if result == "save":
-                self.save_file()
-                if self._document.is_modified:
-                    return
-            elif result == "cancel":
-                return
-
+        """Start a new document in a new tab, or in the current one if it is empty."""
         root_folder = self.sidebar.get_root_folder()
         if root_folder:
             name, ok = QInputDialog.getText(self, "New File", "File name:")
@@ -290,48 +587,28 @@ class MainWindow(QMainWindow):
                 try:
                     with open(file_path, 'w', encoding='utf-8') as f:
                         f.write("")
-                    self.text_edit.clear()
-                    self._document.reset()
-                    self._document.file_path = file_path
-                    self._document.set_content("", mark_as_saved=True)
-                    self._setup_highlighter(file_path)
-                    self._update_status()
-                    self.sidebar.file_tree.highlight_file(file_path)
                 except OSError as e:
                     QMessageBox.critical(self, "Error", f"Could not create file: {e}")
+                    return
+                if self._open_path(file_path):
+                    self.sidebar.file_tree.highlight_file(file_path)
             return
 
-        self.text_edit.clear()
-        self._document.reset()
-        self._setup_highlighter()
-        self._update_status()
+        if not self._tab.is_pristine:
+            self._add_tab()
+        self.text_edit.setFocus()
 
     def open_file(self):
-        if self._document.is_modified:
-            result = self._prompt_save_changes()
-            if result == "save":
-                self.save_file()
-                if self._document.is_modified:
-                    return
-            elif result == "cancel":
-                return
-
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             "Open File",
             "",
-            "All Files (*);;Python (*.py);;C/C++ (*.c *.cpp *.h *.hpp);;Java (*.java);;HTML (*.html *.htm);;JSON (*.json);;Markdown (*.md);;Text (*.txt)",
+            self._controller.get_open_filters(),
         )
         if not file_path:
             return
 
-        success, content, error_msg = self._controller.open_file(file_path)
-        if success:
-            self.text_edit.setPlainText(content)
-            self._update_status()
-            self._setup_highlighter(file_path, content)
-        else:
-            QMessageBox.critical(self, "Error", error_msg)
+        self._open_path(file_path)
 
     def open_folder(self):
         """Open folder dialog and set sidebar root."""
@@ -341,42 +618,25 @@ class MainWindow(QMainWindow):
 
     def _on_file_opened_from_tree(self, file_path: str):
         """Handle file opened from sidebar tree."""
-        if self._document.is_modified:
-            result = self._prompt_save_changes()
-            if result == "save":
-                self.save_file()
-                if self._document.is_modified:
-                    return
-            elif result == "cancel":
-                return
-
-        success, content, error_msg = self._controller.open_file(file_path)
-        if success:
-            self.text_edit.setPlainText(content)
-            self._update_status()
-            self._setup_highlighter(file_path, content)
+        if self._open_path(file_path):
             self.sidebar.highlight_file(file_path)
-        else:
-            QMessageBox.critical(self, "Error", error_msg)
 
     def save_file(self):
-        content = self.text_edit.toPlainText()
-
-        if self._document.file_path:
-            file_path = self._document.file_path
-            success, error_msg = self._controller.save_file(file_path, content)
-            if success:
-                self._update_status()
-                self._setup_highlighter(self._document.file_path)
-            else:
-                QMessageBox.critical(self, "Error", error_msg)
-        else:
+        if self._loader is not None or self._viewer is not None:
+            return
+        if not self._document.file_path:
             self.save_file_as()
+            return
+        if self._saver.has_pending(self._document.revision):
+            return
+        self._write_file(self._document.file_path, self.text_edit.toPlainText())
 
     def save_file_as(self):
+        if self._loader is not None or self._viewer is not None:
+            return
         content = self.text_edit.toPlainText()
         suggested_filter = self._controller.get_save_filter(content)
-        all_filters = "All Files (*);;Python (*.py);;C Source (*.c);;C++ Source (*.cpp);;C Header (*.h);;C++ Header (*.hpp);;Java (*.java);;HTML (*.html);;HTM (*.htm);;JSON (*.json);;Markdown (*.md);;Text (*.txt)"
+        all_filters = self._controller.get_save_filters()
 
         start_dir = ""
         if self._document.file_path:
@@ -392,10 +652,22 @@ class MainWindow(QMainWindow):
         if not file_path:
             return
 
-        success, error_msg = self._controller.save_file(file_path, content)
-        if success:
+        self._write_file(file_path, content)
+
+    def _write_file(self, file_path: str, content: str):
+        """Save ``content``, waiting for the write unless the document is large."""
+        self._saver.save(self._controller.prepare_save(file_path, content))
+        if len(content) < self._controller.BACKGROUND_SAVE_THRESHOLD:
+            self._saver.wait()
+        else:
             self._update_status()
-            self._setup_highlighter(self._document.file_path)
+
+    def _on_save_finished(self, tab: DocumentTab, request, state, error):
+        success, error_msg = tab.controller.finish_save(request, state, error)
+        self._update_status(tab)
+        if success:
+            tab.update_language(tab.document.file_path)
+            tab.record_save()
         else:
             QMessageBox.critical(self, "Error", error_msg)
 
@@ -416,6 +688,7 @@ class MainWindow(QMainWindow):
             <tr><td><b>Ctrl+Shift+O</b></td><td>Open folder</td></tr>
             <tr><td><b>Ctrl+S</b></td><td>Save file</td></tr>
             <tr><td><b>Ctrl+Shift+S</b></td><td>Save file as</td></tr>
+            <tr><td><b>Ctrl+W</b></td><td>Close tab</td></tr>
             <tr><td><b>Ctrl+Q</b></td><td>Exit</td></tr>
         </table>
         <h3>Edit</h3>
@@ -426,11 +699,20 @@ class MainWindow(QMainWindow):
             <tr><td><b>Ctrl+C</b></td><td>Copy</td></tr>
             <tr><td><b>Ctrl+V</b></td><td>Paste</td></tr>
             <tr><td><b>Ctrl+A</b></td><td>Select All</td></tr>
+            <tr><td><b>Ctrl+G</b></td><td>Go to line</td></tr>
         </table>
         <h3>Navigation</h3>
         <table>
             <tr><td><b>Ctrl+B</b></td><td>Toggle file explorer</td></tr>
             <tr><td><b>Ctrl+F</b></td><td>Search files in explorer</td></tr>
+            <tr><td><b>Ctrl+Tab</b></td><td>Next tab</td></tr>
+            <tr><td><b>Ctrl+Shift+Tab</b></td><td>Previous tab</td></tr>
+        </table>
+        <h3>View</h3>
+        <table>
+            <tr><td><b>Ctrl+\\</b></td><td>Split right</td></tr>
+            <tr><td><b>Ctrl+Shift+\\</b></td><td>Split down</td></tr>
+            <tr><td><b>Ctrl+Shift+W</b></td><td>Close pane</td></tr>
         </table>
         <h3>Help</h3>
         <table>
@@ -16,3 +16,11 @@ def qapp():
     if app is None:
         app = QApplication(sys.argv)
     yield app
+
+
+@pytest.fixture(autouse=True)
+def undo_journal_directory(tmp_path, monkeypatch):
+    """Keep undo journals written by the tests out of the user's cache."""
+    from editor.undo_journal import UndoJournal
+
+    monkeypatch.setattr(UndoJournal, "DIRECTORY", str(tmp_path / "undo"))
@@ -0,0 +1,141 @@
+import pytest
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QTextDocument
+
+from editor.highlighters.core.style_registry import StyleRegistry
+from editor.highlighters.core.types import StyleId, Token, pack_tokens
+from editor.highlighters.document_highlighter import DocumentHighlighter
+from editor.highlighters.pretokenizer import tokenize_lines
+import editor.highlighters.register_tokenizers  # noqa: F401
+
+
+@pytest.fixture
+def highlighter(qapp):
+    doc = QTextDocument()
+    return DocumentHighlighter(doc, "c")
+
+
+def _runs(highlighter, tokens):
+    runs = highlighter._merge_runs(pack_tokens(tokens))
+    return [tuple(runs[i:i + 3]) for i in range(0, len(runs), 3)]
+
+
+def _char_formats(block) -> list:
+    formats = [None] * len(block.text())
+    for fmt_range in block.layout().formats():
+        for i in range(fmt_range.start, fmt_range.start + fmt_range.length):
+            formats[i] = fmt_range.format
+    return formats
+
+
+class TestMergeRuns:
+    def test_adjacent_tokens_with_same_format_are_merged(self, highlighter):
+        runs = _runs(highlighter, [
+            Token(0, 1, StyleId.PUNCTUATION),
+            Token(1, 1, StyleId.PUNCTUATION),
+            Token(2, 1, StyleId.PUNCTUATION),
+        ])
+
+        assert len(runs) == 1
+        assert runs[0][:2] == (0, 3)
+
+    def test_gap_between_tokens_is_not_merged(self, highlighter):
+        runs = _runs(highlighter, [
+            Token(0, 1, StyleId.PUNCTUATION),
+            Token(2, 1, StyleId.PUNCTUATION),
+        ])
+
+        assert [run[:2] for run in runs] == [(0, 1), (2, 1)]
+
+    def test_different_formats_are_not_merged(self, highlighter):
+        runs = _runs(highlighter, [
+            Token(0, 3, StyleId.KEYWORD),
+            Token(3, 1, StyleId.STRING),
+        ])
+
+        assert len(runs) == 2
+
+    def test_plain_tokens_are_skipped(self, highlighter):
+        runs = _runs(highlighter, [
+            Token(0, 4, StyleId.PLAIN),
+            Token(4, 1, StyleId.STRING),
+        ])
+
+        assert [run[:2] for run in runs] == [(4, 1)]
+
+    def test_unknown_and_empty_tokens_are_skipped(self, highlighter):
+        assert _runs(highlighter, [Token(0, 2, 99), Token(2, 0, StyleId.STRING)]) == []
+
+
+class TestAppliedFormats:
+    @pytest.mark.parametrize("lang_id, line", [
+        ("c", "a[i]=b[i]+c[i]*d;/*x*/f(x,y);"),
+        ("javascript", "var a={b:[1,2,3]};if(a&&b){c(d)}"),
+    ])
+    def test_merged_runs_format_like_individual_tokens(self, qapp, lang_id, line):
+        doc = QTextDocument()
+        doc.setPlainText(line)
+        DocumentHighlighter(doc, lang_id)
+        QApplication.processEvents()
+
+        registry = StyleRegistry.instance()
+        expected = [None] * len(line)
+        packed = tokenize_lines(lang_id, [line])[0].tokens
+        for i in range(0, len(packed), 3):
+            start, length, style = packed[i], packed[i + 1], packed[i + 2]
+            if style == StyleId.PLAIN:
+                continue
+            fmt = registry.get_format(style)
+            for j in range(start, start + length):
+                expected[j] = fmt
+
+        assert _char_formats(doc.firstBlock()) == expected
+
+
+@pytest.fixture
+def registry(qapp):
+    registry = StyleRegistry.instance()
+    yield registry
+    registry.set_theme("dark")
+
+
+class TestThemes:
+    def test_format_table_is_indexed_by_token_style(self, registry):
+        table = registry.format_table
+
+        assert len(table) == len(StyleId)
+        assert table[StyleId.KEYWORD].fontWeight() > table[StyleId.STRING].fontWeight()
+        assert table[StyleId.COMMENT].fontItalic()
+        assert registry.get_format(StyleId.STRING) is table[StyleId.STRING]
+
+    def test_set_theme_rebuilds_table_once(self, registry):
+        emitted = []
+        registry.theme_changed.connect(lambda: emitted.append(True))
+        old_table = registry.format_table
+
+        registry.set_theme("light")
+        registry.set_theme("light")
+
+        assert registry.theme_name == "light"
+        assert registry.format_table is not old_table
+        assert emitted == [True]
+
+    def test_unknown_theme_raises(self, registry):
+        with pytest.raises(KeyError):
+            registry.set_theme("solarized")
+
+    def test_theme_change_rehighlights_with_new_formats(self, registry):
+        doc = QTextDocument()
+        doc.setPlainText('int x = "s";')
+        highlighter = DocumentHighlighter(doc, "c")
+        invalidated = []
+        highlighter.invalidated.connect(lambda: invalidated.append(True))
+        QApplication.processEvents()
+
+        registry.set_theme("light")
+        QApplication.processEvents()
+
+        formats = _char_formats(doc.firstBlock())
+        assert formats[0] == registry.get_format(StyleId.KEYWORD)
+        assert formats[8] == registry.get_format(StyleId.STRING)
+        assert invalidated == [True]
@@ -0,0 +1,212 @@
+import json
+import random
+from array import array
+
+import pytest
+
+from editor.highlighters.core.registry import HighlightRegistry
+from editor.highlighters.core.types import StackFrame, StyleId
+from editor.highlighters.pretokenizer import tokenize_lines
+from editor.highlighters.register_tokenizers import GRAMMAR_DIR, register_grammars
+from editor.highlighters.tokenizers import (
+    CRegexTokenizer,
+    Embed,
+    Grammar,
+    GrammarTokenizer,
+    Rule,
+    StringRule,
+    grammar_from_dict,
+    load_grammar,
+)
+from editor.highlighters.tokenizers.c_tokenizer import KEYWORDS, OPERATORS, PUNCTUATION
+import editor.highlighters.register_tokenizers  # noqa: F401
+
+
+C_GRAMMAR = Grammar(
+    lang_id="c",
+    keywords=tuple(KEYWORDS),
+    operators=tuple(OPERATORS),
+    punctuation=tuple(PUNCTUATION),
+    line_comments=("//",),
+    block_comments=(("/*", "*/"),),
+    strings=(StringRule('"'), StringRule("'")),
+    rules=(Rule("#", r"[ \t]*\w*"),),
+    identifier_start="[A-Za-z_]",
+    number=(
+        r"(?:0[xX][0-9a-fA-F]*|0(?=\d)[0-7]*|(?=\.?\d)\d*(?:\.\d*)?(?:[eE][+-]?\d*)?)"
+        r"(?:[fFlLuU][lLuU]?)?"
+    ),
+)
+
+TEMPLATE = Grammar(
+    lang_id="template",
+    keywords=("if", "end"),
+    operators=("=",),
+    strings=(StringRule('"""', multiline=True), StringRule('"')),
+    embedded=(
+        Embed("<%css", "css", "%>"),
+        Embed("<%sql", "sql", "%>", StyleId.PUNCTUATION),
+    ),
+)
+
+ALPHABET = list("ab_$x01.eE+-*/\\\"'#@<>=&|!^~%?:;,(){}[]` \tfjn") + [
+    "/*", "*/", "//", "0x", "if", "return", "# define",
+]
+
+
+def _tokenize(tokenizer, lines, stack=()):
+    results = []
+    for line in lines:
+        out = array("I")
+        stack = tokenizer.tokenize_line_packed(line, stack, out)
+        results.append((list(out), stack))
+    return results
+
+
+def _nonempty(results):
+    return [
+        ([v for i in range(0, len(out), 3) if out[i + 1] for v in out[i:i + 3]], stack)
+        for out, stack in results
+    ]
+
+
+def _texts(line, packed):
+    return [
+        (line[packed[i]:packed[i] + packed[i + 1]], packed[i + 2])
+        for i in range(0, len(packed), 3)
+    ]
+
+
+@pytest.fixture
+def template():
+    registry = HighlightRegistry.instance()
+    registry.register("template", GrammarTokenizer(TEMPLATE), [])
+    yield registry.get_tokenizer("template")
+    registry._tokenizers.pop("template")
+
+
+class TestGrammarLoading:
+    def test_shipped_grammar_is_registered_by_extension(self):
+        registry = HighlightRegistry.instance()
+
+        assert registry.get_lang_for_extension(".css") == "css"
+        assert isinstance(registry.get_tokenizer("css"), GrammarTokenizer)
+
+    def test_grammar_compiles_on_first_use(self, tmp_path):
+        (tmp_path / "ini.json").write_text(json.dumps({
+            "lang_id": "ini", "extensions": [".ini"], "line_comments": [";"],
+        }))
+        register_grammars(str(tmp_path))
+        tokenizer = HighlightRegistry.instance().get_tokenizer("ini")
+
+        assert tokenizer._findall is None
+        assert _tokenize(tokenizer, ["; c"]) == [([0, 3, StyleId.COMMENT], ())]
+
+    def test_json_fields_become_grammar(self):
+        grammar = grammar_from_dict({
+            "lang_id": "x",
+            "keywords": ["a"],
+            "strings": [{"delimiter": "`", "multiline": True}],
+            "rules": [{"start": "@", "style": "identifier"}],
+            "embedded": [{"start": "<?", "lang_id": "y", "end": "?>"}],
+        })
+
+        assert grammar.keywords == ("a",)
+        assert grammar.strings == (StringRule("`", multiline=True),)
+        assert grammar.rules == (Rule("@", "", StyleId.IDENTIFIER),)
+        assert grammar.embedded == (Embed("<?", "y", "?>", StyleId.TAG),)
+
+    @pytest.mark.parametrize("data", [
+        {"lang_id": "x", "colour": "red"},
+        {"lang_id": "x", "rules": [{"start": "@", "style": "bold"}]},
+        {"lang_id": "x", "line_comments": [""]},
+        {"lang_id": "x", "embedded": [{"start": "<", "lang_id": "x", "end": ">"}]},
+    ])
+    def test_invalid_grammar_raises(self, data):
+        with pytest.raises(ValueError):
+            grammar_from_dict(data)
+
+    def test_shipped_grammars_load(self):
+        assert load_grammar(f"{GRAMMAR_DIR}/css.json").lang_id == "css"
+
+
+class TestGrammarTokenizer:
+    def test_c_grammar_matches_compiled_c_tokenizer(self):
+        rng = random.Random("grammar")
+        lines = [
+            "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 20)))
+            for _ in range(3000)
+        ]
+        lines += ['int main(void) { /* open', 'close */ return 0x1fUL + .5e-3; } // x']
+
+        expected = _nonempty(_tokenize(CRegexTokenizer(), lines))
+
+        assert _tokenize(GrammarTokenizer(C_GRAMMAR), lines) == expected
+
+    def test_multiline_string_pushes_and_pops_state(self):
+        lines = ['x = """one', 'two', 'three""" if "a']
+        results = _tokenize(GrammarTokenizer(TEMPLATE), lines)
+
+        assert results[0][1] == (StackFrame("template", 1, None),)
+        assert results[1] == ([0, 3, StyleId.STRING], results[0][1])
+        assert _texts(lines[2], results[2][0]) == [
+            ('three"""', StyleId.STRING), ("if", StyleId.KEYWORD), ('"a', StyleId.STRING),
+        ]
+        assert results[2][1] == ()
+
+    def test_non_ascii_identifiers(self):
+        line = "naïve = 1"
+        out = array("I")
+        GrammarTokenizer(TEMPLATE).tokenize_line_packed(line, (), out)
+
+        assert _texts(line, out) == [
+            ("naïve", StyleId.IDENTIFIER), ("=", StyleId.OPERATOR), ("1", StyleId.NUMBER),
+        ]
+
+
+class TestEmbedding:
+    def test_embedded_language_runs_until_end_marker(self, template):
+        lines = ['if <%css a { b: 1 }', 'c {} %> end "s"']
+        results = [(r.tokens, r.final_stack) for r in tokenize_lines("template", lines)]
+
+        assert _texts(lines[0], results[0][0]) == [
+            ("if", StyleId.KEYWORD), ("<%css", StyleId.TAG), ("a", StyleId.IDENTIFIER),
+            ("{", StyleId.PUNCTUATION), ("b", StyleId.IDENTIFIER), (":", StyleId.OPERATOR),
+            ("1", StyleId.NUMBER), ("}", StyleId.PUNCTUATION),
+        ]
+        assert results[0][1][-1] == StackFrame("css", 0, "%>")
+        assert _texts(lines[1], results[1][0]) == [
+            ("c", StyleId.IDENTIFIER), ("{", StyleId.PUNCTUATION), ("}", StyleId.PUNCTUATION),
+            ("%>", StyleId.TAG), ("end", StyleId.KEYWORD), ('"s"', StyleId.STRING),
+        ]
+        assert all(frame.lang_id == "template" for frame in results[1][1])
+
+    def test_unregistered_embedded_language_is_one_token(self, template):
+        line = '<%sql select 1 %> if'
+        results = _tokenize(template, [line])
+
+        assert _texts(line, results[0][0]) == [
+            ("<%sql", StyleId.PUNCTUATION), (" select 1 ", StyleId.EMBEDDED),
+            ("%>", StyleId.PUNCTUATION), ("if", StyleId.KEYWORD),
+        ]
+        assert results[0][1] == ()
+
+    def test_css_inside_html_style_closes_on_end_tag(self):
+        lines = ["<style>", "a { color: red } /* open", "*/ b {} </STYLE><p>x</p>"]
+        results = tokenize_lines("html", lines)
+
+        assert ("color", StyleId.IDENTIFIER) in _texts(lines[1], results[1].tokens)
+        assert results[1].final_stack[-1] == StackFrame("css", 1, None)
+        assert _texts(lines[2], results[2].tokens)[:4] == [
+            ("*/", StyleId.COMMENT), ("b", StyleId.IDENTIFIER),
+            ("{", StyleId.PUNCTUATION), ("}", StyleId.PUNCTUATION),
+        ]
+        assert ("</STYLE>", StyleId.TAG) in _texts(lines[2], results[2].tokens)
+        assert all(frame.lang_id == "html" for frame in results[2].final_stack)
+
+    def test_css_fenced_in_markdown_closes_on_fence(self):
+        lines = ["```css", "a { b: 1 }", "```", "text"]
+        results = tokenize_lines("markdown", lines)
+
+        assert ("a", StyleId.IDENTIFIER) in _texts(lines[1], results[1].tokens)
+        assert results[2].final_stack == (StackFrame("markdown", 0, None),)
@@ -0,0 +1,199 @@
+import pytest
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QTextCursor, QTextDocument
+
+from editor.highlighters.core.incremental_manager import IncrementalManager
+from editor.highlighters.core.types import Token, StyleId, pack_tokens
+from editor.highlighters.document_highlighter import DocumentHighlighter
+import editor.highlighters.register_tokenizers  # noqa: F401
+
+
+class CountingTokenizer:
+    """Wraps a tokenizer and records every line it is asked to tokenize."""
+
+    def __init__(self, inner):
+        self._inner = inner
+        self.lines: list[str] = []
+
+    def get_lang_id(self):
+        return self._inner.get_lang_id()
+
+    def tokenize_line(self, line, state_stack):
+        self.lines.append(line)
+        return self._inner.tokenize_line(line, state_stack)
+
+    def tokenize_line_packed(self, line, state_stack, out):
+        self.lines.append(line)
+        return self._inner.tokenize_line_packed(line, state_stack, out)
+
+
+def _make_highlighter(text: str, lang_id: str = "c"):
+    doc = QTextDocument()
+    doc.documentLayout()
+    doc.setPlainText(text)
+    highlighter = DocumentHighlighter(doc, lang_id)
+    QApplication.processEvents()
+    counter = CountingTokenizer(highlighter._tokenizer)
+    highlighter._tokenizer = counter
+    return doc, highlighter, counter
+
+
+def _block_states(doc: QTextDocument) -> list[int]:
+    states = []
+    block = doc.begin()
+    while block.isValid():
+        states.append(block.userState())
+        block = block.next()
+    return states
+
+
+class TestIncrementalManagerCache:
+    def test_lookup_hits_with_same_text_and_initial_state(self):
+        manager = IncrementalManager()
+        manager.set_line_count(1)
+        tokens = pack_tokens([Token(0, 3, StyleId.KEYWORD)])
+        manager.update_line(0, "int", 5, initial_state_id=-1, tokens=tokens)
+
+        assert manager.lookup(0, "int", -1) == (tokens, 5)
+
+    def test_lookup_misses_on_different_text(self):
+        manager = IncrementalManager()
+        manager.set_line_count(1)
+        manager.update_line(0, "int", 5, initial_state_id=-1, tokens=[])
+
+        assert manager.lookup(0, "char", -1) is None
+
+    def test_lookup_misses_on_different_initial_state(self):
+        manager = IncrementalManager()
+        manager.set_line_count(1)
+        manager.update_line(0, "int", 5, initial_state_id=-1, tokens=[])
+
+        assert manager.lookup(0, "int", 7) is None
+
+    def test_previous_entry_is_kept_as_spare(self):
+        manager = IncrementalManager()
+        manager.set_line_count(1)
+        code_tokens = pack_tokens([Token(0, 3, StyleId.KEYWORD)])
+        comment_tokens = pack_tokens([Token(0, 3, StyleId.COMMENT)])
+        manager.update_line(0, "int", 1, initial_state_id=1, tokens=code_tokens)
+        manager.update_line(0, "int", 2, initial_state_id=2, tokens=comment_tokens)
+
+        assert manager.lookup(0, "int", 1) == (code_tokens, 1)
+        assert manager.lookup(0, "int", 2) == (comment_tokens, 2)
+
+    def test_splice_inserts_and_removes_after_index(self):
+        manager = IncrementalManager()
+        manager.set_line_count(3)
+        for i, text in enumerate(["a", "b", "c"]):
+            manager.update_line(i, text, i, initial_state_id=-1, tokens=[])
+
+        manager.splice(0, 2)
+        assert manager.line_count == 5
+        assert manager.lookup(3, "b", -1) is not None
+        assert manager.lookup(4, "c", -1) is not None
+
+        manager.splice(0, -2)
+        assert manager.line_count == 3
+        assert manager.lookup(1, "b", -1) is not None
+
+    def test_invalidate_from_drops_cached_tokens(self):
+        manager = IncrementalManager()
+        manager.set_line_count(2)
+        manager.update_line(1, "x", 3, initial_state_id=-1, tokens=[])
+
+        manager.invalidate_from(1)
+
+        assert manager.lookup(1, "x", -1) is None
+        assert manager.get_initial_state_id(2) == -1
+
+    def test_cached_bytes_follow_entries(self):
+        manager = IncrementalManager()
+        manager.set_line_count(2)
+        tokens = pack_tokens([Token(0, 3, StyleId.KEYWORD)] * 10)
+        manager.update_line(0, "int", 1, initial_state_id=-1, tokens=tokens)
+        one = manager.cached_bytes
+        assert one > 4 * len(tokens)
+
+        manager.update_line(1, "int", 1, initial_state_id=1, tokens=tokens)
+        assert manager.cached_bytes == 2 * one
+
+        manager.set_line_count(1)
+        assert manager.cached_bytes == one
+
+        manager.drop_tokens()
+        assert manager.cached_bytes == 0
+        assert manager.get_initial_state_id(1) == 1
+
+
+class TestDocumentHighlighterEviction:
+    def test_evict_cache_frees_runs_and_keeps_states(self, qapp):
+        doc, highlighter, counter = _make_highlighter(
+            "\n".join(f"int x{i} = {i};" for i in range(200))
+        )
+        states = _block_states(doc)
+        assert highlighter.cache_bytes > 0
+
+        highlighter.evict_cache()
+
+        assert highlighter.cache_bytes == 0
+        assert _block_states(doc) == states
+        assert doc.findBlockByNumber(50).layout().formats()
+
+    def test_edit_after_eviction_only_tokenizes_edited_line(self, qapp):
+        doc, highlighter, counter = _make_highlighter(
+            "\n".join(f"int x{i} = {i};" for i in range(200))
+        )
+        highlighter.evict_cache()
+
+        QTextCursor(doc.findBlockByNumber(100)).insertText("y")
+
+        assert counter.lines == ["yint x100 = 100;"]
+
+
+class TestDocumentHighlighterEarlyExit:
+    def test_typing_in_a_line_only_tokenizes_that_line(self, qapp):
+        doc, highlighter, counter = _make_highlighter(
+            "\n".join(f"int x{i} = {i};" for i in range(200))
+        )
+
+        cursor = QTextCursor(doc.findBlockByNumber(100))
+        cursor.insertText("y")
+
+        assert counter.lines == ["yint x100 = 100;"]
+
+    def test_closing_block_comment_reuses_cached_tokens(self, qapp):
+        doc, highlighter, counter = _make_highlighter(
+            "\n".join(f"int x{i} = {i};" for i in range(200))
+        )
+
+        cursor = QTextCursor(doc.findBlockByNumber(10))
+        cursor.insertText("/*")
+        opened = len(counter.lines)
+        assert opened > 150
+
+        counter.lines.clear()
+        cursor.deletePreviousChar()
+        cursor.deletePreviousChar()
+
+        assert len(counter.lines) <= 2
+
+    def test_inserted_lines_match_full_rehighlight(self, qapp):
+        text = "\n".join(f"int x{i} = {i}; /* c */" for i in range(50))
+        doc, highlighter, _ = _make_highlighter(text)
+
+        cursor = QTextCursor(doc.findBlockByNumber(20))
+        cursor.insertText("/* start\nstill comment\nend */ int z;\n")
+        cursor = QTextCursor(doc.findBlockByNumber(40))
+        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock)
+        cursor.movePosition(
+            QTextCursor.MoveOperation.NextBlock, QTextCursor.MoveMode.KeepAnchor
+        )
+        cursor.removeSelectedText()
+
+        fresh = QTextDocument()
+        fresh.setPlainText(doc.toPlainText())
+        fresh_highlighter = DocumentHighlighter(fresh, "c")
+        QApplication.processEvents()
+
+        assert _block_states(doc) == _block_states(fresh)
+        assert highlighter._incremental_manager.line_count == doc.blockCount()
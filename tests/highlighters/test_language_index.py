@@ -0,0 +1,83 @@
+import pytest
+
+from editor.highlighters.core.language_index import Language, LanguageIndex
+from editor.highlighters.core.registry import HighlightRegistry
+from editor.highlighters.detector import LanguageDetector
+from editor.highlighters.tokenizers import PlainTokenizer
+
+
+@pytest.fixture
+def index():
+    return LanguageIndex()
+
+
+class TestLookups:
+    def test_extension_of_path(self, index):
+        assert index.for_path("/src/app/main.PY") == "python"
+        assert index.for_path("archive.tar.json") == "json"
+        assert index.for_path("notes") is None
+        assert index.for_path("dir.py/notes") is None
+
+    def test_longest_extension_wins(self, index):
+        index.register("gzip", [".gz"])
+        index.register("tarball", [".tar.gz"])
+
+        assert index.for_path("a.tar.gz") == "tarball"
+        assert index.for_path("a.gz") == "gzip"
+
+    def test_filename(self, index):
+        assert index.for_path("/project/SConstruct") == "python"
+
+    @pytest.mark.parametrize("line, lang", [
+        ("#!/usr/bin/python3", "python"),
+        ("#!/usr/bin/env python3.12", "python"),
+        ("#!/usr/bin/env -S node --harmony", "javascript"),
+        ("#!/bin/sh", None),
+        ("#!", None),
+        ("import os", None),
+    ])
+    def test_shebang(self, index, line, lang):
+        assert index.for_shebang(line) == lang
+
+    def test_features_match_in_order(self, index):
+        assert index.for_features({"c_include", "cpp_keyword"}) == "cpp"
+        assert index.for_features({"c_include"}) == "c"
+        assert index.for_features({"py_import"}) is None
+
+
+class TestRegistration:
+    def test_register_merges_extensions(self, index):
+        index.register("python", [".pyi"])
+
+        assert index.for_path("stub.pyi") == "python"
+        assert index.get("python").name == "Python"
+        assert index.save_extension("python") == ".py"
+
+    def test_added_language_has_filters(self, index):
+        index.add(Language("toml", "TOML", (".toml",)))
+
+        assert index.save_filter("toml") == "TOML (*.toml)"
+        assert "TOML (*.toml)" in index.save_filters().split(";;")
+        assert index.save_filter("cobol") == "All Files (*)"
+        assert index.save_extension("cobol") == ".txt"
+
+    def test_open_filters_list_every_extension(self, index):
+        assert "C++ Source (*.cpp *.hpp *.cc *.cxx *.hxx)" in index.open_filters().split(";;")
+
+    def test_registry_registers_into_its_index(self, index):
+        registry = HighlightRegistry(index)
+
+        registry.register("toy", PlainTokenizer(), [".toy"])
+
+        assert index.for_path("a.toy") == "toy"
+        assert LanguageIndex.instance().for_path("a.toy") is None
+
+
+class TestSharedIndex:
+    def test_detector_sees_grammar_languages(self):
+        assert LanguageDetector.detect_from_extension("style.css") == "css"
+
+    def test_detector_and_registry_agree(self):
+        registry = HighlightRegistry.instance()
+        for ext in (".py", ".js", ".css", ".md", ".hxx"):
+            assert LanguageDetector.detect_from_extension("a" + ext) == registry.get_lang_for_extension(ext)
@@ -0,0 +1,105 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+import warnings
+
+import pytest
+
+from editor.highlighters.core.registry import HighlightRegistry
+from editor.highlighters.detector import LanguageDetector
+from editor.highlighters.python_hl import PythonHighlighter
+from editor.highlighters.tokenizers import PlainTokenizer
+import editor.highlighters.register_tokenizers  # noqa: F401
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "src")
+
+
+@pytest.fixture
+def registry():
+    return HighlightRegistry()
+
+
+class TestLazyRegistration:
+    def test_factory_runs_on_first_lookup_only(self, registry):
+        created = []
+
+        def factory():
+            created.append(True)
+            return PlainTokenizer()
+
+        registry.register_lazy("toy", factory, [".toy"])
+
+        assert registry.get_lang_for_extension(".toy") == "toy"
+        assert not registry.is_loaded("toy")
+        assert created == []
+
+        first = registry.get_tokenizer("toy")
+
+        assert registry.get_tokenizer("toy") is first
+        assert registry.is_loaded("toy")
+        assert created == [True]
+
+    def test_concurrent_lookups_build_once(self, registry):
+        created = []
+
+        def factory():
+            created.append(True)
+            time.sleep(0.05)
+            return PlainTokenizer()
+
+        registry.register_lazy("toy", factory)
+        found = []
+        threads = [
+            threading.Thread(target=lambda: found.append(registry.get_tokenizer("toy")))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert created == [True]
+        assert len(found) == 4
+        assert all(tokenizer is found[0] for tokenizer in found)
+        assert found[0] is not None
+
+    def test_register_replaces_lazy_factory(self, registry):
+        registry.register_lazy("toy", lambda: pytest.fail("factory called"), [])
+        tokenizer = PlainTokenizer()
+
+        registry.register("toy", tokenizer, [])
+
+        assert registry.get_tokenizer("toy") is tokenizer
+
+    def test_unknown_language_has_no_tokenizer(self, registry):
+        assert registry.get_tokenizer("cobol") is None
+
+    def test_registering_imports_no_language_modules(self):
+        code = (
+            "import sys\n"
+            "import editor.highlighters.register_tokenizers\n"
+            "from editor.highlighters.core.registry import HighlightRegistry\n"
+            "from editor.highlighters.detector import LanguageDetector\n"
+            "assert LanguageDetector.detect('a.c') == 'c'\n"
+            "HighlightRegistry.instance().get_tokenizer('plain')\n"
+            "print(sorted(m for m in sys.modules if m.startswith(('editor.', 'multiprocessing'))))\n"
+        )
+        env = dict(os.environ, PYTHONPATH=SRC_DIR)
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env
+        ).stdout
+
+        assert "plain_tokenizer" in output
+        for module in ("c_tokenizer", "python_tokenizer", "grammar", "c_hl", "multiprocessing"):
+            assert module not in output
+
+
+class TestDeprecatedHighlighterMap:
+    def test_values_are_imported_on_access(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            assert LanguageDetector.HIGHLIGHTER_MAP["python"] is PythonHighlighter
+            assert LanguageDetector.HIGHLIGHTER_MAP.get("cobol") is None
+            assert dict(LanguageDetector.HIGHLIGHTER_MAP.items())["python"] is PythonHighlighter
@@ -0,0 +1,70 @@
+from array import array
+
+import pytest
+
+from editor.highlighters.core.registry import HighlightRegistry
+from editor.highlighters.core.types import (
+    StackFrame,
+    StyleId,
+    Token,
+    pack_tokens,
+    unpack_tokens,
+)
+import editor.highlighters.register_tokenizers  # noqa: F401
+
+
+SAMPLES = {
+    "c": ['#include <stdio.h>', 'int main(void) { /* start', 'end */ return 0x1f; }'],
+    "cpp": ['class A { public: int x = 1; };', '// comment'],
+    "java": ['public class A {', '  String s = "x"; /* c', '*/ int y = 2; }'],
+    "python": ['def f(x):', '    """doc', '    """', '    return x + 1  # c'],
+    "javascript": ['const re = /a+b/g;', 'let s = `tmpl', 'end` + 1; /* c */'],
+    "json": ['{"key": [1, 2.5, true, null],', ' "other": "value"}'],
+    "markdown": ['# Title', 'Some *text* with [link](http://x)'],
+    "html": ['<div class="a">', '<script>var x = 1;</script>'],
+    "plain": ['just text'],
+}
+
+
+def _tokenize_both(lang_id, lines):
+    tokenizer = HighlightRegistry.instance().get_tokenizer(lang_id)
+    stack = (StackFrame(lang_id=lang_id, sub_state=0, end_condition=None),)
+    packed_stack = stack
+    for line in lines:
+        result = tokenizer.tokenize_line(line, stack)
+        out = array("I")
+        packed_stack = tokenizer.tokenize_line_packed(line, packed_stack, out)
+        yield result, out, packed_stack
+        stack = result.final_stack
+
+
+class TestPackedTokens:
+    def test_pack_round_trip(self):
+        tokens = [Token(0, 3, StyleId.KEYWORD), Token(4, 2, StyleId.NUMBER)]
+
+        packed = pack_tokens(tokens)
+
+        assert packed.typecode == "I"
+        assert list(packed) == [0, 3, StyleId.KEYWORD, 4, 2, StyleId.NUMBER]
+        assert unpack_tokens(packed) == tokens
+
+    @pytest.mark.parametrize("lang_id", sorted(SAMPLES))
+    def test_packed_matches_token_list(self, lang_id):
+        for result, out, packed_stack in _tokenize_both(lang_id, SAMPLES[lang_id]):
+            assert unpack_tokens(out) == result.tokens
+            assert packed_stack == result.final_stack
+
+    def test_tokenize_line_still_returns_tokens(self):
+        tokenizer = HighlightRegistry.instance().get_tokenizer("c")
+
+        result = tokenizer.tokenize_line("int x;", ())
+
+        assert all(isinstance(token, Token) for token in result.tokens)
+
+    def test_packed_output_is_appended(self):
+        tokenizer = HighlightRegistry.instance().get_tokenizer("javascript")
+        out = array("I", [0, 1, StyleId.IDENTIFIER])
+
+        tokenizer.tokenize_line_packed("/a/", (), out)
+
+        assert unpack_tokens(out)[1:] == [Token(0, 3, StyleId.STRING)]
@@ -0,0 +1,141 @@
+import pytest
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QTextDocument
+
+from editor.highlighters import pretokenizer
+from editor.highlighters.document_highlighter import DocumentHighlighter
+from editor.highlighters.pretokenizer import (
+    default_stack,
+    stitch_chunks,
+    tokenize_lines,
+)
+
+
+def _lines() -> list[str]:
+    lines = []
+    for i in range(300):
+        if i % 37 == 5:
+            lines.append("/* a comment that")
+        elif i % 37 == 9:
+            lines.append("   spans lines */ int z;")
+        else:
+            lines.append(f'int x{i} = {i}; char *s = "str";')
+    return lines
+
+
+def _split(lines: list[str], size: int) -> list[list[str]]:
+    return [lines[i:i + size] for i in range(0, len(lines), size)]
+
+
+class TestStitchChunks:
+    @pytest.mark.parametrize("size", [1, 7, 40, 300])
+    def test_matches_sequential_tokenization(self, size):
+        lines = _lines()
+        chunks = _split(lines, size)
+        speculative = [tokenize_lines("c", chunk) for chunk in chunks]
+
+        assert stitch_chunks("c", chunks, speculative) == tokenize_lines("c", lines)
+
+    def test_chunk_starting_inside_comment_is_retokenized(self):
+        lines = ["/* open", "still comment", "int x; */ int y;", "int z;"]
+        chunks = [lines[:1], lines[1:]]
+        speculative = [tokenize_lines("c", chunk) for chunk in chunks]
+
+        stitched = stitch_chunks("c", chunks, speculative)
+
+        assert stitched == tokenize_lines("c", lines)
+        assert stitched[1] != speculative[1][0]
+
+    def test_embedded_language_uses_embedded_tokenizer(self):
+        lines = ["<script>", "var x = 1;", "</script>"]
+        chunks = _split(lines, 1)
+        speculative = [tokenize_lines("html", chunk) for chunk in chunks]
+
+        assert stitch_chunks("html", chunks, speculative) == tokenize_lines(
+            "html", lines
+        )
+
+    def test_default_stack_uses_language(self):
+        assert default_stack("python")[0].lang_id == "python"
+
+
+class TestPreload:
+    def test_preloaded_lines_are_not_tokenized_again(self, qapp):
+        lines = _lines()
+        doc = QTextDocument()
+        doc.setPlainText("\n".join(lines))
+        highlighter = DocumentHighlighter(doc, "c")
+
+        assert highlighter.preload(lines, tokenize_lines("c", lines))
+
+        calls = []
+        inner = highlighter._tokenizer
+
+        class Counting:
+            def get_lang_id(self):
+                return inner.get_lang_id()
+
+            def tokenize_line_packed(self, line, stack, out):
+                calls.append(line)
+                return inner.tokenize_line_packed(line, stack, out)
+
+        highlighter._tokenizer = Counting()
+        QApplication.processEvents()
+
+        assert calls == []
+        assert doc.lastBlock().userState() != -1
+
+    def test_preload_rejects_mismatched_line_count(self, qapp):
+        doc = QTextDocument()
+        doc.setPlainText("int x;\nint y;")
+        highlighter = DocumentHighlighter(doc, "c")
+
+        assert not highlighter.preload(["int x;"], tokenize_lines("c", ["int x;"]))
+
+
+class TestPretokenize:
+    def test_worker_results_match_sequential(self):
+        lines = _lines() * 10
+        future = pretokenizer.pretokenize("c", "\n".join(lines))
+
+        assert future.result(timeout=60) == (lines, tokenize_lines("c", lines))
+
+    def test_worker_count_follows_cpu_affinity(self, monkeypatch):
+        monkeypatch.setattr(pretokenizer.os, "sched_getaffinity", lambda pid: {0}, raising=False)
+        monkeypatch.setattr(pretokenizer.os, "cpu_count", lambda: 64)
+
+        assert pretokenizer.available_cpus() == 1
+        assert not pretokenizer.should_pretokenize(10 * pretokenizer.MIN_LINES)
+
+
+class TestStreamPretokenizer:
+    @pytest.mark.parametrize("piece", [1, 13, 4096])
+    def test_fed_pieces_match_sequential(self, monkeypatch, piece):
+        monkeypatch.setattr(pretokenizer, "MIN_LINES", 100)
+        monkeypatch.setattr(pretokenizer, "MIN_CPUS", 1)
+        monkeypatch.setattr(pretokenizer, "STREAM_CHUNK_LINES", 70)
+        lines = _lines() * 3
+        text = "\n".join(lines)
+        stream = pretokenizer.StreamPretokenizer("c")
+
+        for i in range(0, len(text), piece):
+            stream.feed(text[i:i + piece])
+        future = stream.finish()
+
+        assert future.result(timeout=60) == (lines, tokenize_lines("c", lines))
+
+    def test_work_starts_before_the_end_of_the_file(self, monkeypatch):
+        monkeypatch.setattr(pretokenizer, "MIN_LINES", 100)
+        monkeypatch.setattr(pretokenizer, "STREAM_CHUNK_LINES", 50)
+        stream = pretokenizer.StreamPretokenizer("c")
+
+        stream.feed("\n".join(_lines()) + "\n")
+
+        assert len(stream._futures) == 6
+        stream.cancel()
+
+    def test_short_file_is_not_pretokenized(self):
+        stream = pretokenizer.StreamPretokenizer("c")
+        stream.feed("int x;\nint y;")
+
+        assert stream.finish() is None
@@ -0,0 +1,126 @@
+import random
+from array import array
+
+import pytest
+
+from editor.highlighters.core.registry import HighlightRegistry
+from editor.highlighters.core.types import StackFrame
+from editor.highlighters.tokenizers import (
+    CRegexTokenizer,
+    CTokenizer,
+    CppRegexTokenizer,
+    CppTokenizer,
+    JavaRegexTokenizer,
+    JavaScriptRegexTokenizer,
+    JavaScriptTokenizer,
+    JavaTokenizer,
+    PythonRegexTokenizer,
+    PythonTokenizer,
+)
+import editor.highlighters.register_tokenizers  # noqa: F401
+
+
+PAIRS = {
+    "c": (CTokenizer, CRegexTokenizer),
+    "cpp": (CppTokenizer, CppRegexTokenizer),
+    "java": (JavaTokenizer, JavaRegexTokenizer),
+    "python": (PythonTokenizer, PythonRegexTokenizer),
+    "javascript": (JavaScriptTokenizer, JavaScriptRegexTokenizer),
+}
+
+SOURCES = {
+    "c": [
+        '#include <stdio.h>',
+        '#  define MAX 0x7fUL',
+        'int main(void) { /* start',
+        '   still a comment */ return a->b[i++] <<= 010 + 1.5e-3f; }',
+        'char c = \'\\n\'; char *s = "a\\"b"; /**/ x /= 2; // done',
+        '"unterminated \\',
+        'y = .5 + 08; /*/ odd */ z >>=',
+    ],
+    "cpp": [
+        'class A : public B { constexpr static int x = 1; };',
+        'auto p = new A(); delete p; /* open',
+        'close */ std::cout << "hi";',
+    ],
+    "java": [
+        '@Override public final class A<T> extends B {',
+        '  String s = "x"; /* c',
+        '*/ int y = 0b1010_1010 + 0x1F_FFL + 1_000.5e+3d; y >>>= 2;',
+        '  char c = \'\\\'\'; // comment',
+        '  Runnable r = () -> System.out::println;',
+    ],
+    "python": [
+        '@app.route("/x")',
+        'def f(x: int = 0o17, *args) -> float:',
+        '    """doc with \\""" escape',
+        "    and ''' inside",
+        '    """ + r"raw\\" + f\'{x}\'',
+        "    s = '''one line''' @ m; t @= 2; x //= 0x_ff + 1_0.5e-3j",
+        "    return x ** 2 != 3 if x else None  # comment",
+        '    """',
+        "    '''open single",
+    ],
+    "javascript": [
+        'const re = /a[/]b\\/c/gi, d = x / y / z;',
+        'let s = `tmpl ${a}',
+        'end` + 1; /* c */ a = b ? c : d ?? e;',
+        '/* open',
+        ' close */ x = /re/.test(s) && 10n >>> 1;',
+        'if (a) /[)]/.exec(b); return /x/; f(a) / 2 /= 3',
+        'let $el = `closed` + `open \\',
+        'still template`',
+    ],
+}
+
+ALPHABET = list("ab_$x01.eE+-*/\\\"'#@<>=&|!^~%?:;,(){}[]` \tfjn") + [
+    "/*", "*/", "//", "0x", '"""', "'''", "if", "return", "/a/g", "[/]",
+]
+
+
+def _tokenize(tokenizer, lines, stack=()):
+    results = []
+    for line in lines:
+        out = array("I")
+        stack = tokenizer.tokenize_line_packed(line, stack, out)
+        results.append((list(out), stack))
+    return results
+
+
+class TestRegexTokenizersMatchScanners:
+    @pytest.mark.parametrize("lang_id", sorted(SOURCES))
+    def test_same_tokens_and_states_on_sources(self, lang_id):
+        scanner, compiled = (cls() for cls in PAIRS[lang_id])
+
+        assert _tokenize(compiled, SOURCES[lang_id]) == _tokenize(scanner, SOURCES[lang_id])
+
+    @pytest.mark.parametrize("lang_id", sorted(PAIRS))
+    def test_same_tokens_and_states_on_random_lines(self, lang_id):
+        scanner, compiled = (cls() for cls in PAIRS[lang_id])
+        rng = random.Random(lang_id)
+        lines = [
+            "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 20)))
+            for _ in range(3000)
+        ]
+
+        assert _tokenize(compiled, lines) == _tokenize(scanner, lines)
+
+    @pytest.mark.parametrize("lang_id", sorted(PAIRS))
+    def test_non_ascii_lines_match(self, lang_id):
+        scanner, compiled = (cls() for cls in PAIRS[lang_id])
+        lines = ['x = "héllo"; // ünïcode', "naïve² = 1"]
+
+        assert _tokenize(compiled, lines) == _tokenize(scanner, lines)
+
+    def test_embedded_state_is_left_alone(self):
+        stack = (StackFrame(lang_id="html", sub_state=3, end_condition="</script>"),)
+        scanner, compiled = JavaScriptTokenizer(), JavaScriptRegexTokenizer()
+
+        assert _tokenize(compiled, ["*/ x"], stack) == _tokenize(scanner, ["*/ x"], stack)
+
+    @pytest.mark.parametrize("lang_id", sorted(PAIRS))
+    def test_registry_uses_regex_tokenizers(self, lang_id):
+        tokenizer = HighlightRegistry.instance().get_tokenizer(lang_id)
+
+        assert type(tokenizer) is PAIRS[lang_id][1]
+
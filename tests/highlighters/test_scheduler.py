@@ -0,0 +1,281 @@
+import random
+
+import pytest
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QTextCursor, QTextDocument
+
+from editor.code_editor import CodeEditor
+from editor.highlighters import pretokenizer
+from editor.highlighters.document_highlighter import DocumentHighlighter
+from editor.highlighters.scheduler import HighlightScheduler
+import editor.highlighters.register_tokenizers  # noqa: F401
+
+
+def _source(lines: int) -> str:
+    parts = []
+    for i in range(lines):
+        if i % 50 == 10:
+            parts.append("/* block comment")
+        elif i % 50 == 12:
+            parts.append("   ends here */ int y;")
+        else:
+            parts.append(f"int x{i} = {i}; // value")
+    return "\n".join(parts)
+
+
+def _block_states(doc: QTextDocument) -> list[int]:
+    states = []
+    block = doc.begin()
+    while block.isValid():
+        states.append(block.userState())
+        block = block.next()
+    return states
+
+
+def _reference_states(text: str) -> list[int]:
+    doc = QTextDocument()
+    doc.setPlainText(text)
+    highlighter = DocumentHighlighter(doc, "c")
+    QApplication.processEvents()
+    states = _block_states(doc)
+    highlighter.setDocument(None)
+    return states
+
+
+@pytest.fixture
+def editor(qapp):
+    widget = CodeEditor()
+    widget.resize(400, 300)
+    widget.show()
+    yield widget
+    widget.close()
+
+
+def _attach(editor, text: str):
+    highlighter = DocumentHighlighter(editor.document(), "c")
+    scheduler = HighlightScheduler(highlighter, editor)
+    editor.setPlainText(text)
+    return highlighter, scheduler
+
+
+class TestHighlightWindow:
+    def test_blocks_outside_window_are_deferred(self, qapp):
+        doc = QTextDocument()
+        doc.setPlainText(_source(100))
+        highlighter = DocumentHighlighter(doc, "c")
+        highlighter.set_window(0, 9)
+        QApplication.processEvents()
+
+        states = _block_states(doc)
+        assert all(state != -1 for state in states[:10])
+        assert all(state == -1 for state in states[10:])
+        assert highlighter.take_deferred() == 10
+        assert highlighter.take_deferred() is None
+
+    def test_removing_window_highlights_everything(self, qapp):
+        doc = QTextDocument()
+        doc.setPlainText(_source(100))
+        highlighter = DocumentHighlighter(doc, "c")
+        highlighter.set_window(0, 9)
+        highlighter.set_window(None)
+        QApplication.processEvents()
+
+        assert -1 not in _block_states(doc)
+
+
+class TestHighlightScheduler:
+    def test_viewport_is_highlighted_before_background(self, editor):
+        highlighter, scheduler = _attach(editor, _source(2000))
+        QApplication.processEvents()
+
+        assert editor.firstVisibleBlock().userState() != -1
+        assert not scheduler.is_complete
+        assert editor.document().lastBlock().userState() == -1
+
+    def test_finish_matches_full_highlight(self, editor):
+        text = _source(2000)
+        highlighter, scheduler = _attach(editor, text)
+        QApplication.processEvents()
+
+        scheduler.finish()
+
+        assert scheduler.is_complete
+        assert _block_states(editor.document()) == _reference_states(text)
+
+    def test_slices_eventually_complete(self, editor):
+        highlighter, scheduler = _attach(editor, _source(500))
+
+        for _ in range(1000):
+            QApplication.processEvents()
+            if scheduler.is_complete:
+                break
+
+        assert scheduler.is_complete
+
+    def test_scrolled_viewport_is_highlighted_first(self, editor):
+        highlighter, scheduler = _attach(editor, _source(5000))
+        QApplication.processEvents()
+
+        editor.verticalScrollBar().setValue(4000)
+        QApplication.processEvents()
+
+        first = editor.firstVisibleBlock()
+        assert first.blockNumber() >= 3990
+        assert first.userState() != -1
+        assert not scheduler.is_complete
+
+    def test_edit_after_complete_reconverges(self, editor):
+        text = _source(1000)
+        highlighter, scheduler = _attach(editor, text)
+        scheduler.finish()
+
+        cursor = QTextCursor(editor.document().findBlockByNumber(3))
+        cursor.insertText("/* opened\n")
+        scheduler.finish()
+        assert _block_states(editor.document()) == _reference_states(
+            editor.toPlainText()
+        )
+
+        cursor.deletePreviousChar()
+        for _ in range(len("/* opened")):
+            cursor.deletePreviousChar()
+        scheduler.finish()
+        assert _block_states(editor.document()) == _reference_states(text)
+
+    def test_edit_during_background_pass(self, editor):
+        highlighter, scheduler = _attach(editor, _source(3000))
+        QApplication.processEvents()
+        QApplication.processEvents()
+
+        cursor = QTextCursor(editor.document().findBlockByNumber(2))
+        cursor.insertText("/*\n")
+        cursor = QTextCursor(editor.document().findBlockByNumber(2500))
+        cursor.insertText("*/ int z;\n")
+        scheduler.finish()
+
+        assert _block_states(editor.document()) == _reference_states(
+            editor.toPlainText()
+        )
+
+    @pytest.mark.parametrize("seed", range(8))
+    def test_random_edits_and_scrolls_reconverge(self, editor, seed):
+        rng = random.Random(seed)
+        highlighter, scheduler = _attach(editor, _source(2000))
+        scheduler.finish()
+        document = editor.document()
+        snippets = ["/*", "*/", "\n", "\n\n", "/* x\n", "*/ int q;\n", "int a;", "// c\n"]
+
+        for _ in range(40):
+            cursor = QTextCursor(document)
+            cursor.setPosition(rng.randrange(document.characterCount()))
+            if rng.random() < 0.6:
+                cursor.insertText(rng.choice(snippets))
+            else:
+                end = min(document.characterCount() - 1, cursor.position() + rng.randrange(1, 200))
+                cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+                cursor.removeSelectedText()
+            bar = editor.verticalScrollBar()
+            bar.setValue(rng.randrange(bar.maximum() + 1))
+            for _ in range(rng.randrange(3)):
+                QApplication.processEvents()
+
+        scheduler.finish()
+
+        assert _block_states(document) == _reference_states(editor.toPlainText())
+
+    def test_language_change_restarts(self, editor):
+        highlighter, scheduler = _attach(editor, _source(500))
+        scheduler.finish()
+
+        highlighter.set_language("python")
+
+        assert not scheduler.is_complete
+        scheduler.finish()
+        assert -1 not in _block_states(editor.document())
+
+    def test_added_editor_viewport_is_highlighted_first(self, editor):
+        highlighter, scheduler = _attach(editor, _source(5000))
+        pane = CodeEditor()
+        pane.share_document(editor)
+        pane.resize(400, 300)
+        pane.show()
+        scheduler.add_editor(pane)
+        QApplication.processEvents()
+
+        pane.verticalScrollBar().setValue(4000)
+        QApplication.processEvents()
+
+        assert pane.firstVisibleBlock().blockNumber() >= 3990
+        assert pane.firstVisibleBlock().userState() != -1
+        assert editor.firstVisibleBlock().userState() != -1
+        assert not scheduler.is_complete
+        pane.close()
+
+    def test_removed_editor_no_longer_widens_window(self, editor):
+        highlighter, scheduler = _attach(editor, _source(5000))
+        pane = CodeEditor()
+        pane.share_document(editor)
+        pane.resize(400, 300)
+        pane.show()
+        scheduler.add_editor(pane)
+        pane.verticalScrollBar().setValue(4000)
+        QApplication.processEvents()
+
+        scheduler.remove_editor(pane)
+        QApplication.processEvents()
+
+        assert highlighter._view_windows == ()
+        pane.close()
+
+    def test_stop_removes_window(self, editor):
+        highlighter, scheduler = _attach(editor, _source(500))
+        QApplication.processEvents()
+
+        scheduler.stop()
+        highlighter.rehighlight()
+
+        assert -1 not in _block_states(editor.document())
+
+    def test_pretokenized_tokens_are_handed_over(self, editor, monkeypatch):
+        monkeypatch.setattr(pretokenizer, "MIN_LINES", 100)
+        monkeypatch.setattr(pretokenizer, "MIN_CPUS", 1)
+        text = _source(3000)
+        highlighter, scheduler = _attach(editor, text)
+
+        assert scheduler.pretokenize(text)
+        scheduler._pretokenize_future.result(timeout=60)
+        for _ in range(1000):
+            QApplication.processEvents()
+            if scheduler.is_complete:
+                break
+
+        assert scheduler.is_complete
+        assert _block_states(editor.document()) == _reference_states(text)
+
+    def test_streamed_tokens_are_handed_over(self, editor, monkeypatch):
+        monkeypatch.setattr(pretokenizer, "MIN_LINES", 100)
+        monkeypatch.setattr(pretokenizer, "MIN_CPUS", 1)
+        monkeypatch.setattr(pretokenizer, "STREAM_CHUNK_LINES", 500)
+        text = _source(3000)
+        highlighter, scheduler = _attach(editor, "")
+
+        assert scheduler.begin_pretokenize_stream()
+        cursor = QTextCursor(editor.document())
+        for i in range(0, len(text), 10_000):
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText(text[i:i + 10_000])
+            scheduler.feed_pretokenize_stream(text[i:i + 10_000])
+        assert scheduler.end_pretokenize_stream()
+        scheduler._pretokenize_future.result(timeout=60)
+        for _ in range(1000):
+            QApplication.processEvents()
+            if scheduler.is_complete:
+                break
+
+        assert scheduler.is_complete
+        assert _block_states(editor.document()) == _reference_states(text)
+
+    def test_small_files_are_not_pretokenized(self, editor):
+        highlighter, scheduler = _attach(editor, _source(10))
+
+        assert not scheduler.pretokenize(_source(10))
@@ -48,6 +48,90 @@ class TestStateStackPool:
         
         assert result == ()
 
+    def test_scoped_pools_are_shared_per_scope(self):
+        assert StateStackPool("html") is StateStackPool("html")
+        assert StateStackPool("html") is not StateStackPool("markdown")
+        assert StateStackPool("html") is not StateStackPool()
+
+    def test_private_pools_are_independent(self):
+        stack: StateStack = (StackFrame(lang_id="html", sub_state=0, end_condition=None),)
+        first = StateStackPool.private()
+        second = StateStackPool.private()
+
+        first.intern(stack)
+
+        assert second.stats().size == 0
+
+    def test_unreferenced_stacks_are_evicted_beyond_bound(self):
+        pool = StateStackPool.private(max_unused=2)
+        ids = [
+            pool.intern((StackFrame(lang_id="html", sub_state=i, end_condition=None),))
+            for i in range(5)
+        ]
+
+        assert pool.stats().size == 2
+        assert pool.stats().evictions == 3
+        assert pool.get(ids[0]) == ()
+        assert pool.get(ids[4]) != ()
+
+    def test_referenced_stacks_are_kept(self):
+        pool = StateStackPool.private(max_unused=0)
+        stack: StateStack = (StackFrame(lang_id="html", sub_state=1, end_condition="pending:x"),)
+        state_id = pool.intern(stack)
+        pool.acquire(state_id)
+        pool.acquire(state_id)
+
+        pool.release(state_id)
+        assert pool.get(state_id) == stack
+
+        pool.release(state_id)
+        pool.intern((StackFrame(lang_id="html", sub_state=2, end_condition=None),))
+        assert pool.get(state_id) == ()
+
+    def test_evicted_ids_are_not_reused(self):
+        pool = StateStackPool.private(max_unused=0)
+        stack: StateStack = (StackFrame(lang_id="html", sub_state=1, end_condition=None),)
+        old_id = pool.intern((StackFrame(lang_id="html", sub_state=2, end_condition=None),))
+
+        assert pool.intern(stack) != old_id
+
+    def test_global_pool_never_evicts(self):
+        pool = StateStackPool()
+        for i in range(StateStackPool.MAX_UNUSED + 10):
+            pool.intern((StackFrame(lang_id="html", sub_state=i, end_condition=None),))
+
+        assert pool.stats().evictions == 0
+
+    def test_stats_report_hit_rate(self):
+        pool = StateStackPool.private()
+        stack: StateStack = (StackFrame(lang_id="html", sub_state=0, end_condition=None),)
+        pool.intern(stack)
+        pool.intern(stack)
+        pool.intern(stack)
+
+        stats = pool.stats()
+        assert (stats.hits, stats.misses) == (2, 1)
+        assert stats.hit_rate == pytest.approx(2 / 3)
+
+    def test_incremental_manager_holds_references(self):
+        from editor.highlighters.core.incremental_manager import IncrementalManager
+
+        pool = StateStackPool.private(max_unused=0)
+        manager = IncrementalManager(pool)
+        manager.set_line_count(2)
+        stack: StateStack = (StackFrame(lang_id="html", sub_state=1, end_condition=None),)
+        state_id = pool.intern(stack)
+        manager.update_line(0, "<!--", state_id, initial_state_id=-1, tokens=[])
+
+        assert pool.get(state_id) == stack
+        assert pool.stats().referenced == 1
+
+        manager.clear()
+        pool.intern((StackFrame(lang_id="html", sub_state=2, end_condition=None),))
+
+        assert pool.get(state_id) == ()
+        assert pool.stats().referenced == 0
+
 
 class TestHtmlJsTransitions:
     @pytest.fixture
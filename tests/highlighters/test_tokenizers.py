@@ -0,0 +1,33 @@
+import pytest
+
+from editor.highlighters.core.types import StyleId
+from editor.highlighters.tokenizers import (
+    CTokenizer,
+    JavaScriptTokenizer,
+    JavaTokenizer,
+    PythonTokenizer,
+)
+
+
+class TestScannerFixes:
+    @pytest.mark.parametrize("cls", [CTokenizer, PythonTokenizer, JavaTokenizer, JavaScriptTokenizer])
+    def test_operator_at_end_of_line_stays_inside_line(self, cls):
+        tokens = cls().tokenize_line("a +=", ()).tokens
+
+        assert tokens[-1].start + tokens[-1].length == 4
+
+    @pytest.mark.parametrize("cls", [JavaTokenizer, JavaScriptTokenizer])
+    def test_three_character_operator_at_end_of_line(self, cls):
+        tokens = cls().tokenize_line("a >>=", ()).tokens
+
+        assert (tokens[-1].start, tokens[-1].length) == (2, 3)
+
+    def test_javascript_comment_closing_at_end_of_line_pops_state(self):
+        tokenizer = JavaScriptTokenizer()
+        opened = tokenizer.tokenize_line("/* a", ()).final_stack
+
+        closed = tokenizer.tokenize_line(" */", opened)
+        after = tokenizer.tokenize_line("var x", closed.final_stack)
+
+        assert closed.final_stack == ()
+        assert after.tokens[0].style_id == StyleId.KEYWORD
@@ -178,6 +178,66 @@ class TestLineNumberArea:
         event = QPaintEvent(rect)
         editor.line_number_area_paint_event(event)
 
+    def _render(self, editor, region):
+        from PyQt6.QtGui import QImage, QRegion
+
+        area = editor.line_number_area
+        image = QImage(area.size(), QImage.Format.Format_ARGB32)
+        image.fill(0)
+        area.render(image, region.topLeft(), QRegion(region))
+        return image
+
+    def test_damaged_rows_paint_like_full_repaint(self, editor):
+        """Painting only a damaged strip yields the same pixels as a full repaint."""
+        from PyQt6.QtCore import QRect
+        from PyQt6.QtGui import QImage
+
+        editor.setPlainText("\n".join(["line"] * 200))
+        editor.resize(300, 400)
+        editor.show()
+        editor.verticalScrollBar().setValue(57)
+
+        area = editor.line_number_area
+        full = self._render(editor, area.rect())
+        strip = QRect(0, 150, area.width(), 40)
+        damaged = self._render(editor, strip)
+
+        assert damaged.copy(strip) == full.copy(strip)
+        blank = QImage(strip.size(), QImage.Format.Format_ARGB32)
+        blank.fill(0)
+        assert damaged.copy(strip) != blank
+
+    def test_font_change_resizes_gutter(self, editor):
+        editor.setPlainText("\n".join(["line"] * 50))
+        width_before = editor.line_number_area_width()
+
+        font = editor.font()
+        font.setPointSize(font.pointSize() * 3)
+        editor.setFont(font)
+
+        assert editor.line_number_area_width() > width_before
+        assert editor.viewportMargins().left() == editor.line_number_area_width()
+
+    def test_draw_number_is_right_aligned(self, app):
+        from PyQt6.QtGui import QFont, QImage, QPainter
+
+        from editor.line_number_gutter import LineNumberGutter
+
+        gutter = LineNumberGutter(QFont())
+        image = QImage(gutter.width(4), gutter.line_height, QImage.Format.Format_ARGB32)
+        image.fill(0)
+        right = image.width() - gutter.PADDING
+        painter = QPainter(image)
+        gutter.draw_number(painter, right, 0, 120)
+        painter.end()
+
+        def column_is_empty(x):
+            return all(image.pixel(x, y) == 0 for y in range(image.height()))
+
+        assert all(column_is_empty(x) for x in range(right, image.width()))
+        assert not all(column_is_empty(x) for x in range(right - gutter.digit_width, right))
+        assert all(column_is_empty(x) for x in range(0, right - 3 * gutter.digit_width))
+
 
 class TestKeyboardShortcuts:
     """Tests for keyboard shortcuts (Ctrl+Z, Ctrl+Y, etc.)."""
@@ -262,7 +322,7 @@ class TestKeyboardShortcuts:
         assert editor.toPlainText() == "a b"
         
         editor.undo()
-        assert editor.toPlainText() == "a "
+        assert editor.toPlainText() == "a"
 
     def test_ctrl_y_redoes_after_undo(self, editor):
         """Ctrl+Y should redo after undo."""
@@ -294,13 +354,13 @@ class TestKeyboardShortcuts:
         assert editor.toPlainText() == "a b c"
         
         editor.undo()
-        assert editor.toPlainText() == "a b "
+        assert editor.toPlainText() == "a b"
         
         editor.undo()
-        assert editor.toPlainText() == "a b"
+        assert editor.toPlainText() == "a"
         
         editor.redo()
-        assert editor.toPlainText() == "a b "
+        assert editor.toPlainText() == "a b"
         
         editor.redo()
         assert editor.toPlainText() == "a b c"
@@ -390,6 +450,38 @@ class TestKeyPressHandling:
         
         assert editor.toPlainText() == "hello", f"Expected 'hello', got '{editor.toPlainText()}'"
 
+    def _press_delete(self, editor):
+        from PyQt6.QtCore import Qt, QEvent
+        from PyQt6.QtGui import QKeyEvent
+
+        event = QKeyEvent(QEvent.Type.KeyPress, Qt.Key.Key_Delete, Qt.KeyboardModifier.NoModifier, "")
+        editor.keyPressEvent(event)
+
+    def test_delete_does_not_materialize_document(self, editor, monkeypatch):
+        """Delete checks the document end without copying the text out."""
+        editor.setPlainText("ab")
+        monkeypatch.setattr(editor, "toPlainText", lambda: pytest.fail("toPlainText called"))
+
+        self._press_delete(editor)
+        editor.moveCursor(editor.textCursor().MoveOperation.End)
+        self._press_delete(editor)
+
+        assert editor.document().characterCount() == 2
+        assert editor.undo_stack.count() == 1
+
+    def test_delete_and_undo_astral_character(self, editor):
+        """Undo puts back a character that takes two UTF-16 code units."""
+        editor.setPlainText("a\U0001F600b")
+        cursor = editor.textCursor()
+        cursor.setPosition(1)
+        editor.setTextCursor(cursor)
+
+        self._press_delete(editor)
+        assert editor.toPlainText() == "ab"
+
+        editor.undo()
+        assert editor.toPlainText() == "a\U0001F600b"
+
 
 class TestUndoHistoryLimit:
     """Tests for undo history limit using QUndoStack (MAX_UNDO_STEPS = 100)."""
@@ -480,6 +572,211 @@ class TestUndoHistoryLimit:
         assert len(editor.toPlainText()) == expected_length
 
 
+class TestUndoMemoryBudget:
+    """Large undo payloads are compressed, then spilled, past the budget."""
+
+    def _replace_all(self, editor, new_text):
+        from editor.undo_commands import ReplaceTextCommand
+
+        old_text = editor.toPlainText()
+        cursor = editor.textCursor()
+        cursor.select(cursor.SelectionType.Document)
+        cursor.insertText(new_text)
+        editor.undo_stack.push(ReplaceTextCommand(editor, 0, len(old_text), old_text, new_text))
+
+    def test_footprint_counts_payloads(self, editor):
+        from editor.undo_commands import InsertTextCommand
+
+        editor.undo_stack.push(InsertTextCommand(editor, "x" * 1000, 0))
+        footprint = editor.undo_stack.footprint()
+        assert footprint.memory >= 1000
+        assert footprint.disk == 0
+
+    def test_payloads_compressed_over_budget(self, editor):
+        editor.undo_stack.memory_budget = 100_000
+        texts = [f"pass {i}\n" * 20_000 for i in range(4)]
+        editor.setPlainText("start")
+        for text in texts:
+            self._replace_all(editor, text)
+
+        footprint = editor.undo_stack.footprint()
+        assert footprint.memory <= 100_000
+        assert footprint.disk == 0
+
+        for text in reversed(texts[:-1]):
+            editor.undo()
+            assert editor.toPlainText() == text
+        editor.undo()
+        assert editor.toPlainText() == "start"
+        for text in texts:
+            editor.redo()
+            assert editor.toPlainText() == text
+
+    def test_payloads_spilled_when_compression_is_not_enough(self, editor):
+        import os
+        import random
+
+        editor.undo_stack.memory_budget = 100_000
+        rng = random.Random(1)
+        texts = ["".join(rng.choice("abcdefgh ") for _ in range(200_000)) for _ in range(3)]
+        editor.setPlainText("")
+        for text in texts:
+            self._replace_all(editor, text)
+
+        footprint = editor.undo_stack.footprint()
+        assert footprint.memory <= 100_000
+        assert footprint.disk > 0
+        paths = [
+            payload._path
+            for index in range(editor.undo_stack.count())
+            for payload in editor.undo_stack.command(index).payloads()
+            if payload._path
+        ]
+
+        editor.undo()
+        assert editor.toPlainText() == texts[1]
+        editor.undo()
+        assert editor.toPlainText() == texts[0]
+
+        editor.undo_stack.clear()
+        import gc
+        gc.collect()
+        assert not any(os.path.exists(path) for path in paths)
+
+    def test_small_payloads_stay_in_memory(self, editor):
+        from editor.undo_commands import InsertTextCommand
+
+        editor.undo_stack.memory_budget = 10
+        for _ in range(5):
+            editor.undo_stack.push(InsertTextCommand(editor, "word ", 0))
+
+        for index in range(editor.undo_stack.count()):
+            payload = editor.undo_stack.command(index).payloads()[0]
+            assert payload.text == "word "
+            assert payload._data is None and payload._path is None
+
+
+class TestUndoCoalescing:
+    """Typed whitespace with the word after it, Backspace and Delete runs merge into one step."""
+
+    def _press(self, editor, key, text=""):
+        from PyQt6.QtCore import Qt, QEvent
+        from PyQt6.QtGui import QKeyEvent
+
+        event = QKeyEvent(QEvent.Type.KeyPress, key, Qt.KeyboardModifier.NoModifier, text)
+        editor.keyPressEvent(event)
+
+    def _type(self, editor, text):
+        from PyQt6.QtCore import Qt
+
+        for char in text:
+            if char == " ":
+                self._press(editor, Qt.Key.Key_Space, " ")
+            elif char == "\n":
+                self._press(editor, Qt.Key.Key_Return, "\r")
+            else:
+                self._press(editor, Qt.Key.Key_A, char)
+
+    def _move_to(self, editor, position):
+        cursor = editor.textCursor()
+        cursor.setPosition(position)
+        editor.setTextCursor(cursor)
+
+    def test_indentation_is_one_step(self, editor):
+        self._type(editor, "if\n    x")
+        editor.undo()
+        assert editor.toPlainText() == "if\n"
+        editor.undo()
+        assert editor.toPlainText() == "if"
+
+    def test_sentence_is_one_step_per_word(self, editor):
+        sentence = "The quick brown fox jumps over the lazy dog. It was fun"
+        self._type(editor, sentence)
+        editor.end_typing()
+
+        assert editor.undo_stack.count() == len(sentence.split())
+        editor.undo()
+        assert editor.toPlainText() == "The quick brown fox jumps over the lazy dog. It was"
+        editor.undo()
+        assert editor.toPlainText() == "The quick brown fox jumps over the lazy dog. It"
+
+    def test_backspace_run_is_one_step(self, editor):
+        from PyQt6.QtCore import Qt
+
+        editor.setPlainText("hello world")
+        editor.moveCursor(editor.textCursor().MoveOperation.End)
+        for _ in range(5):
+            self._press(editor, Qt.Key.Key_Backspace)
+
+        assert editor.toPlainText() == "hello "
+        assert editor.undo_stack.count() == 1
+        editor.undo()
+        assert editor.toPlainText() == "hello world"
+        editor.redo()
+        assert editor.toPlainText() == "hello "
+
+    def test_delete_run_is_one_step(self, editor):
+        from PyQt6.QtCore import Qt
+
+        editor.setPlainText("hello world")
+        self._move_to(editor, 5)
+        for _ in range(6):
+            self._press(editor, Qt.Key.Key_Delete)
+
+        assert editor.toPlainText() == "hello"
+        assert editor.undo_stack.count() == 1
+        editor.undo()
+        assert editor.toPlainText() == "hello world"
+
+    def test_deleting_a_line_break_is_its_own_step(self, editor):
+        from PyQt6.QtCore import Qt
+
+        editor.setPlainText("ab\ncd")
+        editor.moveCursor(editor.textCursor().MoveOperation.End)
+        for _ in range(4):
+            self._press(editor, Qt.Key.Key_Backspace)
+
+        assert editor.toPlainText() == "a"
+        assert editor.undo_stack.count() == 3
+        editor.undo()
+        assert editor.toPlainText() == "ab"
+        editor.undo()
+        assert editor.toPlainText() == "ab\n"
+
+    def test_pause_starts_new_step(self, editor, monkeypatch):
+        from PyQt6.QtCore import Qt
+        from editor.undo_commands import TextEditCommand
+
+        monkeypatch.setattr(TextEditCommand, "MERGE_WINDOW", -1.0)
+        editor.setPlainText("abc")
+        editor.moveCursor(editor.textCursor().MoveOperation.End)
+        self._press(editor, Qt.Key.Key_Backspace)
+        self._press(editor, Qt.Key.Key_Backspace)
+        self._type(editor, "xy")
+        editor.undo()
+
+        assert editor.undo_stack.count() == 4
+        assert editor.toPlainText() == "ax"
+
+    def test_typing_elsewhere_starts_new_step(self, editor):
+        editor.setPlainText("one two")
+        self._move_to(editor, 3)
+        self._type(editor, "AA")
+        self._move_to(editor, 0)
+        self._type(editor, "B")
+        editor.undo()
+        assert editor.toPlainText() == "oneAA two"
+        editor.undo()
+        assert editor.toPlainText() == "one two"
+
+    def test_untyped_commands_do_not_merge(self, editor):
+        from editor.undo_commands import InsertTextCommand
+
+        editor.undo_stack.push(InsertTextCommand(editor, " ", 0))
+        editor.undo_stack.push(InsertTextCommand(editor, " ", 1))
+        assert editor.undo_stack.count() == 2
+
+
 # =============================================================================
 # NEW QA TESTS FOR UNDO/REDO EDGE CASES AND COMMON BUGS
 # =============================================================================
@@ -1194,3 +1491,56 @@ class TestUndoRedoMemoryAndPerformance:
         editor.redo()
         
         assert len(editor.toPlainText()) == len(content_after_undo) + 1
+
+
+class TestSharedDocument:
+    """Tests for two editors showing one document (split panes)."""
+
+    def _type(self, editor, text):
+        from PyQt6.QtCore import Qt, QEvent
+        from PyQt6.QtGui import QKeyEvent
+
+        for char in text:
+            key = Qt.Key.Key_Space if char == " " else getattr(Qt.Key, f"Key_{char.upper()}")
+            event = QKeyEvent(QEvent.Type.KeyPress, key, Qt.KeyboardModifier.NoModifier, char)
+            editor.keyPressEvent(event)
+
+    def test_share_document_shares_text_and_undo(self, editor):
+        editor.setPlainText("hello")
+        other = CodeEditor()
+        other.share_document(editor)
+
+        assert other.document() is editor.document()
+        assert other.undo_stack is editor.undo_stack
+        assert other.line_number_area is not editor.line_number_area
+
+        other.moveCursor(other.textCursor().MoveOperation.End)
+        self._type(other, " world ")
+        assert editor.toPlainText() == "hello world "
+
+        editor.undo()
+        editor.undo()
+        assert other.toPlainText() == "hello"
+
+    def test_each_editor_keeps_its_cursor(self, editor):
+        editor.setPlainText("one\ntwo\nthree")
+        other = CodeEditor()
+        other.share_document(editor)
+
+        other.moveCursor(other.textCursor().MoveOperation.End)
+
+        assert editor.textCursor().position() == 0
+        assert other.textCursor().position() == len("one\ntwo\nthree")
+
+    def test_hand_over_undo_retargets_commands(self, editor):
+        editor.setPlainText("")
+        other = CodeEditor()
+        other.share_document(editor)
+        self._type(other, "ab ")
+
+        other.hand_over_undo(editor)
+        other.deleteLater()
+        editor.undo()
+        editor.undo()
+
+        assert editor.toPlainText() == ""
@@ -0,0 +1,90 @@
+from editor.models.document import DocumentModel
+
+
+class TextSource:
+    """Stands in for the editor: holds live text and counts reads."""
+
+    def __init__(self, text=""):
+        self.text = text
+        self.reads = 0
+
+    def __call__(self):
+        self.reads += 1
+        return self.text
+
+    def edit(self, document, text):
+        self.text = text
+        document.note_edit(len(text.encode("utf-16-le")) // 2)
+
+
+def _document(source, text):
+    document = DocumentModel()
+    document.content_source = source
+    source.edit(document, text)
+    document.mark_saved()
+    source.reads = 0
+    return document
+
+
+class TestRevisionTracking:
+    def test_new_document_is_unmodified(self):
+        assert DocumentModel().is_modified is False
+
+    def test_length_change_does_not_read_content(self):
+        source = TextSource()
+        document = _document(source, "hello")
+
+        source.edit(document, "hello!")
+
+        assert document.is_modified is True
+        assert source.reads == 0
+
+    def test_same_length_edit_is_hashed_once_per_revision(self):
+        source = TextSource()
+        document = _document(source, "hello")
+
+        source.edit(document, "jello")
+
+        assert document.is_modified is True
+        assert document.is_modified is True
+        assert source.reads == 1
+
+    def test_restoring_saved_text_is_unmodified(self):
+        source = TextSource()
+        document = _document(source, "hello")
+
+        source.edit(document, "hell")
+        source.edit(document, "hello")
+
+        assert document.is_modified is False
+
+    def test_length_is_counted_in_utf16_units(self):
+        source = TextSource()
+        document = DocumentModel()
+        document.content_source = source
+        document.set_content("x\U0001F600", mark_as_saved=True)
+
+        source.edit(document, "x\U0001F600")
+
+        assert document.is_modified is False
+
+    def test_mark_saved_uses_live_content(self):
+        source = TextSource()
+        document = _document(source, "a")
+
+        source.edit(document, "b")
+        document.mark_saved()
+
+        assert document.is_modified is False
+        assert document.current_content == "b"
+
+    def test_reset_clears_path_and_content(self):
+        document = DocumentModel()
+        document.file_path = "a.txt"
+        document.set_content("text")
+
+        document.reset()
+
+        assert document.file_path is None
+        assert document.current_content == ""
+        assert document.is_modified is False
@@ -1,8 +1,11 @@
+import codecs
 import os
+import stat
 import tempfile
 import pytest
 from unittest.mock import patch, MagicMock
 
+from editor.file_format import SNIFF_SIZE, BinaryFileError, FileFormat
 from editor.file_manager import FileManager
 
 
@@ -53,6 +56,78 @@ class TestFileManager:
         finally:
             file_path.chmod(0o644)
 
+    def test_write_file_leaves_no_temp_files(self, tmp_path):
+        file_path = tmp_path / "test.txt"
+
+        FileManager.write_file(str(file_path), "content")
+        FileManager.write_file(str(file_path), "more content")
+
+        assert os.listdir(tmp_path) == ["test.txt"]
+
+    def test_failed_write_keeps_original(self, tmp_path):
+        file_path = tmp_path / "test.txt"
+        file_path.write_text("original", encoding="utf-8")
+
+        with patch("editor.file_manager.os.fsync", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                FileManager.write_file(str(file_path), "replacement")
+
+        assert file_path.read_text(encoding="utf-8") == "original"
+        assert os.listdir(tmp_path) == ["test.txt"]
+
+    def test_write_file_keeps_permissions(self, tmp_path):
+        if os.name == "nt":
+            pytest.skip("POSIX permissions only")
+        file_path = tmp_path / "script.sh"
+        file_path.write_text("old", encoding="utf-8")
+        file_path.chmod(0o750)
+
+        FileManager.write_file(str(file_path), "new")
+
+        assert file_path.stat().st_mode & 0o777 == 0o750
+
+    def test_new_file_gets_default_permissions(self, tmp_path):
+        if os.name == "nt":
+            pytest.skip("POSIX permissions only")
+        file_path = tmp_path / "new.txt"
+
+        old_umask = os.umask(0o027)
+        try:
+            FileManager.write_file(str(file_path), "new")
+        finally:
+            os.umask(old_umask)
+
+        assert file_path.stat().st_mode & 0o777 == 0o640
+
+    def test_write_file_syncs_directory(self, tmp_path):
+        if os.name == "nt":
+            pytest.skip("Directories cannot be synced on Windows")
+        file_path = tmp_path / "test.txt"
+        synced = []
+        fsync = os.fsync
+
+        def record(fd):
+            synced.append(stat.S_ISDIR(os.fstat(fd).st_mode))
+            fsync(fd)
+
+        with patch("editor.file_manager.os.fsync", side_effect=record):
+            FileManager.write_file(str(file_path), "content")
+
+        assert synced == [False, True]
+
+    def test_write_file_follows_symlink(self, tmp_path):
+        if os.name == "nt":
+            pytest.skip("Symlinks need privileges on Windows")
+        target = tmp_path / "target.txt"
+        target.write_text("old", encoding="utf-8")
+        link = tmp_path / "link.txt"
+        link.symlink_to(target)
+
+        FileManager.write_file(str(link), "new")
+
+        assert link.is_symlink()
+        assert target.read_text(encoding="utf-8") == "new"
+
     def test_read_file_returns_content(self, tmp_path):
         file_path = tmp_path / "test.txt"
         file_path.write_text("Hello, World!", encoding="utf-8")
@@ -90,6 +165,62 @@ class TestFileManager:
 
         assert content == ""
 
+    def test_read_text_detects_latin1(self, tmp_path):
+        file_path = tmp_path / "latin1.txt"
+        file_path.write_bytes("café\n".encode("latin-1"))
+
+        content, file_format = FileManager.read_text(str(file_path))
+
+        assert content == "café\n"
+        assert file_format.encoding == "latin-1"
+
+    def test_read_text_falls_back_to_latin1_past_prefix(self, tmp_path):
+        file_path = tmp_path / "late.txt"
+        file_path.write_bytes(b"x" * SNIFF_SIZE + "é".encode("latin-1"))
+
+        content, file_format = FileManager.read_text(str(file_path))
+
+        assert content.endswith("xé")
+        assert file_format.encoding == "latin-1"
+
+    def test_read_text_strips_bom_and_translates_newlines(self, tmp_path):
+        file_path = tmp_path / "utf16.txt"
+        file_path.write_bytes(codecs.BOM_UTF16_LE + "a\r\nb\r\n".encode("utf-16-le"))
+
+        content, file_format = FileManager.read_text(str(file_path))
+
+        assert content == "a\nb\n"
+        assert file_format == FileFormat("utf-16-le", True, "\r\n")
+
+    def test_read_binary_file_raises(self, tmp_path):
+        file_path = tmp_path / "image.png"
+        file_path.write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR")
+
+        with pytest.raises(BinaryFileError):
+            FileManager.read_file(str(file_path))
+
+    def test_read_binary_past_prefix_raises(self, tmp_path):
+        file_path = tmp_path / "archive.tar"
+        file_path.write_bytes(b"x" * SNIFF_SIZE + b"\xff\x00\x01")
+
+        with pytest.raises(BinaryFileError):
+            FileManager.read_file(str(file_path))
+
+    @pytest.mark.parametrize("data", [
+        "café\r\nline\r\n".encode("latin-1"),
+        codecs.BOM_UTF8 + "naïve\nline\n".encode("utf-8"),
+        codecs.BOM_UTF16_BE + "日本\r\n".encode("utf-16-be"),
+        "no bom\rmac\r".encode("utf-16-le"),
+    ])
+    def test_roundtrip_preserves_format(self, tmp_path, data):
+        file_path = tmp_path / "roundtrip.txt"
+        file_path.write_bytes(data)
+
+        content, file_format = FileManager.read_text(str(file_path))
+        FileManager.write_file(str(file_path), content, file_format)
+
+        assert file_path.read_bytes() == data
+
     def test_write_to_directory_raises(self, tmp_path):
         with pytest.raises((IsADirectoryError, PermissionError, OSError)):
             FileManager.write_file(str(tmp_path), "content")
@@ -187,3 +318,50 @@ class TestSaveAs:
 
         assert new_file.exists()
         assert window._document.file_path == str(new_file)
+
+
+class TestReadChunks:
+    def _read(self, path, chunk_size):
+        return "".join(text for text, _ in FileManager.read_chunks(str(path), chunk_size))
+
+    def test_chunks_join_to_file_content(self, tmp_path):
+        test_file = tmp_path / "chunks.txt"
+        test_file.write_text("line\n" * 1000, encoding="utf-8")
+
+        assert self._read(test_file, 64) == FileManager.read_file(str(test_file))
+
+    def test_multibyte_character_split_between_chunks(self, tmp_path):
+        test_file = tmp_path / "unicode.txt"
+        test_file.write_text("é😀" * 100, encoding="utf-8")
+
+        assert self._read(test_file, 3) == "é😀" * 100
+
+    def test_crlf_split_between_chunks(self, tmp_path):
+        test_file = tmp_path / "crlf.txt"
+        test_file.write_bytes(b"a\r\nb\r\n")
+
+        assert self._read(test_file, 2) == "a\nb\n"
+
+    def test_reports_bytes_read(self, tmp_path):
+        test_file = tmp_path / "progress.txt"
+        test_file.write_bytes(b"x" * 10)
+
+        progress = [read for _, read in FileManager.read_chunks(str(test_file), 4)]
+
+        assert progress == [4, 8, 10]
+
+    def test_decodes_with_file_format(self, tmp_path):
+        test_file = tmp_path / "utf16.txt"
+        test_file.write_bytes(codecs.BOM_UTF16_LE + "é\r\nx\r\n".encode("utf-16-le") * 50)
+        file_format = FileManager.detect_format(str(test_file))
+
+        chunks = FileManager.read_chunks(str(test_file), 3, file_format)
+
+        assert "".join(text for text, _ in chunks) == "é\nx\n" * 50
+
+    def test_binary_file_raises(self, tmp_path):
+        test_file = tmp_path / "binary.bin"
+        test_file.write_bytes(b"ok\xff\xfe")
+
+        with pytest.raises(UnicodeDecodeError):
+            self._read(test_file, 2)
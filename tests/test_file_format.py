@@ -0,0 +1,73 @@
+import codecs
+
+import pytest
+
+from editor.file_format import (
+    SNIFF_SIZE,
+    BinaryFileError,
+    FileFormat,
+    sniff,
+    sniff_file,
+)
+
+
+class TestSniff:
+    @pytest.mark.parametrize("encoding, bom", [
+        ("utf-8", codecs.BOM_UTF8),
+        ("utf-16-le", codecs.BOM_UTF16_LE),
+        ("utf-16-be", codecs.BOM_UTF16_BE),
+        ("utf-32-le", codecs.BOM_UTF32_LE),
+        ("utf-32-be", codecs.BOM_UTF32_BE),
+    ])
+    def test_bom_decides_encoding(self, encoding, bom):
+        data = bom + "line\n".encode(encoding)
+
+        assert sniff(data, complete=True) == FileFormat(encoding, True, "\n")
+
+    def test_utf16_without_bom(self):
+        assert sniff("hello\nworld\n".encode("utf-16-le")).encoding == "utf-16-le"
+        assert sniff("hello\nworld\n".encode("utf-16-be")).encoding == "utf-16-be"
+
+    def test_valid_utf8(self):
+        assert sniff("héllo 世界\n".encode("utf-8"), complete=True).encoding == "utf-8"
+
+    def test_invalid_utf8_is_latin1(self):
+        assert sniff("café\n".encode("latin-1"), complete=True).encoding == "latin-1"
+
+    def test_character_cut_off_at_end_of_prefix_is_utf8(self):
+        data = ("x" * 10 + "é").encode("utf-8")[:-1]
+
+        assert sniff(data).encoding == "utf-8"
+        assert sniff(data, complete=True).encoding == "latin-1"
+
+    def test_nul_bytes_are_binary(self):
+        with pytest.raises(BinaryFileError):
+            sniff(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR")
+
+    def test_control_bytes_are_binary(self):
+        with pytest.raises(BinaryFileError):
+            sniff(bytes(range(1, 32)) * 4)
+
+    def test_text_with_escape_sequences_is_text(self):
+        assert sniff(b"\x1b[31mred\x1b[0m\n", complete=True).encoding == "utf-8"
+
+    @pytest.mark.parametrize("data, newline", [
+        (b"a\nb\n", "\n"),
+        (b"a\r\nb\r\n", "\r\n"),
+        (b"a\rb\r", "\r"),
+        (b"a\r\nb\r\nc\n", "\r\n"),
+    ])
+    def test_majority_newline(self, data, newline):
+        assert sniff(data, complete=True).newline == newline
+
+    def test_single_line_uses_default_newline(self):
+        default = FileFormat(newline="\r\n")
+
+        assert sniff(b"one line", complete=True, default=default).newline == "\r\n"
+
+    def test_sniff_file_reads_prefix_only(self, tmp_path):
+        path = tmp_path / "big.txt"
+        prefix = (b"a\r\n" * (SNIFF_SIZE // 3)).ljust(SNIFF_SIZE, b"a")
+        path.write_bytes(prefix + b"\xff" + b"b\n" * SNIFF_SIZE)
+
+        assert sniff_file(str(path)) == FileFormat("utf-8", False, "\r\n")
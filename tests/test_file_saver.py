@@ -0,0 +1,83 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from editor.file_saver import FileSaver, SaveRequest
+from editor.models.document import fingerprint
+
+
+@pytest.fixture
+def saver(qapp):
+    file_saver = FileSaver()
+    yield file_saver
+    file_saver.wait()
+
+
+@pytest.fixture
+def blocked_writes():
+    """Hold every write until ``release`` is set; record what was written."""
+    release = threading.Event()
+    written = []
+
+    def write_file(file_path, content, file_format):
+        release.wait(5)
+        written.append(content)
+
+    with patch("editor.file_saver.FileManager.write_file", side_effect=write_file):
+        yield release, written
+
+
+def _finished(saver):
+    reports = []
+    saver.finished.connect(lambda request, state, error: reports.append((request, state, error)))
+    return reports
+
+
+class TestFileSaver:
+    def test_writes_and_reports_fingerprint(self, saver, tmp_path):
+        reports = _finished(saver)
+        request = SaveRequest(str(tmp_path / "a.txt"), "text", 3)
+
+        saver.save(request)
+        assert saver.is_busy
+        saver.wait()
+
+        assert not saver.is_busy
+        assert (tmp_path / "a.txt").read_text(encoding="utf-8") == "text"
+        assert reports == [(request, fingerprint("text"), None)]
+
+    def test_repeated_saves_are_coalesced(self, saver, blocked_writes, tmp_path):
+        release, written = blocked_writes
+        reports = _finished(saver)
+        path = str(tmp_path / "a.txt")
+
+        for revision in range(5):
+            saver.save(SaveRequest(path, f"v{revision}", revision))
+        assert saver.has_pending(4)
+        assert not saver.has_pending(2)
+        release.set()
+        saver.wait()
+
+        assert written == ["v0", "v4"]
+        assert [request.revision for request, _, _ in reports] == [0, 4]
+
+    def test_error_is_reported(self, saver, tmp_path):
+        reports = _finished(saver)
+
+        saver.save(SaveRequest(str(tmp_path / "missing" / "a.txt"), "text", 0))
+        saver.wait()
+
+        request, state, error = reports[0]
+        assert state is None
+        assert isinstance(error, OSError)
+
+    def test_result_delivered_through_event_loop(self, saver, qapp, tmp_path):
+        reports = _finished(saver)
+
+        saver.save(SaveRequest(str(tmp_path / "a.txt"), "text", 0))
+        while saver.is_busy:
+            qapp.processEvents()
+        saver.wait()
+
+        assert len(reports) == 1
@@ -5,6 +5,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 from PyQt6.QtCore import Qt, QModelIndex
+from PyQt6.QtGui import QIcon, QPixmap
 from PyQt6.QtWidgets import QApplication
 
 from editor.file_tree import FileTreeWidget
@@ -181,6 +182,18 @@ class TestFileTreeWidget:
         assert selected_path == file_path
 
 
+    def test_file_icons_come_from_language_index(self, file_tree):
+        model = file_tree._model
+        icon = QIcon(QPixmap(16, 16))
+
+        with patch("editor.file_tree.QIcon.fromTheme", return_value=icon) as from_theme:
+            python_index = model.index(os.path.join(file_tree.get_root_folder(), "file2.py"))
+            assert model.data(python_index, Qt.ItemDataRole.DecorationRole) is icon
+            assert model.language_icon("other.py") is icon
+            assert model.language_icon("unknown.xyz") is None
+
+        from_theme.assert_called_once_with("text-x-python")
+
 class TestFileTreeContextMenu:
     """Tests for context menu actions."""
 
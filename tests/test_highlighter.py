@@ -1,3 +1,4 @@
+import codecs
 import re
 import sys
 import pytest
@@ -16,6 +17,7 @@ from editor.highlighter import (
     PlainTextHighlighter,
     LanguageDetector,
 )
+from editor.highlighters.detector import MAX_LINES, PREFIX_SIZE
 
 
 @pytest.fixture(scope="module")
@@ -149,6 +151,10 @@ class TestLanguageDetectorExtension:
     def test_plain_text(self):
         assert LanguageDetector.detect_from_extension("file.txt") == "plain"
 
+    def test_javascript_and_grammar_languages(self):
+        assert LanguageDetector.detect_from_extension("app.js") == "javascript"
+        assert LanguageDetector.detect_from_extension("style.css") == "css"
+
     def test_unknown_extension(self):
         assert LanguageDetector.detect_from_extension("file.xyz") == ""
         assert LanguageDetector.detect_from_extension("noextension") == ""
@@ -206,6 +212,26 @@ class TestLanguageDetectorContent:
         assert LanguageDetector.detect_from_content("") == "plain"
 
 
+    def test_detect_by_shebang(self):
+        content = "#!/usr/bin/env node\nconsole.log(1);\n"
+        assert LanguageDetector.detect_from_content(content) == "javascript"
+
+    def test_cpp_keyword_starting_a_line(self):
+        content = "#include <vector>\ntemplate <typename T>\nT max(T a, T b);"
+        assert LanguageDetector.detect_from_content(content) == "cpp"
+
+    def test_python_class_starting_a_line_with_include(self):
+        content = '#include "x.h"\nclass Foo:\n'
+        assert LanguageDetector.detect_from_content(content) == "cpp"
+
+    def test_only_first_lines_are_examined(self):
+        content = "text\n" * MAX_LINES + "# Title\n"
+        assert LanguageDetector.detect_from_content(content) == "plain"
+
+    def test_long_lines_are_cut_off(self):
+        content = "x" * PREFIX_SIZE + "\n# Title\n"
+        assert LanguageDetector.detect_from_content(content) == "plain"
+
 class TestLanguageDetectorRealisticFiles:
     def test_realistic_python_file(self):
         content = '''#!/usr/bin/env python3
@@ -356,6 +382,28 @@ class TestLanguageDetectorIntegration:
         assert LanguageDetector.detect("", "") == "plain"
 
 
+class TestLanguageDetectorFromFile:
+    def test_extension_takes_precedence(self, tmp_path):
+        path = tmp_path / "script.py"
+        path.write_text("#include <stdio.h>\n", encoding="utf-8")
+        assert LanguageDetector.detect_from_file(str(path)) == "python"
+
+    def test_content_used_without_extension(self, tmp_path):
+        path = tmp_path / "script"
+        path.write_text("import os\r\n\r\ndef main():\r\n    pass\r\n", encoding="utf-8")
+        assert LanguageDetector.detect_from_file(str(path)) == "python"
+
+    def test_reads_detected_encoding(self, tmp_path):
+        path = tmp_path / "page"
+        path.write_bytes(codecs.BOM_UTF16_LE + "<!DOCTYPE html>\n".encode("utf-16-le"))
+        assert LanguageDetector.detect_from_file(str(path)) == "html"
+
+    def test_binary_and_missing_files_are_plain(self, tmp_path):
+        path = tmp_path / "blob"
+        path.write_bytes(b"\x00\x01\x02#include <x>")
+        assert LanguageDetector.detect_from_file(str(path)) == "plain"
+        assert LanguageDetector.detect_from_file(str(tmp_path / "missing")) == "plain"
+
 class TestSuggestExtension:
     def test_keeps_existing_extension(self):
         assert LanguageDetector.suggest_extension("file.py", "") == "file.py"
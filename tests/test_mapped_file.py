@@ -0,0 +1,101 @@
+import pytest
+
+from editor.file_format import FileFormat
+from editor.models.mapped_file import MappedFile
+
+
+@pytest.fixture
+def mapped(tmp_path):
+    files = []
+
+    def open_mapped(data: bytes, block_size: int = 8, file_format: FileFormat = FileFormat()) -> MappedFile:
+        path = tmp_path / f"file{len(files)}.txt"
+        path.write_bytes(data)
+        mapped_file = MappedFile(str(path), file_format)
+        mapped_file.BLOCK_SIZE = block_size
+        files.append(mapped_file)
+        return mapped_file
+
+    yield open_mapped
+    for mapped_file in files:
+        mapped_file.close()
+
+
+class TestMappedFile:
+    def test_lines_match_split(self, mapped):
+        text = "".join(f"line {i}\n" * (i % 3) for i in range(50))
+        mapped_file = mapped(text.encode())
+        mapped_file.build_index()
+
+        expected = text.split("\n")
+        assert mapped_file.line_count == len(expected)
+        for first in range(len(expected)):
+            assert mapped_file.lines(first, 4) == expected[first:first + 4]
+
+    def test_line_offset_uses_index(self, mapped):
+        mapped_file = mapped(b"a\nbb\nccc\n" * 10)
+        mapped_file.build_index()
+
+        assert mapped_file.line_offset(0) == 0
+        assert mapped_file.line_offset(2) == 5
+        assert mapped_file.line_offset(30) == 90
+        assert mapped_file.line_offset(31) is None
+
+    def test_crlf_and_invalid_utf8(self, mapped):
+        mapped_file = mapped(b"one\r\nt\xffo\r\n")
+        mapped_file.build_index()
+
+        assert mapped_file.lines(0, 3) == ["one", "t�o", ""]
+
+    def test_long_lines_are_cut_off(self, mapped):
+        mapped_file = mapped(b"x" * 100 + b"\nend")
+        mapped_file.MAX_LINE_BYTES = 10
+        mapped_file.build_index()
+
+        assert mapped_file.lines(0, 2) == ["x" * 10, "end"]
+
+    def test_long_line_end_comes_from_index(self, mapped):
+        mapped_file = mapped(b"x" * 1000 + b"\nnext\n" + b"y" * 1000, block_size=64)
+        mapped_file.MAX_LINE_BYTES = 10
+        mapped_file.build_index()
+
+        assert mapped_file.lines(0, 5) == ["x" * 10, "next", "y" * 10]
+
+    def test_decodes_in_file_format(self, mapped):
+        latin = mapped("café\nnaïve".encode("latin-1"), file_format=FileFormat("latin-1"))
+        latin.build_index()
+        utf16 = mapped(
+            "\ufeffone\r\ntwo\n".encode("utf-16-le"), file_format=FileFormat("utf-16-le", bom=True)
+        )
+        utf16.build_index()
+
+        assert latin.lines(0, 2) == ["café", "naïve"]
+        assert utf16.line_count == 3
+        assert utf16.lines(0, 3) == ["one", "two", ""]
+
+    def test_lines_stop_at_indexed_part(self, mapped):
+        mapped_file = mapped(b"a\nb\nc\nd\ne\n", block_size=4)
+
+        assert mapped_file.lines(0, 10) == []
+        assert not mapped_file.is_indexed
+
+        mapped_file.build_index()
+
+        assert mapped_file.is_indexed
+        assert mapped_file.lines(3, 10) == ["d", "e", ""]
+
+    def test_empty_file(self, mapped):
+        mapped_file = mapped(b"")
+
+        assert mapped_file.is_indexed
+        assert mapped_file.line_count == 1
+        assert mapped_file.lines(0, 5) == [""]
+
+    def test_background_indexing(self, mapped):
+        mapped_file = mapped(b"line\n" * 10_000, block_size=1024)
+
+        mapped_file.start_indexing()
+        mapped_file._thread.join()
+
+        assert mapped_file.line_count == 10_001
+        assert mapped_file.lines(9_999, 2) == ["line", ""]
@@ -0,0 +1,242 @@
+import os
+
+import pytest
+from PyQt6.QtCore import QEvent, Qt
+from PyQt6.QtGui import QKeyEvent
+
+from editor.code_editor import CodeEditor
+from editor.models.document import fingerprint
+from editor.undo_commands import InsertTextCommand, TextEditCommand
+from editor.undo_journal import UndoJournal
+
+
+@pytest.fixture
+def file_path(tmp_path):
+    return str(tmp_path / "notes.txt")
+
+
+def _open(qapp, file_path, text):
+    """Show ``text`` as if ``file_path`` was just opened, with its journal."""
+    editor = CodeEditor()
+    editor.setPlainText(text)
+    editor.undo_stack.journal = UndoJournal.restore(file_path, fingerprint(text), editor)
+    editor.moveCursor(editor.textCursor().MoveOperation.End)
+    return editor
+
+
+def _save(editor):
+    editor.end_typing()
+    editor.undo_stack.journal.checkpoint(fingerprint(editor.toPlainText()))
+
+
+def _close(editor):
+    editor.undo_stack.journal.close()
+    editor.undo_stack.journal = None
+
+
+def _press(editor, key, text=""):
+    editor.keyPressEvent(QKeyEvent(QEvent.Type.KeyPress, key, Qt.KeyboardModifier.NoModifier, text))
+
+
+def _type(editor, text):
+    for char in text:
+        if char == " ":
+            _press(editor, Qt.Key.Key_Space, " ")
+        else:
+            _press(editor, Qt.Key.Key_A, char)
+
+
+def _undo_all(editor):
+    texts = [editor.toPlainText()]
+    while editor.canUndo():
+        editor.undo()
+        texts.append(editor.toPlainText())
+    return texts
+
+
+class TestUndoJournal:
+    def test_history_survives_reopening(self, qapp, file_path):
+        editor = _open(qapp, file_path, "start")
+        _type(editor, " one two")
+        _save(editor)
+        _close(editor)
+
+        editor = _open(qapp, file_path, "start one two")
+        assert _undo_all(editor) == [
+            "start one two", "start one", "start",
+        ]
+
+    def test_restored_steps_can_be_redone(self, qapp, file_path):
+        editor = _open(qapp, file_path, "a")
+        _type(editor, " b")
+        _save(editor)
+        _close(editor)
+
+        editor = _open(qapp, file_path, "a b")
+        editor.undo()
+        editor.undo()
+        editor.redo()
+        editor.redo()
+        assert editor.toPlainText() == "a b"
+
+    def test_unsaved_edits_are_not_restored(self, qapp, file_path):
+        editor = _open(qapp, file_path, "x")
+        _type(editor, " saved")
+        _save(editor)
+        _type(editor, " lost")
+        editor.end_typing()
+        _close(editor)
+
+        editor = _open(qapp, file_path, "x saved")
+        assert _undo_all(editor) == ["x saved", "x"]
+
+    def test_undone_steps_are_not_restored(self, qapp, file_path):
+        editor = _open(qapp, file_path, "")
+        _type(editor, "one two")
+        editor.undo()
+        _type(editor, " three")
+        _save(editor)
+        _close(editor)
+
+        editor = _open(qapp, file_path, "one three")
+        assert _undo_all(editor) == ["one three", "one", ""]
+
+    def test_merged_steps_are_restored_whole(self, qapp, file_path):
+        editor = _open(qapp, file_path, "keep delete")
+        for _ in range(7):
+            _press(editor, Qt.Key.Key_Backspace)
+        _save(editor)
+        _close(editor)
+
+        editor = _open(qapp, file_path, "keep")
+        assert _undo_all(editor) == ["keep", "keep delete"]
+
+    def test_history_of_several_sessions(self, qapp, file_path):
+        editor = _open(qapp, file_path, "")
+        _type(editor, "a")
+        _save(editor)
+        _close(editor)
+
+        editor = _open(qapp, file_path, "a")
+        editor.undo()
+        _type(editor, "b")
+        _save(editor)
+        _close(editor)
+
+        editor = _open(qapp, file_path, "b")
+        assert _undo_all(editor) == ["b", ""]
+
+    def test_changed_file_discards_journal(self, qapp, file_path):
+        editor = _open(qapp, file_path, "a")
+        _type(editor, "b")
+        _save(editor)
+        _close(editor)
+        assert os.path.exists(UndoJournal.journal_path(file_path))
+
+        editor = _open(qapp, file_path, "changed elsewhere")
+        assert not editor.canUndo()
+        assert not os.path.exists(UndoJournal.journal_path(file_path))
+
+    def test_only_limit_steps_are_read(self, qapp, file_path):
+        editor = _open(qapp, file_path, "")
+        editor.undo_stack.setUndoLimit(0)
+        words = [f"w{i} " for i in range(300)]
+        for word in words:
+            _type(editor, word)
+        _save(editor)
+        _close(editor)
+
+        editor = _open(qapp, file_path, "".join(words))
+        stack = editor.undo_stack
+        assert stack.count() == editor.MAX_UNDO_STEPS
+        payload = stack.command(0).payloads()[0]
+        assert payload.memory_bytes == 0
+        assert payload.disk_bytes > 0
+        editor.undo()
+        assert editor.toPlainText() == "".join(words)[:-1]
+
+    def test_merge_run_is_written_once(self, qapp, file_path):
+        text = "x" * 300
+        editor = _open(qapp, file_path, text)
+        for _ in range(300):
+            _press(editor, Qt.Key.Key_Backspace)
+        _save(editor)
+        _close(editor)
+
+        # Writing the merged step on every keystroke would take ~45 KB.
+        assert os.path.getsize(UndoJournal.journal_path(file_path)) < 2000
+        editor = _open(qapp, file_path, "")
+        assert _undo_all(editor) == ["", text]
+
+    def test_unjournaled_command_stops_restore(self, qapp, file_path):
+        editor = _open(qapp, file_path, "a")
+        _type(editor, " b")
+        editor.end_typing()
+        editor.undo_stack.push(TextEditCommand(editor))
+        _type(editor, " c")
+        _save(editor)
+        _close(editor)
+
+        editor = _open(qapp, file_path, "a b c")
+        assert _undo_all(editor) == ["a b c", "a b"]
+
+    def test_large_payloads_round_trip(self, qapp, file_path):
+        editor = _open(qapp, file_path, "")
+        pasted = "line of text é 😀\n" * 5000
+        editor.textCursor().insertText(pasted)
+        editor.undo_stack.push(InsertTextCommand(editor, pasted, 0))
+        _save(editor)
+        size = os.path.getsize(UndoJournal.journal_path(file_path))
+        assert size < len(pasted) // 4
+        _close(editor)
+
+        editor = _open(qapp, file_path, editor.toPlainText())
+        editor.undo()
+        assert editor.toPlainText() == ""
+        editor.redo()
+        assert editor.toPlainText() == pasted
+
+    def test_compacts_old_history(self, qapp, file_path, monkeypatch):
+        monkeypatch.setattr(UndoJournal, "COMPACT_BYTES", 0)
+        editor = _open(qapp, file_path, "")
+        editor.undo_stack.setUndoLimit(0)
+        for i in range(200):
+            _type(editor, f"w{i} ")
+        text = editor.toPlainText()
+        _save(editor)
+        _close(editor)
+        size = os.path.getsize(UndoJournal.journal_path(file_path))
+
+        editor = _open(qapp, file_path, text)
+        assert os.path.getsize(UndoJournal.journal_path(file_path)) < size
+        _close(editor)
+
+        editor = _open(qapp, file_path, text)
+        assert editor.undo_stack.count() == editor.MAX_UNDO_STEPS
+        for _ in range(editor.MAX_UNDO_STEPS):
+            editor.undo()
+        # One step per word, plus the trailing space.
+        kept = 200 - (editor.MAX_UNDO_STEPS - 1)
+        assert editor.toPlainText() == " ".join(f"w{i}" for i in range(kept))
+
+    def test_journal_is_private(self, qapp, file_path):
+        editor = _open(qapp, file_path, "start")
+        _type(editor, " one")
+        _save(editor)
+        _close(editor)
+
+        journal_path = UndoJournal.journal_path(file_path)
+        assert os.stat(journal_path).st_mode & 0o777 == 0o600
+        assert os.stat(os.path.dirname(journal_path)).st_mode & 0o777 == 0o700
+
+    def test_stale_journals_are_pruned_on_restore(self, qapp, tmp_path, file_path):
+        old = _open(qapp, str(tmp_path / "gone.txt"), "a")
+        _type(old, " b")
+        _save(old)
+        _close(old)
+        stale = UndoJournal.journal_path(str(tmp_path / "gone.txt"))
+        os.utime(stale, (0, 0))
+
+        _close(_open(qapp, file_path, "start"))
+
+        assert not os.path.exists(stale)
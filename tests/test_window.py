@@ -2,8 +2,13 @@ import pytest
 import sys
 from unittest.mock import patch, MagicMock
 
+from PyQt6.QtCore import QEvent, Qt
+from PyQt6.QtGui import QKeyEvent, QTextCursor
 from PyQt6.QtWidgets import QApplication
+from editor.code_editor import CodeEditor
 from editor.window import MainWindow
+from editor.file_format import SNIFF_SIZE
+from editor.highlighters.detector import LanguageDetector
 
 
 @pytest.fixture(scope="module")
@@ -58,6 +63,26 @@ class TestUnsavedChangesTracking:
         assert window._is_modified is False
         assert window._status_label.text() == "New"
 
+    def test_same_length_edit_marks_unsaved(self, window, tmp_path):
+        test_file = tmp_path / "same.txt"
+        test_file.write_text("abc", encoding="utf-8")
+        with patch("editor.window.QFileDialog.getOpenFileName", return_value=(str(test_file), "")):
+            window.open_file()
+
+        window.text_edit.setPlainText("abd")
+        assert window._status_label.text() == "Unsaved"
+
+        window.text_edit.setPlainText("abc")
+        assert window._status_label.text() == "Saved"
+
+    def test_opened_file_with_crlf_is_saved(self, window, tmp_path):
+        test_file = tmp_path / "crlf.txt"
+        test_file.write_bytes(b"one\r\ntwo\r\n")
+        with patch("editor.window.QFileDialog.getOpenFileName", return_value=(str(test_file), "")):
+            window.open_file()
+
+        assert window._status_label.text() == "Saved"
+
 
 class TestSaveFile:
     def test_save_writes_file_and_updates_ui(self, window, tmp_path):
@@ -97,6 +122,99 @@ class TestSaveFile:
         assert window._status_label.text() == "Unsaved"
 
 
+    def test_save_as_detects_language_once_per_revision(self, window, tmp_path):
+        test_file = tmp_path / "script"
+        window.text_edit.setPlainText("import os\n\ndef main():\n    pass\n")
+
+        with patch("editor.window.QFileDialog.getSaveFileName") as mock_save, \
+             patch.object(LanguageDetector, "detect_from_content",
+                          wraps=LanguageDetector.detect_from_content) as detect:
+            mock_save.return_value = (str(test_file), "")
+            window.save_file()
+
+        assert detect.call_count == 1
+        assert window.current_file == str(test_file) + ".py"
+
+    def test_save_keeps_highlighter_and_block_states(self, window, tmp_path, app):
+        test_file = tmp_path / "code.c"
+        test_file.write_text("\n".join(f"int x{i} = {i};" for i in range(200)), encoding="utf-8")
+        with patch("editor.window.QFileDialog.getOpenFileName", return_value=(str(test_file), "")):
+            window.open_file()
+        app.processEvents()
+        highlighter = window.highlighter
+        window.text_edit.insertPlainText("/* x */")
+
+        with patch.object(highlighter, "rehighlight") as rehighlight:
+            window.save_file()
+            app.processEvents()
+
+        rehighlight.assert_not_called()
+        assert window.highlighter is highlighter
+        assert highlighter.lang_id == "c"
+
+    def test_save_as_new_extension_switches_language_in_place(self, window, tmp_path):
+        window.text_edit.setPlainText("int x = 1;\n")
+        highlighter = window.highlighter
+        assert highlighter.lang_id == "plain"
+
+        with patch("editor.window.QFileDialog.getSaveFileName") as mock_save:
+            mock_save.return_value = (str(tmp_path / "code.c"), "")
+            window.save_file()
+
+        assert window.highlighter is highlighter
+        assert highlighter.lang_id == "c"
+
+class TestBackgroundSave:
+    @pytest.fixture
+    def saved_file(self, window, tmp_path):
+        test_file = tmp_path / "big.txt"
+        test_file.write_text("original", encoding="utf-8")
+        with patch("editor.window.QFileDialog.getOpenFileName", return_value=(str(test_file), "")):
+            window.open_file()
+        window._controller.BACKGROUND_SAVE_THRESHOLD = 0
+        return test_file
+
+    def test_save_reports_back_when_written(self, window, saved_file):
+        window.text_edit.setPlainText("changed")
+
+        window.save_file()
+        assert window._status_label.text() == "Saving"
+        window._saver.wait()
+
+        assert saved_file.read_text(encoding="utf-8") == "changed"
+        assert window._status_label.text() == "Saved"
+
+    def test_typing_during_save_stays_unsaved(self, window, saved_file):
+        window.text_edit.setPlainText("changed")
+        window.save_file()
+
+        window.text_edit.setPlainText("changed again")
+        window._saver.wait()
+
+        assert saved_file.read_text(encoding="utf-8") == "changed"
+        assert window._status_label.text() == "Unsaved"
+
+    def test_repeated_save_of_same_revision_is_skipped(self, window, saved_file):
+        window.text_edit.setPlainText("changed")
+
+        with patch.object(window._controller, "prepare_save", wraps=window._controller.prepare_save) as prepare:
+            window.save_file()
+            window.save_file()
+            window.save_file()
+        window._saver.wait()
+
+        assert prepare.call_count == 1
+
+    def test_close_waits_for_save(self, window, saved_file):
+        window.text_edit.setPlainText("changed")
+        window.save_file()
+
+        window.close()
+
+        assert saved_file.read_text(encoding="utf-8") == "changed"
+        assert not window._document.is_modified
+
+
 class TestOpenFile:
     def test_open_loads_content_and_updates_ui(self, window, tmp_path):
         test_file = tmp_path / "test.txt"
@@ -122,33 +240,35 @@ class TestOpenFile:
 
         assert str(test_file) in window.windowTitle()
 
-    def test_open_with_unsaved_discard_proceeds(self, window, tmp_path):
+    def test_open_with_unsaved_changes_opens_new_tab(self, window, tmp_path, no_dialogs):
         test_file = tmp_path / "test.txt"
         test_file.write_text("file content", encoding="utf-8")
 
         window.text_edit.setPlainText("unsaved changes")
+        unsaved = window._tab
         assert window._is_modified is True
 
-        with patch("editor.window.QFileDialog.getOpenFileName") as mock_open, \
-             patch.object(window, "_prompt_save_changes", return_value="discard"):
+        with patch("editor.window.QFileDialog.getOpenFileName") as mock_open:
             mock_open.return_value = (str(test_file), "")
             window.open_file()
 
+        no_dialogs["question"].assert_not_called()
         assert window.text_edit.toPlainText() == "file content"
         assert window._is_modified is False
+        assert unsaved.editor.toPlainText() == "unsaved changes"
+        assert unsaved.document.is_modified
 
-    def test_open_with_unsaved_cancel_aborts(self, window, tmp_path):
-        original_text = "unsaved changes"
-        window.text_edit.setPlainText(original_text)
-        assert window._is_modified is True
+    def test_open_failure_in_new_tab_removes_it(self, window, tmp_path, no_dialogs):
+        window.text_edit.setPlainText("unsaved changes")
+        unsaved = window._tab
 
-        with patch("editor.window.QFileDialog.getOpenFileName") as mock_open, \
-             patch.object(window, "_prompt_save_changes", return_value="cancel"):
-            mock_open.return_value = (str(tmp_path / "ignored.txt"), "")
+        with patch("editor.window.QFileDialog.getOpenFileName") as mock_open:
+            mock_open.return_value = (str(tmp_path / "missing.txt"), "")
             window.open_file()
 
-        assert window.text_edit.toPlainText() == original_text
-        assert window._is_modified is True
+        no_dialogs["critical"].assert_called_once()
+        assert window._tabs.count() == 1
+        assert window._tab is unsaved
 
     def test_open_cancelled_keeps_state(self, window):
         window.text_edit.setPlainText("existing content")
@@ -159,6 +279,190 @@ class TestOpenFile:
 
         assert window.text_edit.toPlainText() == "existing content"
 
+    def test_save_preserves_encoding_and_line_endings(self, window, tmp_path):
+        test_file = tmp_path / "legacy.txt"
+        test_file.write_bytes("café\r\n".encode("latin-1"))
+
+        with patch("editor.window.QFileDialog.getOpenFileName") as mock_open:
+            mock_open.return_value = (str(test_file), "")
+            window.open_file()
+        window.text_edit.moveCursor(QTextCursor.MoveOperation.End)
+        window.text_edit.insertPlainText("déjà vu\n")
+        window.save_file()
+
+        assert test_file.read_bytes() == "café\r\ndéjà vu\r\n".encode("latin-1")
+        assert window._status_label.text() == "Saved"
+
+
+class TestStreamingOpen:
+    @pytest.fixture
+    def big_file(self, window, tmp_path):
+        window._controller.STREAM_THRESHOLD = 0
+        window._controller.file_manager.CHUNK_SIZE = 16
+        test_file = tmp_path / "big.c"
+        test_file.write_text("int x = 1;\n" * 50, encoding="utf-8")
+        return test_file
+
+    def _open(self, window, path):
+        with patch("editor.window.QFileDialog.getOpenFileName", return_value=(str(path), "")):
+            window.open_file()
+
+    def test_streamed_file_is_loaded_and_saved(self, window, big_file):
+        self._open(window, big_file)
+        assert window._status_label.text() == "Loading"
+        assert window.text_edit.isReadOnly()
+
+        window._loader.finish()
+
+        assert window.text_edit.toPlainText() == "int x = 1;\n" * 50
+        assert window.current_file == str(big_file)
+        assert window._status_label.text() == "Saved"
+        assert not window.text_edit.isReadOnly()
+        assert not window.text_edit.canUndo()
+
+    def test_streamed_file_is_pretokenized(self, window, big_file, monkeypatch):
+        from editor.highlighters import pretokenizer
+
+        monkeypatch.setattr(pretokenizer, "MIN_LINES", 10)
+        monkeypatch.setattr(pretokenizer, "MIN_CPUS", 1)
+        self._open(window, big_file)
+
+        window._loader.finish()
+
+        future = window._highlight_scheduler._pretokenize_future
+        assert future is not None
+        lines, results = future.result(timeout=60)
+        assert len(lines) == window.text_edit.blockCount() == len(results)
+
+    def test_edit_after_streaming_marks_unsaved(self, window, big_file):
+        self._open(window, big_file)
+        window._loader.finish()
+
+        window.text_edit.textCursor().insertText("x")
+
+        assert window._status_label.text() == "Unsaved"
+
+    def test_save_is_ignored_while_loading(self, window, big_file):
+        self._open(window, big_file)
+
+        window.save_file()
+
+        assert big_file.read_text(encoding="utf-8") == "int x = 1;\n" * 50
+
+    def test_opening_another_file_keeps_loading_in_its_tab(self, window, big_file, tmp_path):
+        small = tmp_path / "small.txt"
+        small.write_text("small", encoding="utf-8")
+        self._open(window, big_file)
+        loading = window._tab
+
+        self._open(window, small)
+
+        assert window._loader is None
+        assert window.text_edit.toPlainText() == "small"
+        assert window._status_label.text() == "Saved"
+        assert not window._load_progress_action.isVisible()
+
+        loading.loader.finish()
+
+        assert loading.editor.toPlainText() == "int x = 1;\n" * 50
+        assert window.text_edit.toPlainText() == "small"
+        assert window._status_label.text() == "Saved"
+
+    def test_binary_file_rejected_before_loading(self, window, tmp_path, no_dialogs):
+        window._controller.STREAM_THRESHOLD = 0
+        binary = tmp_path / "data.bin"
+        binary.write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR")
+        self._open(window, binary)
+
+        assert window._loader is None
+        no_dialogs["critical"].assert_called_once()
+        assert window.current_file is None
+        assert window._status_label.text() == "New"
+
+    def test_falls_back_to_latin1_past_sniffed_prefix(self, window, tmp_path):
+        window._controller.STREAM_THRESHOLD = 0
+        late = tmp_path / "late.txt"
+        late.write_bytes(b"x" * SNIFF_SIZE + "café\n".encode("latin-1"))
+        self._open(window, late)
+
+        window._loader.finish()
+
+        assert window.text_edit.toPlainText() == "x" * SNIFF_SIZE + "café\n"
+        assert window._document.file_format.encoding == "latin-1"
+        assert window.current_file == str(late)
+        assert window._status_label.text() == "Saved"
+
+    def test_binary_past_sniffed_prefix_fails_and_resets(self, window, tmp_path, no_dialogs):
+        window._controller.STREAM_THRESHOLD = 0
+        broken = tmp_path / "broken.txt"
+        broken.write_bytes(b"x" * SNIFF_SIZE + b"\xff\x00")
+        self._open(window, broken)
+
+        window._loader.finish()
+
+        no_dialogs["critical"].assert_called_once()
+        assert window.current_file is None
+        assert window.text_edit.toPlainText() == ""
+        assert window._status_label.text() == "New"
+
+
+class TestLargeFileMode:
+    @pytest.fixture
+    def huge_file(self, window, tmp_path):
+        window._controller.LARGE_FILE_THRESHOLD = 0
+        test_file = tmp_path / "huge.log"
+        test_file.write_text("".join(f"entry {i}\n" for i in range(1000)), encoding="utf-8")
+        return test_file
+
+    def _open(self, window, path):
+        with patch("editor.window.QFileDialog.getOpenFileName", return_value=(str(path), "")):
+            window.open_file()
+        window._viewer.mapped_file._thread.join()
+
+    def test_opens_in_read_only_viewer(self, window, huge_file):
+        self._open(window, huge_file)
+
+        assert window._editor_stack.currentWidget() is window._viewer
+        assert window.current_file == str(huge_file)
+        assert window._status_label.text() == "Read-only"
+        assert window._viewer._visible_lines()[0][0] == "entry 0"
+
+    def test_goto_line(self, window, huge_file):
+        self._open(window, huge_file)
+
+        with patch("editor.window.QInputDialog.getInt", return_value=(500, True)):
+            window._goto_line()
+
+        assert window._viewer.first_visible_line == 499
+        assert window._viewer._visible_lines()[0][0] == "entry 499"
+
+    def test_save_is_ignored(self, window, huge_file):
+        self._open(window, huge_file)
+
+        with patch("editor.window.QFileDialog.getSaveFileName") as mock_save:
+            window.save_file()
+
+        mock_save.assert_not_called()
+
+    def test_opening_small_file_leaves_viewer_in_its_tab(self, window, huge_file, tmp_path):
+        self._open(window, huge_file)
+        viewing = window._tab
+        small = tmp_path / "small.txt"
+        small.write_text("small", encoding="utf-8")
+
+        with patch("editor.window.QFileDialog.getOpenFileName", return_value=(str(small), "")):
+            window.open_file()
+
+        assert window._viewer is None
+        assert window._editor_stack.currentWidget() is window._tab.panes
+        assert window.text_edit.toPlainText() == "small"
+        assert window._status_label.text() == "Saved"
+
+        window._tabs.set_current_tab(viewing)
+
+        assert window._editor_stack.currentWidget() is window._viewer
+        assert window._status_label.text() == "Read-only"
+
 
 class TestStatusLabel:
     def test_status_label_shows_new_initially(self, window):
@@ -175,6 +479,14 @@ class TestStatusLabel:
         window.text_edit.setPlainText("modified")
         assert "#8B0000" in window._status_label.styleSheet()
 
+    def test_undo_summary_reports_footprint(self, window):
+        from editor.undo_commands import InsertTextCommand
+
+        assert window._undo_summary() == "Undo history: 0.0 MB in memory"
+        window.text_edit.undo_stack.memory_budget = 0
+        window.text_edit.undo_stack.push(InsertTextCommand(window.text_edit, "x" * 2_000_000, 0))
+        assert window._undo_summary().endswith("MB on disk")
+
 
 class TestTitleAsterisk:
     def test_title_has_asterisk_when_unsaved(self, window):
@@ -401,40 +713,27 @@ class TestNewFile:
         assert window.current_file is None
         assert window.text_edit.toPlainText() == ""
 
-    def test_new_file_with_unsaved_discard_proceeds(self, window):
+    def test_new_file_with_unsaved_changes_opens_new_tab(self, window, no_dialogs):
         window.text_edit.setPlainText("unsaved content")
+        unsaved = window._tab
         assert window._is_modified is True
 
-        with patch.object(window, "_prompt_save_changes", return_value="discard"):
-            window.new_file()
+        window.new_file()
 
+        no_dialogs["question"].assert_not_called()
         assert window.text_edit.toPlainText() == ""
         assert window._is_modified is False
+        assert window._tabs.count() == 2
+        assert unsaved.editor.toPlainText() == "unsaved content"
+        assert unsaved.document.is_modified
 
-    def test_new_file_with_unsaved_cancel_aborts(self, window):
-        original_text = "unsaved content"
-        window.text_edit.setPlainText(original_text)
-        assert window._is_modified is True
-
-        with patch.object(window, "_prompt_save_changes", return_value="cancel"):
-            window.new_file()
-
-        assert window.text_edit.toPlainText() == original_text
-        assert window._is_modified is True
+    def test_new_file_in_empty_tab_reuses_it(self, window):
+        tab = window._tab
 
-    def test_new_file_with_unsaved_save_then_clears(self, window, tmp_path):
-        test_file = tmp_path / "saved.txt"
-        window.text_edit.setPlainText("content to save")
-        assert window._is_modified is True
+        window.new_file()
 
-        with patch.object(window, "_prompt_save_changes", return_value="save"), \
-             patch("editor.window.QFileDialog.getSaveFileName") as mock_save:
-            mock_save.return_value = (str(test_file), "")
-            window.new_file()
-
-        assert test_file.exists()
-        assert window.text_edit.toPlainText() == ""
-        assert window._is_modified is False
+        assert window._tab is tab
+        assert window._tabs.count() == 1
 
     def test_new_file_updates_title(self, window, tmp_path):
         test_file = tmp_path / "test.txt"
@@ -450,3 +749,350 @@ class TestNewFile:
 
         assert str(test_file) not in window.windowTitle()
         assert not window.windowTitle().startswith("* ")
+
+
+class TestTabs:
+    def _open(self, window, path):
+        with patch("editor.window.QFileDialog.getOpenFileName", return_value=(str(path), "")):
+            window.open_file()
+
+    @pytest.fixture
+    def two_files(self, tmp_path):
+        first = tmp_path / "first.c"
+        first.write_text("\n".join(f"int x{i} = {i};" for i in range(200)), encoding="utf-8")
+        second = tmp_path / "second.py"
+        second.write_text("import os\n\ndef main():\n    pass\n", encoding="utf-8")
+        return first, second
+
+    def test_files_open_in_their_own_tabs(self, window, two_files):
+        first, second = two_files
+        self._open(window, first)
+        self._open(window, second)
+
+        assert window._tabs.count() == 2
+        assert window._tabs.tabText(0) == "first.c"
+        assert window._tabs.tabText(1) == "second.py"
+        assert window.current_file == str(second)
+        assert str(second) in window.windowTitle()
+
+    def test_reopening_a_file_switches_to_its_tab(self, window, two_files):
+        first, second = two_files
+        self._open(window, first)
+        first_tab = window._tab
+        window.text_edit.insertPlainText("edit ")
+        self._open(window, second)
+
+        self._open(window, first)
+
+        assert window._tabs.count() == 2
+        assert window._tab is first_tab
+        assert window.text_edit.toPlainText().startswith("edit int x0")
+        assert window._status_label.text() == "Unsaved"
+
+    def test_switching_back_keeps_document_and_highlighting(self, window, two_files, app):
+        first, second = two_files
+        self._open(window, first)
+        while not window._highlight_scheduler.is_complete:
+            app.processEvents()
+        first_tab = window._tab
+        document = window.text_edit.document()
+        highlighter = window.highlighter
+        formats = document.findBlockByNumber(0).layout().formats()
+        assert formats
+        self._open(window, second)
+
+        tokenizer = MagicMock(wraps=highlighter._tokenizer)
+        with patch.object(highlighter, "_tokenizer", tokenizer):
+            window._tabs.set_current_tab(first_tab)
+            app.processEvents()
+
+        tokenizer.tokenize_line_packed.assert_not_called()
+        assert window.text_edit.document() is document
+        assert window.highlighter is highlighter
+        assert document.findBlockByNumber(0).layout().formats() == formats
+
+    def test_edit_menu_acts_on_current_tab(self, window, two_files):
+        first, second = two_files
+        self._open(window, first)
+        self._open(window, second)
+        edit_menu = window.menuBar().actions()[1].menu()
+        select_all = next(a for a in edit_menu.actions() if a.text() == "Select &All")
+
+        select_all.trigger()
+
+        assert window.text_edit.textCursor().selectedText().startswith("import os")
+
+    def test_modified_tab_is_marked(self, window, two_files):
+        first, second = two_files
+        self._open(window, first)
+        first_tab = window._tab
+        self._open(window, second)
+
+        first_tab.editor.insertPlainText("x")
+
+        assert window._tabs.tabText(0) == "* first.c"
+        assert window._status_label.text() == "Saved"
+
+    def test_inactive_tab_caches_are_evicted_over_budget(self, window, two_files, app):
+        first, second = two_files
+        self._open(window, first)
+        app.processEvents()
+        first_tab = window._tab
+        assert first_tab.cache_bytes > 0
+        self._open(window, second)
+        app.processEvents()
+        second_tab = window._tab
+
+        assert window._tabs.evict_caches() == 0
+        assert window._tabs.evict_caches(budget=0) == 1
+        assert first_tab.cache_bytes == 0
+        assert second_tab.cache_bytes > 0
+
+    def test_switching_tabs_evicts_least_recently_used(self, window, two_files, app):
+        first, second = two_files
+        self._open(window, first)
+        app.processEvents()
+        first_tab = window._tab
+        window._tabs.CACHE_BUDGET = 0
+
+        self._open(window, second)
+
+        assert first_tab.cache_bytes == 0
+
+    def test_close_unmodified_tab(self, window, two_files, no_dialogs):
+        first, second = two_files
+        self._open(window, first)
+        self._open(window, second)
+
+        window.close_tab()
+
+        no_dialogs["question"].assert_not_called()
+        assert window._tabs.count() == 1
+        assert window.current_file == str(first)
+
+    def test_close_modified_tab_cancel_keeps_it(self, window, two_files):
+        first, second = two_files
+        self._open(window, first)
+        window.text_edit.insertPlainText("x")
+        first_tab = window._tab
+        self._open(window, second)
+        window._tabs.set_current_tab(first_tab)
+
+        with patch.object(window, "_prompt_save_changes", return_value="cancel"):
+            window.close_tab()
+
+        assert window._tabs.count() == 2
+        assert window._tab is first_tab
+
+    def test_close_modified_tab_save_writes_it(self, window, two_files):
+        first, second = two_files
+        self._open(window, first)
+        window.text_edit.insertPlainText("x")
+        first_tab = window._tab
+        self._open(window, second)
+
+        with patch.object(window, "_prompt_save_changes", return_value="save"):
+            window.close_tab(first_tab)
+
+        assert first.read_text(encoding="utf-8").startswith("xint x0")
+        assert window._tabs.count() == 1
+        assert window.current_file == str(second)
+
+    def test_closing_last_tab_leaves_empty_tab(self, window, two_files):
+        first, _ = two_files
+        self._open(window, first)
+
+        window.close_tab()
+
+        assert window._tabs.count() == 1
+        assert window.current_file is None
+        assert window.text_edit.toPlainText() == ""
+        assert window._status_label.text() == "New"
+
+    def test_close_event_asks_for_each_modified_tab(self, window, two_files, app):
+        first, second = two_files
+        self._open(window, first)
+        window.text_edit.insertPlainText("x")
+        self._open(window, second)
+        window.text_edit.insertPlainText("y")
+
+        with patch.object(window, "_prompt_save_changes", side_effect=["discard", "cancel"]) as prompt:
+            window.close()
+
+        assert prompt.call_count == 2
+        assert window._tab.document.file_path == str(second)
+
+
+class TestSplitView:
+    @pytest.fixture
+    def opened(self, window, tmp_path):
+        test_file = tmp_path / "code.c"
+        test_file.write_text("\n".join(f"int x{i} = {i};" for i in range(500)), encoding="utf-8")
+        with patch("editor.window.QFileDialog.getOpenFileName", return_value=(str(test_file), "")):
+            window.open_file()
+        return test_file
+
+    def test_split_shares_document_and_highlighter(self, window, opened):
+        highlighter = window.highlighter
+
+        pane = window._tab.split(Qt.Orientation.Horizontal)
+
+        assert window._tab.pane_count() == 2
+        assert pane.document() is window.text_edit.document()
+        assert window.highlighter is highlighter
+        assert pane.line_number_area is not window.text_edit.line_number_area
+        assert window._active_pane is pane
+
+    def test_panes_scroll_independently(self, window, opened, app):
+        window.resize(800, 600)
+        window.show()
+        pane = window._tab.split(Qt.Orientation.Vertical)
+        app.processEvents()
+
+        pane.verticalScrollBar().setValue(400)
+        app.processEvents()
+
+        assert window.text_edit.firstVisibleBlock().blockNumber() == 0
+        assert pane.firstVisibleBlock().blockNumber() >= 390
+        assert pane.firstVisibleBlock().userState() != -1
+
+    def test_edit_in_pane_marks_document_modified(self, window, opened):
+        pane = window._tab.split(Qt.Orientation.Horizontal)
+
+        pane.insertPlainText("/* new */")
+
+        assert window.text_edit.toPlainText().startswith("/* new */")
+        assert window._status_label.text() == "Unsaved"
+
+    def test_edit_menu_acts_on_active_pane(self, window, opened):
+        pane = window._tab.split(Qt.Orientation.Horizontal)
+        pane.moveCursor(QTextCursor.MoveOperation.End)
+        edit_menu = window.menuBar().actions()[1].menu()
+        select_all = next(a for a in edit_menu.actions() if a.text() == "Select &All")
+
+        select_all.trigger()
+
+        assert pane.textCursor().hasSelection()
+        assert not window.text_edit.textCursor().hasSelection()
+
+    def test_split_other_way_nests_panes(self, window, opened):
+        first = window._tab.split(Qt.Orientation.Horizontal)
+
+        second = window._tab.split(Qt.Orientation.Vertical)
+
+        assert window._tab.panes.orientation() == Qt.Orientation.Horizontal
+        nested = second.parentWidget()
+        assert nested is first.parentWidget()
+        assert nested.orientation() == Qt.Orientation.Vertical
+        assert nested.parentWidget() is window._tab.panes
+
+    def test_close_pane_collapses_nested_splitter(self, window, opened):
+        window._tab.split(Qt.Orientation.Horizontal)
+        second = window._tab.split(Qt.Orientation.Vertical)
+
+        assert window._tab.close_pane(second)
+
+        assert window._tab.pane_count() == 2
+        assert window._tab.panes.count() == 2
+        assert all(isinstance(w, CodeEditor) for w in (window._tab.panes.widget(0), window._tab.panes.widget(1)))
+        assert window._tab.close_pane()
+        assert not window._tab.close_pane()
+
+    def test_undo_after_closing_pane(self, window, opened, app):
+        pane = window._tab.split(Qt.Orientation.Horizontal)
+        pane.moveCursor(QTextCursor.MoveOperation.End)
+        pane.keyPressEvent(QKeyEvent(QEvent.Type.KeyPress, Qt.Key.Key_Space, Qt.KeyboardModifier.NoModifier, " "))
+
+        window._tab.close_pane(pane)
+        app.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+        window.text_edit.undo()
+
+        assert window._active_pane is window.text_edit
+        assert window.text_edit.toPlainText() == opened.read_text(encoding="utf-8")
+
+    def test_close_primary_pane_keeps_split_pane(self, window, opened, app):
+        primary = window.text_edit
+        pane = window._tab.split(Qt.Orientation.Horizontal)
+        primary.moveCursor(QTextCursor.MoveOperation.End)
+        primary.keyPressEvent(QKeyEvent(QEvent.Type.KeyPress, Qt.Key.Key_Space, Qt.KeyboardModifier.NoModifier, " "))
+
+        assert window._tab.close_pane(primary)
+        app.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+
+        assert window._tab.pane_count() == 1
+        assert window._tab.panes.widget(0) is pane
+        assert window.text_edit is pane
+        assert window._active_pane is pane
+        assert window.highlighter.document() is pane.document()
+        pane.undo()
+        assert pane.toPlainText() == opened.read_text(encoding="utf-8")
+
+        pane.moveCursor(QTextCursor.MoveOperation.Start)
+        pane.insertPlainText("/* new */")
+        assert window._document.current_content.startswith("/* new */")
+        assert window._status_label.text() == "Unsaved"
+        window._highlight_scheduler.finish()
+
+    def test_split_is_ignored_in_large_file_mode(self, window, tmp_path):
+        window._controller.LARGE_FILE_THRESHOLD = 0
+        huge = tmp_path / "huge.log"
+        huge.write_text("entry\n" * 100, encoding="utf-8")
+        with patch("editor.window.QFileDialog.getOpenFileName", return_value=(str(huge), "")):
+            window.open_file()
+        window._viewer.mapped_file._thread.join()
+
+        window._split(Qt.Orientation.Horizontal)
+
+        assert window._tab.pane_count() == 1
+
+
+class TestUndoJournal:
+    def _open(self, window, path):
+        with patch("editor.window.QFileDialog.getOpenFileName", return_value=(str(path), "")):
+            window.open_file()
+
+    def _type(self, window, text):
+        for char in text:
+            key = Qt.Key.Key_Space if char == " " else Qt.Key.Key_A
+            window.text_edit.keyPressEvent(
+                QKeyEvent(QEvent.Type.KeyPress, key, Qt.KeyboardModifier.NoModifier, char)
+            )
+
+    def test_history_survives_closing_the_tab(self, window, tmp_path):
+        path = tmp_path / "notes.txt"
+        path.write_text("draft", encoding="utf-8")
+        self._open(window, path)
+        window.text_edit.moveCursor(QTextCursor.MoveOperation.End)
+        self._type(window, " final")
+        window.save_file()
+        window.close_tab()
+
+        self._open(window, path)
+        assert window.text_edit.toPlainText() == "draft final"
+        window.text_edit.undo()
+        window.text_edit.undo()
+        assert window.text_edit.toPlainText() == "draft"
+        assert window._status_label.text() == "Unsaved"
+
+    def test_first_save_starts_journal_with_current_history(self, window, tmp_path):
+        path = tmp_path / "new.txt"
+        self._type(window, "hello")
+        with patch("editor.window.QFileDialog.getSaveFileName", return_value=(str(path), "")):
+            window.save_file()
+        window.close_tab()
+
+        self._open(window, path)
+        window.text_edit.undo()
+        assert window.text_edit.toPlainText() == ""
+
+    def test_file_changed_elsewhere_has_no_history(self, window, tmp_path):
+        path = tmp_path / "notes.txt"
+        path.write_text("draft", encoding="utf-8")
+        self._open(window, path)
+        self._type(window, "x")
+        window.save_file()
+        window.close_tab()
+        path.write_text("rewritten", encoding="utf-8")
+
+        self._open(window, path)
+        assert not window.text_edit.canUndo()